@@ -19,6 +19,37 @@ MT5_EDITOR = MT5_INSTALL_PATH / "MetaEditor64.exe"
 MT5_DATA_PATH = Path(r"C:\Users\User\AppData\Roaming\MetaQuotes\Terminal\A42909ABCDDDD04324904B57BA9776B8")
 MT5_EXPERTS_PATH = MT5_DATA_PATH / "MQL5" / "Experts"
 MT5_TESTER_PATH = MT5_DATA_PATH / "Tester"
+# Local tester agents (Agent-127.0.0.1-3000, ...) and their logs/reports live
+# under %APPDATA%\MetaQuotes\Tester\<terminal id>, not under the data folder
+MT5_TESTER_AGENTS_PATH = MT5_DATA_PATH.parent.parent / "Tester" / MT5_DATA_PATH.name
+# Shared by all terminals and tester agents of this user (FILE_COMMON)
+MT5_COMMON_FILES = MT5_DATA_PATH.parent / "Common" / "Files"
+
+# Parallel backtest workers: portable MT5 installs, one per subfolder
+# (worker_1/terminal64.exe, worker_2/terminal64.exe, ...). Each is launched with
+# /portable so its data folder, reports and lock file stay inside its own folder.
+MT5_WORKERS_ROOT = Path(r"C:\Users\User\MT5_Workers")
+
+# Content-addressed backtest report cache (see tester/result_cache.py)
+BACKTEST_CACHE_DIR = RUNS_DIR / "cache" / "backtests"
+
+# Live optimization progress files polled by the web UI (see tester/opt_stream.py)
+OPT_LIVE_DIR = RUNS_DIR / "live"
+
+# Seconds-per-pass history of finished optimizations (see optimizer/search_planner.py)
+OPT_TIMINGS_FILE = RUNS_DIR / "cache" / "opt_pass_timings.json"
+
+# Cross-run archive of evaluated optimization passes (see optimizer/pass_archive.py)
+OPT_ARCHIVE_DIR = RUNS_DIR / "cache" / "opt_archive"
+
+# Persisted summaries of runs/workflow_*.json for the web UI (see workflow/state_index.py)
+STATE_INDEX_FILE = RUNS_DIR / "cache" / "state_index.json"
+
+# Per-terminal MQL5/Experts file indexes for the web UI EA picker (see workflow/experts_index.py)
+EXPERTS_INDEX_DIR = RUNS_DIR / "cache" / "experts_index"
+
+# Content-hashed CSS/JS shared by the offline HTML reports (see reports/assets.py)
+ASSETS_DIR = RUNS_DIR / "_assets"
 
 # Backtest settings
 DEFAULT_SYMBOL = "EURUSD"
@@ -20,6 +20,8 @@ from config import (
 )
 from settings import get_settings
 from optimizer.param_extractor import EAParameter, extract_parameters
+from optimizer.pass_archive import apply_trims, check_ini, record_trimmed_grid
+from optimizer.search_planner import plan_search
 
 
 @dataclass
@@ -167,7 +169,8 @@ def create_optimization_from_ea(
     use_cloud: Optional[bool] = None,
     symbol: str = DEFAULT_SYMBOL,
     timeframe: str = DEFAULT_TIMEFRAME,
-    criterion: Optional[int] = None
+    criterion: Optional[int] = None,
+    time_budget_minutes: Optional[float] = None
 ) -> dict:
     """
     Create a complete optimization setup from an EA file.
@@ -181,13 +184,17 @@ def create_optimization_from_ea(
         use_cloud: Enable MQL5 Cloud Network (None = use settings default)
         symbol: Trading symbol
         timeframe: Timeframe
+        time_budget_minutes: Wall-clock budget; steps are coarsened and
+            low-importance params pinned to fit (None = use settings default)
 
     Returns:
-        Dict with ini_path, parameters, and summary
+        Dict with ini_path, parameters, summary and the search plan
     """
-    # Get cloud setting from settings.py if not specified
+    # Get cloud/budget settings from settings.py if not specified
     if use_cloud is None:
         use_cloud = get_settings().optimization.use_cloud
+    if time_budget_minutes is None:
+        time_budget_minutes = get_settings().optimization.time_budget_minutes
 
     ea_name = ea_path.stem
 
@@ -251,19 +258,32 @@ def create_optimization_from_ea(
     if criterion is not None:
         config.optimization_criterion = criterion
 
+    # Size the search space and fit it to the time budget
+    parameters, plan = plan_search(
+        parameters,
+        ea_name=ea_name,
+        symbol=symbol,
+        timeframe=timeframe,
+        model=config.model,
+        optimization_type=config.optimization_type,
+        budget_seconds=time_budget_minutes * 60 if time_budget_minutes else None,
+    )
+
     # Build INI
     ini_path = output_dir / f"{ea_name}_optimize.ini"
     build_optimization_ini(config, parameters, ini_path)
 
-    # Calculate combinations
+    # Overlap with passes earlier runs already evaluated; optionally trim range
+    # ends that are fully archived (Step 8 then reads the merged archive)
+    archive = check_ini(ini_path)
+    trims = archive["trims"] if get_settings().optimization.skip_archived else {}
+    record_trimmed_grid(ini_path, parameters, trims)
+    if trims:
+        parameters = apply_trims(parameters, trims)
+        build_optimization_ini(config, parameters, ini_path)
+    archive["trimmed"] = bool(trims)
+
     optimize_params = [p for p in parameters if p.optimize]
-    combinations = 1
-    for p in optimize_params:
-        if p.type == 'bool':
-            combinations *= 2
-        elif p.step and p.step > 0:
-            steps = int((p.max_val - p.min_val) / p.step) + 1
-            combinations *= steps
 
     return {
         "success": True,
@@ -285,7 +305,9 @@ def create_optimization_from_ea(
                 for p in parameters if not p.optimize
             ]
         },
-        "estimated_combinations": combinations,
+        "estimated_combinations": plan.grid_size,
+        "plan": plan.to_dict(),
+        "archive": archive,
         "settings": {
             "symbol": symbol,
             "timeframe": timeframe,
@@ -309,6 +331,8 @@ if __name__ == "__main__":
     parser.add_argument("--timeframe", default=DEFAULT_TIMEFRAME)
     parser.add_argument("--criterion", type=int, choices=[0, 1, 2, 3, 4, 5, 6],
                         help="Optimization criterion: 0=Balance, 1=PF, 2=Payoff, 3=DD, 4=Recovery, 5=Sharpe, 6=Custom")
+    parser.add_argument("--budget-minutes", type=float,
+                        help="Wall-clock budget; coarsens/pins params to fit (default: from settings.py)")
 
     args = parser.parse_args()
 
@@ -324,7 +348,8 @@ if __name__ == "__main__":
         use_cloud=use_cloud,
         symbol=args.symbol,
         timeframe=args.timeframe,
-        criterion=args.criterion
+        criterion=args.criterion,
+        time_budget_minutes=args.budget_minutes
     )
 
     print(json.dumps(result, indent=2))
@@ -339,5 +364,19 @@ if __name__ == "__main__":
         print(f"\nFixed parameters ({len(result['parameters']['fixed'])}):")
         for p in result['parameters']['fixed']:
             print(f"  {p['name']}: {p['value']}")
+        plan = result['plan']
         print(f"\nEstimated combinations: {result['estimated_combinations']}")
+        if plan['grid_size_before'] != plan['grid_size']:
+            print(f"  (shrunk from {plan['grid_size_before']} to fit {plan['budget_seconds'] / 60:g} min budget)")
+        for adj in plan['adjustments']:
+            if adj['action'] == 'coarsen':
+                print(f"  coarsened {adj['name']}: step {adj['step_from']} -> {adj['step_to']} ({adj['values_to']} values)")
+            else:
+                print(f"  pinned {adj['name']} = {adj['value']}")
+        print(f"Predicted duration: {plan['predicted_minutes']} min "
+              f"({plan['predicted_passes']} passes x {plan['seconds_per_pass']}s, {plan['timing_source']})")
+        archive = result['archive']
+        print(f"Already archived: {archive['covered']}/{archive['grid_size']} grid points ({archive['coverage_pct']}%)")
+        for name, (lo, hi) in archive['trims'].items():
+            print(f"  {'trimmed' if archive['trimmed'] else 'could trim'} {name} to {lo:g} -> {hi:g}")
         print(f"Cloud agents: {'ON' if use_cloud else 'OFF'}")
@@ -15,6 +15,7 @@ Usage:
 
 import re
 import json
+import math
 import sys
 from pathlib import Path
 from dataclasses import dataclass
@@ -289,8 +290,11 @@ def main():
         print(f"Error: File not found: {ea_path}")
         sys.exit(1)
 
+    from optimizer.search_planner import range_values
+
     ea_name = ea_path.stem
     analysis = analyze_ea(ea_path)
+    values = {p.name: range_values(p.opt_min, p.opt_max, p.opt_step) if p.should_optimize else 1 for p in analysis}
 
     output_dir = Path(__file__).parent.parent / 'runs'
     output_dir.mkdir(exist_ok=True)
@@ -305,7 +309,7 @@ def main():
             print(f"  [{opt_flag}] {p.name} ({p.category})")
             print(f"       Default: {p.default} | Wide: {p.wide_value}")
             if p.should_optimize:
-                print(f"       Range: {p.opt_min} to {p.opt_max} step {p.opt_step}")
+                print(f"       Range: {p.opt_min} to {p.opt_max} step {p.opt_step} ({values[p.name]} values)")
             print(f"       {p.reasoning}")
             print()
 
@@ -326,10 +330,11 @@ def main():
         'ea_name': ea_name,
         'total_params': len(analysis),
         'optimizable': sum(1 for p in analysis if p.should_optimize),
+        'grid_size': math.prod(values.values()),
         'categories': {cat: sum(1 for p in analysis if p.category == cat)
                        for cat in set(p.category for p in analysis)},
     }
-    print(f"\nSummary: {result['total_params']} params, {result['optimizable']} optimizable")
+    print(f"\nSummary: {result['total_params']} params, {result['optimizable']} optimizable, {result['grid_size']} combinations")
     print(json.dumps(result, indent=2))
 
 
@@ -0,0 +1,304 @@
+"""
+Pareto-Front Pass Selection
+
+Multi-objective alternative to "max total_profit": passes are sorted into
+non-dominated layers over several objectives (default: IS profit, forward
+profit, forward PF, worst equity DD, trades) and ranked inside each layer by
+NSGA-II crowding distance, so a selection of N passes covers the whole
+trade-off surface instead of N near-copies of the single peak.
+
+Algorithms (numpy, no per-pair Python loops):
+- 2 objectives: exact layering in O(N log N) - sweep in descending order of
+  the first objective, binary-search each point into the first layer whose
+  best second objective does not dominate it.
+- 3+ objectives: sort-filter skyline, one layer at a time. Points are
+  visited in an order in which a dominator always comes first (normalized
+  sum, then lexicographic), and each block is tested against the layer
+  found so far, chunk by chunk, discarding dominated points early. Layering stops once enough
+  points are ranked (min_points / max_layers), so picking the top N of
+  100k+ passes only peels the layers it needs.
+
+Usage:
+    python optimizer/pareto.py "EA_Name" --symbol EURUSD --top 20
+"""
+
+import json
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from optimizer.result_parser import RobustResult
+
+# Objective name -> +1 maximize / -1 minimize
+OBJECTIVES: Dict[str, int] = {
+    "in_profit": 1,
+    "fwd_profit": 1,
+    "fwd_pf": 1,
+    "max_dd": -1,
+    "trades": 1,
+}
+DEFAULT_OBJECTIVES: Tuple[str, ...] = tuple(OBJECTIVES)
+
+# Max elements of one (front x block) dominance test
+_BLOCK_ELEMENTS = 1 << 22
+
+
+@dataclass
+class ParetoResult:
+    """Layer (0 = Pareto front, -1 = not ranked) and crowding distance per input row."""
+    objectives: Tuple[str, ...]
+    layers: np.ndarray
+    crowding: np.ndarray
+
+    def order(self) -> List[int]:
+        """Ranked row indices: layer ascending, then crowding distance descending."""
+        ranked = np.nonzero(self.layers >= 0)[0]
+        keys = np.lexsort((-self.crowding[ranked], self.layers[ranked]))
+        return ranked[keys].tolist()
+
+    def layer_sizes(self) -> List[int]:
+        ranked = self.layers[self.layers >= 0]
+        return np.bincount(ranked).tolist() if len(ranked) else []
+
+
+def objectives_from_result(r: RobustResult) -> Dict[str, float]:
+    return {
+        "in_profit": r.in_sample_profit,
+        "fwd_profit": r.forward_profit,
+        "fwd_pf": r.forward_pf,
+        "max_dd": max(r.in_sample_dd, r.forward_dd),
+        "trades": r.in_sample_trades + r.forward_trades,
+    }
+
+
+def objectives_from_row(row: Dict[str, Any]) -> Dict[str, float]:
+    """Same objectives from a dashboard pass row (in_/fwd_ keys)."""
+    return {
+        "in_profit": row.get("in_profit", 0.0),
+        "fwd_profit": row.get("fwd_profit", 0.0),
+        "fwd_pf": row.get("fwd_pf", 0.0),
+        "max_dd": max(row.get("in_dd", 0.0), row.get("fwd_dd", 0.0)),
+        "trades": row.get("in_trades", 0) + row.get("fwd_trades", 0),
+    }
+
+
+def objective_matrix(values: Sequence[Dict[str, float]], objectives: Sequence[str]) -> np.ndarray:
+    """(n, k) matrix oriented so that larger is better in every column."""
+    unknown = [o for o in objectives if o not in OBJECTIVES]
+    if unknown:
+        raise ValueError(f"Unknown objectives: {unknown} (choose from {list(OBJECTIVES)})")
+    F = np.array([[float(v.get(o, 0.0)) for o in objectives] for v in values], dtype=float).reshape(len(values), len(objectives))
+    F *= np.array([OBJECTIVES[o] for o in objectives], dtype=float)
+    F[np.isnan(F)] = -np.inf
+    return F
+
+
+def _dominated_by_any(A: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """For each row of B: is it dominated by at least one row of A (maximization)?"""
+    out = np.zeros(len(B), dtype=bool)
+    if not len(A) or not len(B):
+        return out
+    chunk = max(1, _BLOCK_ELEMENTS // max(1, len(B)))
+    for s in range(0, len(A), chunk):
+        a = A[s:s + chunk]
+        ge = np.ones((len(a), len(B)), dtype=bool)
+        gt = np.zeros((len(a), len(B)), dtype=bool)
+        for j in range(A.shape[1]):
+            col, row = a[:, j, None], B[None, :, j]
+            ge &= col >= row
+            gt |= col > row
+        out |= (ge & gt).any(axis=0)
+    return out
+
+
+def _layers_2d(F: np.ndarray) -> np.ndarray:
+    """Exact non-dominated layers for two maximized objectives, O(N log N)."""
+    n = len(F)
+    layers = np.empty(n, dtype=np.int64)
+    order = np.lexsort((-F[:, 1], -F[:, 0]))
+    # Per layer: best (max) second objective so far, and the first objective of
+    # that point. Best values are non-increasing across layers, so bisect on
+    # their negation.
+    neg_best: List[float] = []
+    best_f0: List[float] = []
+    for i in order:
+        f0, f1 = F[i, 0], F[i, 1]
+        # First layer whose best does not dominate (f0, f1): best < f1, or
+        # best == f1 with the same f0 (an exact duplicate)
+        k = bisect_right(neg_best, -f1)
+        while k > 0 and neg_best[k - 1] == -f1 and best_f0[k - 1] == f0:
+            k -= 1
+        if k == len(neg_best):
+            neg_best.append(-f1)
+            best_f0.append(f0)
+        elif -f1 < neg_best[k]:
+            neg_best[k] = -f1
+            best_f0[k] = f0
+        layers[i] = k
+    return layers
+
+
+def _layers_sfs(F: np.ndarray, max_layers: Optional[int], min_points: Optional[int], block: int = 512) -> np.ndarray:
+    """Non-dominated layers by repeated sort-filter skyline (any number of objectives)."""
+    n = len(F)
+    layers = np.full(n, -1, dtype=np.int64)
+    finite = np.where(np.isfinite(F), F, np.nan)
+    lo, hi = np.nanmin(finite, axis=0), np.nanmax(finite, axis=0)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    score = np.nan_to_num((F - lo) / span, nan=0.0, neginf=-1e9, posinf=1e9).sum(axis=1)
+    # A dominator has a larger normalized sum, or the same sum and a
+    # lexicographically larger vector - so it is always visited first.
+    remaining = np.lexsort(tuple(-F[:, j] for j in reversed(range(F.shape[1]))) + (-score,))
+
+    layer = 0
+    ranked = 0
+    while len(remaining):
+        # Front of the current layer, grown in place (members are final once added)
+        front = np.empty((len(remaining), F.shape[1]))
+        size = 0
+        members: List[np.ndarray] = []
+        for s in range(0, len(remaining), block):
+            idx = remaining[s:s + block]
+            # Test against the front chunk by chunk, dropping dominated points as
+            # we go: most candidates fall to the first (strongest) front members.
+            for c in range(0, size, block):
+                idx = idx[~_dominated_by_any(front[c:min(size, c + block)], F[idx])]
+                if not len(idx):
+                    break
+            if not len(idx):
+                continue
+            B = F[idx]
+            keep = idx[~_dominated_by_any(B, B)]
+            members.append(keep)
+            front[size:size + len(keep)] = F[keep]
+            size += len(keep)
+        in_layer = np.concatenate(members)
+        layers[in_layer] = layer
+        ranked += len(in_layer)
+        layer += 1
+        mask = np.ones(n, dtype=bool)
+        mask[in_layer] = False
+        remaining = remaining[mask[remaining]]
+        if (max_layers is not None and layer >= max_layers) or (min_points is not None and ranked >= min_points):
+            break
+    return layers
+
+
+def crowding_distance(F: np.ndarray, layers: np.ndarray) -> np.ndarray:
+    """NSGA-II crowding distance within each layer (boundary points = inf)."""
+    dist = np.zeros(len(F), dtype=float)
+    for layer in np.unique(layers[layers >= 0]):
+        idx = np.nonzero(layers == layer)[0]
+        if len(idx) <= 2:
+            dist[idx] = np.inf
+            continue
+        for j in range(F.shape[1]):
+            vals = F[idx, j]
+            order = np.argsort(vals, kind="stable")
+            sorted_vals = vals[order]
+            span = sorted_vals[-1] - sorted_vals[0]
+            dist[idx[order[0]]] = np.inf
+            dist[idx[order[-1]]] = np.inf
+            if not np.isfinite(span) or span <= 0:
+                continue
+            dist[idx[order[1:-1]]] += (sorted_vals[2:] - sorted_vals[:-2]) / span
+    dist[layers < 0] = 0.0
+    return dist
+
+
+def pareto_rank(
+    values: Sequence[Dict[str, float]],
+    objectives: Sequence[str] = DEFAULT_OBJECTIVES,
+    max_layers: Optional[int] = None,
+    min_points: Optional[int] = None,
+) -> ParetoResult:
+    """
+    Non-dominated layers + crowding distance for rows of objective values.
+
+    With 3+ objectives, layering stops after max_layers layers or once at
+    least min_points rows are ranked; the rest get layer -1.
+    """
+    objectives = tuple(objectives)
+    F = objective_matrix(values, objectives)
+    if not len(F):
+        empty = np.empty(0)
+        return ParetoResult(objectives, empty.astype(np.int64), empty)
+    if F.shape[1] == 1:
+        order = np.argsort(-F[:, 0], kind="stable")
+        layers = np.empty(len(F), dtype=np.int64)
+        _, layers[order] = np.unique(-F[order, 0], return_inverse=True)
+    elif F.shape[1] == 2:
+        layers = _layers_2d(F)
+    else:
+        layers = _layers_sfs(F, max_layers, min_points)
+    return ParetoResult(objectives, layers, crowding_distance(F, layers))
+
+
+def select_diverse(
+    values: Sequence[Dict[str, float]],
+    n: int,
+    objectives: Sequence[str] = DEFAULT_OBJECTIVES,
+) -> Tuple[List[int], ParetoResult]:
+    """
+    Pick n row indices NSGA-II style: whole layers first; the layer that
+    does not fit is cut by crowding distance (most isolated points kept).
+    """
+    result = pareto_rank(values, objectives, min_points=n)
+    return result.order()[:max(0, n)], result
+
+
+def pareto_summary(result: ParetoResult, pass_nums: Sequence[int], front_limit: int = 20) -> Dict[str, Any]:
+    """JSON-friendly summary: objectives, layer sizes and the front's pass numbers by crowding."""
+    order = result.order()
+    front = [int(pass_nums[i]) for i in order if result.layers[i] == 0]
+    return {
+        "objectives": list(result.objectives),
+        "layer_sizes": result.layer_sizes(),
+        "front_size": len(front),
+        "front": front[:front_limit],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from config import MT5_DATA_PATH
+    from optimizer.result_parser import OptimizationResultParser
+
+    parser = argparse.ArgumentParser(description="Pareto layers + crowding ranking of optimization passes")
+    parser.add_argument("ea_name", help="Name of the EA")
+    parser.add_argument("--symbol", "-s", help="Symbol for symbol-specific results")
+    parser.add_argument("--objectives", default=",".join(DEFAULT_OBJECTIVES),
+                        help=f"Comma-separated objectives (from: {', '.join(OBJECTIVES)})")
+    parser.add_argument("--top", type=int, default=20, help="Passes to select")
+    parser.add_argument("--all", action="store_true", help="Only robust passes are ranked unless --all")
+    args = parser.parse_args()
+
+    opt = OptimizationResultParser(args.ea_name, MT5_DATA_PATH, symbol=args.symbol)
+    if not opt.insample_xml.exists() or not opt.forward_xml.exists():
+        print(f"Optimization XML not found: {opt.insample_xml}")
+        sys.exit(1)
+
+    passes = [p for p in opt.join_passes() if args.all or p.is_robust]
+    t0 = time.time()
+    picked, result = select_diverse(
+        [objectives_from_result(p) for p in passes], args.top,
+        objectives=[o.strip() for o in args.objectives.split(",") if o.strip()],
+    )
+    print(json.dumps({
+        "passes": len(passes),
+        "seconds": round(time.time() - t0, 3),
+        **pareto_summary(result, [p.pass_num for p in passes]),
+        "selected": [
+            {"pass": passes[i].pass_num, "layer": int(result.layers[i]), "crowding": float(result.crowding[i]) if np.isfinite(result.crowding[i]) else None,
+             **objectives_from_result(passes[i])}
+            for i in picked
+        ],
+    }, indent=2))
@@ -0,0 +1,386 @@
+"""
+Optimization Pass Archive
+
+Keeps every evaluated optimization pass across runs, so re-optimizing an EA
+with overlapping ranges does not throw away what earlier runs already paid
+for.
+
+Archives are split by context - everything except the inputs that decides a
+pass result: the compiled EA (.ex5 SHA-256), symbol, timeframe, dates +
+forward split, model, deposit, currency, leverage and execution latency.
+Inside a context each pass is keyed by its canonical input tuple (all
+[TesterInputs], fixed ones included; 14, 14.0 and "14" are the same point).
+
+- merge: after each optimization the in-sample + forward XML rows are merged
+  in (scripts/run_optimization.py does this automatically).
+- coverage: for a new INI, how many grid points the archive already holds.
+- trims: MT5 INIs can only express start/step/stop ranges, so individual
+  points cannot be excluded. What can be excluded are range ends whose whole
+  slab (every combination of the other parameters) is already archived;
+  settings.optimization.skip_archived trims those in Step 6 and Step 8 then
+  reads the archive merged over the original grid.
+
+Layout (config.OPT_ARCHIVE_DIR):
+  <EA>/<context hash>.json   context, passes {input key: metrics}, run log
+
+Usage:
+    python optimizer/pass_archive.py coverage runs/EA_optimize.ini
+    python optimizer/pass_archive.py merge runs/EA_optimize.ini --xml runs/EA_OPT.xml --forward runs/EA_OPT.forward.xml
+    python optimizer/pass_archive.py export runs/EA_optimize.ini --out-dir runs
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from copy import copy
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import MT5_DATA_PATH, OPT_ARCHIVE_DIR
+from optimizer.param_extractor import EAParameter
+from optimizer.result_parser import OptimizationResultParser
+from optimizer.search_planner import can_optimize, grid_size, read_ini
+from tester.result_cache import canonical_inputs, canonical_value, file_sha256, find_ex5
+
+ARCHIVE_VERSION = 1
+
+# Context field -> [Tester] key
+CONTEXT_FIELDS = {
+    "symbol": "Symbol",
+    "period": "Period",
+    "model": "Model",
+    "from": "FromDate",
+    "to": "ToDate",
+    "forward_mode": "ForwardMode",
+    "forward_date": "ForwardDate",
+    "deposit": "Deposit",
+    "currency": "Currency",
+    "leverage": "Leverage",
+    "latency": "ExecutionMode",
+}
+
+# Stored per pass and period, in this order (keys of OptimizationResultParser._parse_xml rows)
+METRICS = (
+    "result", "profit", "expected_payoff", "profit_factor", "recovery_factor",
+    "sharpe_ratio", "custom", "equity_dd_pct", "trades",
+)
+XML_HEADER = [
+    "Pass", "Result", "Profit", "Expected Payoff", "Profit Factor", "Recovery Factor",
+    "Sharpe Ratio", "Custom", "Equity DD %", "Trades",
+]
+
+# Runs kept in the archive's run log
+MAX_RUN_LOG = 50
+
+
+def archive_context(ea_name: str, tester: Dict[str, str], ex5_sha256: str) -> Dict[str, str]:
+    """Context fields of an INI; passes are only comparable inside one context."""
+    ctx = {"v": str(ARCHIVE_VERSION), "ea": ea_name, "ex5": ex5_sha256}
+    for name, key in CONTEXT_FIELDS.items():
+        value = tester.get(key, "")
+        ctx[name] = value.upper() if name in ("symbol", "period", "currency") else canonical_value(value) if value else ""
+    return ctx
+
+
+def context_key(context: Dict[str, str]) -> str:
+    blob = json.dumps(context, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def point_key(inputs: Dict[str, Any]) -> str:
+    """Canonical input tuple of one grid point."""
+    return json.dumps(canonical_inputs(inputs), separators=(",", ":"))
+
+
+def grid_values(param: EAParameter) -> List[Decimal]:
+    """Values MT5 tests for an optimized parameter (start, start+step, ... stop)."""
+    try:
+        lo, hi, st = Decimal(str(param.min_val)), Decimal(str(param.max_val)), Decimal(str(param.step))
+    except (InvalidOperation, ValueError):
+        return []
+    if st <= 0 or hi < lo:
+        return [lo]
+    return [lo + i * st for i in range(int((hi - lo) / st) + 1)]
+
+
+def fixed_inputs(params: List[EAParameter]) -> Dict[str, str]:
+    return {p.name: canonical_value(p.default) for p in params if not can_optimize(p)}
+
+
+@dataclass
+class Coverage:
+    """How much of an INI's grid the archive already holds."""
+    grid_size: int
+    archived: int  # passes in this context
+    covered: int  # of them inside the grid
+    trims: Dict[str, List[float]] = field(default_factory=dict)  # name -> [new min, new max]
+
+    @property
+    def coverage_pct(self) -> float:
+        return round(self.covered / self.grid_size * 100, 2) if self.grid_size else 0.0
+
+    @property
+    def fully_covered(self) -> bool:
+        return bool(self.grid_size) and self.covered >= self.grid_size
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["coverage_pct"] = self.coverage_pct
+        d["fully_covered"] = self.fully_covered
+        return d
+
+
+def apply_trims(parameters: List[EAParameter], trims: Dict[str, List[float]]) -> List[EAParameter]:
+    """Copies of parameters with trimmed [min, max] ranges."""
+    out = []
+    for p in parameters:
+        if p.name in trims:
+            p = copy(p)
+            lo, hi = trims[p.name]
+            p.min_val, p.max_val = (int(lo), int(hi)) if p.type == "int" else (lo, hi)
+        out.append(p)
+    return out
+
+
+class PassArchive:
+    """All archived passes of one EA context, stored as one JSON file."""
+
+    def __init__(self, context: Dict[str, str], root: Path = OPT_ARCHIVE_DIR):
+        self.context = context
+        self.key = context_key(context)
+        safe_ea = re.sub(r"[^A-Za-z0-9_.-]+", "_", context.get("ea") or "EA")
+        self.path = Path(root) / safe_ea / f"{self.key[:16]}.json"
+        self.passes: Dict[str, Dict[str, Any]] = {}
+        self.runs: List[Dict[str, Any]] = []
+        self._load()
+
+    @classmethod
+    def for_ini(cls, ini_path: Path, data_path: Path = MT5_DATA_PATH, root: Path = OPT_ARCHIVE_DIR) -> Tuple["PassArchive", Dict[str, str], List[EAParameter]]:
+        """Archive matching an optimization INI, plus its [Tester] settings and inputs."""
+        tester, params = read_ini(ini_path)
+        ea_name = tester.get("Expert", Path(ini_path).stem.replace("_optimize", ""))
+        ex5 = find_ex5(ea_name, data_path)
+        ex5_sha = file_sha256(ex5) if ex5 else ""
+        return cls(archive_context(ea_name, tester, ex5_sha), root=root), tester, params
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("key") == self.key:
+            self.passes = data.get("passes") or {}
+            self.runs = data.get("runs") or []
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + f".{uuid.uuid4().hex[:6]}.tmp")
+        tmp.write_text(
+            json.dumps({"key": self.key, "context": self.context, "runs": self.runs, "passes": self.passes}, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+    def merge(
+        self,
+        insample: Dict[int, Dict[str, Any]],
+        forward: Dict[int, Dict[str, Any]],
+        fixed: Dict[str, Any],
+        source: str = "",
+    ) -> Dict[str, int]:
+        """Merge parsed XML rows (pass -> row); returns added/repeated/total counts."""
+        added = repeated = 0
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        for pass_num, ins in insample.items():
+            fwd = forward.get(pass_num)
+            if fwd is None:
+                continue
+            key = point_key({**fixed, **(ins.get("parameters") or {})})
+            entry = self.passes.get(key)
+            if entry is None:
+                added += 1
+                entry = self.passes[key] = {"first_seen": now, "seen": 0}
+            else:
+                repeated += 1
+            entry["in"] = [ins.get(m, 0) for m in METRICS]
+            entry["fwd"] = [fwd.get(m, 0) for m in METRICS]
+            entry["seen"] = int(entry.get("seen", 0)) + 1
+        self.runs.append({"at": now, "source": source, "added": added, "repeated": repeated})
+        self.runs = self.runs[-MAX_RUN_LOG:]
+        return {"added": added, "repeated": repeated, "total": len(self.passes)}
+
+    def in_grid(self, params: List[EAParameter]) -> List[Tuple[Dict[str, str], Dict[str, Any]]]:
+        """Archived (inputs, entry) pairs that are points of the INI grid."""
+        fixed = fixed_inputs(params)
+        allowed = {p.name: {canonical_value(v) for v in grid_values(p)} for p in params if can_optimize(p)}
+        names = set(fixed) | set(allowed)
+        found = []
+        for key, entry in self.passes.items():
+            inputs = json.loads(key)
+            if set(inputs) != names:
+                continue
+            if all(inputs[n] == v for n, v in fixed.items()) and all(inputs[n] in vals for n, vals in allowed.items()):
+                found.append((inputs, entry))
+        return found
+
+    def coverage(self, params: List[EAParameter]) -> Coverage:
+        """Grid points already archived, and range ends whose whole slab is archived."""
+        total = grid_size(params)
+        points = self.in_grid(params)
+        trims: Dict[str, List[float]] = {}
+        for p in params:
+            if not can_optimize(p):
+                continue
+            values = grid_values(p)
+            if len(values) < 2:
+                continue
+            counts: Dict[str, int] = {}
+            for inputs, _ in points:
+                counts[inputs[p.name]] = counts.get(inputs[p.name], 0) + 1
+            slab = total // len(values)
+            done = [counts.get(canonical_value(v), 0) >= slab for v in values]
+            lo = 0
+            while lo < len(values) - 1 and done[lo]:
+                lo += 1
+            hi = len(values) - 1
+            while hi > lo and done[hi]:
+                hi -= 1
+            if lo > 0 or hi < len(values) - 1:
+                trims[p.name] = [float(values[lo]), float(values[hi])]
+        return Coverage(grid_size=total, archived=len(self.passes), covered=len(points), trims=trims)
+
+    def export_xml(self, params: List[EAParameter], insample_path: Path, forward_path: Path) -> int:
+        """Write the archived grid points as an MT5-style in-sample/forward XML pair."""
+        points = self.in_grid(params)
+        names = [p.name for p in params if can_optimize(p)]
+        header = "<Row>" + "".join(_cell(h) for h in XML_HEADER + names) + "</Row>"
+        for path, period in ((insample_path, "in"), (forward_path, "fwd")):
+            rows = [header]
+            for pass_num, (inputs, entry) in enumerate(points):
+                values = [pass_num] + list(entry.get(period) or [0] * len(METRICS))
+                rows.append("<Row>" + "".join(_cell(v) for v in values + [_number(inputs[n]) for n in names]) + "</Row>")
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_text(
+                '<?xml version="1.0"?>\n'
+                '<Workbook xmlns="urn:schemas-microsoft-com:office:spreadsheet" '
+                'xmlns:ss="urn:schemas-microsoft-com:office:spreadsheet">\n'
+                '<Worksheet ss:Name="Tester Optimizator Results"><Table>\n'
+                + "\n".join(rows)
+                + "\n</Table></Worksheet></Workbook>\n",
+                encoding="utf-8",
+            )
+        return len(points)
+
+
+def _number(text: str) -> Any:
+    try:
+        f = float(text)
+    except ValueError:
+        return text
+    return int(f) if f.is_integer() else f
+
+
+def _cell(value: Any) -> str:
+    kind = "Number" if isinstance(value, (int, float)) and not isinstance(value, bool) else "String"
+    return f'<Cell><Data ss:Type="{kind}">{escape(str(value))}</Data></Cell>'
+
+
+def sidecar_path(ini_path: Path) -> Path:
+    """Original (untrimmed) grid of an INI whose ranges were trimmed against the archive."""
+    return Path(ini_path).with_suffix(".archive.json")
+
+
+def check_ini(ini_path: Path, data_path: Path = MT5_DATA_PATH, root: Path = OPT_ARCHIVE_DIR) -> Dict[str, Any]:
+    """Coverage of an INI's grid by the archive (JSON-friendly)."""
+    archive, _, params = PassArchive.for_ini(ini_path, data_path=data_path, root=root)
+    return {**archive.coverage(params).to_dict(), "archive": str(archive.path)}
+
+
+def record_trimmed_grid(ini_path: Path, original: List[EAParameter], trims: Dict[str, List[float]]) -> None:
+    """Remember the untrimmed grid so the merged archive can stand in for the full run."""
+    path = sidecar_path(ini_path)
+    if not trims:
+        path.unlink(missing_ok=True)
+        return
+    path.write_text(json.dumps({"trims": trims, "grid": [asdict(p) for p in original]}, indent=2), encoding="utf-8")
+
+
+def merge_optimization(
+    ini_path: Path,
+    insample_xml: Path,
+    forward_xml: Path,
+    data_path: Path = MT5_DATA_PATH,
+    root: Path = OPT_ARCHIVE_DIR,
+) -> Dict[str, Any]:
+    """Merge one finished optimization into its archive; returns counts + coverage of the INI grid."""
+    archive, _, params = PassArchive.for_ini(ini_path, data_path=data_path, root=root)
+    parser = OptimizationResultParser(archive.context.get("ea", ""), terminal_path=Path("."))
+    stats = archive.merge(
+        parser._parse_xml(Path(insample_xml)),
+        parser._parse_xml(Path(forward_xml)),
+        fixed_inputs(params),
+        source=Path(insample_xml).name,
+    )
+    archive.save()
+
+    grid = params
+    sidecar = sidecar_path(ini_path)
+    if sidecar.exists():
+        try:
+            grid = [EAParameter(**p) for p in json.loads(sidecar.read_text(encoding="utf-8"))["grid"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            grid = params
+    return {**stats, "archive": str(archive.path), "coverage": archive.coverage(grid).to_dict(), "trimmed": sidecar.exists()}
+
+
+def export_merged(
+    ini_path: Path,
+    insample_xml: Path,
+    forward_xml: Path,
+    data_path: Path = MT5_DATA_PATH,
+    root: Path = OPT_ARCHIVE_DIR,
+) -> int:
+    """Write the archive over the INI's original grid (sidecar if trimmed) as an XML pair."""
+    archive, _, params = PassArchive.for_ini(ini_path, data_path=data_path, root=root)
+    sidecar = sidecar_path(ini_path)
+    if sidecar.exists():
+        params = [EAParameter(**p) for p in json.loads(sidecar.read_text(encoding="utf-8"))["grid"]]
+    return archive.export_xml(params, insample_xml, forward_xml)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cross-run optimization pass archive")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    cov = sub.add_parser("coverage", help="How much of an INI's grid is already archived")
+    cov.add_argument("ini_path")
+    mrg = sub.add_parser("merge", help="Merge an optimization XML pair (e.g. an old runs/*_OPT.xml copy)")
+    mrg.add_argument("ini_path", help="INI the XML pair was produced with (defines the context)")
+    mrg.add_argument("--xml", required=True, help="In-sample XML")
+    mrg.add_argument("--forward", required=True, help="Forward XML")
+    exp = sub.add_parser("export", help="Write the archived grid points as an XML pair")
+    exp.add_argument("ini_path")
+    exp.add_argument("--out-dir", default=".", help="Output directory")
+    args = parser.parse_args()
+
+    ini = Path(args.ini_path)
+    if args.cmd == "coverage":
+        print(json.dumps(check_ini(ini), indent=2))
+    elif args.cmd == "merge":
+        print(json.dumps(merge_optimization(ini, Path(args.xml), Path(args.forward)), indent=2))
+    else:
+        tester, _ = read_ini(ini)
+        base = f"{tester.get('Expert', ini.stem)}_ARCHIVE_OPT"
+        out = Path(args.out_dir)
+        n = export_merged(ini, out / f"{base}.xml", out / f"{base}.forward.xml")
+        print(json.dumps({"passes": n, "xml": str(out / f"{base}.xml"), "forward": str(out / f"{base}.forward.xml")}, indent=2))
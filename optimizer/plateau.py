@@ -0,0 +1,421 @@
+"""
+Neighborhood Plateau Scoring
+
+Re-ranks optimization passes by how good their parameter *neighborhood* is,
+not by the single best (peak) total profit. A pass on a broad plateau keeps
+its forward profit when its parameters move a little; a knife-edge pass is
+surrounded by losers. Everything comes from the passes MT5 already ran, so no
+new backtests are needed.
+
+How:
+1. Parameter columns of the pass table are scaled to [0, 1] (min/max over
+   all passes); constant and non-numeric columns are dropped.
+2. A k-d tree (numpy, leaf buckets) is built over the scaled points.
+3. On dense grids a fixed radius holds hundreds of passes (and the pair
+   list grows with candidates x neighbors), so r is first shrunk until a
+   sample of candidates has a median of at most max_neighbors neighbors.
+   Sparse runs (genetic) keep the requested radius.
+4. All robust candidates (IS > 0 and FWD > 0) are queried together for
+   neighbors within Euclidean radius r; each tree node prunes the whole
+   batch of queries with one vectorized box-distance test.
+5. Per candidate: median/min/variance of forward profit and forward PF over
+   the neighborhood (the candidate itself included), plus the share of
+   neighbors that are robust.
+
+plateau_score = median forward profit - STD_PENALTY * std of forward profit.
+Candidates with fewer than min_neighbors neighbors are ranked after the rest.
+
+Usage:
+    python optimizer/plateau.py "EA_Name" --symbol EURUSD --radius 0.15
+"""
+
+import json
+from dataclasses import dataclass, field
+from itertools import chain
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from optimizer.result_parser import RobustResult
+
+# Default neighborhood radius in scaled parameter space (1.0 = full range).
+# 0.15 covers the adjacent grid values (incl. diagonals) of a 10-step range.
+DEFAULT_RADIUS = 0.15
+
+# Neighbors (excluding the pass itself) needed for a trustworthy score
+DEFAULT_MIN_NEIGHBORS = 3
+
+# Typical neighborhood size the radius is shrunk to on dense grids
+# (a full 3x3x3 block around a pass is 26 neighbors)
+DEFAULT_MAX_NEIGHBORS = 64
+
+# Candidates sampled to measure the neighborhood size
+_RADIUS_SAMPLE = 256
+
+# Weight of the forward-profit standard deviation in the score
+STD_PENALTY = 0.5
+
+# Max query x leaf-point distance block per step (bounds memory)
+_BLOCK = 1 << 20
+
+
+class KDTree:
+    """Static k-d tree over an (n, d) array with batched radius queries."""
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 32):
+        self.points = np.asarray(points, dtype=float)
+        n = len(self.points)
+        self.order = np.arange(n)
+        self.lo: List[np.ndarray] = []
+        self.hi: List[np.ndarray] = []
+        self.start: List[int] = []
+        self.end: List[int] = []
+        self.children: List[Optional[Tuple[int, int]]] = []
+        if n:
+            self._build(leaf_size)
+
+    def _new_node(self, s: int, e: int) -> int:
+        pts = self.points[self.order[s:e]]
+        self.lo.append(pts.min(axis=0))
+        self.hi.append(pts.max(axis=0))
+        self.start.append(s)
+        self.end.append(e)
+        self.children.append(None)
+        return len(self.start) - 1
+
+    def _build(self, leaf_size: int) -> None:
+        stack = [self._new_node(0, len(self.points))]
+        while stack:
+            node = stack.pop()
+            s, e = self.start[node], self.end[node]
+            spread = self.hi[node] - self.lo[node]
+            if e - s <= leaf_size or not spread.any():
+                continue
+            dim = int(np.argmax(spread))
+            seg = self.order[s:e]
+            mid = (e - s) // 2
+            part = np.argpartition(self.points[seg, dim], mid)
+            self.order[s:e] = seg[part]
+            left = self._new_node(s, s + mid)
+            right = self._new_node(s + mid, e)
+            self.children[node] = (left, right)
+            stack.extend((left, right))
+
+    def query_radius_pairs(self, queries: np.ndarray, r: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        All (query index, point index) pairs with distance <= r.
+
+        The whole query batch walks the tree together: at each node the
+        queries whose ball misses the node's bounding box are dropped.
+        """
+        queries = np.asarray(queries, dtype=float)
+        if not len(self.start) or not len(queries):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        r2 = float(r) * float(r)
+        out_q: List[np.ndarray] = []
+        out_p: List[np.ndarray] = []
+        stack = [(0, np.arange(len(queries)))]
+        while stack:
+            node, q = stack.pop()
+            qq = queries[q]
+            gap = np.maximum(0.0, np.maximum(self.lo[node] - qq, qq - self.hi[node]))
+            q = q[np.einsum("ij,ij->i", gap, gap) <= r2]
+            if not len(q):
+                continue
+            kids = self.children[node]
+            if kids is not None:
+                stack.append((kids[0], q))
+                stack.append((kids[1], q))
+                continue
+            members = self.order[self.start[node]:self.end[node]]
+            pts = self.points[members]
+            block = max(1, _BLOCK // max(1, len(members) * pts.shape[1]))
+            for b in range(0, len(q), block):
+                qb = q[b:b + block]
+                diff = queries[qb, None, :] - pts[None, :, :]
+                d2 = np.einsum("ijk,ijk->ij", diff, diff)
+                qi, pj = np.nonzero(d2 <= r2)
+                out_q.append(qb[qi])
+                out_p.append(members[pj])
+        if not out_q:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(out_q), np.concatenate(out_p)
+
+
+def neighborhood_radius(tree: KDTree, queries: np.ndarray, radius: float, max_neighbors: int) -> float:
+    """
+    Largest radius <= `radius` whose median neighborhood (sampled) holds at
+    most max_neighbors passes besides the query itself.
+
+    The radius is scaled by (target / measured) ** (1 / dims) a few times,
+    which converges quickly on grids and leaves sparse runs untouched.
+    """
+    if not len(queries) or not queries.shape[1]:
+        return float(radius)
+    sample = queries[np.unique(np.linspace(0, len(queries) - 1, min(len(queries), _RADIUS_SAMPLE)).astype(int))]
+    dims = queries.shape[1]
+    r = float(radius)
+    for _ in range(4):
+        qi, _ = tree.query_radius_pairs(sample, r)
+        measured = float(np.median(np.bincount(qi, minlength=len(sample)))) - 1
+        if measured <= max_neighbors:
+            break
+        r *= (max_neighbors / measured) ** (1.0 / dims)
+    return r
+
+
+@dataclass
+class PlateauScore:
+    """Neighborhood statistics for one robust candidate pass."""
+    pass_num: int
+    plateau_score: Optional[float]
+    neighbors: int  # excluding the pass itself
+    fwd_profit_median: float
+    fwd_profit_min: float
+    fwd_profit_var: float
+    fwd_pf_median: float
+    fwd_pf_min: float
+    fwd_pf_var: float
+    robust_share: float  # share of the neighborhood profitable IS and FWD
+    total_profit: float
+    forward_profit: float
+    forward_pf: float
+    peak_rank: int  # rank by total_profit among robust passes (1 = best)
+    plateau_rank: int = 0
+    parameters: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "pass": self.pass_num,
+            "plateau_rank": self.plateau_rank,
+            "peak_rank": self.peak_rank,
+            "plateau_score": self.plateau_score,
+            "neighbors": self.neighbors,
+            "forward_profit": {
+                "median": self.fwd_profit_median,
+                "min": self.fwd_profit_min,
+                "var": self.fwd_profit_var,
+            },
+            "forward_pf": {
+                "median": self.fwd_pf_median,
+                "min": self.fwd_pf_min,
+                "var": self.fwd_pf_var,
+            },
+            "robust_share": self.robust_share,
+            "total_profit": self.total_profit,
+            "pass_forward_profit": self.forward_profit,
+            "pass_forward_pf": self.forward_pf,
+            "parameters": self.parameters,
+        }
+
+
+def normalize_parameters(passes: List[RobustResult]) -> Tuple[np.ndarray, List[str]]:
+    """Scale numeric, non-constant parameter columns to [0, 1]."""
+    names: List[str] = list(dict.fromkeys(chain.from_iterable(p.parameters for p in passes)))
+
+    raw = np.empty((len(passes), len(names)), dtype=object)
+    if names:
+        try:
+            get = itemgetter(*names)
+            raw[:] = [get(p.parameters) for p in passes] if len(names) > 1 else [[get(p.parameters)] for p in passes]
+        except KeyError:
+            raw[:] = [[p.parameters.get(name, np.nan) for name in names] for p in passes]
+
+    columns: List[np.ndarray] = []
+    kept: List[str] = []
+    for j, name in enumerate(names):
+        try:
+            col = raw[:, j].astype(float)
+        except (TypeError, ValueError):
+            continue
+        if np.isnan(col).any():
+            continue
+        lo, hi = col.min(), col.max()
+        if hi <= lo:
+            continue
+        columns.append((col - lo) / (hi - lo))
+        kept.append(name)
+
+    if not columns:
+        return np.zeros((len(passes), 0)), kept
+    return np.column_stack(columns), kept
+
+
+def _group_stats(qi: np.ndarray, pj: np.ndarray, values: np.ndarray, n_groups: int) -> Dict[str, np.ndarray]:
+    """Per-group count/median/min/variance of values[pj], grouped by qi."""
+    # One int64 key (group, rank of the value) sorts far faster than lexsort.
+    n = len(values)
+    by_value = np.argsort(values, kind="stable")
+    rank = np.empty(n, dtype=np.int64)
+    rank[by_value] = np.arange(n)
+    key = qi.astype(np.int64) * n + rank[pj]
+    key.sort()
+    ordered = values[by_value][key % n]
+
+    counts = np.bincount(qi, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    safe = np.maximum(counts, 1)
+    lo_mid = starts + (safe - 1) // 2
+    hi_mid = starts + safe // 2
+    sums = np.bincount(qi, weights=values[pj], minlength=n_groups)
+    sumsq = np.bincount(qi, weights=values[pj] ** 2, minlength=n_groups)
+    mean = sums / safe
+    return {
+        "count": counts,
+        "median": (ordered[lo_mid] + ordered[hi_mid]) / 2.0,
+        "min": ordered[starts],
+        "var": np.maximum(sumsq / safe - mean * mean, 0.0),
+    }
+
+
+def score_plateaus(
+    passes: List[RobustResult],
+    radius: float = DEFAULT_RADIUS,
+    min_neighbors: int = DEFAULT_MIN_NEIGHBORS,
+    max_neighbors: Optional[int] = DEFAULT_MAX_NEIGHBORS,
+) -> Tuple[List[PlateauScore], List[str]]:
+    """
+    Score every robust pass by its neighborhood and sort best plateau first.
+
+    Args:
+        passes: Joined in-sample + forward passes
+        radius: Neighborhood radius in scaled parameter space
+        min_neighbors: Neighbors needed for a plateau score
+        max_neighbors: Shrink the radius until the median neighborhood is at
+            most this large (None = always use `radius`)
+
+    Returns (scores, parameter names used for the distance).
+    """
+    candidates = [i for i, p in enumerate(passes) if p.is_robust]
+    if not candidates:
+        return [], []
+
+    points, names = normalize_parameters(passes)
+    tree = KDTree(points)
+    cand = np.array(candidates)
+    if max_neighbors is not None:
+        radius = neighborhood_radius(tree, points[cand], radius, max(int(max_neighbors), min_neighbors))
+    qi, pj = tree.query_radius_pairs(points[cand], radius)
+
+    fwd = np.array([p.forward_profit for p in passes], dtype=float)
+    pf = np.array([p.forward_pf for p in passes], dtype=float)
+    robust = np.array([p.is_robust for p in passes], dtype=float)
+
+    n = len(cand)
+    profit_stats = _group_stats(qi, pj, fwd, n)
+    pf_stats = _group_stats(qi, pj, pf, n)
+    robust_share = np.bincount(qi, weights=robust[pj], minlength=n) / np.maximum(profit_stats["count"], 1)
+
+    peak_order = sorted(range(n), key=lambda k: passes[cand[k]].total_profit, reverse=True)
+    peak_rank = {k: rank for rank, k in enumerate(peak_order, start=1)}
+
+    def rounded(values: np.ndarray, digits: int) -> List[float]:
+        return [round(v, digits) for v in values.tolist()]
+
+    neighbors = (profit_stats["count"] - 1).tolist()
+    plateau = rounded(profit_stats["median"] - STD_PENALTY * np.sqrt(profit_stats["var"]), 2)
+    columns = zip(
+        rounded(profit_stats["median"], 2),
+        rounded(profit_stats["min"], 2),
+        rounded(profit_stats["var"], 2),
+        rounded(pf_stats["median"], 3),
+        rounded(pf_stats["min"], 3),
+        rounded(pf_stats["var"], 4),
+        rounded(robust_share, 3),
+    )
+
+    scores: List[PlateauScore] = []
+    for k, (i, row) in enumerate(zip(cand.tolist(), columns)):
+        p = passes[i]
+        scores.append(PlateauScore(
+            pass_num=p.pass_num,
+            plateau_score=plateau[k] if neighbors[k] >= min_neighbors else None,
+            neighbors=neighbors[k],
+            fwd_profit_median=row[0],
+            fwd_profit_min=row[1],
+            fwd_profit_var=row[2],
+            fwd_pf_median=row[3],
+            fwd_pf_min=row[4],
+            fwd_pf_var=row[5],
+            robust_share=row[6],
+            total_profit=float(p.total_profit),
+            forward_profit=float(p.forward_profit),
+            forward_pf=float(p.forward_pf),
+            peak_rank=peak_rank[k],
+            parameters=p.parameters,
+        ))
+
+    scores.sort(key=lambda s: (
+        s.plateau_score is None,
+        -(s.plateau_score if s.plateau_score is not None else s.fwd_profit_median),
+        s.peak_rank,
+    ))
+    for rank, s in enumerate(scores, start=1):
+        s.plateau_rank = rank
+    return scores, names
+
+
+def parameter_slices(passes: List[RobustResult], pass_num: int) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    One-dimensional slices through a pass: for each parameter, the passes that
+    share every other parameter value, with their forward profit/PF. A steep
+    slice marks the parameter the result is most sensitive to.
+    """
+    center = next((p for p in passes if p.pass_num == pass_num), None)
+    if center is None:
+        return {}
+    slices: Dict[str, List[Dict[str, Any]]] = {}
+    for name in center.parameters:
+        others = {k: v for k, v in center.parameters.items() if k != name}
+        rows = [
+            {"value": p.parameters.get(name), "forward_profit": float(p.forward_profit), "forward_pf": float(p.forward_pf), "pass": p.pass_num}
+            for p in passes
+            if all(p.parameters.get(k) == v for k, v in others.items())
+        ]
+        if len(rows) > 1:
+            try:
+                rows.sort(key=lambda r: float(r["value"]))
+            except (TypeError, ValueError):
+                pass
+            slices[name] = rows
+    return slices
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from config import MT5_DATA_PATH
+    from optimizer.result_parser import OptimizationResultParser
+
+    parser = argparse.ArgumentParser(description="Rank optimization passes by neighborhood plateau robustness")
+    parser.add_argument("ea_name", help="Name of the EA")
+    parser.add_argument("--symbol", "-s", help="Symbol for symbol-specific results")
+    parser.add_argument("--radius", "-r", type=float, default=DEFAULT_RADIUS, help="Neighborhood radius (scaled 0..1)")
+    parser.add_argument("--min-neighbors", type=int, default=DEFAULT_MIN_NEIGHBORS)
+    parser.add_argument("--max-neighbors", type=int, default=DEFAULT_MAX_NEIGHBORS, help="Shrink the radius on dense grids (0 = off)")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    opt = OptimizationResultParser(args.ea_name, MT5_DATA_PATH, symbol=args.symbol)
+    if not opt.insample_xml.exists() or not opt.forward_xml.exists():
+        print(f"Optimization XML not found: {opt.insample_xml}")
+        sys.exit(1)
+
+    t0 = time.time()
+    passes = opt.join_passes()
+    scores, names = score_plateaus(
+        passes, radius=args.radius, min_neighbors=args.min_neighbors, max_neighbors=args.max_neighbors or None
+    )
+    print(json.dumps({
+        "total_passes": len(passes),
+        "robust_passes": len(scores),
+        "parameters": names,
+        "seconds": round(time.time() - t0, 2),
+        "top": [s.to_dict() for s in scores[:args.top]],
+    }, indent=2))
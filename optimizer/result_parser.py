@@ -121,16 +121,38 @@ class OptimizationResultParser:
         if not self.forward_xml.exists():
             return {"success": False, "error": f"Forward XML not found: {self.forward_xml}"}
 
-        # Parse both files
-        insample_results = self._parse_xml(self.insample_xml)
-        forward_results = self._parse_xml(self.forward_xml)
-
-        # Get parameter names from XML
+        robust_results = self.join_passes()
         param_names = self._extract_param_names(self.insample_xml)
 
-        # Join results by pass number
-        robust_results = []
+        # Filter to only robust results (profitable on both periods)
+        robust_only = [r for r in robust_results if r.is_robust]
+
+        # Sort by total profit
+        robust_only.sort(key=lambda x: x.total_profit, reverse=True)
+
+        # Get best result
+        best = robust_only[0] if robust_only else None
+
+        # Multi-objective view of the same robust passes (best stays max total profit)
+        from optimizer.pareto import objectives_from_result, pareto_rank, pareto_summary
+        pareto = pareto_rank([objectives_from_result(r) for r in robust_only], max_layers=1)
 
+        return {
+            "success": True,
+            "total_passes": len(robust_results),
+            "robust_passes": len(robust_only),
+            "best": best.to_dict() if best else None,
+            "top_5": [r.to_dict() for r in robust_only[:5]],
+            "pareto": pareto_summary(pareto, [r.pass_num for r in robust_only]),
+            "param_names": param_names
+        }
+
+    def join_passes(self) -> List[RobustResult]:
+        """Join in-sample and forward rows by pass number (all passes, robust or not)."""
+        insample_results = self._parse_xml(self.insample_xml)
+        forward_results = self._parse_xml(self.forward_xml)
+
+        joined = []
         for pass_num, insample in insample_results.items():
             if pass_num in forward_results:
                 forward = forward_results[pass_num]
@@ -138,7 +160,7 @@ class OptimizationResultParser:
                 total_profit = insample['profit'] + forward['profit']
                 is_robust = insample['profit'] > 0 and forward['profit'] > 0
 
-                result = RobustResult(
+                joined.append(RobustResult(
                     pass_num=pass_num,
                     in_sample_profit=insample['profit'],
                     in_sample_pf=insample['profit_factor'],
@@ -151,26 +173,8 @@ class OptimizationResultParser:
                     total_profit=total_profit,
                     is_robust=is_robust,
                     parameters=insample.get('parameters', {})
-                )
-                robust_results.append(result)
-
-        # Filter to only robust results (profitable on both periods)
-        robust_only = [r for r in robust_results if r.is_robust]
-
-        # Sort by total profit
-        robust_only.sort(key=lambda x: x.total_profit, reverse=True)
-
-        # Get best result
-        best = robust_only[0] if robust_only else None
-
-        return {
-            "success": True,
-            "total_passes": len(robust_results),
-            "robust_passes": len(robust_only),
-            "best": best.to_dict() if best else None,
-            "top_5": [r.to_dict() for r in robust_only[:5]],
-            "param_names": param_names
-        }
+                ))
+        return joined
 
     def _parse_xml(self, xml_path: Path) -> Dict[int, Dict]:
         """Parse a single XML file and return results by pass number."""
@@ -329,6 +333,8 @@ if __name__ == "__main__":
     import sys
     import argparse
 
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
     parser = argparse.ArgumentParser(description="Parse optimization results")
     parser.add_argument("ea_name", help="Name of the EA")
     parser.add_argument("--symbol", "-s", help="Symbol for symbol-specific results")
@@ -344,6 +350,7 @@ if __name__ == "__main__":
         print(f"\n--- Robust Parameters Found{symbol_str} ---")
         print(f"Total passes analyzed: {result['total_passes']}")
         print(f"Robust passes (profitable on both periods): {result['robust_passes']}")
+        print(f"Pareto front: {result['pareto']['front_size']} passes")
 
         best = result["best"]
         print(f"\nBest Result (Pass {best['pass']}):")
@@ -0,0 +1,433 @@
+"""
+Optimization Search-Space Planner
+
+Answers "how big is this optimization and how long will it take?" before MT5
+is launched, and shrinks the search space to fit a wall-clock budget.
+
+- Grid size: exact number of combinations implied by the [TesterInputs]
+  ranges (MT5 tests start, start+step, ... up to and including stop).
+- Per-pass cost: median wall seconds per pass from earlier optimizations of
+  the same EA/symbol/TF/model (recorded by scripts/run_optimization.py in
+  config.OPT_TIMINGS_FILE), falling back to the same EA, then the same model,
+  then a rough default per tick model.
+- Budget: while the predicted duration is over budget, steps of the least
+  important parameters are doubled (down to MIN_VALUES values each) and
+  low-importance parameters are pinned at their default. Importance comes
+  from the parameter category in param_intelligence.py.
+
+Genetic runs (Optimization=2) do not test the whole grid; their pass count is
+predicted as min(grid, typical genetic run length), where the typical length
+is the median of earlier genetic runs that stopped short of their grid.
+
+Usage:
+    python optimizer/search_planner.py runs/EA_optimize.ini --budget-minutes 60
+"""
+
+import json
+import os
+import statistics
+import time
+import uuid
+from copy import copy
+from dataclasses import dataclass, field, asdict
+from decimal import ROUND_DOWN, Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import OPT_TIMINGS_FILE
+from optimizer.param_extractor import EAParameter
+from optimizer.param_intelligence import detect_category
+
+# Never coarsen a parameter below this many values (pin it instead)
+MIN_VALUES = 3
+
+# Samples kept per EA/symbol/TF/model key
+MAX_SAMPLES = 20
+
+# Terminal launch + history sync, paid once per optimization
+STARTUP_SECONDS = 30.0
+
+# Rough wall seconds per pass when there is no history (by Model=)
+DEFAULT_SECONDS_PER_PASS = {
+    0: 12.0,   # Every tick
+    1: 3.0,    # 1-minute OHLC
+    2: 0.5,    # Open prices only
+    3: 0.1,    # Math calculations
+    4: 20.0,   # Every tick based on real ticks
+}
+
+# Typical genetic run length when no earlier genetic run stopped short of its grid
+GENETIC_PASSES_DEFAULT = 10000
+
+# Higher = keep fine-grained longer. Categories from param_intelligence.detect_category.
+CATEGORY_IMPORTANCE = {
+    'period': 5,
+    'threshold': 4,
+    'threshold_high': 4,
+    'threshold_low': 4,
+    'multiplier': 4,
+    'activation': 3,
+    'unknown': 3,
+    'time_start': 2,
+    'time_end': 2,
+    'bool_enable': 2,
+    'risk': 1,
+    'fixed': 0,
+}
+
+# Categories at or below this importance are pinned before more important
+# parameters get coarser steps
+PIN_IMPORTANCE = 2
+
+
+@dataclass
+class SearchPlan:
+    """Chosen optimization search space and its predicted cost."""
+    grid_size_before: int
+    grid_size: int
+    predicted_passes: int
+    seconds_per_pass: float
+    timing_source: str
+    predicted_seconds: float
+    budget_seconds: Optional[float] = None
+    within_budget: bool = True
+    optimization_type: int = 2
+    adjustments: List[Dict[str, Any]] = field(default_factory=list)
+    parameters: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["predicted_minutes"] = round(self.predicted_seconds / 60.0, 1)
+        return d
+
+
+def can_optimize(param: EAParameter) -> bool:
+    """Same rule as build_optimization_ini: MT5 rejects optimization with step=0."""
+    return bool(
+        param.optimize and
+        param.min_val is not None and
+        param.max_val is not None and
+        param.step is not None and
+        param.step > 0
+    )
+
+
+def range_values(min_val: Any, max_val: Any, step: Any) -> int:
+    """Number of values MT5 tests for start/step/stop (stop inclusive)."""
+    try:
+        lo, hi, st = Decimal(str(min_val)), Decimal(str(max_val)), Decimal(str(step))
+    except (InvalidOperation, ValueError):
+        return 1
+    if st <= 0 or hi < lo:
+        return 1
+    return int((hi - lo) / st) + 1
+
+
+def param_values(param: EAParameter) -> int:
+    """Number of values a parameter contributes to the grid (1 if not optimized)."""
+    if not can_optimize(param):
+        return 1
+    if param.type == 'bool':
+        return 2
+    return range_values(param.min_val, param.max_val, param.step)
+
+
+def grid_size(parameters: List[EAParameter]) -> int:
+    """Exact number of combinations in the full grid."""
+    total = 1
+    for p in parameters:
+        total *= param_values(p)
+    return total
+
+
+def importance(param: EAParameter) -> int:
+    return CATEGORY_IMPORTANCE.get(detect_category(param.name, param.type), 3)
+
+
+def read_ini(ini_path: Path) -> Tuple[Dict[str, str], List[EAParameter]]:
+    """Read the [Tester] settings and [TesterInputs] ranges of an optimization INI."""
+    tester: Dict[str, str] = {}
+    params: List[EAParameter] = []
+    section = ""
+    for raw in Path(ini_path).read_text(encoding='utf-8', errors='ignore').splitlines():
+        line = raw.strip()
+        if not line or line.startswith(';'):
+            continue
+        if line.startswith('[') and line.endswith(']'):
+            section = line[1:-1]
+            continue
+        if '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        if section == 'Tester':
+            tester[key.strip()] = value.strip()
+        elif section == 'TesterInputs':
+            parts = value.split('||')
+            if len(parts) < 5:
+                params.append(EAParameter(name=key.strip(), type='string', default=value, optimize=False))
+                continue
+            default, lo, st, hi, flag = (x.strip() for x in parts[:5])
+            numbers = (lo, st, hi)
+            is_int = all(x.lstrip('-').isdigit() for x in numbers)
+            try:
+                lo_v, st_v, hi_v = (int(x) if is_int else float(x) for x in numbers)
+            except ValueError:
+                lo_v = st_v = hi_v = None
+            params.append(EAParameter(
+                name=key.strip(),
+                type='int' if is_int else 'double',
+                default=default,
+                optimize=flag.upper() == 'Y',
+                min_val=lo_v,
+                step=st_v,
+                max_val=hi_v,
+            ))
+    return tester, params
+
+
+# ---------------------------------------------------------------------------
+# Pass timing history
+# ---------------------------------------------------------------------------
+
+def timing_key(ea_name: str, symbol: str, timeframe: str, model: int) -> str:
+    return f"{ea_name}|{symbol}|{timeframe}|{int(model)}"
+
+
+def load_timings(path: Path = OPT_TIMINGS_FILE) -> Dict[str, List[Dict[str, Any]]]:
+    try:
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+        return dict(data.get("entries") or {})
+    except Exception:
+        return {}
+
+
+def _save_timings(entries: Dict[str, List[Dict[str, Any]]], path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{uuid.uuid4().hex[:6]}.tmp")
+    tmp.write_text(json.dumps({"version": 1, "entries": entries}, indent=2), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def record_optimization_timing(
+    ini_path: Path,
+    elapsed_seconds: float,
+    passes_done: int,
+    path: Path = OPT_TIMINGS_FILE,
+) -> Optional[Dict[str, Any]]:
+    """
+    Append one finished optimization to the timing history.
+
+    Returns the stored sample, or None when the run gives no usable timing
+    (no passes seen in the tester logs).
+    """
+    if passes_done <= 0 or elapsed_seconds <= 0:
+        return None
+    tester, params = read_ini(ini_path)
+    ea_name = tester.get("Expert")
+    if not ea_name:
+        return None
+    key = timing_key(ea_name, tester.get("Symbol", ""), tester.get("Period", ""), int(tester.get("Model", 1) or 1))
+    run_seconds = max(float(elapsed_seconds) - STARTUP_SECONDS, float(elapsed_seconds) * 0.5)
+    sample = {
+        "seconds_per_pass": round(run_seconds / passes_done, 4),
+        "passes": int(passes_done),
+        "grid_size": grid_size(params),
+        "elapsed": round(float(elapsed_seconds), 1),
+        "optimization": int(tester.get("Optimization", 0) or 0),
+        "cloud": tester.get("UseCloud") == "1",
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+    }
+    entries = load_timings(path)
+    entries[key] = (entries.get(key) or [])[-(MAX_SAMPLES - 1):] + [sample]
+    _save_timings(entries, path)
+    return sample
+
+
+def estimate_seconds_per_pass(
+    ea_name: str,
+    symbol: str,
+    timeframe: str,
+    model: int,
+    entries: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+) -> Tuple[float, str]:
+    """Median seconds per pass from the closest matching history, plus where it came from."""
+    if entries is None:
+        entries = load_timings()
+    model = int(model)
+
+    def split(key: str) -> List[str]:
+        return key.split('|')
+
+    exact = entries.get(timing_key(ea_name, symbol, timeframe, model)) or []
+    same_ea = [s for k, v in entries.items() if split(k)[0] == ea_name and split(k)[-1] == str(model) for s in v]
+    same_model = [s for k, v in entries.items() if split(k)[-1] == str(model) for s in v]
+
+    for samples, label in ((exact, "EA/symbol/TF/model"), (same_ea, "EA/model"), (same_model, "model")):
+        values = [float(s["seconds_per_pass"]) for s in samples if s.get("seconds_per_pass")]
+        if values:
+            return statistics.median(values), f"history ({label}, n={len(values)})"
+
+    return DEFAULT_SECONDS_PER_PASS.get(model, 3.0), f"default (model {model})"
+
+
+def typical_genetic_passes(entries: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> int:
+    """Median length of earlier genetic runs that did not exhaust their grid."""
+    if entries is None:
+        entries = load_timings()
+    lengths = [
+        int(s["passes"]) for v in entries.values() for s in v
+        if s.get("optimization") == 2 and s.get("passes") and int(s["passes"]) < int(s.get("grid_size") or 0)
+    ]
+    return int(statistics.median(lengths)) if lengths else GENETIC_PASSES_DEFAULT
+
+
+# ---------------------------------------------------------------------------
+# Planning
+# ---------------------------------------------------------------------------
+
+def _coarser_step(param: EAParameter) -> Optional[Any]:
+    """
+    Next step for a coarsening, or None if the parameter cannot lose values.
+
+    The step is doubled, but never past the largest step (on the original
+    step's precision) that still leaves MIN_VALUES values; a step change
+    that would not drop any value does not count.
+    """
+    try:
+        lo, hi, step = Decimal(str(param.min_val)), Decimal(str(param.max_val)), Decimal(str(param.step))
+    except (InvalidOperation, ValueError):
+        return None
+    widest = ((hi - lo) / (MIN_VALUES - 1)).quantize(step, rounding=ROUND_DOWN)
+    new_step = min(step * 2, widest)
+    if new_step <= step or not MIN_VALUES <= range_values(lo, hi, new_step) < range_values(lo, hi, step):
+        return None
+    return int(new_step) if param.type == 'int' else float(new_step)
+
+
+def _coarsen(param: EAParameter) -> EAParameter:
+    new_step = _coarser_step(param)
+    if new_step is not None:
+        param.step = new_step
+    return param
+
+
+def _next_adjustment(params: List[EAParameter]) -> Optional[Tuple[str, int]]:
+    """Pick the cheapest-to-lose change: coarsen/pin by ascending importance."""
+    live = [(i, p) for i, p in enumerate(params) if can_optimize(p) and param_values(p) > 1]
+    if not live:
+        return None
+    for level in sorted({importance(p) for _, p in live}):
+        tier = [(i, p) for i, p in live if importance(p) == level]
+        coarsenable = [(i, p) for i, p in tier if p.type != 'bool' and _coarser_step(p) is not None]
+        if coarsenable:
+            i, _ = max(coarsenable, key=lambda ip: param_values(ip[1]))
+            return "coarsen", i
+        if level <= PIN_IMPORTANCE:
+            i, _ = max(tier, key=lambda ip: param_values(ip[1]))
+            return "pin", i
+    i, _ = min(live, key=lambda ip: (importance(ip[1]), -param_values(ip[1])))
+    return "pin", i
+
+
+def plan_search(
+    parameters: List[EAParameter],
+    ea_name: str,
+    symbol: str,
+    timeframe: str,
+    model: int,
+    optimization_type: int = 2,
+    budget_seconds: Optional[float] = None,
+    timings: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+) -> Tuple[List[EAParameter], SearchPlan]:
+    """
+    Predict the cost of an optimization and, given a budget, shrink it to fit.
+
+    Returns (parameters to write into the INI, plan). The input list is not
+    modified; without a budget the parameters come back unchanged.
+    """
+    if timings is None:
+        timings = load_timings()
+    spp, source = estimate_seconds_per_pass(ea_name, symbol, timeframe, model, timings)
+    genetic_cap = typical_genetic_passes(timings) if optimization_type == 2 else None
+
+    def passes_for(grid: int) -> int:
+        return min(grid, genetic_cap) if genetic_cap else grid
+
+    def seconds_for(grid: int) -> float:
+        return STARTUP_SECONDS + passes_for(grid) * spp
+
+    params = [copy(p) for p in parameters]
+    before = grid_size(params)
+    adjustments: List[Dict[str, Any]] = []
+
+    if budget_seconds is not None:
+        while seconds_for(grid_size(params)) > budget_seconds:
+            nxt = _next_adjustment(params)
+            if nxt is None:
+                break
+            action, i = nxt
+            p = params[i]
+            values_from = param_values(p)
+            if action == "coarsen":
+                step_from = p.step
+                _coarsen(p)
+                last = adjustments[-1] if adjustments else {}
+                if last.get("action") == "coarsen" and last.get("name") == p.name:
+                    last.update(step_to=p.step, values_to=param_values(p))
+                    continue
+                adjustments.append({
+                    "action": "coarsen", "name": p.name,
+                    "step_from": step_from, "step_to": p.step,
+                    "values_from": values_from, "values_to": param_values(p),
+                })
+            else:
+                p.optimize = False
+                adjustments.append({
+                    "action": "pin", "name": p.name,
+                    "value": p.default, "values_from": values_from,
+                })
+
+    grid = grid_size(params)
+    predicted = seconds_for(grid)
+    plan = SearchPlan(
+        grid_size_before=before,
+        grid_size=grid,
+        predicted_passes=passes_for(grid),
+        seconds_per_pass=round(spp, 4),
+        timing_source=source,
+        predicted_seconds=round(predicted, 1),
+        budget_seconds=budget_seconds,
+        within_budget=budget_seconds is None or predicted <= budget_seconds,
+        optimization_type=int(optimization_type),
+        adjustments=adjustments,
+        parameters=[
+            {"name": p.name, "min": p.min_val, "step": p.step, "max": p.max_val, "values": param_values(p)}
+            for p in params if can_optimize(p)
+        ],
+    )
+    return params, plan
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estimate optimization size/duration for an INI")
+    parser.add_argument("ini_path", help="Optimization INI file")
+    parser.add_argument("--budget-minutes", type=float, help="Wall-clock budget; shows the shrunk plan")
+    args = parser.parse_args()
+
+    tester, params = read_ini(Path(args.ini_path))
+    _, plan = plan_search(
+        params,
+        ea_name=tester.get("Expert", ""),
+        symbol=tester.get("Symbol", ""),
+        timeframe=tester.get("Period", ""),
+        model=int(tester.get("Model", 1) or 1),
+        optimization_type=int(tester.get("Optimization", 2) or 2),
+        budget_seconds=args.budget_minutes * 60 if args.budget_minutes else None,
+    )
+    print(json.dumps(plan.to_dict(), indent=2))
@@ -0,0 +1,258 @@
+"""
+Surrogate Pre-Screening of Optimization Passes
+
+Full dashboard backtests cost minutes of MT5 time per pass, so the backtest
+budget should go to the passes most likely to hold up - not blindly to the
+top total_profit. This module learns from the pass table MT5 already produced
+(every pass has an in-sample AND a forward result) how forward results
+degrade across the parameter space, and predicts it for each candidate.
+
+Model (numpy only, no fitting loop): binned kernel regression.
+1. Parameter columns are scaled to [0, 1] (plateau.normalize_parameters),
+   ranked by how much of the efficiency variance their own bins explain, and
+   the leading columns are cut into grid cells at two resolutions
+   (FINE_BINS / COARSE_BINS per column; as many columns as keep an average
+   cell at MIN_CELL training passes).
+2. Training rows are the IS-profitable passes. Targets:
+   - efficiency = forward expectancy per trade / in-sample expectancy per
+     trade (1.0 = no degradation), clipped to [-2, 2]
+   - held = 1 if the forward period stayed profitable
+3. Each candidate's prediction is the mean target of its fine cell, shrunk
+   towards its coarse cell, shrunk towards the global mean (PRIOR_WEIGHT
+   pseudo-passes at each level). The candidate itself is left out, so its
+   own (possibly lucky) forward result never predicts itself.
+
+Per candidate:
+- pred_degradation = 1 - predicted efficiency
+- pred_confidence = predicted % of neighboring passes whose forward stayed
+  profitable (0-100, read like the Monte Carlo confidence level)
+- expected_fwd_profit = in-sample expectancy * predicted efficiency * forward trades
+- robustness = expected_fwd_profit * pred_confidence / 100 (ranking key)
+
+skill = correlation of the left-out predictions with the actual efficiency
+over the training rows (around 0 = the surrogate knows nothing; the ranking
+then degrades gracefully to in-sample expectancy x trades).
+
+Usage:
+    python optimizer/surrogate.py "EA_Name" --symbol EURUSD --top 20
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from optimizer.plateau import normalize_parameters
+from optimizer.result_parser import RobustResult
+
+FINE_BINS = 8
+COARSE_BINS = 3
+PRIOR_WEIGHT = 5.0
+MIN_CELL = 10
+EFFICIENCY_CLIP = 2.0
+
+
+@dataclass
+class SurrogatePrediction:
+    """Predicted forward behavior of one candidate pass."""
+    pass_num: int
+    in_profit: float
+    fwd_profit: float
+    pred_efficiency: float
+    pred_degradation: float
+    pred_confidence: float
+    expected_fwd_profit: float
+    support: int  # training passes in the candidate's fine cell (itself excluded)
+    robustness: float
+    rank: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: (round(v, 4) if isinstance(v, float) else v) for k, v in asdict(self).items()}
+
+
+def result_from_row(row: Dict[str, Any]) -> RobustResult:
+    """RobustResult from a dashboard pass row (in_/fwd_ keys)."""
+    in_profit = float(row.get("in_profit", 0.0))
+    fwd_profit = float(row.get("fwd_profit", 0.0))
+    return RobustResult(
+        pass_num=int(row.get("pass", 0)),
+        in_sample_profit=in_profit,
+        in_sample_pf=float(row.get("in_pf", 0.0)),
+        in_sample_dd=float(row.get("in_dd", 0.0)),
+        in_sample_trades=int(row.get("in_trades", 0) or 0),
+        forward_profit=fwd_profit,
+        forward_pf=float(row.get("fwd_pf", 0.0)),
+        forward_dd=float(row.get("fwd_dd", 0.0)),
+        forward_trades=int(row.get("fwd_trades", 0) or 0),
+        total_profit=in_profit + fwd_profit,
+        is_robust=in_profit > 0 and fwd_profit > 0,
+        parameters=row.get("parameters", {}) or {},
+    )
+
+
+def _bin_codes(X: np.ndarray, bins: int) -> np.ndarray:
+    return np.minimum((X * bins).astype(np.int64), bins - 1)
+
+
+def _rank_parameters(codes: np.ndarray, target: np.ndarray, train: np.ndarray) -> List[int]:
+    """Parameter columns by share of target variance explained by their own bins (best first)."""
+    y = target[train]
+    if not len(y) or y.var() <= 0:
+        return list(range(codes.shape[1]))
+    explained = []
+    for j in range(codes.shape[1]):
+        c = codes[train, j]
+        counts = np.bincount(c)
+        means = np.bincount(c, weights=y) / np.maximum(counts, 1)
+        explained.append(float((counts * (means - y.mean()) ** 2).sum() / (len(y) * y.var())))
+    return sorted(range(codes.shape[1]), key=lambda j: -explained[j])
+
+
+def _cells(codes: np.ndarray, columns: List[int], bins: int, n_train: int) -> Tuple[np.ndarray, List[int]]:
+    """
+    Cell id per row on the leading columns, as many as keep an average cell at
+    MIN_CELL training passes (bins ** k cells).
+    """
+    k = 0
+    while k < len(columns) and bins ** (k + 1) * MIN_CELL <= max(n_train, 1):
+        k += 1
+    cells = np.zeros(len(codes), dtype=np.int64)
+    for j in columns[:k]:
+        cells = cells * bins + codes[:, j]
+    return cells, columns[:k]
+
+
+def _shrunk_means(
+    cells: np.ndarray, target: np.ndarray, train: np.ndarray, prior: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Leave-one-out cell mean of target over training rows, shrunk towards prior (per row)."""
+    n_cells = int(cells.max()) + 1 if len(cells) else 0
+    w = train.astype(float)
+    sums = np.bincount(cells, weights=np.where(train, target, 0.0), minlength=n_cells)[cells]
+    counts = np.bincount(cells, weights=w, minlength=n_cells)[cells]
+    sums -= np.where(train, target, 0.0)
+    counts -= w
+    return (sums + PRIOR_WEIGHT * prior) / (counts + PRIOR_WEIGHT), counts
+
+
+def screen_passes(
+    passes: List[RobustResult],
+    candidates: Optional[List[int]] = None,
+    limit: Optional[int] = None,
+) -> Tuple[List[SurrogatePrediction], Dict[str, Any]]:
+    """
+    Train on all passes, predict for candidates (default: robust passes).
+
+    Returns the best `limit` predictions sorted by robustness (rank 1 =
+    backtest first) and a model summary (training size, skill, parameters
+    the cells were cut on).
+    """
+    n = len(passes)
+    if candidates is None:
+        candidates = [i for i, p in enumerate(passes) if p.is_robust]
+    if not n or not candidates:
+        return [], {"trained_on": 0, "candidates": 0, "skill": None, "parameters": []}
+
+    X, names = normalize_parameters(passes)
+    in_profit = np.array([p.in_sample_profit for p in passes], dtype=float)
+    fwd_profit = np.array([p.forward_profit for p in passes], dtype=float)
+    in_trades = np.array([p.in_sample_trades for p in passes], dtype=float)
+    fwd_trades = np.array([p.forward_trades for p in passes], dtype=float)
+
+    in_exp = np.divide(in_profit, in_trades, out=np.zeros(n), where=in_trades > 0)
+    fwd_exp = np.divide(fwd_profit, fwd_trades, out=np.zeros(n), where=fwd_trades > 0)
+    train = (in_exp > 0) & (fwd_trades > 0)
+    efficiency = np.clip(
+        np.divide(fwd_exp, in_exp, out=np.zeros(n), where=train), -EFFICIENCY_CLIP, EFFICIENCY_CLIP
+    )
+    held = (fwd_profit > 0).astype(float)
+
+    n_train = int(train.sum())
+    if n_train:
+        prior_eff = np.full(n, efficiency[train].mean())
+        prior_held = np.full(n, held[train].mean())
+    else:
+        prior_eff = np.ones(n)
+        prior_held = np.full(n, 0.5)
+
+    fine_codes = _bin_codes(X, FINE_BINS)
+    columns = _rank_parameters(fine_codes, efficiency, train)
+    coarse, _ = _cells(_bin_codes(X, COARSE_BINS), columns, COARSE_BINS, n_train)
+    fine, used = _cells(fine_codes, columns, FINE_BINS, n_train)
+    eff_c, _ = _shrunk_means(coarse, efficiency, train, prior_eff)
+    held_c, _ = _shrunk_means(coarse, held, train, prior_held)
+    pred_eff, support = _shrunk_means(fine, efficiency, train, eff_c)
+    pred_held, _ = _shrunk_means(fine, held, train, held_c)
+
+    skill: Optional[float] = None
+    if n_train > 2 and efficiency[train].std() > 0 and pred_eff[train].std() > 0:
+        skill = float(np.corrcoef(pred_eff[train], efficiency[train])[0, 1])
+
+    expected = in_exp * pred_eff * fwd_trades
+    confidence = pred_held * 100.0
+    robustness = expected * pred_held
+
+    idx = np.asarray(candidates, dtype=np.int64)
+    order = idx[np.argsort(-robustness[idx], kind="stable")]
+    if limit is not None:
+        order = order[:max(0, limit)]
+    rows = zip(
+        order.tolist(), in_profit[order].tolist(), fwd_profit[order].tolist(), pred_eff[order].tolist(),
+        confidence[order].tolist(), expected[order].tolist(), support[order].tolist(), robustness[order].tolist(),
+    )
+    predictions = [
+        SurrogatePrediction(
+            pass_num=passes[i].pass_num,
+            in_profit=ip,
+            fwd_profit=fp,
+            pred_efficiency=eff,
+            pred_degradation=1.0 - eff,
+            pred_confidence=conf,
+            expected_fwd_profit=exp,
+            support=int(sup),
+            robustness=rob,
+            rank=rank,
+        )
+        for rank, (i, ip, fp, eff, conf, exp, sup, rob) in enumerate(rows, start=1)
+    ]
+    summary = {
+        "trained_on": n_train,
+        "candidates": len(idx),
+        "skill": round(skill, 4) if skill is not None else None,
+        "parameters": [names[j] for j in used],
+    }
+    return predictions, summary
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from config import MT5_DATA_PATH
+    from optimizer.result_parser import OptimizationResultParser
+
+    parser = argparse.ArgumentParser(description="Surrogate pre-screening of optimization passes")
+    parser.add_argument("ea_name", help="Name of the EA")
+    parser.add_argument("--symbol", "-s", help="Symbol for symbol-specific results")
+    parser.add_argument("--top", type=int, default=20, help="Candidates to show")
+    args = parser.parse_args()
+
+    opt = OptimizationResultParser(args.ea_name, MT5_DATA_PATH, symbol=args.symbol)
+    if not opt.insample_xml.exists() or not opt.forward_xml.exists():
+        print(f"Optimization XML not found: {opt.insample_xml}")
+        sys.exit(1)
+
+    passes = opt.join_passes()
+    t0 = time.time()
+    predictions, summary = screen_passes(passes, limit=args.top)
+    print(json.dumps({
+        "total_passes": len(passes),
+        "seconds": round(time.time() - t0, 3),
+        **summary,
+        "top": [p.to_dict() for p in predictions],
+    }, indent=2))
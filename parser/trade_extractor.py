@@ -28,6 +28,7 @@ class Trade:
     profit: float
     net_profit: float = 0.0
     comment: str = ""
+    entry_time: str = ""  # time of the opening deal ("" when unknown)
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -229,7 +230,8 @@ class TradeExtractor:
                     swap=entry_swap + swap,
                     profit=profit,
                     net_profit=(balance - entry_balance_before) if balance > 0 else (profit + entry_commission + commission + entry_swap + swap),
-                    comment=comment
+                    comment=comment,
+                    entry_time=entry["time"] if entry else "",
                 )
                 trades.append(trade)
 
@@ -0,0 +1 @@
+from .downsample import downsample_line, lttb_indices, thin_scatter
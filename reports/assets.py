@@ -0,0 +1,111 @@
+"""
+Shared Static Assets + Page Templates for Offline Reports
+
+Every offline HTML report (dashboard + compare page, multi-pair, timeframes,
+walk-forward, execution stress, parameter sensitivity) uses the same CSS and
+JS helpers (number formatting, KPI tiles, canvas charts). They live once in
+reports/static/ and are published as a content-hashed bundle:
+
+  runs/_assets/report.<hash>.css
+  runs/_assets/report.<hash>.js
+
+written the first time a report needs them and referenced by relative path,
+so report pages stay small and the files can be cached forever (a changed
+file gets a new name). Pages keep their own layout rules inline.
+
+Page templates (reports/templates/<name>.html) are plain HTML/JS with
+{{ slot }} placeholders. Each is compiled once per process into literal
+parts + slot names; rendering is a single join.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import ASSETS_DIR
+
+ASSET_VERSION = 1
+STATIC_DIR = Path(__file__).parent / "static"
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+BUNDLE_FILES = {"css_href": "report.css", "js_href": "report.js"}
+
+_SLOT = re.compile(r"\{\{\s*([A-Za-z_]\w*)\s*\}\}")
+
+
+class Template:
+    """Page template compiled into literal parts and slot names."""
+
+    def __init__(self, text: str, name: str = ""):
+        parts = _SLOT.split(text)
+        self.name = name
+        self._literals: List[str] = parts[0::2]
+        self.slots: List[str] = parts[1::2]
+
+    def render(self, **values: Any) -> str:
+        missing = set(self.slots) - set(values)
+        if missing:
+            raise KeyError(f"Template {self.name!r} is missing values for: {', '.join(sorted(missing))}")
+        out = [self._literals[0]]
+        for slot, literal in zip(self.slots, self._literals[1:]):
+            out.append(str(values[slot]))
+            out.append(literal)
+        return "".join(out)
+
+
+@lru_cache(maxsize=None)
+def load_template(name: str) -> Template:
+    return Template((TEMPLATE_DIR / f"{name}.html").read_text(encoding="utf-8"), name)
+
+
+@lru_cache(maxsize=None)
+def bundle() -> Dict[str, str]:
+    """Slot -> content-hashed file name of each shared asset."""
+    names = {}
+    for slot, filename in BUNDLE_FILES.items():
+        data = (STATIC_DIR / filename).read_bytes()
+        digest = hashlib.sha256(f"v{ASSET_VERSION}:".encode("utf-8") + data).hexdigest()[:12]
+        stem, ext = os.path.splitext(filename)
+        names[slot] = f"{stem}.{digest}{ext}"
+    return names
+
+
+def ensure_assets(root: Path = ASSETS_DIR) -> Path:
+    """Write the bundle under root unless it is already there; returns root."""
+    root = Path(root)
+    for slot, name in bundle().items():
+        target = root / name
+        if target.exists():
+            continue
+        root.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + f".{uuid.uuid4().hex[:6]}.tmp")
+        shutil.copyfile(STATIC_DIR / BUNDLE_FILES[slot], tmp)
+        os.replace(tmp, target)
+    return root
+
+
+def asset_urls(out_dir: Path, root: Path = ASSETS_DIR) -> Dict[str, str]:
+    """
+    Relative URLs from a report directory to the shared bundle. When no
+    relative path exists (report on another drive), the bundle is copied
+    into <out_dir>/_assets instead.
+    """
+    out_dir = Path(out_dir).resolve()
+    try:
+        base = os.path.relpath(ensure_assets(root).resolve(), out_dir)
+    except ValueError:
+        base = os.path.relpath(ensure_assets(out_dir / "_assets"), out_dir)
+    return {slot: Path(base, name).as_posix() for slot, name in bundle().items()}
+
+
+def render_page(name: str, out_dir: Path, **values: Any) -> str:
+    """Render reports/templates/<name>.html for a report written to out_dir."""
+    return load_template(name).render(**asset_urls(out_dir), **values)
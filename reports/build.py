@@ -0,0 +1,143 @@
+"""
+Incremental Report Builds
+
+A report is a small build graph: each section (optimization summary, pass N
+backtest data, Monte Carlo for pass N, the HTML shell, ...) declares the
+inputs that determine it. The fingerprint of those inputs is stored next to
+the section's result; on the next build into the same output directory a
+section whose fingerprint is unchanged (and whose output files still exist)
+is served from disk instead of being recomputed.
+
+Inputs are plain JSON-able values: settings, parameter sets, file stamps
+(path + size + mtime, see file_stamp), fingerprints of upstream sections,
+or a section version constant bumped when its code changes.
+
+Layout (<out_dir>/.build/):
+  manifest.json          section -> {fingerprint, outputs, built_at}
+  sections/<name>.json   section result
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+BUILD_VERSION = 1
+BUILD_DIR = ".build"
+
+
+def fingerprint(inputs: Any) -> str:
+    """SHA-256 over the canonical JSON form of inputs."""
+    blob = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def file_stamp(path: Optional[Path]) -> Optional[Dict[str, Any]]:
+    """Cheap change marker for an input file (None if missing)."""
+    if not path:
+        return None
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return None
+    return {"path": str(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+@dataclass
+class BuildStats:
+    """Sections built vs served unchanged in this run."""
+    built: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["built_count"] = len(self.built)
+        d["skipped_count"] = len(self.skipped)
+        return d
+
+
+class BuildGraph:
+    """Fingerprinted section results for one output directory."""
+
+    def __init__(self, out_dir: Path, force: bool = False):
+        self.root = Path(out_dir) / BUILD_DIR
+        self.force = force
+        self.stats = BuildStats()
+        self._sections: Dict[str, Dict[str, Any]] = {}
+        manifest = self._read_json(self.root / "manifest.json")
+        if manifest and manifest.get("version") == BUILD_VERSION:
+            self._sections = dict(manifest.get("sections") or {})
+
+    def _value_path(self, name: str) -> Path:
+        return self.root / "sections" / (re.sub(r"[^A-Za-z0-9_.-]", "_", name) + ".json")
+
+    def lookup(self, name: str, inputs: Any) -> Optional[Any]:
+        """
+        Stored result of a section if its fingerprint matches inputs and the
+        output files it declared still exist; None means it must be built.
+        """
+        entry = self._sections.get(name)
+        if self.force or not entry or entry.get("fingerprint") != fingerprint(inputs):
+            return None
+        if not all((self.root.parent / p).exists() for p in entry.get("outputs") or []):
+            return None
+        data = self._read_json(self._value_path(name))
+        if data is None:
+            return None
+        self.stats.skipped.append(name)
+        return data.get("value")
+
+    def store(self, name: str, inputs: Any, value: Any, outputs: Iterable[Path] = ()) -> Any:
+        """Record a freshly built section result (and the files it wrote)."""
+        self._write_json(self._value_path(name), {"value": value})
+        self._sections[name] = {
+            "fingerprint": fingerprint(inputs),
+            "outputs": [self._relative(p) for p in outputs],
+            "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.stats.built.append(name)
+        return value
+
+    def section(
+        self,
+        name: str,
+        inputs: Any,
+        build: Callable[[], Any],
+        outputs: Optional[Callable[[Any], Iterable[Path]]] = None,
+    ) -> Any:
+        """lookup() or build() + store(); outputs(value) lists the files the build wrote."""
+        value = self.lookup(name, inputs)
+        if value is None:
+            value = build()
+            self.store(name, inputs, value, outputs(value) if outputs else ())
+        return value
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return Path(path).resolve().relative_to(self.root.parent.resolve()).as_posix()
+        except ValueError:
+            return str(Path(path).resolve())
+
+    def save(self) -> None:
+        self._write_json(self.root / "manifest.json", {"version": BUILD_VERSION, "sections": self._sections})
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path: Path, data: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{uuid.uuid4().hex[:6]}.tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
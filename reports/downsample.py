@@ -0,0 +1,103 @@
+"""
+Chart Downsampling for Offline Reports
+
+Reports plot on a canvas a few hundred pixels wide, so shipping every trade's
+equity value or every pass's (IS, FWD) point only makes the payload and the
+drawing slower. Both are reduced in Python before they are written:
+
+- Lines (equity curves): Largest-Triangle-Three-Buckets. Interior points are
+  split into n_out - 2 buckets and each bucket keeps the point forming the
+  largest triangle with its neighbors. The anchors are the previous and next
+  bucket means (instead of the previously *chosen* point), which makes every
+  bucket independent, so the whole pass is a handful of numpy operations.
+  First/last points, the exact minimum/maximum and any caller-given indices
+  (e.g. the IS/forward split) are always kept.
+- Scatters: one point per cell of a width x height pixel grid, plus the
+  extreme points on both axes and any caller-given indices (selected passes).
+
+Kept indices are returned in order, so callers can keep the original x
+positions (trade numbers) next to the values.
+"""
+
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# Default target resolutions (roughly the canvas size in device pixels)
+LINE_POINTS = 2000
+SCATTER_GRID = (300, 180)
+
+
+def lttb_indices(y: Sequence[float], n_out: int = LINE_POINTS, keep: Iterable[int] = ()) -> np.ndarray:
+    """Sorted indices of the points LTTB keeps (all indices if len(y) <= n_out)."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max(n_out, 3):
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    n_buckets = max(1, n_out - 2)
+    pos = np.arange(1, n - 1)
+    edges = np.linspace(1, n - 1, n_buckets + 1)
+    bucket = np.searchsorted(edges[1:-1], pos, side="right")
+
+    counts = np.bincount(bucket, minlength=n_buckets)
+    safe = np.maximum(counts, 1)
+    mean_x = np.bincount(bucket, weights=x[pos], minlength=n_buckets) / safe
+    mean_y = np.bincount(bucket, weights=y[pos], minlength=n_buckets) / safe
+
+    # Anchors: previous bucket mean (first point for bucket 0), next bucket
+    # mean (last point for the final bucket)
+    ax, ay = np.r_[x[0], mean_x[:-1]][bucket], np.r_[y[0], mean_y[:-1]][bucket]
+    cx, cy = np.r_[mean_x[1:], x[-1]][bucket], np.r_[mean_y[1:], y[-1]][bucket]
+    area = np.abs((ax - cx) * (y[pos] - ay) - (ax - x[pos]) * (cy - ay))
+    area = np.nan_to_num(area, nan=-1.0)
+
+    order = np.lexsort((-area, bucket))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    chosen = pos[order[starts[counts > 0]]]
+
+    extra = [0, n - 1]
+    finite = np.isfinite(y)
+    if finite.any():
+        idx = np.nonzero(finite)[0]
+        extra += [int(idx[np.argmin(y[idx])]), int(idx[np.argmax(y[idx])])]
+    extra += [int(i) for i in keep if 0 <= int(i) < n]
+    return np.union1d(chosen, np.asarray(extra, dtype=np.int64))
+
+
+def downsample_line(y: Sequence[float], n_out: int = LINE_POINTS, keep: Iterable[int] = ()) -> Tuple[List[int], List[float]]:
+    """(kept indices, kept values) of a line series."""
+    idx = lttb_indices(y, n_out, keep)
+    values = np.asarray(y, dtype=float)[idx]
+    return idx.tolist(), values.tolist()
+
+
+def thin_scatter(
+    x: Sequence[float],
+    y: Sequence[float],
+    grid: Tuple[int, int] = SCATTER_GRID,
+    keep: Iterable[int] = (),
+) -> np.ndarray:
+    """Sorted indices of scatter points to draw: one per grid cell + extremes + keep."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    width, height = grid
+    if n <= width * height // 4:
+        return np.arange(n)
+
+    ok = np.isfinite(x) & np.isfinite(y)
+    idx = np.nonzero(ok)[0]
+    if not len(idx):
+        return np.asarray(sorted({int(i) for i in keep if 0 <= int(i) < n}), dtype=np.int64)
+    xs, ys = x[idx], y[idx]
+    span_x = (xs.max() - xs.min()) or 1.0
+    span_y = (ys.max() - ys.min()) or 1.0
+    col = np.minimum(((xs - xs.min()) / span_x * width).astype(np.int64), width - 1)
+    row = np.minimum(((ys - ys.min()) / span_y * height).astype(np.int64), height - 1)
+    _, first = np.unique(row * width + col, return_index=True)
+
+    extra = [idx[np.argmin(xs)], idx[np.argmax(xs)], idx[np.argmin(ys)], idx[np.argmax(ys)]]
+    extra += [int(i) for i in keep if 0 <= int(i) < n]
+    return np.union1d(idx[first], np.asarray(extra, dtype=np.int64))
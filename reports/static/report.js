@@ -0,0 +1,218 @@
+// Shared helpers + canvas charts of the offline HTML reports (see reports/assets.py).
+
+function num(x) {
+  const n = Number(x);
+  return Number.isFinite(n) ? n : null;
+}
+
+function numOrNullFromInput(id) {
+  const el = document.getElementById(id);
+  if (!el) return null;
+  const raw = String(el.value ?? '').trim();
+  if (raw === '') return null;
+  const n = Number(raw);
+  return Number.isFinite(n) ? n : null;
+}
+
+function fmt(x, digits=2) {
+  if (x === null || x === undefined || Number.isNaN(x)) return '-';
+  const n = Number(x);
+  return n.toLocaleString(undefined, { maximumFractionDigits: digits, minimumFractionDigits: digits });
+}
+
+function escapeHtml(s) {
+  return String(s)
+    .replaceAll('&','&amp;')
+    .replaceAll('<','&lt;')
+    .replaceAll('>','&gt;')
+    .replaceAll('"','&quot;')
+    .replaceAll("'",'&#039;');
+}
+
+function tagClass(status) {
+  if (status === 'good') return 'good';
+  if (status === 'warn') return 'warn';
+  if (status === 'bad') return 'bad';
+  return '';
+}
+
+function addKpis(targetId, items) {
+  const root = document.getElementById(targetId);
+  root.innerHTML = '';
+  for (const it of items) {
+    const div = document.createElement('div');
+    div.className = 'item';
+    const label = document.createElement('div');
+    label.className = 'label';
+    label.textContent = it.label;
+    if (it.tip) label.title = it.tip;
+    const value = document.createElement('div');
+    value.className = 'value';
+    value.textContent = it.value;
+    if (it.tag) {
+      const t = document.createElement('span');
+      t.className = 'tag ' + tagClass(it.tagClass);
+      t.style.marginLeft = '8px';
+      t.textContent = it.tag;
+      value.appendChild(t);
+    }
+    div.appendChild(label);
+    div.appendChild(value);
+    root.appendChild(div);
+  }
+}
+
+// Curves are downsampled server-side (LTTB); in_index/fwd_index hold the trade
+// number of each kept point and length the original trade count.
+function drawEquity(canvasId, inSeries, fwdSeries, layout) {
+  const c = document.getElementById(canvasId);
+  const ctx = c.getContext('2d');
+  const w = c.width = c.clientWidth * devicePixelRatio;
+  const h = c.height = c.clientHeight * devicePixelRatio;
+  ctx.clearRect(0,0,w,h);
+
+  const inS = (inSeries || []).map(Number);
+  const fwdS = (fwdSeries || []).map(Number);
+  const inX = layout?.in_index || inS.map((_, i) => i);
+  const fwdX = layout?.fwd_index || fwdS.map((_, i) => inS.length + i);
+  const totalLen = layout?.length || (inS.length + fwdS.length);
+
+  if (inS.length + fwdS.length < 2) {
+    ctx.fillStyle = 'rgba(168,179,207,0.9)';
+    ctx.fillText('No equity data', 20, 30);
+    return;
+  }
+
+  const pad = 28 * devicePixelRatio;
+  const ys = inS.concat(fwdS);
+  const minY = Math.min(...ys);
+  const maxY = Math.max(...ys);
+  const spanY = (maxY - minY) || 1;
+
+  function X(i) {
+    return pad + (i / (totalLen - 1)) * (w - 2*pad);
+  }
+  function Y(v) {
+    return (h - pad) - ((v - minY) / spanY) * (h - 2*pad);
+  }
+
+  // grid
+  ctx.strokeStyle = 'rgba(255,255,255,0.06)';
+  ctx.lineWidth = 1;
+  for (let g=0; g<=4; g++) {
+    const yy = pad + g*(h-2*pad)/4;
+    ctx.beginPath();
+    ctx.moveTo(pad, yy);
+    ctx.lineTo(w-pad, yy);
+    ctx.stroke();
+  }
+
+  // in-sample segment
+  if (inS.length >= 2) {
+    ctx.strokeStyle = 'rgba(106,166,255,0.95)';
+    ctx.lineWidth = 2 * devicePixelRatio;
+    ctx.beginPath();
+    ctx.moveTo(X(inX[0]), Y(inS[0]));
+    for (let i=1; i<inS.length; i++) {
+      ctx.lineTo(X(inX[i]), Y(inS[i]));
+    }
+    ctx.stroke();
+  }
+
+  // forward segment
+  if (fwdS.length >= 1) {
+    const startIdx = inS.length > 0 ? inX[inS.length - 1] : fwdX[0];
+    const firstY = (inS.length > 0) ? inS[inS.length - 1] : fwdS[0];
+    ctx.strokeStyle = 'rgba(61,220,151,0.95)';
+    ctx.lineWidth = 2 * devicePixelRatio;
+    ctx.beginPath();
+    ctx.moveTo(X(startIdx), Y(firstY));
+    for (let i=0; i<fwdS.length; i++) {
+      ctx.lineTo(X(fwdX[i]), Y(fwdS[i]));
+    }
+    ctx.stroke();
+  }
+
+  // split marker
+  if (inS.length > 0 && fwdS.length > 0) {
+    ctx.strokeStyle = 'rgba(255,255,255,0.18)';
+    ctx.setLineDash([6*devicePixelRatio, 6*devicePixelRatio]);
+    ctx.beginPath();
+    ctx.moveTo(X(inX[inS.length - 1]), pad);
+    ctx.lineTo(X(inX[inS.length - 1]), h - pad);
+    ctx.stroke();
+    ctx.setLineDash([]);
+  }
+
+  // labels
+  ctx.fillStyle = 'rgba(168,179,207,0.9)';
+  ctx.font = `${12*devicePixelRatio}px system-ui`;
+  ctx.fillText(`Min: ${fmt(minY,2)}`, pad, pad - 8*devicePixelRatio);
+  ctx.fillText(`Max: ${fmt(maxY,2)}`, pad + 160*devicePixelRatio, pad - 8*devicePixelRatio);
+}
+
+function drawScatter(canvasId, points, highlight) {
+  const c = document.getElementById(canvasId);
+  const ctx = c.getContext('2d');
+  const w = c.width = c.clientWidth * devicePixelRatio;
+  const h = c.height = c.clientHeight * devicePixelRatio;
+  ctx.clearRect(0,0,w,h);
+
+  const pad = 28 * devicePixelRatio;
+  if (!points || points.length === 0) {
+    ctx.fillStyle = 'rgba(168,179,207,0.9)';
+    ctx.fillText('No robust passes found', 20, 30);
+    return;
+  }
+
+  const xs = points.map(p => Number(p.x));
+  const ys = points.map(p => Number(p.y));
+  const minX = Math.min(...xs), maxX = Math.max(...xs);
+  const minY = Math.min(...ys), maxY = Math.max(...ys);
+  const spanX = (maxX - minX) || 1;
+  const spanY = (maxY - minY) || 1;
+
+  function X(v) {
+    return pad + ((v - minX) / spanX) * (w - 2*pad);
+  }
+  function Y(v) {
+    return (h - pad) - ((v - minY) / spanY) * (h - 2*pad);
+  }
+
+  // axes
+  ctx.strokeStyle = 'rgba(255,255,255,0.14)';
+  ctx.lineWidth = 1 * devicePixelRatio;
+  ctx.beginPath();
+  ctx.moveTo(pad, h-pad);
+  ctx.lineTo(w-pad, h-pad);
+  ctx.lineTo(w-pad, pad);
+  ctx.stroke();
+
+  // points
+  ctx.fillStyle = 'rgba(106,166,255,0.65)';
+  for (const p of points) {
+    const cx = X(p.x), cy = Y(p.y);
+    ctx.beginPath();
+    ctx.arc(cx, cy, 3*devicePixelRatio, 0, Math.PI*2);
+    ctx.fill();
+  }
+
+  // highlight selected pass
+  if (highlight && highlight.x !== undefined && highlight.y !== undefined) {
+    ctx.strokeStyle = 'rgba(61,220,151,0.95)';
+    ctx.lineWidth = 2 * devicePixelRatio;
+    ctx.beginPath();
+    ctx.arc(X(highlight.x), Y(highlight.y), 7*devicePixelRatio, 0, Math.PI*2);
+    ctx.stroke();
+  }
+
+  // labels
+  ctx.fillStyle = 'rgba(168,179,207,0.9)';
+  ctx.font = `${12*devicePixelRatio}px system-ui`;
+  ctx.fillText('In-sample profit', pad, h - 8*devicePixelRatio);
+  ctx.save();
+  ctx.translate(10*devicePixelRatio, h/2);
+  ctx.rotate(-Math.PI/2);
+  ctx.fillText('Forward profit', 0, 0);
+  ctx.restore();
+}
@@ -27,6 +27,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import DEFAULT_SYMBOL, RUNS_DIR
 from parser.report import ReportParser
 from parser.trade_extractor import extract_trades
+from reports.assets import render_page
 from settings import get_settings
 from tester.execution_stress import StressScenario, infer_pip_value_per_lot, score_scenario
 from workflow.post_steps import complete_post_step, fail_post_step, start_post_step
@@ -95,339 +96,16 @@ def _infer_baseline_spread_pips(report_path: Path, symbol: str) -> Optional[floa
     return None
 
 
-def _render_html(data: Dict[str, Any]) -> str:
-    safe = json.dumps(data).replace("</", "<\\/")
-    return f"""<!doctype html>
-<html lang="en">
-<head>
-  <meta charset="utf-8" />
-  <meta name="viewport" content="width=device-width, initial-scale=1" />
-  <title>Execution Stress Suite - {data.get("ea_name","")}</title>
-  <style>
-    :root {{
-      --bg: #0b1020;
-      --panel: #121a33;
-      --muted: #a8b3cf;
-      --text: #e8ecf7;
-      --accent: #6aa6ff;
-      --good: #3ddc97;
-      --warn: #ffcc66;
-      --bad: #ff6b6b;
-      --border: rgba(255,255,255,0.08);
-    }}
-    body {{
-      margin: 0;
-      font-family: ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Ubuntu, Cantarell, Noto Sans, Arial;
-      background: radial-gradient(1200px 800px at 10% 0%, #17234a 0%, var(--bg) 40%, var(--bg) 100%);
-      color: var(--text);
-    }}
-    .wrap {{ max-width: 1200px; margin: 0 auto; padding: 24px; }}
-    .title {{ display:flex; justify-content:space-between; gap:16px; align-items:flex-end; flex-wrap: wrap; }}
-    h1 {{ margin: 0; font-size: 22px; letter-spacing: 0.2px; }}
-    .subtitle {{ color: var(--muted); font-size: 13px; }}
-    .tag {{ display:inline-block; padding: 2px 8px; border-radius: 999px; font-size: 12px; border: 1px solid var(--border); color: var(--muted); }}
-    .card {{
-      background: rgba(18,26,51,0.92);
-      border: 1px solid var(--border);
-      border-radius: 14px;
-      padding: 14px;
-      box-shadow: 0 8px 30px rgba(0,0,0,0.25);
-      margin-top: 14px;
-    }}
-    .kpi {{ display:flex; gap:12px; flex-wrap: wrap; }}
-    .kpi .item {{ flex: 1 1 180px; padding: 10px; border: 1px solid var(--border); border-radius: 12px; background: rgba(255,255,255,0.02); }}
-    .kpi .label {{ font-size: 12px; color: var(--muted); }}
-    .kpi .value {{ margin-top: 4px; font-size: 16px; font-weight: 700; }}
-    table {{ width:100%; border-collapse: collapse; }}
-    th, td {{ padding: 8px 10px; border-bottom: 1px solid var(--border); font-size: 12px; text-align: right; }}
-    th {{ color: var(--muted); font-weight: 600; }}
-    td:first-child, th:first-child {{ text-align: left; }}
-    th.sortable {{ cursor: pointer; user-select: none; }}
-    th.sortable:hover {{ background: rgba(255,255,255,0.03); }}
-    .sort-indicator {{ margin-left: 6px; opacity: 0.8; }}
-    .ok {{ color: var(--good); font-weight: 700; }}
-    .warn {{ color: var(--warn); font-weight: 700; }}
-    .bad {{ color: var(--bad); font-weight: 700; }}
-    .scroll {{ max-height: 580px; overflow:auto; border: 1px solid var(--border); border-radius: 12px; }}
-  </style>
-</head>
-<body>
-  <div class="wrap">
-    <div class="title">
-      <div>
-        <h1>Execution Stress Suite: {data.get("ea_name","")}</h1>
-        <div class="subtitle">
-          Symbol: <span class="tag">{data.get("symbol","")}</span>
-          Report: <span class="tag">{Path(str(data.get("source_report",""))).name}</span>
-          Generated: <span class="tag">{data.get("generated_at","")}</span>
-        </div>
-      </div>
-      <div class="subtitle" style="max-width:560px">
-        This is an offline re-score. Spread uses an assumed baseline (pips) and applies a multiplier; slippage is per-side (entry+exit).
-      </div>
-    </div>
-
-    <div class="card">
-      <div class="kpi" id="kpis"></div>
-    </div>
-
-    <div class="card">
-      <div style="display:flex; gap:10px; flex-wrap:wrap; align-items:flex-end; margin-bottom:10px">
-        <div style="display:flex; flex-direction:column; gap:4px">
-          <div class="subtitle">Min PF</div>
-          <input id="fMinPf" type="number" step="0.01" class="tag" style="background: transparent; width:120px" />
-        </div>
-        <div style="display:flex; flex-direction:column; gap:4px">
-          <div class="subtitle">Min ROI%</div>
-          <input id="fMinRoi" type="number" step="0.1" class="tag" style="background: transparent; width:120px" />
-        </div>
-        <div style="display:flex; flex-direction:column; gap:4px">
-          <div class="subtitle">Max DD%</div>
-          <input id="fMaxDd" type="number" step="0.1" class="tag" style="background: transparent; width:120px" />
-        </div>
-        <div style="display:flex; flex-direction:column; gap:4px">
-          <div class="subtitle">Sort</div>
-          <select id="sortSelect" class="tag" style="background: transparent;">
-            <option value="pf_desc">PF ↓</option>
-            <option value="roi_desc">ROI% ↓</option>
-            <option value="profit_desc">Net Profit ↓</option>
-            <option value="dd_asc">DD% ↑</option>
-            <option value="cost_asc">Stress Cost ↑</option>
-            <option value="custom">Header Click</option>
-          </select>
-        </div>
-        <div style="display:flex; flex-direction:column; gap:4px">
-          <div class="subtitle">&nbsp;</div>
-          <button id="resetFilters" class="tag" style="background: transparent; cursor:pointer">Reset</button>
-        </div>
-      </div>
-      <div class="subtitle" id="tableStats"></div>
-      <div id="table"></div>
-    </div>
-  </div>
-
-  <script>
-    const DATA = {safe};
-    let SORT_COL = null;
-    let SORT_DIR = -1;
-
-    function num(x) {{
-      const n = Number(x);
-      return Number.isFinite(n) ? n : null;
-    }}
-    function numOrNullFromInput(id) {{
-      const el = document.getElementById(id);
-      if (!el) return null;
-      const raw = String(el.value ?? '').trim();
-      if (raw === '') return null;
-      const n = Number(raw);
-      return Number.isFinite(n) ? n : null;
-    }}
-    function fmt(x, digits=2) {{
-      if (x === null || x === undefined || Number.isNaN(x)) return '-';
-      const n = Number(x);
-      return n.toLocaleString(undefined, {{ maximumFractionDigits: digits, minimumFractionDigits: digits }});
-    }}
-    function escapeHtml(s) {{
-      return String(s)
-        .replaceAll('&','&amp;')
-        .replaceAll('<','&lt;')
-        .replaceAll('>','&gt;')
-        .replaceAll('\"','&quot;')
-        .replaceAll(\"'\",'&#039;');
-    }}
-
-    function kpi(label, value, tip) {{
-      return {{ label, value, tip }};
-    }}
-
-    function addKpis(items) {{
-      const root = document.getElementById('kpis');
-      root.innerHTML = '';
-      for (const it of items) {{
-        const div = document.createElement('div');
-        div.className = 'item';
-        const label = document.createElement('div');
-        label.className = 'label';
-        label.textContent = it.label;
-        if (it.tip) label.title = it.tip;
-        const value = document.createElement('div');
-        value.className = 'value';
-        value.textContent = it.value;
-        div.appendChild(label);
-        div.appendChild(value);
-        root.appendChild(div);
-      }}
-    }}
-
-    function rows() {{
-      return (DATA.scenarios || []).map(r => {{
-        const m = r.metrics || {{}};
-        const c = r.costs || {{}};
-        return {{
-          id: r.scenario?.id || r.id || '',
-          label: r.scenario?.label || r.label || '',
-          spread_mult: r.scenario?.spread_mult ?? 1.0,
-          slippage_pips: r.scenario?.slippage_pips ?? 0.0,
-          commission_mult: r.scenario?.commission_mult ?? 1.0,
-          roi_pct: m.roi_pct ?? null,
-          profit_factor: m.profit_factor ?? null,
-          total_net_profit: m.total_net_profit ?? null,
-          max_drawdown_pct: m.max_drawdown_pct ?? null,
-          stress_cost: (c.extra_spread_cost||0) + (c.extra_slippage_cost||0) + (c.extra_commission_cost||0) + (c.extra_swap_cost||0),
-          c: c,
-          delta: r.delta || {{}},
-          gates: r.gates || {{}},
-        }};
-      }});
-    }}
-
-    function applyFilters(list) {{
-      const minPf = numOrNullFromInput('fMinPf');
-      const minRoi = numOrNullFromInput('fMinRoi');
-      const maxDd = numOrNullFromInput('fMaxDd');
-      return list.filter(r => {{
-        if (minPf !== null && num(r.profit_factor) !== null && r.profit_factor < minPf) return false;
-        if (minRoi !== null && num(r.roi_pct) !== null && r.roi_pct < minRoi) return false;
-        if (maxDd !== null && num(r.max_drawdown_pct) !== null && r.max_drawdown_pct > maxDd) return false;
-        return true;
-      }});
-    }}
-
-    function sortRows(list) {{
-      const mode = document.getElementById('sortSelect')?.value || 'pf_desc';
-      if (mode === 'custom' && SORT_COL) {{
-        const col = SORT_COL;
-        const dir = SORT_DIR;
-        return [...list].sort((a,b) => {{
-          const av = a[col]; const bv = b[col];
-          const an = num(av); const bn = num(bv);
-          if (an !== null && bn !== null) return (an - bn) * dir;
-          return String(av).localeCompare(String(bv)) * dir;
-        }});
-      }}
-
-      const cmp = {{
-        pf_desc: (a,b) => (num(b.profit_factor)||-1e9) - (num(a.profit_factor)||-1e9),
-        roi_desc: (a,b) => (num(b.roi_pct)||-1e9) - (num(a.roi_pct)||-1e9),
-        profit_desc: (a,b) => (num(b.total_net_profit)||-1e9) - (num(a.total_net_profit)||-1e9),
-        dd_asc: (a,b) => (num(a.max_drawdown_pct)||1e9) - (num(b.max_drawdown_pct)||1e9),
-        cost_asc: (a,b) => (num(a.stress_cost)||1e9) - (num(b.stress_cost)||1e9),
-      }}[mode] || null;
-      return cmp ? [...list].sort(cmp) : list;
-    }}
-
-    function th(colId, label, tip, sortable=true) {{
-      const cls = sortable ? ' class=\"sortable\"' : '';
-      const data = sortable ? ` data-col=\"${{colId}}\"` : '';
-      const active = SORT_COL === colId;
-      const arrow = active ? (SORT_DIR < 0 ? '↓' : '↑') : '';
-      const indicator = sortable ? `<span class=\"sort-indicator\">${{arrow}}</span>` : '';
-      const title = tip ? ` title=\"${{escapeHtml(tip)}}\"` : '';
-      return `<th${{cls}}${{data}}${{title}}>${{label}}${{indicator}}</th>`;
-    }}
-
-    function renderTable(list) {{
-      const cols = [
-        {{ id:'label', label:'Scenario', tip:'Stress scenario label and assumptions.', align:'left' }},
-        {{ id:'profit_factor', label:'PF', tip:'Profit Factor under this scenario.' }},
-        {{ id:'roi_pct', label:'ROI%', tip:'(Net Profit / Initial Deposit) × 100.' }},
-        {{ id:'total_net_profit', label:'Net Profit', tip:'Total net profit under this scenario.' }},
-        {{ id:'max_drawdown_pct', label:'Max DD%', tip:'Max drawdown percentage under this scenario.' }},
-        {{ id:'stress_cost', label:'Stress Cost', tip:'Total additional modeled cost vs baseline.' }},
-        {{ id:'g_pf_13', label:'PF≥1.3', tip:'Soft gate (user request: 1.5 not a hard fail).' }},
-        {{ id:'g_pf_15', label:'PF≥1.5', tip:'Default gate from settings.py.' }},
-      ];
-
-      const header = `<tr>${{
-        cols.map(c => th(c.id, c.label, c.tip, !['g_pf_13','g_pf_15'].includes(c.id))).join('')
-      }}</tr>`;
-
-      const body = list.map(r => {{
-        const g13 = r.gates?.pf_ge_1_3 ? 'YES' : 'NO';
-        const g15 = r.gates?.pf_ge_1_5 ? 'YES' : 'NO';
-        const g13cls = r.gates?.pf_ge_1_3 ? 'ok' : 'bad';
-        const g15cls = r.gates?.pf_ge_1_5 ? 'ok' : 'warn';
-        return `<tr>
-          <td style="text-align:left">${{escapeHtml(r.label)}}</td>
-          <td>${{fmt(r.profit_factor, 2)}}</td>
-          <td>${{fmt(r.roi_pct, 2)}}</td>
-          <td>${{fmt(r.total_net_profit, 2)}}</td>
-          <td>${{fmt(r.max_drawdown_pct, 2)}}</td>
-          <td>${{fmt(r.stress_cost, 2)}}</td>
-          <td class="${{g13cls}}">${{g13}}</td>
-          <td class="${{g15cls}}">${{g15}}</td>
-        </tr>`;
-      }}).join('');
-
-      document.getElementById('table').innerHTML = `
-        <div class="scroll">
-          <table>
-            <thead>${{header}}</thead>
-            <tbody>${{body}}</tbody>
-          </table>
-        </div>
-      `;
-
-      document.querySelectorAll('th.sortable').forEach(el => {{
-        el.addEventListener('click', () => {{
-          const col = el.getAttribute('data-col');
-          if (!col) return;
-          if (SORT_COL === col) SORT_DIR = -SORT_DIR;
-          else {{ SORT_COL = col; SORT_DIR = -1; }}
-          document.getElementById('sortSelect').value = 'custom';
-          render();
-        }});
-      }});
-    }}
-
-    function render() {{
-      const all = rows();
-      const filtered = applyFilters(all);
-      const sorted = sortRows(filtered);
-      const stats = document.getElementById('tableStats');
-      stats.textContent = `Showing ${{sorted.length}} / ${{all.length}} scenarios`;
-      renderTable(sorted);
-    }}
-
-    function init() {{
-      const base = DATA.baseline || {{}};
-      const bm = base.metrics || {{}};
-      const q = DATA.quality || {{}};
-      const a = DATA.assumptions || {{}};
-      addKpis([
-        kpi('Baseline PF', fmt(bm.profit_factor,2), 'Profit factor from the original backtest (no extra stress).'),
-        kpi('Baseline ROI%', fmt(bm.roi_pct,2), 'ROI% from the original backtest.'),
-        kpi('Baseline DD%', fmt(bm.max_drawdown_pct,2), 'Max DD% from the original backtest.'),
-        kpi('Assumed Baseline Spread (pips)', fmt(a.baseline_spread_pips,2), 'Used for spread multipliers in this stress suite.'),
-        kpi('History Quality', String(q.history_quality ?? '-'), 'From MT5 report (history quality).'),
-        kpi('Bars / Ticks', `${{q.bars ?? '-'}} / ${{q.ticks ?? '-'}}`, 'From MT5 report (bars and ticks).'),
-      ]);
-
-      document.getElementById('resetFilters').addEventListener('click', () => {{
-        document.getElementById('fMinPf').value = '';
-        document.getElementById('fMinRoi').value = '';
-        document.getElementById('fMaxDd').value = '';
-        document.getElementById('sortSelect').value = 'pf_desc';
-        SORT_COL = null; SORT_DIR = -1;
-        render();
-      }});
-
-      ['fMinPf','fMinRoi','fMaxDd','sortSelect'].forEach(id => {{
-        const el = document.getElementById(id);
-        if (!el) return;
-        el.addEventListener('input', render);
-        el.addEventListener('change', render);
-      }});
-
-      render();
-    }}
-
-    init();
-  </script>
-</body>
-</html>
-"""
+def _render_html(data: Dict[str, Any], out_dir: Path) -> str:
+    return render_page(
+        "execution_stress",
+        out_dir,
+        ea_name=data.get("ea_name", ""),
+        symbol=data.get("symbol", ""),
+        source_report_name=Path(str(data.get("source_report", ""))).name,
+        generated_at=data.get("generated_at", ""),
+        data_json=json.dumps(data).replace("</", "<\\/"),
+    )
 
 
 def main() -> None:
@@ -586,7 +264,7 @@ def main() -> None:
 
         (out_dir / "data.json").write_text(json.dumps(data, indent=2), encoding="utf-8")
         index_path = out_dir / "index.html"
-        index_path.write_text(_render_html(data), encoding="utf-8")
+        index_path.write_text(_render_html(data, index_path.parent), encoding="utf-8")
 
         complete_post_step(
             state_path,
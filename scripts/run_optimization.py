@@ -14,7 +14,15 @@ from pathlib import Path
 from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import MT5_TERMINAL, MT5_DATA_PATH, RUNS_DIR
+from config import MT5_TERMINAL, MT5_DATA_PATH, MT5_TESTER_AGENTS_PATH, RUNS_DIR
+from optimizer.pass_archive import export_merged, merge_optimization
+from optimizer.search_planner import record_optimization_timing
+from tester.async_runner import kill_process_tree
+from tester.opt_stream import LiveOptimization, progress_path_for
+from tester.opt_watcher import MAX_WAIT_SECONDS, ChangeWatcher, FileSettle
+
+# How long outputs may take to appear after the terminal exits
+EXIT_GRACE_SECONDS = 5.0
 
 
 def find_latest_optimization_result(ea_name: str) -> Path | None:
@@ -32,13 +40,6 @@ def find_latest_optimization_result(ea_name: str) -> Path | None:
     return max(opt_files, key=lambda p: p.stat().st_mtime)
 
 
-def _recent_mtime(path: Path, start_time: float, grace_seconds: int = 30) -> bool:
-    try:
-        return path.exists() and path.stat().st_mtime >= (start_time - grace_seconds)
-    except OSError:
-        return False
-
-
 def _copy_outputs_to_runs(paths: list[Path]) -> list[str]:
     copied: list[str] = []
     RUNS_DIR.mkdir(parents=True, exist_ok=True)
@@ -56,14 +57,36 @@ def _copy_outputs_to_runs(paths: list[Path]) -> list[str]:
     return copied
 
 
-def wait_for_optimization(process: subprocess.Popen, ea_name: str, report_name: str, timeout: int, poll_interval: int = 30) -> dict:
+def _list_reports(dirs: list[Path], report_base: str) -> set[Path]:
+    found: set[Path] = set()
+    for d in dirs:
+        if d.exists():
+            found |= set(d.glob(f"*{report_base}*.htm*"))
+            found |= set(d.glob(f"*{report_base}*.html*"))
+    return found
+
+
+def wait_for_optimization(
+    process: subprocess.Popen,
+    ea_name: str,
+    report_name: str,
+    timeout: int,
+    progress_interval: int = 30,
+    progress_path: Path | None = None,
+) -> dict:
     """
     Wait for optimization to complete.
 
     Monitors for:
     - Terminal process exit
-    - Report file creation
+    - Report file creation (complete and size-stable)
     - Timeout
+
+    Wakes on folder changes (inotify / Windows change notifications, else fast
+    polling) instead of sleeping between checks, so finished exports are seen
+    within ~100 ms. Passes are streamed from the tester logs into a live
+    progress file (top-K + convergence curve); creating its .abort file stops
+    the run early.
     """
     start_time = time.time()
     tester_path = MT5_DATA_PATH / "Tester"
@@ -84,85 +107,97 @@ def wait_for_optimization(process: subprocess.Popen, ea_name: str, report_name:
         tester_path / "reports" / f"{report_base}.html",
     ]
 
-    initial_reports = set()
-    for d in (tester_path, tester_path / "reports"):
-        if d.exists():
-            initial_reports |= set(d.glob(f"*{report_base}*.htm*"))
-            initial_reports |= set(d.glob(f"*{report_base}*.html*"))
-
-    while True:
-        elapsed = time.time() - start_time
+    report_dirs = [tester_path, tester_path / "reports"]
+    initial_reports = _list_reports(report_dirs, report_base)
+    current_reports = initial_reports
 
-        if elapsed > timeout:
-            return {
-                "success": False,
-                "error": f"Optimization timed out after {timeout}s",
-                "elapsed": int(elapsed)
-            }
+    settle = FileSettle(since=start_time)
+    live = LiveOptimization(
+        tester_path,
+        progress_path or progress_path_for(report_base),
+        agents_path=MT5_TESTER_AGENTS_PATH,
+        label=report_base,
+    )
+    progress = live.tail.progress
+    print(f"Live progress: {live.progress_path} (create {live.abort_path.name} next to it to abort)", flush=True)
+    exited_at: float | None = None
+    last_scan = last_print = start_time
+    last_log = 0.0
+    changed = True
+
+    def done(**kwargs) -> dict:
+        live.finish("done")
+        return {
+            "success": True,
+            "elapsed": int(time.time() - start_time),
+            "passes_done": progress.passes_done,
+            "progress_path": str(live.progress_path),
+            **kwargs,
+        }
 
-        # Prefer XML outputs (optimization result exports).
-        if _recent_mtime(xml_insample, start_time) and _recent_mtime(xml_forward, start_time):
-            copied = _copy_outputs_to_runs([xml_insample, xml_forward])
-            return {
-                "success": True,
-                "elapsed": int(elapsed),
-                "xml_insample": str(xml_insample),
-                "xml_forward": str(xml_forward),
-                "copied_to_runs": copied,
-            }
+    def failed(status: str, error: str) -> dict:
+        live.finish(status)
+        return {
+            "success": False,
+            "error": error,
+            "elapsed": int(time.time() - start_time),
+            "passes_done": progress.passes_done,
+            "progress_path": str(live.progress_path),
+            "top": [r.to_dict() for r in live.top()],
+        }
 
-        # Fallback: detect HTML report creation.
-        current_reports = set()
-        for d in (tester_path, tester_path / "reports"):
-            if d.exists():
-                current_reports |= set(d.glob(f"*{report_base}*.htm*"))
-                current_reports |= set(d.glob(f"*{report_base}*.html*"))
-        new_reports = current_reports - initial_reports
-
-        if new_reports:
-            report = max(new_reports, key=lambda p: p.stat().st_mtime)
-            copied = _copy_outputs_to_runs([report])
-            return {
-                "success": True,
-                "report_path": str(report),
-                "elapsed": int(elapsed),
-                "copied_to_runs": copied,
-            }
+    with ChangeWatcher([MT5_DATA_PATH, *report_dirs]) as watcher:
+        while True:
+            now = time.time()
+            elapsed = now - start_time
 
-        # Check the process we launched (do not rely on global terminal64.exe presence;
-        # users may have other MT5 instances open).
-        if process.poll() is not None:
-            time.sleep(5)
-            elapsed = time.time() - start_time
+            if elapsed > timeout:
+                return failed("timeout", f"Optimization timed out after {timeout}s")
 
-            if _recent_mtime(xml_insample, start_time) and _recent_mtime(xml_forward, start_time):
+            # Prefer XML outputs (optimization result exports).
+            insample_ready = settle.ready(xml_insample)
+            forward_ready = settle.ready(xml_forward)
+            if insample_ready and forward_ready:
                 copied = _copy_outputs_to_runs([xml_insample, xml_forward])
-                return {
-                    "success": True,
-                    "elapsed": int(elapsed),
-                    "xml_insample": str(xml_insample),
-                    "xml_forward": str(xml_forward),
-                    "copied_to_runs": copied,
-                }
-
-            for cand in html_candidates:
-                if _recent_mtime(cand, start_time):
-                    copied = _copy_outputs_to_runs([cand])
-                    return {
-                        "success": True,
-                        "report_path": str(cand),
-                        "elapsed": int(elapsed),
-                        "copied_to_runs": copied,
-                    }
-
-            return {
-                "success": False,
-                "error": "MT5 closed without generating report",
-                "elapsed": int(elapsed),
-            }
-
-        print(f"Optimization running... {int(elapsed)}s elapsed", flush=True)
-        time.sleep(poll_interval)
+                return done(xml_insample=str(xml_insample), xml_forward=str(xml_forward), copied_to_runs=copied)
+
+            # Fallback: detect HTML report creation. Only re-glob when a folder
+            # changed (or once a second without change notifications).
+            if changed or (watcher.backend == "poll" and now - last_scan >= 1.0):
+                current_reports = _list_reports(report_dirs, report_base)
+                last_scan = now
+            new_reports = [r for r in current_reports - initial_reports if settle.ready(r)]
+            if new_reports:
+                report = max(new_reports, key=lambda p: p.stat().st_mtime)
+                copied = _copy_outputs_to_runs([report])
+                return done(report_path=str(report), copied_to_runs=copied)
+
+            # Check the process we launched (do not rely on global terminal64.exe presence;
+            # users may have other MT5 instances open).
+            if exited_at is None and process.poll() is not None:
+                exited_at = now
+            if exited_at is not None:
+                for cand in html_candidates:
+                    if settle.ready(cand):
+                        copied = _copy_outputs_to_runs([cand])
+                        return done(report_path=str(cand), copied_to_runs=copied)
+                if now - exited_at > EXIT_GRACE_SECONDS:
+                    return failed("failed", "MT5 closed without generating report")
+
+            if now - last_log >= 0.5:
+                live.poll()
+                last_log = now
+                if live.abort_requested() and exited_at is None:
+                    kill_process_tree(process.pid)
+                    return failed("aborted", "Optimization aborted")
+            if now - last_print >= progress_interval:
+                line = f"Optimization running... {int(elapsed)}s elapsed, {progress.passes_done} passes done"
+                if live.best is not None:
+                    line += f", best result {live.best.result:g} (pass {live.best.pass_id})"
+                print(line, flush=True)
+                last_print = now
+
+            changed = watcher.wait(MAX_WAIT_SECONDS)
 
 
 def save_optimization_results(ea_name: str, symbol: str) -> dict:
@@ -252,7 +287,7 @@ def run_optimization(ini_path: Path, timeout: int = 3600, wait: bool = True) ->
         result = wait_for_optimization(process, ea_name, report_name, timeout)
 
         if result["success"]:
-            print(f"Optimization complete in {result['elapsed']}s")
+            print(f"Optimization complete in {result['elapsed']}s ({result.get('passes_done', 0)} passes seen in tester logs)")
             if "report_path" in result:
                 print(f"Report: {result['report_path']}")
             if "xml_insample" in result and "xml_forward" in result:
@@ -261,11 +296,34 @@ def run_optimization(ini_path: Path, timeout: int = 3600, wait: bool = True) ->
             if result.get("copied_to_runs"):
                 print(f"Copied to runs/: {result['copied_to_runs']}")
 
+            # Feed the Step 6 planner's per-pass cost estimate
+            timing = record_optimization_timing(ini_path, result["elapsed"], int(result.get("passes_done") or 0))
+            if timing:
+                result["seconds_per_pass"] = timing["seconds_per_pass"]
+
             # Save XML files with symbol-specific names
             if symbol:
                 saved = save_optimization_results(ea_name, symbol)
                 print(f"Saved optimization results: {saved['saved']}")
                 result["saved_xml"] = saved["saved"]
+
+            # Merge into the cross-run pass archive. If Step 6 trimmed ranges the
+            # archive already covered, the merged archive stands in for this run's XML.
+            if "xml_insample" in result and "xml_forward" in result:
+                try:
+                    archived = merge_optimization(ini_path, Path(result["xml_insample"]), Path(result["xml_forward"]))
+                    cov = archived["coverage"]
+                    print(f"Pass archive: +{archived['added']} new, {archived['repeated']} repeated, "
+                          f"{archived['total']} total ({cov['coverage_pct']}% of grid)")
+                    if archived["trimmed"]:
+                        base = f"{ea_name}_{symbol}_OPT" if symbol else (report_name or f"{ea_name}_OPT")
+                        archived["exported"] = export_merged(
+                            ini_path, MT5_DATA_PATH / f"{base}.xml", MT5_DATA_PATH / f"{base}.forward.xml"
+                        )
+                        print(f"Merged archive written to {base}.xml ({archived['exported']} passes)")
+                    result["archive"] = archived
+                except (OSError, ValueError) as e:
+                    result["archive"] = {"error": str(e)}
         else:
             print(f"Optimization failed: {result['error']}")
 
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Run a parameter stability / sensitivity check from the optimization passes (offline).
+
+This is an OPTIONAL module (post-Step-11).
+It does not re-run MT5: every pass MT5 already ran is placed in a scaled
+parameter space and each robust pass is scored by its neighborhood
+(optimizer/plateau.py). Broad plateaus rank above knife-edge peaks.
+
+Usage:
+  python scripts/run_param_sensitivity.py --state runs/workflow_EA_*.json --open
+  python scripts/run_param_sensitivity.py --ea EA_Name --symbol EURUSD --radius 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import DEFAULT_SYMBOL, MT5_DATA_PATH, RUNS_DIR
+from optimizer.plateau import (
+    DEFAULT_MAX_NEIGHBORS,
+    DEFAULT_MIN_NEIGHBORS,
+    DEFAULT_RADIUS,
+    STD_PENALTY,
+    parameter_slices,
+    score_plateaus,
+)
+from optimizer.result_parser import OptimizationResultParser
+from reports.assets import render_page
+from workflow.post_steps import complete_post_step, fail_post_step, start_post_step
+
+
+def _find_latest_workflow_state(ea_name: str) -> Optional[Path]:
+    candidates = sorted(RUNS_DIR.glob(f"workflow_{ea_name}_*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return candidates[0] if candidates else None
+
+
+def _load_state(state_path: Path) -> Dict[str, Any]:
+    with open(state_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _step8_best_pass(state: Optional[Dict[str, Any]]) -> Optional[int]:
+    steps = (state or {}).get("steps", {}) or {}
+    out = (steps.get("8_parse_results") or {}).get("output", {}) or {}
+    try:
+        return int(out["best_pass"]) if out.get("best_pass") is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _render_html(data: Dict[str, Any], out_dir: Path) -> str:
+    return render_page(
+        "param_sensitivity",
+        out_dir,
+        ea_name=data.get("ea_name", ""),
+        symbol=data.get("symbol", ""),
+        radius=data.get("radius", ""),
+        generated_at=data.get("generated_at", ""),
+        std_penalty=STD_PENALTY,
+        data_json=json.dumps(data).replace("</", "<\\/"),
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Rank optimization passes by neighborhood plateau robustness (offline)")
+    ap.add_argument("--state", type=str, help="Path to runs/workflow_*.json")
+    ap.add_argument("--ea", type=str, help="EA name (uses latest workflow state in runs/)")
+    ap.add_argument("--symbol", type=str, help="Symbol (default: from state)")
+    ap.add_argument("--radius", type=float, default=DEFAULT_RADIUS, help=f"Neighborhood radius in scaled parameter space (default: {DEFAULT_RADIUS})")
+    ap.add_argument("--min-neighbors", type=int, default=DEFAULT_MIN_NEIGHBORS, help=f"Neighbors needed for a score (default: {DEFAULT_MIN_NEIGHBORS})")
+    ap.add_argument("--max-neighbors", type=int, default=DEFAULT_MAX_NEIGHBORS, help=f"Shrink the radius on dense grids to about this many neighbors, 0 = off (default: {DEFAULT_MAX_NEIGHBORS})")
+    ap.add_argument("--top", type=int, default=200, help="Ranked passes kept in the report (default: 200)")
+    ap.add_argument("--out", type=str, help="Output directory (default: runs/sensitivity/{EA}_YYYYMMDD_HHMMSS)")
+    ap.add_argument("--open", action="store_true", help="Open the HTML report in your browser")
+    args = ap.parse_args()
+
+    state_path: Optional[Path] = Path(args.state) if args.state else None
+    if state_path and not state_path.exists():
+        raise SystemExit(f"State file not found: {state_path}")
+
+    state: Optional[Dict[str, Any]] = None
+    if state_path:
+        state = _load_state(state_path)
+    elif args.ea:
+        state_path = _find_latest_workflow_state(args.ea)
+        if state_path:
+            state = _load_state(state_path)
+
+    ea_name = (state or {}).get("ea_name") or args.ea
+    if not ea_name:
+        raise SystemExit("Provide --state or --ea")
+    symbol = args.symbol or (state or {}).get("symbol") or DEFAULT_SYMBOL
+
+    ts = time.strftime("%Y%m%d_%H%M%S")
+    out_dir = Path(args.out) if args.out else (RUNS_DIR / "sensitivity" / f"{ea_name}_{ts}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    post_id = start_post_step(state_path, "param_sensitivity", meta={"out_dir": str(out_dir), "radius": args.radius})
+
+    try:
+        parser = OptimizationResultParser(ea_name, MT5_DATA_PATH, symbol=symbol)
+        if not parser.insample_xml.exists() or not parser.forward_xml.exists():
+            raise RuntimeError(f"Optimization XML not found: {parser.insample_xml}")
+
+        t0 = time.time()
+        passes = parser.join_passes()
+        scores, names = score_plateaus(
+            passes, radius=args.radius, min_neighbors=args.min_neighbors, max_neighbors=args.max_neighbors or None
+        )
+        seconds = time.time() - t0
+        if not scores:
+            raise RuntimeError("No robust passes to score")
+
+        step8_pass = _step8_best_pass(state)
+        step8_best = next((s for s in scores if s.pass_num == step8_pass), None)
+
+        data = {
+            "ea_name": ea_name,
+            "symbol": symbol,
+            "generated_at": ts,
+            "source_xml": [str(parser.insample_xml), str(parser.forward_xml)],
+            "radius": args.radius,
+            "min_neighbors": args.min_neighbors,
+            "std_penalty": STD_PENALTY,
+            "parameters": names,
+            "total_passes": len(passes),
+            "robust_passes": len(scores),
+            "seconds": round(seconds, 3),
+            "step8_best": step8_best.to_dict() if step8_best else None,
+            "ranking": [s.to_dict() for s in scores[: max(1, int(args.top))]],
+            "slices": parameter_slices(passes, scores[0].pass_num),
+        }
+
+        (out_dir / "data.json").write_text(json.dumps(data, indent=2), encoding="utf-8")
+        (out_dir / "plateau_best_params.json").write_text(json.dumps(scores[0].parameters, indent=2), encoding="utf-8")
+        index_path = out_dir / "index.html"
+        index_path.write_text(_render_html(data, index_path.parent), encoding="utf-8")
+
+        complete_post_step(
+            state_path,
+            post_id,
+            output={
+                "out_dir": str(out_dir),
+                "index": str(index_path),
+                "data_json": str(out_dir / "data.json"),
+                "plateau_best_pass": scores[0].pass_num,
+                "plateau_best_peak_rank": scores[0].peak_rank,
+                "plateau_best_params": str(out_dir / "plateau_best_params.json"),
+                "step8_plateau_rank": step8_best.plateau_rank if step8_best else None,
+            },
+        )
+
+        if args.open:
+            import subprocess
+
+            try:
+                subprocess.Popen(["cmd", "/c", "start", str(index_path.resolve())], shell=False)
+            except Exception:
+                pass
+
+        print(
+            json.dumps(
+                {
+                    "success": True,
+                    "ea_name": ea_name,
+                    "state_file": str(state_path) if state_path else None,
+                    "passes": len(passes),
+                    "robust_passes": len(scores),
+                    "seconds": round(seconds, 3),
+                    "plateau_best_pass": scores[0].pass_num,
+                    "out_dir": str(out_dir),
+                    "index": str(index_path),
+                },
+                indent=2,
+            )
+        )
+
+    except Exception as e:
+        fail_post_step(state_path, post_id, error=str(e), output={"out_dir": str(out_dir)})
+        raise
+
+
+if __name__ == "__main__":
+    main()
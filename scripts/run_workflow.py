@@ -157,7 +157,14 @@ def _args() -> argparse.Namespace:
     ap.add_argument("--no-safety", action="store_true", help="Do not inject safety guards")
     ap.add_argument("--no-opt", action="store_true", help="Stop after validation backtest (skip optimization+report)")
     ap.add_argument("--passes", type=int, default=20, help="Dashboard passes (default: 20)")
+    ap.add_argument(
+        "--pass-select",
+        choices=["profit", "pareto", "surrogate"],
+        default="profit",
+        help="Dashboard pass selection: top total profit, diverse Pareto front, or surrogate-predicted robustness (default: profit)",
+    )
     ap.add_argument("--optimization-timeout", type=int, default=3600, help="Optimization timeout seconds (default: 3600)")
+    ap.add_argument("--optimization-budget", type=float, help="Optimization wall-clock budget in minutes (default: settings.py)")
     ap.add_argument("--backtest-timeout", type=int, default=600, help="Backtest timeout seconds (default: 600)")
     return ap.parse_args()
 
@@ -184,8 +191,10 @@ def main() -> None:
     options.setdefault("inject_ontester", not bool(args.no_ontester))
     options.setdefault("inject_safety", not bool(args.no_safety))
     options.setdefault("passes", int(cfg.get("passes") or args.passes))
+    options.setdefault("pass_select", cfg.get("pass_select") or args.pass_select)
     options.setdefault("optimization_timeout", int(cfg.get("optimization_timeout") or args.optimization_timeout))
     options.setdefault("backtest_timeout", int(cfg.get("backtest_timeout") or args.backtest_timeout))
+    options.setdefault("optimization_budget_minutes", cfg.get("optimization_budget_minutes") or args.optimization_budget)
 
     enabled = _enabled_steps_from_options(options)
     last_step = _last_step(enabled)
@@ -344,6 +353,7 @@ def main() -> None:
             symbol=symbol,
             timeframe=timeframe,
             criterion=criterion,
+            time_budget_minutes=options.get("optimization_budget_minutes"),
         )
         if not ini_res.get("success"):
             manager.fail_step("6_create_opt_ini", ini_res.get("error") or "INI creation failed", output=ini_res)
@@ -354,6 +364,21 @@ def main() -> None:
         # Preserve useful context if present
         if "settings" in ini_res:
             out.update(ini_res["settings"])
+        plan = ini_res.get("plan") or {}
+        out["estimated_combinations"] = ini_res.get("estimated_combinations")
+        out["predicted_minutes"] = plan.get("predicted_minutes")
+        out["plan"] = plan
+        out["archive"] = ini_res.get("archive")
+        print(
+            f"[workflow] opt plan: {plan.get('grid_size')} combinations, {plan.get('predicted_passes')} passes, "
+            f"~{plan.get('predicted_minutes')} min ({plan.get('timing_source')})"
+        )
+        archive = ini_res.get("archive") or {}
+        if archive.get("covered"):
+            print(
+                f"[workflow] pass archive: {archive.get('covered')} of the grid already evaluated "
+                f"({archive.get('coverage_pct')}%){', ranges trimmed' if archive.get('trimmed') else ''}"
+            )
         manager.complete_step("6_create_opt_ini", out)
 
     # Step 7: run optimization
@@ -404,6 +429,8 @@ def main() -> None:
             "forward_profit": (best.get("forward") or {}).get("profit"),
             "total_profit": best.get("total_profit"),
             "params_file": str(best_params_path),
+            "pareto_front_size": (parsed.get("pareto") or {}).get("front_size"),
+            "pareto_front": (parsed.get("pareto") or {}).get("front"),
         }
         manager.complete_step("8_parse_results", out)
 
@@ -472,6 +499,8 @@ def main() -> None:
                 str(state_path),
                 "--passes",
                 str(int(options["passes"])),
+                "--select",
+                str(options.get("pass_select") or "profit"),
             ]
         )
 
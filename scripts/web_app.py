@@ -12,33 +12,45 @@ Goals:
 from __future__ import annotations
 
 import argparse
+import codecs
+import email.utils
+import gzip
+import hashlib
+import io
 import json
 import os
-import subprocess
 import sys
 import threading
 import time
 import webbrowser
-from dataclasses import dataclass
+import zlib
+from functools import lru_cache
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 from urllib.parse import parse_qs, urlparse
 
-import psutil
-
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import (
+    ASSETS_DIR,
     DEFAULT_SYMBOL,
     DEFAULT_TIMEFRAME,
+    EXPERTS_INDEX_DIR,
     MT5_DATA_PATH,
     MT5_EXPERTS_PATH,
     MT5_TERMINAL,
+    OPT_LIVE_DIR,
     PROJECT_ROOT,
     RUNS_DIR,
+    STATE_INDEX_FILE,
 )  # type: ignore
+from tester.opt_stream import abort_path_for
+from workflow.experts_index import ExpertsIndex
+from workflow.job_queue import CPU, Job, JobQueue, mt5_resource, tail_with_offset
 from workflow.post_step_modules import POST_STEP_MODULES
+from workflow.state_index import StateIndex
+from workflow.terminal_registry import TerminalRegistry
 
 
 def _now_iso() -> str:
@@ -150,106 +162,45 @@ def _summarize_state(state: Dict[str, Any], state_path: Path) -> Dict[str, Any]:
     }
 
 
-def _list_states(limit: int = 100) -> List[Dict[str, Any]]:
-    items: List[Dict[str, Any]] = []
-    paths = sorted(RUNS_DIR.glob("workflow_*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
-    for p in paths[: max(0, int(limit))]:
-        try:
-            state = _read_json(p)
-            items.append(_summarize_state(state, p))
-        except Exception as e:
-            items.append({"path": _safe_relative_to_root(p) or str(p), "filename": p.name, "error": str(e)})
-    return items
+def _summarize_state_file(p: Path) -> Dict[str, Any]:
+    try:
+        return _summarize_state(_read_json(p), p)
+    except Exception as e:
+        return {"path": _safe_relative_to_root(p) or str(p), "filename": p.name, "error": str(e)}
 
 
-def _tail_text(path: Path, max_bytes: int = 8000) -> str:
-    try:
-        with open(path, "rb") as f:
-            f.seek(0, os.SEEK_END)
-            size = f.tell()
-            f.seek(max(0, size - max_bytes), os.SEEK_SET)
-            data = f.read()
-        return data.decode("utf-8", errors="replace")
-    except Exception:
-        return ""
+# Bump when _summarize_state's output changes (invalidates the persisted index)
+STATE_SUMMARY_VERSION = 1
+STATE_INDEX = StateIndex(RUNS_DIR, _summarize_state_file, cache_path=STATE_INDEX_FILE, summary_version=STATE_SUMMARY_VERSION)
 
 
-def _terminal_bases() -> List[Path]:
-    bases: List[Path] = []
-    appdata = os.environ.get("APPDATA")
-    localappdata = os.environ.get("LOCALAPPDATA")
-    if appdata:
-        bases.append(Path(appdata) / "MetaQuotes" / "Terminal")
-    if localappdata:
-        bases.append(Path(localappdata) / "MetaQuotes" / "Terminal")
-    return [b for b in bases if b.exists()]
+def _list_states(limit: int = 100) -> List[Dict[str, Any]]:
+    # Served from the resident index (only changed state files are re-read)
+    return STATE_INDEX.list(limit)
 
 
-def _read_origin_path(data_dir: Path) -> Optional[Path]:
-    origin = data_dir / "origin.txt"
-    if not origin.exists():
-        return None
-    try:
-        b = origin.read_bytes()
-        # Some terminals write origin.txt as UTF-16 (null bytes between chars).
-        if b"\x00" in b[:64]:
-            raw = b.decode("utf-16", errors="ignore").strip()
-        else:
-            raw = b.decode("utf-8", errors="ignore").strip()
-    except Exception:
-        return None
-    if not raw:
-        return None
-    return Path(raw)
+def _tail_text(path: Path, max_bytes: int = 8000) -> str:
+    return tail_with_offset(path, max_bytes)[0]
 
 
-def _latest_mtime_under(path: Path, glob: str) -> Optional[float]:
-    if not path.exists():
-        return None
-    latest: Optional[float] = None
+def _read_from(path: Path, offset: int, max_bytes: int) -> bytes:
     try:
-        for p in path.glob(glob):
-            try:
-                mt = p.stat().st_mtime
-            except OSError:
-                continue
-            if latest is None or mt > latest:
-                latest = mt
+        with open(path, "rb") as f:
+            f.seek(offset, os.SEEK_SET)
+            return f.read(max_bytes)
     except Exception:
-        return None
-    return latest
+        return b""
 
 
-def _running_mt5_processes() -> Dict[Path, List[int]]:
-    """
-    Map MT5 install dirs -> list of PIDs.
-
-    We use the process executable directory as the install dir (origin.txt matches this).
-    """
-    by_install: Dict[Path, List[int]] = {}
-    for proc in psutil.process_iter(["pid", "name", "exe"]):
-        try:
-            name = (proc.info.get("name") or "").lower()
-            exe = proc.info.get("exe")
-            if not exe:
-                continue
-            exe_path = Path(exe)
-            if not exe_path.exists():
-                continue
-            if "terminal64" not in name and exe_path.name.lower() not in ("terminal64.exe", "terminal.exe"):
-                continue
-            install_dir = exe_path.parent.resolve()
-            by_install.setdefault(install_dir, []).append(int(proc.info["pid"]))
-        except Exception:
-            continue
-    return by_install
+# Terminal discovery is cached and refreshed in the background (workflow/terminal_registry.py)
+TERMINALS = TerminalRegistry(MT5_DATA_PATH)
 
 
 def _discover_terminals() -> List[Dict[str, Any]]:
     """
-    Discover terminal data folders (and try to mark which ones are currently open).
+    Discovered terminal data folders (running terminals first).
 
-    Returns entries with:
+    Entries have:
       - id: terminal data folder name (hash)
       - data_path: absolute path to terminal data folder
       - experts_path: absolute path to MQL5/Experts
@@ -258,126 +209,44 @@ def _discover_terminals() -> List[Dict[str, Any]]:
       - is_running: whether a matching terminal64.exe process is running (best-effort)
       - pids: list of PIDs if running
     """
-    running = _running_mt5_processes()
-    out: List[Dict[str, Any]] = []
-
-    seen: set[str] = set()
-    for base in _terminal_bases():
-        for data_dir in base.iterdir():
-            if not data_dir.is_dir():
-                continue
-            if data_dir.name.lower() in {"common", "community", "help"}:
-                continue
-            if data_dir.name in seen:
-                continue
-            seen.add(data_dir.name)
-
-            experts = data_dir / "MQL5" / "Experts"
-            if not experts.exists():
-                continue
-
-            origin = _read_origin_path(data_dir)
-            install_dir = origin.resolve() if origin else None
-
-            pids: List[int] = []
-            if install_dir and install_dir in running:
-                pids = running[install_dir]
-
-            latest_log = _latest_mtime_under(data_dir / "logs", "*.log")
-            if latest_log is None:
-                latest_log = _latest_mtime_under(data_dir / "Tester" / "logs", "*.log")
-
-            terminal_exe = None
-            if origin:
-                cand = origin / "terminal64.exe"
-                if cand.exists():
-                    terminal_exe = str(cand)
-                else:
-                    cand2 = origin / "terminal.exe"
-                    terminal_exe = str(cand2) if cand2.exists() else str(cand)
-
-            out.append(
-                {
-                    "id": data_dir.name,
-                    "data_path": str(data_dir),
-                    "experts_path": str(experts),
-                    "origin_path": str(origin) if origin else None,
-                    "terminal_exe": terminal_exe,
-                    "is_running": bool(pids),
-                    "pids": pids,
-                    "latest_log_mtime": latest_log,
-                    "is_default": data_dir.resolve() == MT5_DATA_PATH.resolve(),
-                }
-            )
-
-    out.sort(key=lambda d: (not bool(d.get("is_running")), not bool(d.get("is_default")), str(d.get("id"))))
-    return out
+    return TERMINALS.list()
 
 
 def _resolve_terminal_by_id(terminal_id: str) -> Optional[Dict[str, Any]]:
-    tid = (terminal_id or "").strip()
-    if not tid:
-        return None
-    for t in _discover_terminals():
-        if t.get("id") == tid:
-            return t
-    return None
+    return TERMINALS.get(terminal_id)
 
 
-def _list_eas_in_experts(experts_path: Path, *, max_files: int = 2000) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    if not experts_path.exists():
-        return out
+_EXPERTS_LOCK = threading.Lock()
+_EXPERTS_INDEXES: Dict[str, ExpertsIndex] = {}
 
-    count = 0
-    for p in experts_path.rglob("*.mq5"):
-        if not p.is_file():
-            continue
-        try:
-            rel = p.relative_to(experts_path).as_posix()
-        except Exception:
-            rel = p.name
 
-        try:
-            st = p.stat()
-            size = int(st.st_size)
-            mtime = float(st.st_mtime)
-        except OSError:
-            size = 0
-            mtime = 0.0
+def _experts_index(terminal: Dict[str, Any]) -> ExpertsIndex:
+    """Persistent Experts index of a discovered terminal (one per terminal id)."""
+    terminal_id = str(terminal["id"])
+    experts = Path(str(terminal["experts_path"]))
+    with _EXPERTS_LOCK:
+        idx = _EXPERTS_INDEXES.get(terminal_id)
+        if idx is None or idx.experts_path != experts:
+            safe_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in terminal_id)
+            idx = ExpertsIndex(experts, cache_path=EXPERTS_INDEX_DIR / f"{safe_id}.json")
+            _EXPERTS_INDEXES[terminal_id] = idx
+        return idx
 
-        out.append(
-            {
-                "name": p.stem,
-                "rel_path": rel,
-                "abs_path": str(p),
-                "size_bytes": size,
-                "mtime": mtime,
-            }
-        )
-        count += 1
-        if count >= max_files:
-            break
-
-    out.sort(key=lambda d: (str(d.get("name") or "").lower(), str(d.get("rel_path") or "")))
-    return out
 
+# MT5-bound jobs run one at a time on the configured test terminal (workflows import
+# the EA there; backtesting post-step modules use its worker pool). Offline modules
+# (param_sensitivity only reads the optimization XML) share the cores as CPU jobs.
+MT5_JOB_RESOURCE = mt5_resource(MT5_DATA_PATH.name)
+JOB_LIST_LIMIT = 50
 
-@dataclass
-class Job:
-    id: str
-    module_id: str
-    state_path: str
-    command: List[str]
-    started_at: float
-    ended_at: Optional[float] = None
-    returncode: Optional[int] = None
-    status: str = "running"  # running|completed|failed
-    log_rel: Optional[str] = None
-
-
-_JOBS_LOCK = threading.Lock()
-_JOBS: Dict[str, Dict[str, Any]] = {}
+# module_id -> (script, resource class)
+_MODULE_JOBS: Dict[str, Tuple[str, str]] = {
+    "execution_stress": ("scripts/run_execution_stress.py", MT5_JOB_RESOURCE),
+    "walk_forward": ("scripts/run_walk_forward.py", MT5_JOB_RESOURCE),
+    "param_sensitivity": ("scripts/run_param_sensitivity.py", CPU),
+    "multipair": ("scripts/run_multipair.py", MT5_JOB_RESOURCE),
+    "timeframes": ("scripts/run_timeframes.py", MT5_JOB_RESOURCE),
+}
 
 
 def _jobs_dir() -> Path:
@@ -386,50 +255,40 @@ def _jobs_dir() -> Path:
     return d
 
 
-def _spawn_job(module_id: str, state_path: Path, extra_args: Optional[List[str]] = None) -> Job:
-    job_id = time.strftime("%Y%m%d_%H%M%S") + f"_{os.getpid()}_{int(time.time() * 1000) % 1000:03d}"
+JOBS = JobQueue(RUNS_DIR / "web_jobs" / "jobs.jsonl", cwd=PROJECT_ROOT)
 
-    scripts: Dict[str, List[str]] = {
-        "execution_stress": ["scripts/run_execution_stress.py"],
-        "walk_forward": ["scripts/run_walk_forward.py"],
-        "multipair": ["scripts/run_multipair.py"],
-        "timeframes": ["scripts/run_timeframes.py"],
-    }
-    if module_id not in scripts:
+
+def _new_job_id() -> str:
+    return time.strftime("%Y%m%d_%H%M%S") + f"_{os.getpid()}_{int(time.time() * 1000) % 1000:03d}"
+
+
+def _spawn_job(module_id: str, state_path: Path, extra_args: Optional[List[str]] = None, priority: int = 0) -> Job:
+    if module_id not in _MODULE_JOBS:
         raise ValueError(f"Unknown/unsupported module_id: {module_id}")
+    script, resource = _MODULE_JOBS[module_id]
+    job_id = _new_job_id()
 
-    cmd = [sys.executable, *scripts[module_id], "--state", str(state_path)]
+    cmd = [sys.executable, script, "--state", str(state_path)]
     if extra_args:
         cmd.extend([str(a) for a in extra_args if str(a).strip()])
 
     log_path = _jobs_dir() / f"{job_id}_{module_id}.log"
-    log_f = open(log_path, "w", encoding="utf-8", errors="replace")
-    proc = subprocess.Popen(
-        cmd,
-        cwd=str(PROJECT_ROOT),
-        stdout=log_f,
-        stderr=subprocess.STDOUT,
-        text=True,
-    )
-
-    job = Job(
-        id=job_id,
-        module_id=module_id,
-        state_path=_safe_relative_to_root(state_path) or str(state_path),
-        command=[str(c) for c in cmd],
-        started_at=time.time(),
-        status="running",
-        log_rel=_safe_relative_to_root(log_path) or str(log_path),
+    return JOBS.submit(
+        Job(
+            id=job_id,
+            module_id=module_id,
+            state_path=_safe_relative_to_root(state_path) or str(state_path),
+            command=[str(c) for c in cmd],
+            log_path=str(log_path),
+            log_rel=_safe_relative_to_root(log_path) or str(log_path),
+            resource=resource,
+            priority=int(priority),
+        )
     )
 
-    with _JOBS_LOCK:
-        _JOBS[job_id] = {"job": job, "proc": proc, "log_f": log_f, "log_path": log_path}
-
-    return job
 
-
-def _spawn_workflow_job(config: Dict[str, Any]) -> Job:
-    job_id = time.strftime("%Y%m%d_%H%M%S") + f"_{os.getpid()}_{int(time.time() * 1000) % 1000:03d}"
+def _spawn_workflow_job(config: Dict[str, Any], priority: int = 0) -> Job:
+    job_id = _new_job_id()
 
     cfg_path = _jobs_dir() / f"{job_id}_workflow.json"
     cfg_path.write_text(json.dumps(config, indent=2), encoding="utf-8")
@@ -437,69 +296,398 @@ def _spawn_workflow_job(config: Dict[str, Any]) -> Job:
     cmd = [sys.executable, "scripts/run_workflow.py", "--config", str(cfg_path)]
 
     log_path = _jobs_dir() / f"{job_id}_workflow.log"
-    log_f = open(log_path, "w", encoding="utf-8", errors="replace")
-    proc = subprocess.Popen(
-        cmd,
-        cwd=str(PROJECT_ROOT),
-        stdout=log_f,
-        stderr=subprocess.STDOUT,
-        text=True,
+    return JOBS.submit(
+        Job(
+            id=job_id,
+            module_id="workflow",
+            state_path="",
+            command=[str(c) for c in cmd],
+            log_path=str(log_path),
+            log_rel=_safe_relative_to_root(log_path) or str(log_path),
+            resource=MT5_JOB_RESOURCE,
+            priority=int(priority),
+        )
     )
 
-    job = Job(
-        id=job_id,
-        module_id="workflow",
-        state_path="",
-        command=[str(c) for c in cmd],
-        started_at=time.time(),
-        status="running",
-        log_rel=_safe_relative_to_root(log_path) or str(log_path),
-    )
 
-    with _JOBS_LOCK:
-        _JOBS[job_id] = {"job": job, "proc": proc, "log_f": log_f, "log_path": log_path, "cfg_path": cfg_path}
+def _poll_jobs() -> List[Job]:
+    return JOBS.poll(limit=JOB_LIST_LIMIT)
+
 
-    return job
+def _job_log(job_id: str) -> Tuple[Optional[Path], Optional[int], Optional[str]]:
+    """(log path, final size, final tail) of a job; size/tail are None while it runs."""
+    return JOBS.log_info(job_id)
 
 
-def _poll_jobs() -> List[Job]:
-    out: List[Job] = []
-    with _JOBS_LOCK:
-        for job_id, entry in list(_JOBS.items()):
-            job: Job = entry["job"]
-            proc: subprocess.Popen[str] = entry["proc"]
-            if job.status == "running":
-                rc = proc.poll()
-                if rc is not None:
-                    job.returncode = int(rc)
-                    job.ended_at = time.time()
-                    job.status = "completed" if rc == 0 else "failed"
-                    try:
-                        entry["log_f"].close()
-                    except Exception:
-                        pass
-            out.append(job)
-    out.sort(key=lambda j: j.started_at, reverse=True)
+def _job_payload(j: Job, log_tail: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "id": j.id,
+        "module_id": j.module_id,
+        "state_path": j.state_path,
+        "command": j.command,
+        "started_at": j.started_at,
+        "ended_at": j.ended_at,
+        "returncode": j.returncode,
+        "status": j.status,
+        "queued_at": j.queued_at,
+        "priority": j.priority,
+        "resource": j.resource,
+        "error": j.error,
+        "log_rel": j.log_rel,
+        "log_tail": log_tail,
+    }
+
+
+# /api/jobs/stream (server-sent events)
+JOB_STREAM_TICK = 0.5  # seconds between checks for job changes / new log bytes
+JOB_STREAM_HEARTBEAT = 15.0  # keep-alive comment when nothing happened
+JOB_STREAM_MAX_CHUNK = 64 * 1024  # log bytes sent per job per tick
+
+
+class _JobStream:
+    """
+    One client's view of the jobs. The first message is a snapshot (status +
+    log tail per job); after that only status changes and log bytes past the
+    offset this client already has are sent. A finished job's log is read
+    once more to drain it and then never again.
+    """
+
+    def __init__(self) -> None:
+        self.status: Dict[str, str] = {}
+        self.offsets: Dict[str, int] = {}
+        self.drained: Set[str] = set()
+        self._decoders: Dict[str, Any] = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        jobs = []
+        for j in _poll_jobs():
+            log_path, final_size, final_tail = _job_log(j.id)
+            if final_size is not None:
+                tail, offset = final_tail or "", final_size
+                self.drained.add(j.id)
+            elif log_path:
+                tail, offset = tail_with_offset(log_path)
+            else:
+                tail, offset = "", 0
+            self.status[j.id] = j.status
+            self.offsets[j.id] = offset
+            jobs.append(_job_payload(j, tail))
+        return {"jobs": jobs, "now": _now_iso()}
+
+    def changes(self) -> List[Tuple[str, Dict[str, Any]]]:
+        events: List[Tuple[str, Dict[str, Any]]] = []
+        for j in _poll_jobs():
+            if self.status.get(j.id) != j.status:
+                self.status[j.id] = j.status
+                events.append(("job", _job_payload(j)))
+            if j.id in self.drained:
+                continue
+            log_path, final_size, _ = _job_log(j.id)
+            offset = self.offsets.get(j.id, 0)
+            data = _read_from(log_path, offset, JOB_STREAM_MAX_CHUNK) if log_path else b""
+            if data:
+                self.offsets[j.id] = offset + len(data)
+                decoder = self._decoders.setdefault(j.id, codecs.getincrementaldecoder("utf-8")(errors="replace"))
+                text = decoder.decode(data, final=False)
+                if text:
+                    events.append(("log", {"id": j.id, "offset": offset, "text": text}))
+            if final_size is not None and self.offsets.get(j.id, 0) >= final_size:
+                self.drained.add(j.id)
+                self._decoders.pop(j.id, None)
+        return events
+
+
+def _live_progress_path(name: str) -> Optional[Path]:
+    """Progress file of a live optimization by report name (no path components allowed)."""
+    name = (name or "").strip()
+    if not name or name != Path(name).name or name.startswith("."):
+        return None
+    return OPT_LIVE_DIR / f"{name}.progress.json"
+
+
+def _list_live_optimizations(limit: int = 50) -> List[Dict[str, Any]]:
+    """Newest-first summaries of the progress files written by tester/opt_stream.py."""
+    if not OPT_LIVE_DIR.exists():
+        return []
+    files = sorted(OPT_LIVE_DIR.glob("*.progress.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    out: List[Dict[str, Any]] = []
+    for path in files[: max(1, limit)]:
+        try:
+            data = _read_json(path)
+        except Exception:
+            continue  # being replaced right now
+        best = data.get("best") or {}
+        out.append(
+            {
+                "name": path.name[: -len(".progress.json")],
+                "label": data.get("label"),
+                "status": data.get("status"),
+                "passes_done": data.get("passes_done"),
+                "best_result": best.get("result"),
+                "elapsed_seconds": data.get("elapsed_seconds"),
+                "updated_at": data.get("updated_at"),
+            }
+        )
     return out
 
 
+# HTTP: compression for JSON/text, ETags + 304, byte ranges for large report files
+COMPRESS_MIN_BYTES = 1024
+STATIC_COMPRESS_MAX_BYTES = 32 * 1024 * 1024  # bigger files are sent as-is (ranges still work)
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+
+def _negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """gzip or deflate if the client accepts it (q > 0), gzip preferred."""
+    accepted: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    for enc in ("gzip", "deflate"):
+        if accepted.get(enc, accepted.get("*", 0.0)) > 0:
+            return enc
+    return None
+
+
+def _compress(body: bytes, encoding: str, level: int = 6) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    return zlib.compress(body, level)
+
+
+@lru_cache(maxsize=16)
+def _compressed_file(path: str, mtime_ns: int, size: int, encoding: str) -> bytes:
+    """Compressed static file; (mtime_ns, size) are part of the key so edits miss the cache."""
+    with open(path, "rb") as f:
+        return _compress(f.read(), encoding)
+
+
+def _encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    # Strong ETags must differ per representation
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        for enc in ("gzip", "deflate"):
+            if tag == _encoded_etag(etag, enc):
+                return True
+        if tag == etag:
+            return True
+    return False
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(start, end inclusive) of a single "bytes=" range; None if unsatisfiable/unsupported."""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:  # suffix range: last N bytes
+            n = int(last)
+            return (max(0, size - n), size - 1) if n > 0 and size > 0 else None
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+# Report bundle files are content-hashed (reports/assets.py): a changed file gets a new name
+ASSETS_URL_PREFIX = "/" + ASSETS_DIR.relative_to(PROJECT_ROOT).as_posix() + "/"
+
+
 class _Handler(SimpleHTTPRequestHandler):
-    def _send_json(self, payload: Any, status: int = 200) -> None:
-        body = json.dumps(payload, indent=2).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json; charset=utf-8")
-        self.send_header("Content-Length", str(len(body)))
+    def end_headers(self) -> None:
+        if urlparse(self.path).path.startswith(ASSETS_URL_PREFIX):
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        super().end_headers()
+
+    def _send_not_modified(self, etag: str) -> None:
+        self.send_response(304)
+        self.send_header("ETag", etag)
         self.end_headers()
-        self.wfile.write(body)
 
-    def _send_text(self, text: str, status: int = 200, content_type: str = "text/plain; charset=utf-8") -> None:
-        body = (text or "").encode("utf-8", errors="replace")
+    def _send_bytes(self, body: bytes, content_type: str, status: int = 200, etag: Optional[str] = None) -> None:
+        """Send a response body, compressed when the client allows it; 304 if etag matches."""
+        if etag and status == 200 and _etag_matches(self.headers.get("If-None-Match"), etag):
+            return self._send_not_modified(etag)
+        encoding = None
+        if len(body) >= COMPRESS_MIN_BYTES:
+            encoding = _negotiate_encoding(self.headers.get("Accept-Encoding"))
+        if encoding:
+            body = _compress(body, encoding, level=5)
         self.send_response(status)
         self.send_header("Content-Type", content_type)
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if etag:
+            self.send_header("ETag", _encoded_etag(etag, encoding))
+            self.send_header("Cache-Control", "no-cache")
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
         self.wfile.write(body)
 
+    def _send_json(self, payload: Any, status: int = 200, etag: Optional[str] = None) -> None:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        if etag is None and status == 200 and self.command == "GET":
+            etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self._send_bytes(body, "application/json; charset=utf-8", status=status, etag=etag)
+
+    def _send_text(self, text: str, status: int = 200, content_type: str = "text/plain; charset=utf-8") -> None:
+        self._send_bytes((text or "").encode("utf-8", errors="replace"), content_type, status=status)
+
+    def send_head(self):  # type: ignore[override]
+        """Static files with ETag/304, single byte ranges and gzip for text types."""
+        self._range_length: Optional[int] = None
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            if not self.path.split("?", 1)[0].endswith("/") or not os.path.isfile(index):
+                return super().send_head()  # redirect / directory listing
+            path = index
+        if path.endswith("/"):
+            return super().send_head()
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return super().send_head()  # 404
+
+        try:
+            st = os.fstat(f.fileno())
+            size = st.st_size
+            etag = f'"{st.st_mtime_ns:x}-{size:x}"'
+            ctype = self.guess_type(path)
+            last_modified = self.date_time_string(st.st_mtime)
+
+            if_none_match = self.headers.get("If-None-Match")
+            if if_none_match:
+                not_modified = _etag_matches(if_none_match, etag)
+            else:
+                not_modified = self._not_modified_since(st.st_mtime)
+            if not_modified:
+                f.close()
+                self._send_not_modified(etag)
+                return None
+
+            range_header = self.headers.get("Range")
+            if_range = self.headers.get("If-Range")
+            if range_header and (not if_range or if_range.strip() in (etag, last_modified)):
+                rng = _parse_range(range_header, size)
+                if rng is None:
+                    f.close()
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return None
+                start, end = rng
+                f.seek(start)
+                self._range_length = end - start + 1
+                self.send_response(206)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                self.send_header("Content-Length", str(self._range_length))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.end_headers()
+                return f
+
+            encoding = None
+            if COMPRESS_MIN_BYTES <= size <= STATIC_COMPRESS_MAX_BYTES and ctype.startswith(COMPRESSIBLE_TYPES):
+                encoding = _negotiate_encoding(self.headers.get("Accept-Encoding"))
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("ETag", _encoded_etag(etag, encoding))
+            self.send_header("Last-Modified", last_modified)
+            if not urlparse(self.path).path.startswith(ASSETS_URL_PREFIX):
+                self.send_header("Cache-Control", "no-cache")  # revalidate: unchanged files cost a 304
+            if encoding:
+                f.close()
+                body = _compressed_file(path, st.st_mtime_ns, size, encoding)
+                self.send_header("Content-Encoding", encoding)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                return io.BytesIO(body)
+            self.send_header("Content-Length", str(size))
+            self.end_headers()
+            return f
+        except Exception:
+            f.close()
+            raise
+
+    def _not_modified_since(self, mtime: float) -> bool:
+        ims = self.headers.get("If-Modified-Since")
+        if not ims:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(ims).timestamp()
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        return int(mtime) <= since
+
+    def copyfile(self, source, outputfile) -> None:  # type: ignore[override]
+        remaining = getattr(self, "_range_length", None)
+        if remaining is None:
+            return super().copyfile(source, outputfile)
+        while remaining > 0:
+            chunk = source.read(min(64 * 1024, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+
+    def _send_event(self, event: str, payload: Any) -> None:
+        data = json.dumps(payload, separators=(",", ":"))
+        self.wfile.write(f"event: {event}\ndata: {data}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _send_job_stream(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.close_connection = True
+
+        stream = _JobStream()
+        try:
+            self._send_event("snapshot", stream.snapshot())
+            last_write = time.monotonic()
+            while True:
+                time.sleep(JOB_STREAM_TICK)
+                events = stream.changes()
+                for event, payload in events:
+                    self._send_event(event, payload)
+                if events:
+                    last_write = time.monotonic()
+                elif time.monotonic() - last_write >= JOB_STREAM_HEARTBEAT:
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+                    last_write = time.monotonic()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass  # client went away
+
     def do_GET(self) -> None:  # noqa: N802
         parsed = urlparse(self.path)
 
@@ -521,11 +709,19 @@ class _Handler(SimpleHTTPRequestHandler):
             state_path = _resolve_state_path(raw)
             if not state_path:
                 return self._send_json({"error": "Invalid state path"}, status=400)
+            try:
+                st = state_path.stat()
+            except OSError as e:
+                return self._send_json({"error": str(e)}, status=500)
+            # Keyed by the state file, so an unchanged state is answered without reading it
+            etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}-{STATE_SUMMARY_VERSION}"'
+            if _etag_matches(self.headers.get("If-None-Match"), etag):
+                return self._send_not_modified(etag)
             try:
                 state = _read_json(state_path)
             except Exception as e:
                 return self._send_json({"error": str(e)}, status=500)
-            return self._send_json({"state": state, "summary": _summarize_state(state, state_path)})
+            return self._send_json({"state": state, "summary": _summarize_state(state, state_path)}, etag=etag)
 
         if parsed.path == "/api/modules":
             mods = [
@@ -559,40 +755,54 @@ class _Handler(SimpleHTTPRequestHandler):
             t = _resolve_terminal_by_id(terminal_id)
             if not t:
                 return self._send_json({"error": "Unknown terminal_id"}, status=400)
-            experts = Path(str(t["experts_path"]))
-            return self._send_json(
-                {"terminal_id": terminal_id, "experts_path": str(experts), "eas": _list_eas_in_experts(experts)}
-            )
+            try:
+                offset = int((qs.get("offset") or ["0"])[0])
+                limit = min(1000, int((qs.get("limit") or ["200"])[0]))
+            except ValueError:
+                return self._send_json({"error": "offset/limit must be integers"}, status=400)
+            mode = str((qs.get("mode") or ["fuzzy"])[0])
+            if mode not in ("fuzzy", "prefix"):
+                return self._send_json({"error": "mode must be fuzzy or prefix"}, status=400)
+            page = _experts_index(t).search(str((qs.get("q") or [""])[0]), offset=offset, limit=limit, mode=mode)
+            return self._send_json({"terminal_id": terminal_id, "experts_path": str(t["experts_path"]), **page})
 
         if parsed.path == "/api/jobs":
             jobs = _poll_jobs()
             payload = []
             for j in jobs:
-                log_text = None
-                if j.log_rel:
-                    log_path = (PROJECT_ROOT / j.log_rel).resolve()
-                    log_text = _tail_text(log_path) if log_path.exists() else ""
-                payload.append(
-                    {
-                        "id": j.id,
-                        "module_id": j.module_id,
-                        "state_path": j.state_path,
-                        "command": j.command,
-                        "started_at": j.started_at,
-                        "ended_at": j.ended_at,
-                        "returncode": j.returncode,
-                        "status": j.status,
-                        "log_rel": j.log_rel,
-                        "log_tail": log_text,
-                    }
-                )
+                log_path, final_size, final_tail = _job_log(j.id)
+                if final_size is not None:
+                    log_text = final_tail
+                else:
+                    log_text = _tail_text(log_path) if log_path and log_path.exists() else ""
+                payload.append(_job_payload(j, log_text))
             return self._send_json({"jobs": payload, "now": _now_iso()})
 
+        if parsed.path == "/api/jobs/stream":
+            return self._send_job_stream()
+
+        if parsed.path == "/api/optimizations/live":
+            qs = parse_qs(parsed.query or "")
+            name = str((qs.get("name") or [""])[0])
+            if not name:
+                limit = int((qs.get("limit") or ["50"])[0])
+                return self._send_json({"optimizations": _list_live_optimizations(limit=limit), "now": _now_iso()})
+            progress_path = _live_progress_path(name)
+            if not progress_path:
+                return self._send_json({"error": "Invalid name"}, status=400)
+            if not progress_path.exists():
+                return self._send_json({"error": f"No live optimization: {name}"}, status=404)
+            try:
+                progress = _read_json(progress_path)
+            except Exception as e:
+                return self._send_json({"error": str(e)}, status=503)
+            return self._send_json({"name": name, "progress": progress})
+
         return super().do_GET()
 
     def do_POST(self) -> None:  # noqa: N802
         parsed = urlparse(self.path)
-        if parsed.path not in ("/api/run", "/api/workflow/run"):
+        if parsed.path not in ("/api/run", "/api/workflow/run", "/api/jobs/cancel", "/api/optimizations/abort"):
             return self._send_json({"error": "Not found"}, status=404)
 
         try:
@@ -605,6 +815,28 @@ class _Handler(SimpleHTTPRequestHandler):
         except Exception:
             return self._send_json({"error": "Invalid JSON"}, status=400)
 
+        try:
+            priority = int(payload.get("priority") or 0)
+        except (TypeError, ValueError):
+            return self._send_json({"error": "priority must be an integer"}, status=400)
+
+        if parsed.path == "/api/jobs/cancel":
+            job = JOBS.cancel(str(payload.get("id") or ""))
+            if not job:
+                return self._send_json({"error": "Unknown job id"}, status=404)
+            return self._send_json({"ok": True, "job": {"id": job.id, "status": job.status}})
+
+        if parsed.path == "/api/optimizations/abort":
+            name = str(payload.get("name") or "")
+            progress_path = _live_progress_path(name)
+            if not progress_path:
+                return self._send_json({"error": "Invalid name"}, status=400)
+            if not progress_path.exists():
+                return self._send_json({"error": f"No live optimization: {name}"}, status=404)
+            abort_path = abort_path_for(progress_path)
+            abort_path.touch()
+            return self._send_json({"ok": True, "name": name, "abort_file": str(abort_path)})
+
         if parsed.path == "/api/workflow/run":
             terminal_id = str(payload.get("terminal_id") or "").strip()
             ea_rel = str(payload.get("ea_rel_path") or "").strip().replace("\\", "/")
@@ -638,7 +870,7 @@ class _Handler(SimpleHTTPRequestHandler):
             }
 
             try:
-                job = _spawn_workflow_job(cfg)
+                job = _spawn_workflow_job(cfg, priority=priority)
             except Exception as e:
                 return self._send_json({"error": str(e)}, status=500)
 
@@ -660,7 +892,7 @@ class _Handler(SimpleHTTPRequestHandler):
             return self._send_json({"error": "extra_args must be a list"}, status=400)
 
         try:
-            job = _spawn_job(module_id=module_id, state_path=state_path, extra_args=extra_args)
+            job = _spawn_job(module_id=module_id, state_path=state_path, extra_args=extra_args, priority=priority)
         except Exception as e:
             return self._send_json({"error": str(e)}, status=500)
 
@@ -682,6 +914,10 @@ def main() -> None:
     handler = lambda *a, **kw: _Handler(*a, directory=str(PROJECT_ROOT), **kw)  # type: ignore[arg-type]
     httpd = ThreadingHTTPServer((args.host, int(args.port)), handler)
 
+    STATE_INDEX.start()
+    TERMINALS.start()
+    JOBS.start()
+
     print(f"simpleEA web app running at: {url}")
     print(f"Serving files from: {PROJECT_ROOT}")
     print(f"Workflow states: {RUNS_DIR}")
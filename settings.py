@@ -33,6 +33,14 @@ class MonteCarloSettings(BaseModel):
     confidence_min: float = Field(default=70.0, ge=50.0, le=99.0, description="Min confidence level %")
     max_ruin_probability: float = Field(default=5.0, ge=0.0, le=50.0, description="Max probability of ruin %")
     ruin_threshold_pct: float = Field(default=50.0, ge=10.0, le=100.0, description="Equity loss % considered ruin")
+    portfolio_block_days: int = Field(default=5, ge=1, le=60, description="Calendar days per block in portfolio day-block bootstrap")
+
+
+class BacktestCacheSettings(BaseModel):
+    """Backtest result cache (identical reruns skip MT5)."""
+    enabled: bool = Field(default=True, description="Serve unchanged backtests from the cache")
+    max_entries: int = Field(default=2000, ge=10, description="Max cached backtests (LRU eviction)")
+    max_size_mb: float = Field(default=2048.0, ge=10.0, description="Max cache size on disk in MB")
 
 
 class TestPairs(BaseModel):
@@ -56,6 +64,8 @@ class OptimizationSettings(BaseModel):
     out_sample_ratio: float = Field(default=0.25, ge=0.1, le=0.5, description="Out-of-sample ratio")
     genetic_population: int = Field(default=128, ge=32, le=512, description="Genetic algorithm population")
     optimization_criterion: int = Field(default=6, description="0=Balance, 6=Custom max")
+    time_budget_minutes: Optional[float] = Field(default=None, gt=0, description="Wall-clock budget for Step 6 planning (None = no limit, estimate only)")
+    skip_archived: bool = Field(default=False, description="Trim range ends already fully evaluated in the pass archive (Step 8 then reads the merged archive)")
 
 
 class FixerSettings(BaseModel):
@@ -90,6 +100,7 @@ class StressTestSettings(BaseModel):
     workers: WorkerSettings = Field(default_factory=WorkerSettings)
     thresholds: SuccessThresholds = Field(default_factory=SuccessThresholds)
     monte_carlo: MonteCarloSettings = Field(default_factory=MonteCarloSettings)
+    backtest_cache: BacktestCacheSettings = Field(default_factory=BacktestCacheSettings)
     pairs: TestPairs = Field(default_factory=TestPairs)
     optimization: OptimizationSettings = Field(default_factory=OptimizationSettings)
     fixer: FixerSettings = Field(default_factory=FixerSettings)
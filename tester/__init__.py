@@ -2,3 +2,4 @@ from .backtest import BacktestRunner, BacktestResult
 from .optimize import OptimizationRunner, OptimizationOutput, OptimizationResult
 from .forward_test import ForwardTestRunner, ForwardTestResult, calculate_date_splits
 from .ini_generator import create_backtest_ini, create_optimization_ini, create_forward_test_ini, BacktestConfig
+from .worker_pool import WorkerPool, TerminalWorker, BacktestJob, discover_workers
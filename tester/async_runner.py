@@ -0,0 +1,193 @@
+"""
+Async MT5 Terminal Execution
+
+Shared asyncio plumbing behind BacktestRunner.run_async,
+ForwardTestRunner.run_async and OptimizationRunner.run_async:
+
+- the terminal runs as an asyncio subprocess, so the event loop stays free to
+  parse, simulate or render while MT5 works;
+- an optional asyncio.Semaphore bounds how many terminals run at once, and a
+  per-install lock keeps two runs off the same terminal;
+- cancelling the awaiting task kills the terminal's whole process tree;
+- progress is reported as TerminalEvent objects through an on_event callback.
+
+Usage:
+    limit = concurrency_limit(4)
+    results = await asyncio.gather(*(
+        runner.run_async(ea, symbol=s, semaphore=limit, on_event=print) for s in symbols
+    ))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+import weakref
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import psutil
+
+
+@dataclass
+class TerminalEvent:
+    """Status update for one terminal run."""
+    kind: str  # queued, started, exited, timeout, cancelled, cached, report, done, failed
+    label: str
+    elapsed_seconds: float = 0.0
+    pid: Optional[int] = None
+    returncode: Optional[int] = None
+    detail: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+EventCallback = Callable[[TerminalEvent], None]
+
+
+@dataclass
+class TerminalExit:
+    """How the terminal process ended."""
+    returncode: Optional[int]
+    timed_out: bool
+    elapsed_seconds: float
+
+
+def emit(on_event: Optional[EventCallback], kind: str, label: str, start_time: float, **kwargs) -> None:
+    """Send an event to the callback; a failing callback never breaks the run."""
+    if on_event is None:
+        return
+    try:
+        on_event(TerminalEvent(kind=kind, label=label, elapsed_seconds=time.time() - start_time, **kwargs))
+    except Exception:
+        pass
+
+
+def kill_process_tree(pid: int, timeout: float = 5.0) -> None:
+    """Kill a process and all of its descendants (MT5 spawns tester agents)."""
+    try:
+        parent = psutil.Process(pid)
+    except psutil.NoSuchProcess:
+        return
+    try:
+        procs: List[psutil.Process] = parent.children(recursive=True)
+    except psutil.Error:
+        procs = []
+    procs.append(parent)
+    for p in procs:
+        try:
+            p.kill()
+        except psutil.Error:
+            pass
+    psutil.wait_procs(procs, timeout=timeout)
+
+
+def _terminal_processes(terminal_path: Path) -> Iterator[psutil.Process]:
+    """Running processes whose executable is exactly this terminal."""
+    try:
+        target = Path(terminal_path).resolve()
+    except OSError:
+        return
+    for proc in psutil.process_iter(["exe"]):
+        try:
+            exe = proc.info.get("exe")
+            if exe and Path(exe).resolve() == target:
+                yield proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied, OSError):
+            pass
+
+
+def terminal_running(terminal_path: Path) -> bool:
+    """True if a process of exactly this terminal executable is running."""
+    return next(_terminal_processes(terminal_path), None) is not None
+
+
+def kill_terminal_instances(terminal_path: Path) -> int:
+    """
+    Kill running processes of exactly this terminal executable.
+
+    Other installs (portable workers, other brokers) are left alone, so runs on
+    different terminals can proceed side by side. Returns how many were killed.
+    """
+    killed = 0
+    for proc in _terminal_processes(terminal_path):
+        try:
+            proc.kill()
+            killed += 1
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return killed
+
+
+def concurrency_limit(max_concurrent: Optional[int] = None) -> asyncio.Semaphore:
+    """Semaphore for run_async callers; defaults to settings.workers.current_workers."""
+    if max_concurrent is None:
+        from settings import get_settings
+        max_concurrent = get_settings().workers.current_workers
+    return asyncio.Semaphore(max(1, int(max_concurrent)))
+
+
+_terminal_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]" = weakref.WeakKeyDictionary()
+
+
+def terminal_lock(terminal_path: Path) -> asyncio.Lock:
+    """Per-event-loop lock for one terminal install (MT5 runs one tester per install)."""
+    loop = asyncio.get_running_loop()
+    locks = _terminal_locks.setdefault(loop, {})
+    key = str(Path(terminal_path)).lower()
+    if key not in locks:
+        locks[key] = asyncio.Lock()
+    return locks[key]
+
+
+async def run_terminal(
+    cmd: List[str],
+    *,
+    timeout: float,
+    label: str,
+    start_time: Optional[float] = None,
+    on_event: Optional[EventCallback] = None,
+) -> TerminalExit:
+    """
+    Launch the terminal and wait for it to exit without blocking the loop.
+
+    On timeout the process tree is killed and TerminalExit.timed_out is set.
+    If the awaiting task is cancelled, the process tree is killed and
+    CancelledError propagates.
+    """
+    start = start_time if start_time is not None else time.time()
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    emit(on_event, "started", label, start, pid=proc.pid)
+
+    try:
+        returncode = await asyncio.wait_for(proc.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        await asyncio.to_thread(kill_process_tree, proc.pid)
+        with contextlib.suppress(Exception):
+            await proc.wait()
+        emit(on_event, "timeout", label, start, pid=proc.pid)
+        return TerminalExit(returncode=None, timed_out=True, elapsed_seconds=time.time() - start)
+    except asyncio.CancelledError:
+        await asyncio.shield(asyncio.to_thread(kill_process_tree, proc.pid))
+        emit(on_event, "cancelled", label, start, pid=proc.pid)
+        raise
+
+    emit(on_event, "exited", label, start, pid=proc.pid, returncode=returncode)
+    return TerminalExit(returncode=returncode, timed_out=False, elapsed_seconds=time.time() - start)
+
+
+@contextlib.asynccontextmanager
+async def terminal_slot(terminal_path: Path, semaphore: Optional[asyncio.Semaphore]):
+    """Hold the caller's concurrency slot (if any) and the install's lock."""
+    async with contextlib.AsyncExitStack() as stack:
+        if semaphore is not None:
+            await stack.enter_async_context(semaphore)
+        await stack.enter_async_context(terminal_lock(terminal_path))
+        yield
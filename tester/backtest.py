@@ -2,20 +2,31 @@
 MT5 Backtest Runner
 Executes backtests using terminal64.exe with INI configuration.
 """
+import asyncio
 import subprocess
 import time
-import psutil
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import MT5_TERMINAL, MT5_DATA_PATH, MT5_TESTER_PATH, RUNS_DIR
+from config import MT5_TERMINAL, MT5_DATA_PATH, MT5_TESTER_AGENTS_PATH, RUNS_DIR
 from .ini_generator import BacktestConfig, create_backtest_ini, InputParam
+from .async_runner import EventCallback, emit, kill_process_tree, kill_terminal_instances, run_terminal, terminal_running, terminal_slot
+from .report_locator import expected_report_paths, read_ini_report, wait_for_report
+from .result_cache import (
+    BacktestCache,
+    cache_key,
+    cache_key_payload,
+    file_sha256,
+    find_ex5,
+    get_backtest_cache,
+    terminal_identity,
+)
 
 # MT5 Tester folder is separate from Terminal data folder
-MT5_TESTER_REPORTS = Path(r"C:\Users\User\AppData\Roaming\MetaQuotes\Tester\A42909ABCDDDD04324904B57BA9776B8")
+MT5_TESTER_REPORTS = MT5_TESTER_AGENTS_PATH
 
 
 @dataclass
@@ -25,12 +36,40 @@ class BacktestResult:
     report_path: Optional[Path] = None
     error: Optional[str] = None
     duration_seconds: float = 0
+    report_latency_seconds: float = 0  # Time from terminal exit to a complete report
+    cached: bool = False  # Served from the backtest result cache (no MT5 launch)
+    cache_key: Optional[str] = None
+    resumed: bool = False  # Finished in an earlier run (checkpoint journal); report reused
+
+
+@dataclass
+class _BacktestPlan:
+    """Everything run()/run_async() carry from INI generation to report collection."""
+    start_time: float
+    run_dir: Path
+    report_name: str
+    ini_path: Path
+    cache: Optional[BacktestCache] = None
+    cache_key: Optional[str] = None
+    cache_payload: Optional[Dict[str, Any]] = None
+    result: Optional[BacktestResult] = None  # set when served from the cache
 
 
 class BacktestRunner:
     """Runs MT5 Strategy Tester backtests."""
 
-    def __init__(self, terminal_path: Optional[Path] = None, timeout: int = 300, *, kill_existing: bool = False):
+    def __init__(
+        self,
+        terminal_path: Optional[Path] = None,
+        timeout: int = 300,
+        *,
+        kill_existing: bool = False,
+        data_path: Optional[Path] = None,
+        portable: bool = False,
+        report_timeout: float = 15.0,
+        cache: Optional[BacktestCache] = None,
+        use_cache: bool = True,
+    ):
         """
         Initialize the backtest runner.
 
@@ -38,10 +77,27 @@ class BacktestRunner:
             terminal_path: Path to terminal64.exe
             timeout: Maximum seconds to wait for backtest completion
             kill_existing: If True, kill a running MT5 process for this terminal path before starting.
+            data_path: Terminal data folder (where reports are written). Defaults to config.MT5_DATA_PATH.
+            portable: Launch the terminal with /portable (data folder = install folder).
+            report_timeout: Max seconds to wait for the report after the terminal exits.
+            cache: Result cache to use. Defaults to the shared cache from settings.backtest_cache.
+            use_cache: Set False to bypass the cache entirely (always launch MT5, store nothing).
         """
         self.terminal = terminal_path or MT5_TERMINAL
         self.timeout = timeout
         self.kill_existing = kill_existing
+        self.portable = portable
+        self.report_timeout = float(report_timeout)
+        self.cache = cache
+        self.use_cache = use_cache
+        if data_path is not None:
+            self.data_path = Path(data_path)
+        elif portable:
+            self.data_path = Path(self.terminal).parent
+        else:
+            self.data_path = MT5_DATA_PATH
+        # The shared AppData Tester folder only belongs to the default installation.
+        self.tester_reports = MT5_TESTER_REPORTS if self.data_path == MT5_DATA_PATH else self.data_path / "Tester"
 
     def run(
         self,
@@ -68,6 +124,118 @@ class BacktestRunner:
         Returns:
             BacktestResult with success status and report path
         """
+        plan = self._prepare(ea_name, symbol, timeframe, from_date, to_date, run_dir, inputs)
+        if plan.result is not None:
+            return plan.result
+
+        try:
+            blocked = self._preflight(plan)
+            if blocked:
+                return blocked
+
+            process = subprocess.Popen(
+                self._command(plan.ini_path),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+            # Wait for completion (MT5 should close itself due to ShutdownTerminal=1)
+            try:
+                process.wait(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                kill_process_tree(process.pid)
+                return BacktestResult(
+                    success=False,
+                    error="Backtest timed out",
+                    duration_seconds=time.time() - plan.start_time,
+                )
+
+            return self._collect(plan)
+
+        except Exception as e:
+            return BacktestResult(
+                success=False,
+                error=str(e),
+                duration_seconds=time.time() - plan.start_time,
+            )
+
+    async def run_async(
+        self,
+        ea_name: str,
+        symbol: str = "EURUSD",
+        timeframe: str = "H1",
+        from_date: str = "2024.01.01",
+        to_date: str = "2024.12.01",
+        run_dir: Optional[Path] = None,
+        inputs: Optional[dict] = None,
+        *,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        on_event: Optional[EventCallback] = None,
+    ) -> BacktestResult:
+        """
+        Async version of run(): same arguments and result, but the terminal runs
+        as an asyncio subprocess and report detection/caching run in a thread.
+
+        Args:
+            semaphore: Bounds concurrent terminals across callers (see async_runner.concurrency_limit)
+            on_event: Receives TerminalEvent updates (queued, started, exited, report, cached, done, ...)
+
+        Cancelling the awaiting task kills the terminal process tree.
+        """
+        label = f"{ea_name} {symbol} {timeframe} {from_date}-{to_date}"
+        plan = await asyncio.to_thread(self._prepare, ea_name, symbol, timeframe, from_date, to_date, run_dir, inputs)
+        if plan.result is not None:
+            emit(on_event, "cached" if plan.result.cached else "failed", label, plan.start_time, detail=plan.result.error)
+            return plan.result
+
+        emit(on_event, "queued", label, plan.start_time)
+        try:
+            async with terminal_slot(self.terminal, semaphore):
+                blocked = await asyncio.to_thread(self._preflight, plan)
+                if blocked:
+                    emit(on_event, "failed", label, plan.start_time, detail=blocked.error)
+                    return blocked
+
+                exit_info = await run_terminal(
+                    self._command(plan.ini_path),
+                    timeout=self.timeout,
+                    label=label,
+                    start_time=plan.start_time,
+                    on_event=on_event,
+                )
+            if exit_info.timed_out:
+                return BacktestResult(
+                    success=False,
+                    error="Backtest timed out",
+                    duration_seconds=time.time() - plan.start_time,
+                )
+
+            result = await asyncio.to_thread(self._collect, plan)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result = BacktestResult(
+                success=False,
+                error=str(e),
+                duration_seconds=time.time() - plan.start_time,
+            )
+
+        if result.success:
+            emit(on_event, "report", label, plan.start_time, detail=str(result.report_path))
+        emit(on_event, "done" if result.success else "failed", label, plan.start_time, detail=result.error)
+        return result
+
+    def _prepare(
+        self,
+        ea_name: str,
+        symbol: str,
+        timeframe: str,
+        from_date: str,
+        to_date: str,
+        run_dir: Optional[Path],
+        inputs: Optional[dict],
+    ) -> "_BacktestPlan":
+        """Write the INI and check the result cache; plan.result is set on a cache hit."""
         start_time = time.time()
         ms = int((start_time - int(start_time)) * 1000)
         run_id = time.strftime("%Y%m%d_%H%M%S", time.localtime(start_time)) + f"_{ms:03d}"
@@ -103,150 +271,109 @@ class BacktestRunner:
         # Generate INI file
         create_backtest_ini(config, ini_path)
 
-        try:
-            # Check if MT5 is already running
-            if self.kill_existing:
-                self._kill_mt5_if_running()
-                time.sleep(1)
-            elif self._is_mt5_running():
-                return BacktestResult(
-                    success=False,
-                    error="MT5 terminal is already running for this installation (close it or use kill_existing=True)",
+        plan = _BacktestPlan(start_time=start_time, run_dir=run_dir, report_name=report_name, ini_path=ini_path)
+        plan.cache, plan.cache_key, plan.cache_payload = self._cache_lookup_key(config)
+        if plan.cache and plan.cache_key:
+            hit = plan.cache.get(plan.cache_key, run_dir)
+            if hit:
+                print(f"[cache] {ea_name} {symbol} {timeframe} {from_date}-{to_date}: hit {plan.cache_key[:12]}", file=sys.stderr)
+                plan.result = BacktestResult(
+                    success=True,
+                    report_path=hit,
                     duration_seconds=time.time() - start_time,
+                    cached=True,
+                    cache_key=plan.cache_key,
                 )
-
-            # Run terminal with config
-            cmd = [str(self.terminal), f'/config:{ini_path}']
-
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-
-            # Wait for completion (MT5 should close itself due to ShutdownTerminal=1)
-            try:
-                process.wait(timeout=self.timeout)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                return BacktestResult(
-                    success=False,
-                    error="Backtest timed out",
-                    duration_seconds=time.time() - start_time,
-                )
-
-            # Check if report was generated
-            # MT5 might need a moment to write the file
-            time.sleep(3)
-
-            # MT5 saves reports in the Terminal data folder (not Tester!)
-            possible_locations = [
-                # In the main Terminal data folder (most common)
-                MT5_DATA_PATH / f"{report_name}.htm",
-                MT5_DATA_PATH / f"{report_name}.html",
-                MT5_DATA_PATH / f"{report_name}.xml",
-                # In the Tester subfolder
-                MT5_DATA_PATH / "Tester" / f"{report_name}.htm",
-                MT5_DATA_PATH / "Tester" / f"{report_name}.html",
-                # In the Tester reports subfolder (common in some MT5 setups)
-                MT5_TESTER_PATH / "reports" / f"{report_name}.htm",
-                MT5_TESTER_PATH / "reports" / f"{report_name}.html",
-                # In the Tester reports folder
-                MT5_TESTER_REPORTS / f"{report_name}.htm",
-                MT5_TESTER_REPORTS / f"{report_name}.html",
-                MT5_TESTER_REPORTS / "reports" / f"{report_name}.htm",
-                MT5_TESTER_REPORTS / "reports" / f"{report_name}.html",
-                # In the run directory
-                run_dir / f"{report_name}.htm",
-                run_dir / f"{report_name}.html",
-            ]
-
-            for loc in possible_locations:
-                if loc and loc.exists():
-                    dest = self._copy_report_assets(loc, run_dir)
-                    return BacktestResult(
-                        success=True,
-                        report_path=dest,
-                        duration_seconds=time.time() - start_time,
-                    )
-
-            # Try finding any recent HTML reports in the tester area
-            import glob
-            search_patterns = [
-                str(MT5_TESTER_REPORTS / "*.htm"),
-                str(MT5_TESTER_REPORTS / "*.html"),
-                str(MT5_DATA_PATH / "Tester" / "*.htm"),
-                str(MT5_TESTER_PATH / "reports" / "*.htm"),
-                str(MT5_TESTER_PATH / "reports" / "*.html"),
-                str(MT5_TESTER_REPORTS / "reports" / "*.htm"),
-                str(MT5_TESTER_REPORTS / "reports" / "*.html"),
-            ]
-
-            for pattern in search_patterns:
-                for found in glob.glob(pattern):
-                    found_path = Path(found)
-                    # Check if it was modified recently (within 60 seconds of start)
-                    try:
-                        if found_path.stat().st_mtime > start_time - 30:
-                            dest = self._copy_report_assets(found_path, run_dir)
-                            return BacktestResult(
-                                success=True,
-                                report_path=dest,
-                                duration_seconds=time.time() - start_time,
-                            )
-                    except:
-                        pass
-
+        return plan
+
+    def _preflight(self, plan: "_BacktestPlan") -> Optional[BacktestResult]:
+        """Make sure this installation is free; returns a failed result if it is not."""
+        if self.kill_existing:
+            self._kill_mt5_if_running()
+            time.sleep(1)
+        elif self._is_mt5_running():
             return BacktestResult(
                 success=False,
-                error="Report file not generated",
-                duration_seconds=time.time() - start_time,
+                error="MT5 terminal is already running for this installation (close it or use kill_existing=True)",
+                duration_seconds=time.time() - plan.start_time,
             )
-
-        except Exception as e:
+        return None
+
+    def _command(self, ini_path: Path) -> List[str]:
+        cmd = [str(self.terminal), f'/config:{ini_path}']
+        if self.portable:
+            cmd.append('/portable')
+        return cmd
+
+    def _collect(self, plan: "_BacktestPlan") -> BacktestResult:
+        """After the terminal exits: wait for the report, copy it into run_dir, store it in the cache."""
+        # MT5 writes Report= relative to its data folder, so the path is known
+        # up front; wait for that exact file to be fully flushed.
+        located = wait_for_report(
+            self._report_candidates(plan.ini_path, plan.report_name),
+            deadline_seconds=self.report_timeout,
+            label=plan.report_name,
+        )
+        if not located.found:
             return BacktestResult(
                 success=False,
-                error=str(e),
-                duration_seconds=time.time() - start_time,
+                error=located.error or "Report file not generated",
+                duration_seconds=time.time() - plan.start_time,
+                report_latency_seconds=located.latency_seconds,
             )
 
+        dest = self._copy_report_assets(located.path, plan.run_dir)
+        if plan.cache and plan.cache_key:
+            plan.cache.put(plan.cache_key, plan.cache_payload, dest)
+        return BacktestResult(
+            success=True,
+            report_path=dest,
+            duration_seconds=time.time() - plan.start_time,
+            report_latency_seconds=located.latency_seconds,
+            cache_key=plan.cache_key,
+        )
+
+    def _cache_lookup_key(self, config: BacktestConfig):
+        """Return (cache, key, key_payload), or (None, None, None) when caching is off or unkeyable."""
+        if not self.use_cache:
+            return None, None, None
+        cache = self.cache or get_backtest_cache()
+        if cache is None:
+            return None, None, None
+        ex5 = find_ex5(config.expert, self.data_path)
+        if ex5 is None:
+            # Without the compiled binary a stale result could be served; don't cache.
+            cache.skip()
+            return None, None, None
+        payload = cache_key_payload(config, file_sha256(ex5), terminal_identity(self.terminal, self.data_path))
+        return cache, cache_key(payload), payload
+
+    def _report_candidates(self, ini_path: Path, report_name: str) -> List[Path]:
+        """
+        Exact report paths for this run: Report= resolved against the data folder
+        first, then the same file name in the Tester report folders some MT5
+        setups use. No wildcard matching, so concurrent runs never cross over.
+        """
+        name = read_ini_report(ini_path) or report_name
+        tester_path = self.data_path / "Tester"
+        return expected_report_paths(
+            name,
+            self.data_path,
+            extra_dirs=[
+                tester_path,
+                tester_path / "reports",
+                self.tester_reports,
+                self.tester_reports / "reports",
+            ],
+        )
+
     def _kill_mt5_if_running(self):
         """Kill running MT5 terminal processes that match this runner's terminal executable path."""
-        target = None
-        try:
-            target = Path(self.terminal).resolve()
-        except Exception:
-            target = None
-
-        for proc in psutil.process_iter(['name', 'exe']):
-            try:
-                exe = proc.info.get('exe')
-                if not exe:
-                    continue
-                if target and Path(exe).resolve() == target:
-                    proc.kill()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
+        kill_terminal_instances(self.terminal)
 
     def _is_mt5_running(self) -> bool:
         """Return True if a running MT5 process matches this runner's terminal executable path."""
-        try:
-            target = Path(self.terminal).resolve()
-        except Exception:
-            return False
-
-        for proc in psutil.process_iter(['exe']):
-            try:
-                exe = proc.info.get('exe')
-                if not exe:
-                    continue
-                if Path(exe).resolve() == target:
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-            except Exception:
-                continue
-        return False
+        return terminal_running(self.terminal)
 
     def _copy_report_assets(self, report_path: Path, run_dir: Path) -> Path:
         """
@@ -266,7 +393,7 @@ class BacktestRunner:
             shutil.copy2(report_path, dest_report)
 
         # MT5 sometimes writes the HTML report to one folder but chart PNGs to another.
-        search_dirs = [report_path.parent, MT5_DATA_PATH]
+        search_dirs = [report_path.parent, self.data_path]
         copied = set()
         for d in search_dirs:
             if not d.exists():
@@ -0,0 +1,483 @@
+"""
+Batch Backtests
+
+Runs K explicit parameter sets in ONE MT5 launch instead of K launches, so
+terminal startup, history load and shutdown are paid once per batch.
+
+MT5 cannot enumerate an arbitrary list of parameter sets by itself, so the
+EA opts in with tester/mql5/SimpleEA_Batch.mqh:
+  1. the harness writes the sets to Common\\Files\\SimpleEA_Batch\\<id>\\params.csv
+     (one line per set: "index;name=value;name=value...");
+  2. the INI is a slow-complete optimization over BatchPassIndex = 0..K-1,
+     with BatchFile pointing at the table;
+  3. each pass loads its row in OnInit and exports its closed trades to
+     pass_<index>.csv from OnTester;
+  4. the harness maps optimization XML rows back to sets via BatchPassIndex
+     and combines them with the exported trades.
+
+Only parameter sets batch this way: symbol, timeframe and dates are
+[Tester] settings, so sweeps over those still need one launch each.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import MT5_COMMON_FILES, MT5_DATA_PATH, MT5_TERMINAL, RUNS_DIR
+from optimizer.result_parser import OptimizationResultParser
+from parser.report import BacktestMetrics
+from parser.trade_extractor import Trade, TradeExtractionResult
+from optimizer.param_extractor import ParameterExtractor
+from .async_runner import kill_process_tree, terminal_running
+from .ini_generator import BacktestConfig, InputParam, create_backtest_ini
+from .report_locator import expected_report_paths, wait_for_report
+from .result_cache import find_ex5, sidecar_path
+
+BATCH_INDEX_INPUT = "BatchPassIndex"
+BATCH_FILE_INPUT = "BatchFile"
+BATCH_INCLUDE = "SimpleEA_Batch.mqh"
+BATCH_COMMON_DIR = "SimpleEA_Batch"
+
+TRADE_COLUMNS = ("deal", "time", "symbol", "direction", "volume", "entry_price", "exit_price", "commission", "swap", "profit")
+# Newer exports append an entry_time column; older files stop at profit.
+
+
+@dataclass
+class BatchPass:
+    """One parameter set's outcome within a batch."""
+    index: int
+    parameters: Dict[str, Any]
+    success: bool
+    metrics: Optional[BacktestMetrics] = None
+    trades: Optional[TradeExtractionResult] = None  # None when the EA did not export trades
+    report_path: Optional[Path] = None  # per-pass JSON (parameters, metrics, trades)
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchResult:
+    """Result of one batched MT5 launch."""
+    success: bool
+    passes: List[BatchPass] = field(default_factory=list)
+    error: Optional[str] = None
+    duration_seconds: float = 0
+    xml_path: Optional[Path] = None
+
+    def by_index(self) -> Dict[int, BatchPass]:
+        return {p.index: p for p in self.passes}
+
+
+def ea_supports_batch(ea_name: str, data_path: Optional[Path] = None) -> bool:
+    """True if the EA source next to its .ex5 includes the batch protocol."""
+    ex5 = find_ex5(ea_name, data_path or MT5_DATA_PATH)
+    if ex5 is None:
+        return False
+    src = ex5.with_suffix(".mq5")
+    try:
+        text = src.read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return False
+    if "\x00" in text:
+        text = src.read_text(encoding="utf-16", errors="ignore")
+    return BATCH_INCLUDE in text or BATCH_INDEX_INPUT in text
+
+
+def ea_input_defaults(ea_name: str, data_path: Optional[Path] = None) -> Dict[str, Any]:
+    """Input defaults declared in the EA source next to its .ex5 ({} if unavailable)."""
+    ex5 = find_ex5(ea_name, data_path or MT5_DATA_PATH)
+    if ex5 is None or not ex5.with_suffix(".mq5").exists():
+        return {}
+    extraction = ParameterExtractor().extract(ex5.with_suffix(".mq5"))
+    return {p.name: p.default for p in extraction.parameters} if extraction.success else {}
+
+
+def complete_param_sets(param_sets: List[Dict[str, Any]], defaults: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Give every set the full input list used anywhere in the batch.
+
+    BatchParam() falls back to the INI value for a name missing from a row, and the
+    INI can only carry one value per input, so a set that omits an input another set
+    overrides would silently run with that other set's value. Missing names are
+    filled from the EA's own defaults instead.
+
+    Raises:
+        ValueError: if a set omits an input that has no known default
+    """
+    names: List[str] = []
+    for params in param_sets:
+        names.extend(k for k in params if k not in names)
+    missing = sorted({k for params in param_sets for k in names if k not in params and k not in defaults})
+    if missing:
+        raise ValueError(f"Parameter sets differ in inputs with no EA default: {', '.join(missing)}")
+    return [{k: params[k] if k in params else defaults[k] for k in names} for params in param_sets]
+
+
+def _table_value(value: Any) -> str:
+    # BatchParam() reads values with StringToDouble(), which maps "True" to 0
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return str(value)
+
+
+def write_param_table(path: Path, param_sets: List[Dict[str, Any]]) -> None:
+    """Write the "index;name=value;..." table read by SimpleEA_Batch.mqh."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = []
+    for i, params in enumerate(param_sets):
+        cells = [str(i)] + [f"{k}={_table_value(v)}" for k, v in params.items()]
+        lines.append(";".join(cells))
+    path.write_text("\r\n".join(lines) + "\r\n", encoding="ascii", errors="replace")
+
+
+def read_pass_trades(path: Path, initial_balance: float) -> Optional[TradeExtractionResult]:
+    """Read a pass_<index>.csv export into a TradeExtractionResult."""
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+    text = raw.decode("utf-16") if raw[:2] in (b"\xff\xfe", b"\xfe\xff") else raw.decode("utf-8", errors="ignore")
+
+    trades: List[Trade] = []
+    for line in text.splitlines()[1:]:
+        cells = line.strip().split(";")
+        if len(cells) < len(TRADE_COLUMNS):
+            continue
+        try:
+            commission, swap, profit = float(cells[7]), float(cells[8]), float(cells[9])
+            trades.append(Trade(
+                deal_id=int(cells[0]),
+                time=cells[1],
+                symbol=cells[2],
+                direction=cells[3],
+                volume=float(cells[4]),
+                entry_price=float(cells[5]),
+                exit_price=float(cells[6]),
+                commission=commission,
+                swap=swap,
+                profit=profit,
+                net_profit=profit + commission + swap,
+                entry_time=cells[10] if len(cells) > len(TRADE_COLUMNS) else "",
+            ))
+        except ValueError:
+            continue
+
+    trades.sort(key=lambda t: t.time)
+    net = sum(t.net_profit for t in trades)
+    return TradeExtractionResult(
+        success=True,
+        trades=trades,
+        total_profit=sum(t.profit for t in trades),
+        total_commission=sum(t.commission for t in trades),
+        total_swap=sum(t.swap for t in trades),
+        initial_balance=initial_balance,
+        final_balance=initial_balance + net,
+        total_net_profit=net,
+    )
+
+
+def _metrics_from_row(row: Dict[str, Any], trades: Optional[TradeExtractionResult], deposit: float) -> BacktestMetrics:
+    """BacktestMetrics from an optimization XML row, refined with trades when available."""
+    m = BacktestMetrics(
+        total_net_profit=float(row.get("profit", 0.0)),
+        profit_factor=float(row.get("profit_factor", 0.0)),
+        max_drawdown_pct=float(row.get("equity_dd_pct", 0.0)),
+        total_trades=int(row.get("trades", 0)),
+        expected_payoff=float(row.get("expected_payoff", 0.0)),
+        sharpe_ratio=float(row.get("sharpe_ratio", 0.0)),
+        recovery_factor=float(row.get("recovery_factor", 0.0)),
+        initial_deposit=deposit,
+    )
+    m.final_balance = deposit + m.total_net_profit
+    m.roi_pct = m.total_net_profit / deposit * 100 if deposit else 0.0
+    if trades and trades.trades:
+        nets = [t.net_profit for t in trades.trades]
+        m.gross_profit = sum(x for x in nets if x > 0)
+        m.gross_loss = sum(x for x in nets if x < 0)
+        m.winning_trades = sum(1 for x in nets if x > 0)
+        m.losing_trades = sum(1 for x in nets if x < 0)
+        m.win_rate = m.winning_trades / len(nets) * 100
+        peak = balance = deposit
+        for x in nets:
+            balance += x
+            peak = max(peak, balance)
+            m.max_drawdown = max(m.max_drawdown, peak - balance)
+    return m
+
+
+class BatchBacktestRunner:
+    """Runs several parameter sets for one EA/symbol/timeframe/period in a single MT5 launch."""
+
+    def __init__(
+        self,
+        terminal_path: Optional[Path] = None,
+        timeout: int = 1800,
+        *,
+        data_path: Optional[Path] = None,
+        portable: bool = False,
+        common_files: Optional[Path] = None,
+        report_timeout: float = 30.0,
+        lock_timeout: float = 3600.0,
+    ):
+        """
+        Args:
+            terminal_path: Path to terminal64.exe
+            timeout: Max seconds for the whole batch
+            data_path: Terminal data folder (where the XML report is written)
+            portable: Launch with /portable (data folder = install folder)
+            common_files: MT5 Common\\Files folder shared with tester agents
+            report_timeout: Max seconds to wait for the XML after the terminal exits
+            lock_timeout: Max seconds to wait for the install's worker lock
+        """
+        self.terminal = terminal_path or MT5_TERMINAL
+        self.timeout = timeout
+        self.portable = portable
+        if data_path is not None:
+            self.data_path = Path(data_path)
+        elif portable:
+            self.data_path = Path(self.terminal).parent
+        else:
+            self.data_path = MT5_DATA_PATH
+        self.common_files = Path(common_files) if common_files else MT5_COMMON_FILES
+        self.report_timeout = float(report_timeout)
+        self.lock_timeout = float(lock_timeout)
+
+    def run(
+        self,
+        ea_name: str,
+        param_sets: List[Dict[str, Any]],
+        symbol: str = "EURUSD",
+        timeframe: str = "H1",
+        from_date: str = "2024.01.01",
+        to_date: str = "2024.12.01",
+        run_dir: Optional[Path] = None,
+        pass_dirs: Optional[List[Path]] = None,
+    ) -> BatchResult:
+        """
+        Backtest every parameter set in one launch.
+
+        Holds the install's worker lock (shared with WorkerPool) for the whole launch.
+
+        Args:
+            run_dir: Folder for the INI and XML report (default runs/batches/<ea>_<time>)
+            pass_dirs: Output folder for each set (default run_dir/pass_<i>)
+
+        Returns:
+            BatchResult with one BatchPass per set (same order as param_sets)
+        """
+        # Imported here: worker_pool imports BATCH_INCLUDE from this module
+        from .worker_pool import LOCK_FILE_NAME, WorkerLock, WorkerLockError
+
+        start_time = time.time()
+        if not param_sets:
+            return BatchResult(success=True, duration_seconds=0.0)
+        try:
+            param_sets = complete_param_sets(param_sets, ea_input_defaults(ea_name, self.data_path))
+        except ValueError as e:
+            return BatchResult(success=False, error=str(e), duration_seconds=time.time() - start_time)
+
+        lock = WorkerLock(self.data_path / LOCK_FILE_NAME)
+        try:
+            lock.acquire(timeout=self.lock_timeout)
+        except WorkerLockError as e:
+            return BatchResult(success=False, error=str(e), duration_seconds=time.time() - start_time)
+        try:
+            if terminal_running(self.terminal):
+                return BatchResult(
+                    success=False,
+                    error="MT5 terminal is already running for this installation",
+                    duration_seconds=time.time() - start_time,
+                )
+            return self._run_locked(
+                ea_name, param_sets, symbol, timeframe, from_date, to_date, run_dir, pass_dirs, start_time
+            )
+        finally:
+            lock.release()
+
+    def _run_locked(
+        self,
+        ea_name: str,
+        param_sets: List[Dict[str, Any]],
+        symbol: str,
+        timeframe: str,
+        from_date: str,
+        to_date: str,
+        run_dir: Optional[Path],
+        pass_dirs: Optional[List[Path]],
+        start_time: float,
+    ) -> BatchResult:
+
+        ms = int((start_time - int(start_time)) * 1000)
+        run_id = time.strftime("%Y%m%d_%H%M%S", time.localtime(start_time)) + f"_{ms:03d}"
+        batch_id = f"{ea_name}_{run_id}"
+        if run_dir is None:
+            run_dir = RUNS_DIR / "batches" / batch_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+        if pass_dirs is None:
+            pass_dirs = [run_dir / f"pass_{i}" for i in range(len(param_sets))]
+
+        table_rel = f"{BATCH_COMMON_DIR}\\{batch_id}\\params.csv"
+        batch_dir = self.common_files / BATCH_COMMON_DIR / batch_id
+        write_param_table(batch_dir / "params.csv", param_sets)
+
+        report_name = f"{ea_name}_BATCH_{run_id}"
+        ini_path = run_dir / f"{ea_name}_batch.ini"
+        config = self._config(ea_name, param_sets, symbol, timeframe, from_date, to_date, report_name)
+        create_backtest_ini(config, ini_path)
+        with open(ini_path, "a", encoding="utf-8") as f:
+            f.write(f"{BATCH_FILE_INPUT}={table_rel}\n")
+
+        try:
+            cmd = [str(self.terminal), f"/config:{ini_path}"]
+            if self.portable:
+                cmd.append("/portable")
+            process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                process.wait(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                kill_process_tree(process.pid)
+                return BatchResult(success=False, error="Batch timed out", duration_seconds=time.time() - start_time)
+
+            located = wait_for_report(
+                expected_report_paths(report_name, self.data_path, extensions=(".xml",)),
+                deadline_seconds=self.report_timeout,
+                label=report_name,
+            )
+            if not located.found:
+                return BatchResult(
+                    success=False,
+                    error=located.error or "Batch report not generated",
+                    duration_seconds=time.time() - start_time,
+                )
+
+            xml_dest = run_dir / located.path.name
+            shutil.copy2(located.path, xml_dest)
+            passes = self._split(xml_dest, batch_dir, param_sets, pass_dirs, float(config.deposit))
+            return BatchResult(
+                success=True,
+                passes=passes,
+                duration_seconds=time.time() - start_time,
+                xml_path=xml_dest,
+            )
+        except Exception as e:
+            return BatchResult(success=False, error=str(e), duration_seconds=time.time() - start_time)
+        finally:
+            shutil.rmtree(batch_dir, ignore_errors=True)
+
+    def _config(
+        self,
+        ea_name: str,
+        param_sets: List[Dict[str, Any]],
+        symbol: str,
+        timeframe: str,
+        from_date: str,
+        to_date: str,
+        report_name: str,
+    ) -> BacktestConfig:
+        # Fixed inputs carry the first set's values; every table row holds its set's
+        # complete inputs, so the EA overrides all of them per pass. The only
+        # optimized input is the pass index.
+        names: Dict[str, Any] = {}
+        for params in param_sets:
+            for k, v in params.items():
+                names.setdefault(k, v)
+        inputs = [InputParam(name=k, default=v, optimize=False) for k, v in names.items()]
+        inputs.append(InputParam(
+            name=BATCH_INDEX_INPUT,
+            default=0,
+            min_val=0,
+            step=1,
+            max_val=len(param_sets) - 1,
+            optimize=True,
+        ))
+        return BacktestConfig(
+            expert=ea_name,
+            symbol=symbol,
+            period=timeframe,
+            from_date=from_date,
+            to_date=to_date,
+            optimization=1,  # slow complete algorithm: every index exactly once
+            report_name=report_name,
+            shutdown_terminal=True,
+            visual=False,
+            use_local=True,
+            inputs=inputs,
+        )
+
+    def _split(
+        self,
+        xml_path: Path,
+        batch_dir: Path,
+        param_sets: List[Dict[str, Any]],
+        pass_dirs: List[Path],
+        deposit: float,
+    ) -> List[BatchPass]:
+        """
+        Map XML rows back to parameter sets and write one JSON per pass.
+
+        Each batch_pass.json also gets a parsed sidecar, so cached_metrics() and
+        cached_trades() read it like any single-backtest report.
+        """
+        rows = OptimizationResultParser("", xml_path.parent)._parse_xml(xml_path)
+        by_index: Dict[int, Dict[str, Any]] = {}
+        for row in rows.values():
+            idx = (row.get("parameters") or {}).get(BATCH_INDEX_INPUT)
+            if idx is not None:
+                by_index[int(idx)] = row
+
+        passes: List[BatchPass] = []
+        for i, params in enumerate(param_sets):
+            row = by_index.get(i)
+            if row is None:
+                passes.append(BatchPass(index=i, parameters=params, success=False, error="Pass missing from batch results"))
+                continue
+
+            trades = read_pass_trades(batch_dir / f"pass_{i}.csv", deposit)
+            metrics = _metrics_from_row(row, trades, deposit)
+            pass_dir = Path(pass_dirs[i])
+            pass_dir.mkdir(parents=True, exist_ok=True)
+            report_path = pass_dir / "batch_pass.json"
+            parsed = {"metrics": metrics.to_dict(), "trades": trades.to_dict() if trades else None}
+            report_path.write_text(json.dumps({"index": i, "parameters": params, **parsed}, indent=2), encoding="utf-8")
+            sidecar_path(report_path).write_text(json.dumps(parsed, indent=2), encoding="utf-8")
+            passes.append(BatchPass(
+                index=i,
+                parameters=params,
+                success=True,
+                metrics=metrics,
+                trades=trades,
+                report_path=report_path,
+            ))
+        return passes
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Backtest several parameter sets in one MT5 launch")
+    ap.add_argument("ea_name")
+    ap.add_argument("param_sets", help="JSON file with a list of {input: value} objects")
+    ap.add_argument("--symbol", default="EURUSD")
+    ap.add_argument("--timeframe", default="H1")
+    ap.add_argument("--from-date", default="2024.01.01")
+    ap.add_argument("--to-date", default="2024.12.01")
+    args = ap.parse_args()
+
+    sets = json.loads(Path(args.param_sets).read_text(encoding="utf-8"))
+    res = BatchBacktestRunner().run(args.ea_name, sets, args.symbol, args.timeframe, args.from_date, args.to_date)
+    print(json.dumps({
+        "success": res.success,
+        "error": res.error,
+        "duration_seconds": round(res.duration_seconds, 2),
+        "passes": [
+            {"index": p.index, "success": p.success, "profit": p.metrics.total_net_profit if p.metrics else None, "error": p.error}
+            for p in res.passes
+        ],
+    }, indent=2))
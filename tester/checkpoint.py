@@ -0,0 +1,135 @@
+"""
+Checkpoint Journal for Resumable Sweeps
+
+Long sweeps (walk-forward folds, multi-pair, timeframes) dispatch many
+independent backtests. The journal is an append-only JSONL file in the sweep's
+output directory with one line per finished unit:
+
+    {"unit": "EURUSD", "fingerprint": "<sha256>", "report_path": "...", ...}
+
+The fingerprint covers everything that determines the backtest (EA binary,
+symbol, timeframe, dates, inputs), so a --resume run only skips a unit when
+it would have produced the same report. Skipped units still hand their report
+back to the caller, which re-parses it as usual.
+
+Lines are flushed and fsync'ed as units finish, so a crash or timeout loses
+at most the unit in flight. A torn last line is ignored on load.
+
+Usage:
+    journal = CheckpointJournal(out_dir / CHECKPOINT_FILE, resume=args.resume)
+    with WorkerPool.from_config(workers, journal=journal) as pool:
+        results = pool.map(jobs)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from tester.result_cache import canonical_inputs, file_sha256, find_ex5
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+CHECKPOINT_VERSION = 1
+
+
+def job_fingerprint(job: Any, data_path: Optional[Path] = None) -> str:
+    """
+    Input fingerprint of a BacktestJob.
+
+    When the compiled EA is found under data_path its SHA-256 is included, so
+    recompiling the EA invalidates every checkpoint that used it.
+    """
+    ex5 = find_ex5(job.ea_name, data_path) if data_path else None
+    payload = {
+        "v": CHECKPOINT_VERSION,
+        "ea": str(job.ea_name),
+        "ex5": file_sha256(ex5) if ex5 else None,
+        "symbol": str(job.symbol).upper(),
+        "timeframe": str(job.timeframe).upper(),
+        "from": str(job.from_date),
+        "to": str(job.to_date),
+        "inputs": canonical_inputs(job.inputs),
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class CheckpointJournal:
+    """Append-only record of finished units, keyed by unit name + fingerprint."""
+
+    def __init__(self, path: Path, *, resume: bool = True):
+        """
+        Args:
+            path: Journal file (created on first record)
+            resume: Load existing records; False starts a fresh journal
+        """
+        self.path = Path(path)
+        self.resume = bool(resume)
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+        if self.resume:
+            self._load()
+        elif self.path.exists():
+            self.path.unlink()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def lookup(self, unit: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """The finished record for unit, if its fingerprint matches and its report still exists."""
+        with self._lock:
+            rec = self._records.get(unit)
+        if not rec or rec.get("fingerprint") != fingerprint:
+            return None
+        report = rec.get("report_path")
+        if not report or not Path(report).exists():
+            return None
+        with self._lock:
+            self.skipped += 1
+        return rec
+
+    def record(self, unit: str, fingerprint: str, **data: Any) -> None:
+        """Append a finished unit and make it durable before returning."""
+        rec = {"unit": unit, "fingerprint": fingerprint, "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"), **data}
+        line = json.dumps(rec, default=str) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._records[unit] = rec
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        text = self.path.read_text(encoding="utf-8", errors="replace")
+        for line in text.splitlines():
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn write from a crash
+            if isinstance(rec, dict) and rec.get("unit"):
+                self._records[str(rec["unit"])] = rec  # later lines win
+        if text and not text.endswith("\n"):
+            # Terminate the torn line so the next record starts on its own line.
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n")
+
+
+def resumable_dir(parent: Path, prefix: str) -> Optional[Path]:
+    """Most recent <parent>/<prefix>_YYYYMMDD_HHMMSS directory that has a checkpoint journal."""
+    if not parent.exists():
+        return None
+    candidates = [
+        d for d in parent.glob(f"{prefix}_*")
+        if d.name[len(prefix) + 1:].replace("_", "").isdigit() and (d / CHECKPOINT_FILE).exists()
+    ]
+    return max(candidates, key=lambda d: (d / CHECKPOINT_FILE).stat().st_mtime, default=None)
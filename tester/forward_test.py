@@ -2,19 +2,21 @@
 Forward Testing Module
 Tests optimized parameters on out-of-sample data.
 """
+import asyncio
 import subprocess
 import time
 import shutil
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 from datetime import datetime, timedelta
-import psutil
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import MT5_TERMINAL, MT5_DATA_PATH
 from .ini_generator import BacktestConfig, create_forward_test_ini
+from .async_runner import EventCallback, emit, kill_process_tree, kill_terminal_instances, run_terminal, terminal_slot
+from .report_locator import expected_report_paths, wait_for_report
 
 
 @dataclass
@@ -107,30 +109,10 @@ class ForwardTestRunner:
             ForwardTestResult with performance metrics
         """
         start_time = time.time()
-
-        if run_dir is None:
-            run_dir = MT5_DATA_PATH / "Tester" / "reports"
-        run_dir.mkdir(parents=True, exist_ok=True)
-
-        report_name = f"{ea_name}_FWD_{fast_period}_{slow_period}"
-        ini_path = run_dir / f"{ea_name}_forward.ini"
-
-        # Create forward test configuration
-        config = BacktestConfig(
-            expert=ea_name,
-            symbol=symbol,
-            period=timeframe,
-            from_date=from_date,
-            to_date=to_date,
-            report_name=report_name,
-            shutdown_terminal=True,
-            visual=False,
-            use_local=True,
+        run_dir, report_name, ini_path = self._prepare(
+            ea_name, fast_period, slow_period, symbol, timeframe, from_date, to_date, run_dir
         )
 
-        # Generate forward test INI with specific parameters
-        create_forward_test_ini(config, ini_path, fast_period, slow_period)
-
         try:
             # Kill any running MT5
             self._kill_mt5_if_running()
@@ -141,14 +123,14 @@ class ForwardTestRunner:
 
             process = subprocess.Popen(
                 cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
             )
 
             try:
                 process.wait(timeout=self.timeout)
             except subprocess.TimeoutExpired:
-                process.kill()
+                kill_process_tree(process.pid)
                 return ForwardTestResult(
                     success=False,
                     fast_period=fast_period,
@@ -157,44 +139,66 @@ class ForwardTestRunner:
                     duration_seconds=time.time() - start_time,
                 )
 
-            # Wait for report
-            time.sleep(3)
-
-            # Find the report
-            report_path = MT5_DATA_PATH / f"{report_name}.htm"
-            if not report_path.exists():
-                report_path = MT5_DATA_PATH / f"{report_name}.html"
+            return self._collect(fast_period, slow_period, run_dir, report_name, start_time)
 
-            if report_path.exists():
-                # Copy to run directory
-                dest_path = run_dir / report_path.name
-                shutil.copy2(report_path, dest_path)
-
-                # Parse the report
-                metrics = self._parse_forward_report(dest_path)
+        except Exception as e:
+            return ForwardTestResult(
+                success=False,
+                fast_period=fast_period,
+                slow_period=slow_period,
+                error=str(e),
+                duration_seconds=time.time() - start_time,
+            )
 
-                return ForwardTestResult(
-                    success=True,
-                    fast_period=fast_period,
-                    slow_period=slow_period,
-                    profit=metrics.get('profit', 0),
-                    profit_factor=metrics.get('profit_factor', 0),
-                    trades=metrics.get('trades', 0),
-                    drawdown=metrics.get('drawdown', 0),
-                    report_path=dest_path,
-                    duration_seconds=time.time() - start_time,
+    async def run_async(
+        self,
+        ea_name: str,
+        fast_period: int,
+        slow_period: int,
+        symbol: str = "EURUSD",
+        timeframe: str = "H1",
+        from_date: str = "2024.09.01",
+        to_date: str = "2024.12.01",
+        run_dir: Optional[Path] = None,
+        *,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        on_event: Optional[EventCallback] = None,
+    ) -> ForwardTestResult:
+        """
+        Async version of run(). The terminal runs as an asyncio subprocess;
+        cancelling the awaiting task kills its process tree.
+        """
+        start_time = time.time()
+        label = f"{ea_name} FWD {fast_period}/{slow_period} {symbol} {timeframe}"
+        emit(on_event, "queued", label, start_time)
+        try:
+            run_dir, report_name, ini_path = self._prepare(
+                ea_name, fast_period, slow_period, symbol, timeframe, from_date, to_date, run_dir
+            )
+            async with terminal_slot(self.terminal, semaphore):
+                await asyncio.to_thread(self._kill_mt5_if_running)
+                await asyncio.sleep(1)
+                exit_info = await run_terminal(
+                    [str(self.terminal), f'/config:{ini_path}'],
+                    timeout=self.timeout,
+                    label=label,
+                    start_time=start_time,
+                    on_event=on_event,
                 )
-            else:
-                return ForwardTestResult(
+            if exit_info.timed_out:
+                result = ForwardTestResult(
                     success=False,
                     fast_period=fast_period,
                     slow_period=slow_period,
-                    error="Forward test report not found",
+                    error="Forward test timed out",
                     duration_seconds=time.time() - start_time,
                 )
-
+            else:
+                result = await asyncio.to_thread(self._collect, fast_period, slow_period, run_dir, report_name, start_time)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            return ForwardTestResult(
+            result = ForwardTestResult(
                 success=False,
                 fast_period=fast_period,
                 slow_period=slow_period,
@@ -202,14 +206,91 @@ class ForwardTestRunner:
                 duration_seconds=time.time() - start_time,
             )
 
+        emit(on_event, "done" if result.success else "failed", label, start_time, detail=result.error)
+        return result
+
+    def _prepare(
+        self,
+        ea_name: str,
+        fast_period: int,
+        slow_period: int,
+        symbol: str,
+        timeframe: str,
+        from_date: str,
+        to_date: str,
+        run_dir: Optional[Path],
+    ) -> Tuple[Path, str, Path]:
+        """Write the forward test INI; returns (run_dir, report_name, ini_path)."""
+        if run_dir is None:
+            run_dir = MT5_DATA_PATH / "Tester" / "reports"
+        run_dir.mkdir(parents=True, exist_ok=True)
+
+        report_name = f"{ea_name}_FWD_{fast_period}_{slow_period}"
+        ini_path = run_dir / f"{ea_name}_forward.ini"
+
+        # Create forward test configuration
+        config = BacktestConfig(
+            expert=ea_name,
+            symbol=symbol,
+            period=timeframe,
+            from_date=from_date,
+            to_date=to_date,
+            report_name=report_name,
+            shutdown_terminal=True,
+            visual=False,
+            use_local=True,
+        )
+
+        # Generate forward test INI with specific parameters
+        create_forward_test_ini(config, ini_path, fast_period, slow_period)
+        return run_dir, report_name, ini_path
+
+    def _collect(
+        self,
+        fast_period: int,
+        slow_period: int,
+        run_dir: Path,
+        report_name: str,
+        start_time: float,
+    ) -> ForwardTestResult:
+        """After the terminal exits: locate, copy and parse the report."""
+        # Wait for the exact report MT5 writes for Report= (no fixed sleep)
+        located = wait_for_report(
+            expected_report_paths(report_name, MT5_DATA_PATH),
+            label=report_name,
+        )
+        report_path = located.path or (MT5_DATA_PATH / f"{report_name}.htm")
+
+        if report_path.exists():
+            # Copy to run directory
+            dest_path = run_dir / report_path.name
+            shutil.copy2(report_path, dest_path)
+
+            # Parse the report
+            metrics = self._parse_forward_report(dest_path)
+
+            return ForwardTestResult(
+                success=True,
+                fast_period=fast_period,
+                slow_period=slow_period,
+                profit=metrics.get('profit', 0),
+                profit_factor=metrics.get('profit_factor', 0),
+                trades=metrics.get('trades', 0),
+                drawdown=metrics.get('drawdown', 0),
+                report_path=dest_path,
+                duration_seconds=time.time() - start_time,
+            )
+        return ForwardTestResult(
+            success=False,
+            fast_period=fast_period,
+            slow_period=slow_period,
+            error="Forward test report not found",
+            duration_seconds=time.time() - start_time,
+        )
+
     def _kill_mt5_if_running(self):
-        """Kill any running MT5 terminal processes."""
-        for proc in psutil.process_iter(['name']):
-            try:
-                if proc.info['name'] and 'terminal64' in proc.info['name'].lower():
-                    proc.kill()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
+        """Kill running instances of this runner's terminal (other installs are left alone)."""
+        kill_terminal_instances(self.terminal)
 
     def _parse_forward_report(self, report_path: Path) -> dict:
         """Parse forward test report for key metrics."""
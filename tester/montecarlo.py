@@ -3,16 +3,21 @@ Monte Carlo Simulation for EA Robustness Testing
 
 Shuffles trade order to test strategy robustness.
 A robust strategy should maintain profitability regardless of trade sequence.
+
+Portfolio mode resamples whole calendar-day blocks of an aligned (pairs x days)
+daily PnL matrix, so cross-pair correlation on each day is preserved.
 """
 
 import random
 import math
 from pathlib import Path
 from dataclasses import dataclass, asdict
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 import json
 import sys
 
+import numpy as np
+
 # Add parent dir for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -258,6 +263,253 @@ class MonteCarloSimulator:
         )
 
 
+@dataclass
+class PortfolioMonteCarloResult:
+    """Results of a portfolio (multi-pair) day-block bootstrap simulation."""
+    iterations: int
+    initial_balance: float
+    pairs: List[str]
+    days: int
+    block_days: int
+
+    # Profit statistics
+    median_profit: float
+    mean_profit: float
+    profit_5th_percentile: float
+    profit_95th_percentile: float
+
+    # Drawdown statistics
+    median_max_drawdown: float
+    max_drawdown_95th_percentile: float
+    median_max_drawdown_pct: float
+    max_drawdown_pct_95th_percentile: float
+    max_drawdown_pct_99th_percentile: float
+
+    # Confidence metrics
+    confidence_level: float  # % of iterations that were profitable
+    probability_of_ruin: float  # % of iterations that hit ruin threshold
+    ruin_threshold_pct: float
+
+    # Original (historical day order) metrics for comparison
+    original_profit: float
+    original_drawdown: float
+    original_drawdown_pct: float
+
+    # Fewer than two requested blocks of history: the block was shrunk and the
+    # percentiles rest on very few distinct paths
+    low_sample: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    @property
+    def is_robust(self) -> bool:
+        """Check if the basket meets robustness criteria."""
+        return (
+            not self.low_sample and
+            self.confidence_level >= 70 and
+            self.probability_of_ruin <= 5
+        )
+
+
+class PortfolioMonteCarloSimulator:
+    """
+    Day-block bootstrap over an aligned (pairs x days) daily PnL matrix.
+
+    Each simulated path is built by drawing blocks of consecutive calendar days
+    (with replacement) and applying every pair's PnL for those days together,
+    so same-day co-movement between pairs (and short-range autocorrelation
+    within a block) is kept intact. Iterations are vectorized with NumPy and
+    processed in chunks to bound memory.
+    """
+
+    def __init__(
+        self,
+        iterations: int = 1000,
+        ruin_threshold_pct: float = 50.0,
+        block_days: int = 5,
+        seed: Optional[int] = None,
+        chunk_size: int = 2000,
+    ):
+        """
+        Initialize portfolio Monte Carlo simulator.
+
+        Args:
+            iterations: Number of bootstrap iterations
+            ruin_threshold_pct: Equity loss % considered "ruin"
+            block_days: Length of each resampled block in calendar days (1 = iid days);
+                shrunk to half the history when fewer than 2 blocks of days exist
+            seed: Random seed for reproducibility
+            chunk_size: Iterations simulated per vectorized batch
+        """
+        self.iterations = int(iterations)
+        self.ruin_threshold_pct = float(ruin_threshold_pct)
+        self.block_days = max(1, int(block_days))
+        self.chunk_size = max(1, int(chunk_size))
+        self._rng = np.random.default_rng(seed)
+
+    def run(
+        self,
+        daily_pnl: Dict[str, Sequence[float]],
+        initial_balance: float,
+        pairs: Optional[Sequence[str]] = None,
+    ) -> PortfolioMonteCarloResult:
+        """
+        Run the bootstrap on aligned daily PnL vectors.
+
+        Args:
+            daily_pnl: {symbol: [net profit per day]}, all vectors aligned to the
+                same date axis (as built by run_multipair's daily alignment)
+            initial_balance: Starting balance of the account trading the basket
+            pairs: Subset of symbols forming the basket (default: all)
+
+        Returns:
+            PortfolioMonteCarloResult with basket statistics
+        """
+        basket = [p for p in (pairs or sorted(daily_pnl.keys())) if p in daily_pnl]
+        if not basket:
+            return self._empty_result(initial_balance, [])
+
+        matrix = np.asarray([daily_pnl[p] for p in basket], dtype=np.float64)
+        if matrix.ndim != 2 or matrix.shape[1] == 0:
+            return self._empty_result(initial_balance, basket)
+
+        # Whole-day resampling keeps each column intact, so the basket path only
+        # needs the per-day sum across pairs.
+        day_pnl = matrix.sum(axis=0)
+        n_days = day_pnl.shape[0]
+        # A block as long as the history has a single start, so every path would
+        # be the original one; keep at least two blocks per path.
+        block = min(self.block_days, max(1, n_days // 2))
+        n_blocks = -(-n_days // block)
+        offsets = np.arange(block)
+
+        initial = float(initial_balance)
+        ruin_level = initial * (1 - self.ruin_threshold_pct / 100)
+
+        final_profit = np.empty(self.iterations)
+        max_dd = np.empty(self.iterations)
+        max_dd_pct = np.empty(self.iterations)
+        ruined = np.empty(self.iterations, dtype=bool)
+
+        for lo in range(0, self.iterations, self.chunk_size):
+            hi = min(lo + self.chunk_size, self.iterations)
+            starts = self._rng.integers(0, n_days - block + 1, size=(hi - lo, n_blocks))
+            idx = (starts[:, :, None] + offsets).reshape(hi - lo, -1)[:, :n_days]
+            equity = initial + np.cumsum(day_pnl[idx], axis=1)
+            fp, dd, dd_pct, ru = self._path_stats(equity, initial, ruin_level)
+            final_profit[lo:hi] = fp
+            max_dd[lo:hi] = dd
+            max_dd_pct[lo:hi] = dd_pct
+            ruined[lo:hi] = ru
+
+        orig_equity = initial + np.cumsum(day_pnl)[None, :]
+        o_fp, o_dd, o_dd_pct, _ = self._path_stats(orig_equity, initial, ruin_level)
+
+        return PortfolioMonteCarloResult(
+            iterations=self.iterations,
+            initial_balance=initial,
+            pairs=list(basket),
+            days=int(n_days),
+            block_days=int(block),
+            median_profit=float(np.percentile(final_profit, 50)),
+            mean_profit=float(final_profit.mean()),
+            profit_5th_percentile=float(np.percentile(final_profit, 5)),
+            profit_95th_percentile=float(np.percentile(final_profit, 95)),
+            median_max_drawdown=float(np.percentile(max_dd, 50)),
+            max_drawdown_95th_percentile=float(np.percentile(max_dd, 95)),
+            median_max_drawdown_pct=float(np.percentile(max_dd_pct, 50)),
+            max_drawdown_pct_95th_percentile=float(np.percentile(max_dd_pct, 95)),
+            max_drawdown_pct_99th_percentile=float(np.percentile(max_dd_pct, 99)),
+            confidence_level=float((final_profit > 0).mean() * 100),
+            probability_of_ruin=float(ruined.mean() * 100),
+            ruin_threshold_pct=self.ruin_threshold_pct,
+            original_profit=float(o_fp[0]),
+            original_drawdown=float(o_dd[0]),
+            original_drawdown_pct=float(o_dd_pct[0]),
+            low_sample=block < self.block_days,
+        )
+
+    @staticmethod
+    def _path_stats(
+        equity: np.ndarray,
+        initial_balance: float,
+        ruin_level: float,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Per-row final profit, max DD, max DD % and ruin flag for equity paths."""
+        peak = np.maximum.accumulate(np.maximum(equity, initial_balance), axis=1)
+        dd = peak - equity
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dd_pct = np.where(peak > 0, dd / peak * 100, 0.0)
+        return (
+            equity[:, -1] - initial_balance,
+            dd.max(axis=1),
+            dd_pct.max(axis=1),
+            equity.min(axis=1) <= ruin_level,
+        )
+
+    def _empty_result(self, initial_balance: float, pairs: List[str]) -> PortfolioMonteCarloResult:
+        """Return empty result when no daily PnL is available."""
+        return PortfolioMonteCarloResult(
+            iterations=0,
+            initial_balance=float(initial_balance),
+            pairs=list(pairs),
+            days=0,
+            block_days=self.block_days,
+            median_profit=0,
+            mean_profit=0,
+            profit_5th_percentile=0,
+            profit_95th_percentile=0,
+            median_max_drawdown=0,
+            max_drawdown_95th_percentile=0,
+            median_max_drawdown_pct=0,
+            max_drawdown_pct_95th_percentile=0,
+            max_drawdown_pct_99th_percentile=0,
+            confidence_level=0,
+            probability_of_ruin=100,
+            ruin_threshold_pct=self.ruin_threshold_pct,
+            original_profit=0,
+            original_drawdown=0,
+            original_drawdown_pct=0,
+        )
+
+
+def run_portfolio_montecarlo(
+    daily_pnl: Dict[str, Sequence[float]],
+    initial_balance: float,
+    pairs: Optional[Sequence[str]] = None,
+    iterations: int = 1000,
+    ruin_threshold_pct: float = 50.0,
+    block_days: int = 5,
+    seed: Optional[int] = None,
+) -> PortfolioMonteCarloResult:
+    """
+    Convenience function to run the portfolio day-block bootstrap.
+
+    Args:
+        daily_pnl: Aligned {symbol: [net profit per day]} vectors
+        initial_balance: Starting balance of the basket account
+        pairs: Basket subset (default: all symbols)
+        iterations: Number of bootstrap iterations
+        ruin_threshold_pct: Equity loss % considered ruin
+        block_days: Calendar days per resampled block
+        seed: Random seed for reproducibility
+
+    Returns:
+        PortfolioMonteCarloResult
+    """
+    simulator = PortfolioMonteCarloSimulator(
+        iterations=iterations,
+        ruin_threshold_pct=ruin_threshold_pct,
+        block_days=block_days,
+        seed=seed,
+    )
+    return simulator.run(daily_pnl, initial_balance, pairs=pairs)
+
+
 def run_montecarlo(
     report_path: str,
     iterations: int = 1000,
@@ -9,7 +9,6 @@ import time
 from pathlib import Path
 from dataclasses import dataclass, asdict, field
 from typing import List, Optional, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 import sys
 
@@ -20,7 +19,10 @@ from config import (
     DEFAULT_TIMEFRAME, BACKTEST_FROM, BACKTEST_TO
 )
 from parser.report import ReportParser, BacktestMetrics
-from tester.backtest import BacktestRunner, BacktestResult
+from tester.backtest import BacktestResult
+from tester.checkpoint import CheckpointJournal
+from tester.result_cache import cached_metrics
+from tester.worker_pool import BacktestJob, WorkerPool
 
 
 @dataclass
@@ -104,8 +106,9 @@ class MultiPairTester:
     """
     Tests an EA across multiple currency pairs.
 
-    Uses sequential testing (one pair at a time) to avoid MT5 conflicts.
-    Can be extended to use parallel workers with separate MT5 data folders.
+    Pairs are dispatched to a WorkerPool: with several portable MT5 installs
+    (separate data folders) they run in parallel, otherwise one at a time on
+    the default terminal to avoid MT5 conflicts.
     """
 
     def __init__(
@@ -113,7 +116,10 @@ class MultiPairTester:
         pairs: Optional[List[str]] = None,
         timeout_per_pair: int = 300,
         run_dir: Optional[Path] = None,
-        inputs: Optional[Dict] = None
+        inputs: Optional[Dict] = None,
+        workers: Optional[int] = None,
+        pool: Optional[WorkerPool] = None,
+        journal: Optional[CheckpointJournal] = None,
     ):
         """
         Initialize multi-pair tester.
@@ -123,6 +129,9 @@ class MultiPairTester:
             timeout_per_pair: Backtest timeout per pair in seconds
             run_dir: Directory to store results
             inputs: EA input parameters to use for all pairs
+            workers: Parallel MT5 workers (default: settings.workers.current_workers)
+            pool: Existing WorkerPool to use (overrides workers)
+            journal: Checkpoint journal; pairs it already holds are not re-run
         """
         self.pairs = pairs or [
             "EURUSD",
@@ -136,6 +145,9 @@ class MultiPairTester:
         self.timeout = timeout_per_pair
         self.run_dir = run_dir
         self.inputs = inputs
+        self.workers = workers
+        self.pool = pool
+        self.journal = journal
         self.report_parser = ReportParser()
 
     def test(
@@ -174,78 +186,42 @@ class MultiPairTester:
         base_run_dir = self.run_dir or (Path("runs") / "multipair" / f"{ea_name}_{ts}")
         base_run_dir.mkdir(parents=True, exist_ok=True)
 
-        # Test each pair sequentially
-        results: Dict[str, PairResult] = {}
-        runner = BacktestRunner(timeout=self.timeout)
-
+        # Dispatch one backtest per pair to the worker pool (parallel when
+        # several isolated MT5 installs are configured, sequential otherwise)
+        jobs: List[BacktestJob] = []
         for symbol in pairs_to_test:
-            print(f"Testing {ea_name} on {symbol}...")
-            pair_start = time.time()
             pair_dir = base_run_dir / symbol
             pair_dir.mkdir(parents=True, exist_ok=True)
-
-            try:
-                # Run backtest
-                bt_result = runner.run(
-                    ea_name=ea_name,
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    from_date=from_date,
-                    to_date=to_date,
-                    run_dir=pair_dir,
-                    inputs=self.inputs,
-                )
-
-                if bt_result.success and bt_result.report_path:
-                    # Parse metrics
-                    metrics = self.report_parser.parse(bt_result.report_path)
-                    if metrics:
-                        roi_pct = 0.0
-                        if metrics.initial_deposit and metrics.initial_deposit > 0:
-                            roi_pct = (metrics.total_net_profit / metrics.initial_deposit) * 100.0
-                        results[symbol] = PairResult(
-                            symbol=symbol,
-                            success=True,
-                            profit_factor=metrics.profit_factor,
-                            total_profit=metrics.total_net_profit,
-                            roi_pct=roi_pct,
-                            max_drawdown_pct=metrics.max_drawdown_pct,
-                            win_rate=metrics.win_rate,
-                            total_trades=metrics.total_trades,
-                            sharpe_ratio=metrics.sharpe_ratio,
-                            recovery_factor=metrics.recovery_factor,
-                            history_quality=metrics.history_quality,
-                            bars=metrics.bars,
-                            ticks=metrics.ticks,
-                            initial_deposit=metrics.initial_deposit,
-                            report_path=str(bt_result.report_path),
-                            duration_seconds=time.time() - pair_start
-                        )
-                    else:
-                        results[symbol] = PairResult(
-                            symbol=symbol,
-                            success=False,
-                            error="Failed to parse report",
-                            duration_seconds=time.time() - pair_start
-                        )
-                else:
+            jobs.append(BacktestJob(
+                ea_name=ea_name,
+                symbol=symbol,
+                timeframe=timeframe,
+                from_date=from_date,
+                to_date=to_date,
+                run_dir=pair_dir,
+                inputs=self.inputs,
+                tag=symbol,
+            ))
+
+        pool = self.pool or WorkerPool.from_config(self.workers, timeout=self.timeout, journal=self.journal)
+        try:
+            futures = {job.symbol: pool.submit(job) for job in jobs}
+            results: Dict[str, PairResult] = {}
+            for symbol in pairs_to_test:
+                pair_start = time.time()
+                try:
+                    bt_result = futures[symbol].result()
+                    results[symbol] = self._pair_result(symbol, bt_result)
+                except Exception as e:
                     results[symbol] = PairResult(
                         symbol=symbol,
                         success=False,
-                        error=bt_result.error or "Backtest failed",
+                        error=str(e),
                         duration_seconds=time.time() - pair_start
                     )
-
-            except Exception as e:
-                results[symbol] = PairResult(
-                    symbol=symbol,
-                    success=False,
-                    error=str(e),
-                    duration_seconds=time.time() - pair_start
-                )
-
-            # Small delay between tests
-            time.sleep(2)
+        finally:
+            if self.pool is None:
+                pool.shutdown()
 
         # Calculate summary
         successful_pfs = [r.profit_factor for r in results.values() if r.success]
@@ -267,6 +243,47 @@ class MultiPairTester:
 
         return result
 
+    def _pair_result(self, symbol: str, bt_result: BacktestResult) -> PairResult:
+        """Parse a finished backtest into a PairResult."""
+        if not (bt_result.success and bt_result.report_path):
+            return PairResult(
+                symbol=symbol,
+                success=False,
+                error=bt_result.error or "Backtest failed",
+                duration_seconds=bt_result.duration_seconds
+            )
+
+        metrics = cached_metrics(bt_result.report_path) or self.report_parser.parse(bt_result.report_path)
+        if not metrics:
+            return PairResult(
+                symbol=symbol,
+                success=False,
+                error="Failed to parse report",
+                duration_seconds=bt_result.duration_seconds
+            )
+
+        roi_pct = 0.0
+        if metrics.initial_deposit and metrics.initial_deposit > 0:
+            roi_pct = (metrics.total_net_profit / metrics.initial_deposit) * 100.0
+        return PairResult(
+            symbol=symbol,
+            success=True,
+            profit_factor=metrics.profit_factor,
+            total_profit=metrics.total_net_profit,
+            roi_pct=roi_pct,
+            max_drawdown_pct=metrics.max_drawdown_pct,
+            win_rate=metrics.win_rate,
+            total_trades=metrics.total_trades,
+            sharpe_ratio=metrics.sharpe_ratio,
+            recovery_factor=metrics.recovery_factor,
+            history_quality=metrics.history_quality,
+            bars=metrics.bars,
+            ticks=metrics.ticks,
+            initial_deposit=metrics.initial_deposit,
+            report_path=str(bt_result.report_path),
+            duration_seconds=bt_result.duration_seconds
+        )
+
 
 def run_multipair_test(
     ea_name: str,
@@ -342,6 +359,11 @@ if __name__ == "__main__":
         "--params",
         help="EA parameters as JSON file path or inline JSON string"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Parallel MT5 workers (default: settings.workers.current_workers)"
+    )
 
     args = parser.parse_args()
 
@@ -354,7 +376,7 @@ if __name__ == "__main__":
     if inputs:
         print(f"Using custom parameters from: {args.params}")
 
-    tester = MultiPairTester(pairs=args.pairs, timeout_per_pair=args.timeout, inputs=inputs)
+    tester = MultiPairTester(pairs=args.pairs, timeout_per_pair=args.timeout, inputs=inputs, workers=args.workers)
     result = tester.test(
         ea_name=args.ea_name,
         primary_pair=args.primary,
@@ -0,0 +1,197 @@
+"""
+Live Optimization Streaming
+
+Ingests optimization passes while MT5 is still running, so results can be
+inspected (and hopeless runs aborted) long before the XML export exists.
+
+Passes are read from the tester logs via AgentLogTail. Each line of the form
+
+    ... pass 42 returned result 1082.41 in 0:00:07.894
+    ... genetic pass (3, 17) returned result 955.10 in 0:00:01.020
+
+becomes a PassRecord. "name=value" pairs on that line, or on the last line
+from the same log that mentions "inputs", are attached as its parameters.
+
+LiveOptimization keeps every pass in memory, tracks the running top-K and the
+best-so-far convergence curve, and atomically rewrites a JSON progress file
+the web UI polls (GET /api/optimizations/live). Creating the matching
+"<name>.abort" file (POST /api/optimizations/abort) asks the runner to stop.
+
+Usage:
+    live = LiveOptimization(MT5_TESTER_PATH, progress_path_for("EA_OPT"), agents_path=MT5_TESTER_AGENTS_PATH)
+    while process.poll() is None:
+        live.poll()
+        if live.abort_requested():
+            kill_process_tree(process.pid)
+        time.sleep(0.5)
+    live.finish("done")
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import OPT_LIVE_DIR
+from tester.opt_watcher import AgentLogTail
+
+_RESULT_RE = re.compile(
+    r"\bpass\s+\(?\s*(\d+)(?:\s*,\s*(\d+))?\s*\)?\s+returned result\s+(-?[\d.]+(?:[eE][-+]?\d+)?)",
+    re.IGNORECASE,
+)
+_PARAM_RE = re.compile(r"\b([A-Za-z_]\w*)=([^\s,;]+)")
+
+
+@dataclass
+class PassRecord:
+    """One finished optimization pass as seen in the tester logs."""
+    pass_id: str
+    result: float
+    params: Dict[str, str] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0  # since the stream started
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def progress_path_for(report_name: str) -> Path:
+    """Default progress file for an optimization report name."""
+    return OPT_LIVE_DIR / f"{Path(report_name).name}.progress.json"
+
+
+def abort_path_for(progress_path: Path) -> Path:
+    return progress_path.with_name(progress_path.name.replace(".progress.json", "") + ".abort")
+
+
+class PassLogParser:
+    """Turns tester log lines into PassRecords (keeps per-log parameter context)."""
+
+    def __init__(self) -> None:
+        self._inputs: Dict[Path, Dict[str, str]] = {}
+
+    def feed(self, log: Path, line: str, elapsed: float) -> Optional[PassRecord]:
+        m = _RESULT_RE.search(line)
+        if m is None:
+            if "inputs" in line.lower():
+                params = dict(_PARAM_RE.findall(line))
+                if params:
+                    self._inputs[log] = params
+            return None
+        try:
+            result = float(m.group(3))
+        except ValueError:
+            return None
+        params = dict(_PARAM_RE.findall(line[m.end():])) or self._inputs.pop(log, {})
+        pass_id = f"{m.group(1)},{m.group(2)}" if m.group(2) else m.group(1)
+        return PassRecord(pass_id=pass_id, result=result, params=params, elapsed_seconds=round(elapsed, 3))
+
+
+class LiveOptimization:
+    """In-memory pass table + progress file for one running optimization."""
+
+    def __init__(
+        self,
+        tester_path: Path,
+        progress_path: Path,
+        *,
+        agents_path: Optional[Path] = None,
+        top_k: int = 10,
+        maximize: bool = True,
+        label: str = "",
+        write_interval: float = 1.0,
+    ):
+        """
+        Args:
+            tester_path: <data>/Tester folder whose journal logs are tailed
+            agents_path: Folder with the Agent-* log folders (default: tester_path)
+            progress_path: JSON file rewritten as passes arrive
+            top_k: How many best passes to publish
+            maximize: Whether a larger result (optimization criterion) is better
+            label: Free-form name shown by the UI
+            write_interval: Minimum seconds between progress file rewrites
+        """
+        self.tail = AgentLogTail(tester_path, agents_path)
+        self.parser = PassLogParser()
+        self.progress_path = Path(progress_path)
+        self.abort_path = abort_path_for(self.progress_path)
+        self.top_k = max(1, int(top_k))
+        self.maximize = bool(maximize)
+        self.label = label
+        self.write_interval = float(write_interval)
+
+        self.started_at = time.time()
+        self.passes: Dict[str, PassRecord] = {}
+        self.best: Optional[PassRecord] = None
+        self.convergence: List[List[float]] = []  # [passes_done, best_result, elapsed_seconds] at each improvement
+        self.status = "running"
+        self._last_write = 0.0
+
+        if self.abort_path.exists():
+            self.abort_path.unlink()
+        self.write()
+
+    def _better(self, a: float, b: float) -> bool:
+        return a > b if self.maximize else a < b
+
+    def _on_line(self, log: Path, line: str) -> None:
+        rec = self.parser.feed(log, line, time.time() - self.started_at)
+        if rec is None or rec.pass_id in self.passes:
+            return
+        self.passes[rec.pass_id] = rec
+        if self.best is None or self._better(rec.result, self.best.result):
+            self.best = rec
+            self.convergence.append([len(self.passes), rec.result, rec.elapsed_seconds])
+
+    def poll(self, force_write: bool = False) -> int:
+        """Ingest new log lines; rewrites the progress file when due. Returns passes so far."""
+        self.tail.poll(on_line=self._on_line)
+        if force_write or time.time() - self._last_write >= self.write_interval:
+            self.write()
+        return len(self.passes)
+
+    def top(self, k: Optional[int] = None) -> List[PassRecord]:
+        k = k or self.top_k
+        pick = heapq.nlargest if self.maximize else heapq.nsmallest
+        return pick(k, self.passes.values(), key=lambda r: r.result)
+
+    def abort_requested(self) -> bool:
+        return self.abort_path.exists()
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = time.time() - self.started_at
+        curve = list(self.convergence)
+        if self.best is not None and (not curve or curve[-1][0] != len(self.passes)):
+            curve.append([len(self.passes), self.best.result, round(elapsed, 3)])
+        return {
+            "label": self.label,
+            "status": self.status,
+            "started_at": self.started_at,
+            "updated_at": time.time(),
+            "elapsed_seconds": round(elapsed, 3),
+            "passes_done": len(self.passes),
+            "maximize": self.maximize,
+            "best": self.best.to_dict() if self.best else None,
+            "top": [r.to_dict() for r in self.top()],
+            "convergence": curve,
+            "abort_file": str(self.abort_path),
+        }
+
+    def write(self) -> None:
+        """Atomically replace the progress file with the current snapshot."""
+        self.progress_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.progress_path.with_name(self.progress_path.name + ".tmp")
+        tmp.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+        os.replace(tmp, self.progress_path)
+        self._last_write = time.time()
+
+    def finish(self, status: str) -> None:
+        """Final ingest and write with a terminal status (done, aborted, failed, timeout)."""
+        self.tail.poll(on_line=self._on_line)
+        self.status = status
+        self.write()
@@ -0,0 +1,268 @@
+"""
+Optimization Completion Watcher
+
+Event-driven replacement for fixed-interval polling while MT5 optimizes:
+
+- ChangeWatcher wakes as soon as something changes in the watched folders
+  (inotify on Linux, FindFirstChangeNotification on Windows) and falls back
+  to fast polling elsewhere. Waits are capped at ~0.1 s, so process exit and
+  finished exports are noticed within about 100 ms either way.
+- FileSettle decides when an export is complete: non-empty, closing tag
+  present, and size/mtime unchanged for a short settle window.
+- AgentLogTail tails the tester logs (main + agents) to report how many
+  passes have finished while the optimization runs.
+
+Only the standard library is used (ctypes for the OS notification APIs).
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+MAX_WAIT_SECONDS = 0.1
+POLL_INTERVAL_SECONDS = 0.05
+
+
+class ChangeWatcher:
+    """
+    Wait for changes in a set of directories.
+
+    Usage:
+        with ChangeWatcher([data_path, tester_path]) as w:
+            while not done():
+                changed = w.wait(0.1)  # True if a folder changed
+    """
+
+    def __init__(self, dirs: Sequence[Path]):
+        self.dirs = [Path(d) for d in dirs if Path(d).is_dir()]
+        self.backend = "poll"
+        self._fd: Optional[int] = None
+        self._handles: List[int] = []
+        if sys.platform.startswith("linux"):
+            self._open_inotify()
+        elif sys.platform == "win32":
+            self._open_win32()
+
+    # Linux ----------------------------------------------------------------
+
+    _IN_MODIFY = 0x002
+    _IN_CLOSE_WRITE = 0x008
+    _IN_MOVED_TO = 0x080
+    _IN_CREATE = 0x100
+    _IN_NONBLOCK = 0o4000
+    _IN_CLOEXEC = 0o2000000
+
+    def _open_inotify(self) -> None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(self._IN_NONBLOCK | self._IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            return
+        mask = self._IN_MODIFY | self._IN_CLOSE_WRITE | self._IN_MOVED_TO | self._IN_CREATE
+        watched = [d for d in self.dirs if libc.inotify_add_watch(fd, os.fsencode(str(d)), mask) >= 0]
+        if not watched:
+            os.close(fd)
+            return
+        self._fd = fd
+        self.backend = "inotify"
+
+    # Windows --------------------------------------------------------------
+
+    _FILE_NOTIFY_CHANGE_FILE_NAME = 0x01
+    _FILE_NOTIFY_CHANGE_SIZE = 0x08
+    _FILE_NOTIFY_CHANGE_LAST_WRITE = 0x10
+    _WAIT_TIMEOUT = 0x102
+
+    def _open_win32(self) -> None:
+        try:
+            k32 = ctypes.WinDLL("kernel32", use_last_error=True)  # type: ignore[attr-defined]
+        except (OSError, AttributeError):
+            return
+        k32.FindFirstChangeNotificationW.restype = ctypes.c_void_p
+        k32.FindFirstChangeNotificationW.argtypes = [ctypes.c_wchar_p, ctypes.c_int, ctypes.c_uint32]
+        k32.FindNextChangeNotification.argtypes = [ctypes.c_void_p]
+        k32.FindCloseChangeNotification.argtypes = [ctypes.c_void_p]
+        k32.WaitForMultipleObjects.argtypes = [ctypes.c_uint32, ctypes.c_void_p, ctypes.c_int, ctypes.c_uint32]
+        k32.WaitForMultipleObjects.restype = ctypes.c_uint32
+        flags = self._FILE_NOTIFY_CHANGE_FILE_NAME | self._FILE_NOTIFY_CHANGE_SIZE | self._FILE_NOTIFY_CHANGE_LAST_WRITE
+        invalid = ctypes.c_void_p(-1).value
+        for d in self.dirs:
+            h = k32.FindFirstChangeNotificationW(str(d), False, flags)
+            if h and h != invalid:
+                self._handles.append(h)
+        if self._handles:
+            self._k32 = k32
+            self.backend = "win32"
+
+    # Common ---------------------------------------------------------------
+
+    def wait(self, timeout: float = MAX_WAIT_SECONDS) -> bool:
+        """Block until a watched folder changes or timeout elapses; True on change."""
+        timeout = max(0.0, min(timeout, MAX_WAIT_SECONDS))
+        if self._fd is not None:
+            ready, _, _ = select.select([self._fd], [], [], timeout)
+            if not ready:
+                return False
+            try:
+                while os.read(self._fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+            return True
+        if self._handles:
+            arr = (ctypes.c_void_p * len(self._handles))(*self._handles)
+            rc = self._k32.WaitForMultipleObjects(len(self._handles), arr, False, int(timeout * 1000))
+            if rc == self._WAIT_TIMEOUT or rc >= len(self._handles):
+                return False
+            self._k32.FindNextChangeNotification(self._handles[rc])
+            return True
+        time.sleep(min(timeout, POLL_INTERVAL_SECONDS))
+        return False
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        for h in self._handles:
+            self._k32.FindCloseChangeNotification(h)
+        self._handles = []
+
+    def __enter__(self) -> "ChangeWatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_CLOSING_TAGS = (b"</workbook>", b"</html>")
+
+
+def _has_closing_tag(path: Path) -> bool:
+    """True if the file ends with a SpreadsheetML/HTML closing tag (UTF-8 or UTF-16)."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 512))
+            tail = f.read()
+    except OSError:
+        return False
+    tail = tail.replace(b"\x00", b"").lower()
+    return any(tag in tail for tag in _CLOSING_TAGS)
+
+
+class FileSettle:
+    """Tracks candidate output files until one is complete and stable."""
+
+    def __init__(self, *, since: float, settle_seconds: float = 0.05, grace_seconds: float = 30.0):
+        """
+        Args:
+            since: Run start time; files last modified well before it are stale outputs
+            settle_seconds: How long size and mtime must stay unchanged
+            grace_seconds: Clock slack allowed when comparing mtimes with since
+        """
+        self.since = since - grace_seconds
+        self.settle_seconds = settle_seconds
+        self._seen: Dict[Path, Tuple[int, int, float]] = {}
+
+    def ready(self, path: Path) -> bool:
+        """True once path is fresh, non-empty, closed and unchanged for settle_seconds."""
+        try:
+            st = path.stat()
+        except OSError:
+            self._seen.pop(path, None)
+            return False
+        if st.st_size <= 0 or st.st_mtime < self.since:
+            return False
+        sig = (st.st_size, st.st_mtime_ns)
+        now = time.time()
+        prev = self._seen.get(path)
+        if prev is None or prev[:2] != sig:
+            self._seen[path] = (sig[0], sig[1], now)
+            return False
+        return now - prev[2] >= self.settle_seconds and _has_closing_tag(path)
+
+
+_PASS_RE = re.compile(r"\bpass\s+\(?\s*(\d+)(?:\s*,\s*(\d+))?\s*\)?\s+returned result", re.IGNORECASE)
+
+
+@dataclass
+class OptimizationProgress:
+    """Live progress read from the tester logs."""
+    passes_done: int = 0
+    last_line: str = ""
+
+
+class AgentLogTail:
+    """
+    Tails the Strategy Tester logs written during this run.
+
+    Reads the tester journal (<data>/Tester/logs/*.log) and the local agent
+    logs (<agents>/Agent-*/logs/*.log) as UTF-16LE, as MT5 writes them, from
+    where the last call stopped, and counts finished passes from lines like
+    "pass 42 returned result ..." (genetic: "pass (0, 42) ...").
+
+    Args:
+        tester_path: <data>/Tester folder (journal logs)
+        agents_path: Folder holding the Agent-* folders. The default terminal
+            keeps them under %APPDATA%\MetaQuotes\Tester\<id>
+            (config.MT5_TESTER_AGENTS_PATH); portable installs keep them in
+            their own Tester folder, which is the default.
+    """
+
+    def __init__(self, tester_path: Path, agents_path: Optional[Path] = None):
+        self.tester_path = Path(tester_path)
+        self.agents_path = Path(agents_path) if agents_path is not None else self.tester_path
+        self._passes: Set[Tuple[str, str]] = set()
+        self.progress = OptimizationProgress()
+        # Logs are per day and shared across runs: only read what this run appends.
+        self._offsets: Dict[Path, int] = {}
+        for log in self._log_files():
+            try:
+                self._offsets[log] = log.stat().st_size
+            except OSError:
+                continue
+
+    def _log_files(self) -> List[Path]:
+        return list(self.tester_path.glob("logs/*.log")) + list(self.agents_path.glob("Agent-*/logs/*.log"))
+
+    def poll(self, on_line: Optional[Callable[[Path, str], None]] = None) -> OptimizationProgress:
+        """Read new log lines (passing each to on_line) and return the updated progress."""
+        for log in self._log_files():
+            start = self._offsets.get(log, 0)
+            try:
+                with open(log, "rb") as f:
+                    if os.fstat(f.fileno()).st_size < start:
+                        start = 0  # truncated or replaced: read the new content from the top
+                    f.seek(start)
+                    data = f.read()
+            except OSError:
+                continue
+            end = data.rfind(b"\n\x00")
+            while end > 0 and end % 2:
+                end = data.rfind(b"\n\x00", 0, end)
+            if end < 0:
+                continue  # no complete line yet
+            data = data[: end + 2]
+            self._offsets[log] = start + len(data)
+            text = data.decode("utf-16-le", errors="ignore").lstrip("\ufeff")
+            for line in text.splitlines():
+                m = _PASS_RE.search(line)
+                if m:
+                    self._passes.add((m.group(1), m.group(2) or ""))
+                if line.strip():
+                    self.progress.last_line = line.strip()
+                    if on_line is not None:
+                        on_line(log, line)
+        self.progress.passes_done = len(self._passes)
+        return self.progress
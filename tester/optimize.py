@@ -2,19 +2,22 @@
 MT5 Optimization Runner
 Runs genetic optimization and parses results.
 """
+import asyncio
 import subprocess
 import time
 import re
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional
-import psutil
+from typing import Optional, Tuple
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import MT5_TERMINAL, MT5_DATA_PATH
+from config import MT5_TERMINAL, MT5_DATA_PATH, MT5_TESTER_AGENTS_PATH
 from .ini_generator import BacktestConfig, create_optimization_ini
+from .async_runner import EventCallback, emit, kill_process_tree, kill_terminal_instances, run_terminal, terminal_slot
+from .opt_stream import LiveOptimization, progress_path_for
+from .report_locator import expected_report_paths, wait_for_report
 
 # MT5 cache/results locations
 MT5_TESTER_CACHE = MT5_DATA_PATH / "Tester" / "cache"
@@ -42,6 +45,7 @@ class OptimizationOutput:
     error: Optional[str] = None
     duration_seconds: float = 0
     report_path: Optional[Path] = None
+    progress_path: Optional[Path] = None  # live progress file (see tester/opt_stream.py)
 
 
 class OptimizationRunner:
@@ -88,7 +92,163 @@ class OptimizationRunner:
             OptimizationOutput with best parameters
         """
         start_time = time.time()
+        run_dir, report_name, ini_path = self._prepare(
+            ea_name, symbol, timeframe, from_date, to_date, forward_date, fast_range, slow_range, run_dir
+        )
+
+        try:
+            # Kill any running MT5
+            self._kill_mt5_if_running()
+            time.sleep(1)
+
+            # Run terminal with optimization config
+            cmd = [str(self.terminal), f'/config:{ini_path}']
+
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+            # Wait for completion, streaming passes from the tester logs meanwhile
+            print(f"[DEBUG] Waiting for optimization with timeout={self.timeout}s ({self.timeout/60:.1f}min)")
+            live = self._live(report_name, ea_name, symbol, timeframe)
+            deadline = start_time + self.timeout
+            while True:
+                try:
+                    process.wait(timeout=0.5)
+                    break
+                except subprocess.TimeoutExpired:
+                    pass
+                live.poll()
+                stop = "aborted" if live.abort_requested() else ("timeout" if time.time() > deadline else None)
+                if stop:
+                    kill_process_tree(process.pid)
+                    live.finish(stop)
+                    return OptimizationOutput(
+                        success=False,
+                        results=[],
+                        error="Optimization aborted" if stop == "aborted" else "Optimization timed out",
+                        duration_seconds=time.time() - start_time,
+                        progress_path=live.progress_path,
+                    )
+            live.finish("done")
+
+            output = self._collect(ea_name, run_dir, report_name, start_time)
+            output.progress_path = live.progress_path
+            return output
+
+        except Exception as e:
+            return OptimizationOutput(
+                success=False,
+                results=[],
+                error=str(e),
+                duration_seconds=time.time() - start_time,
+            )
+
+    async def run_async(
+        self,
+        ea_name: str,
+        symbol: str = "EURUSD",
+        timeframe: str = "H1",
+        from_date: str = "2024.01.01",
+        to_date: str = "2024.09.01",
+        forward_date: str = None,
+        fast_range: tuple = (5, 5, 50),
+        slow_range: tuple = (20, 10, 200),
+        run_dir: Optional[Path] = None,
+        *,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        on_event: Optional[EventCallback] = None,
+    ) -> OptimizationOutput:
+        """
+        Async version of run(). The terminal runs as an asyncio subprocess;
+        cancelling the awaiting task kills its process tree (terminal + agents).
+        """
+        start_time = time.time()
+        label = f"{ea_name} OPT {symbol} {timeframe} {from_date}-{to_date}"
+        emit(on_event, "queued", label, start_time)
+        try:
+            run_dir, report_name, ini_path = self._prepare(
+                ea_name, symbol, timeframe, from_date, to_date, forward_date, fast_range, slow_range, run_dir
+            )
+            async with terminal_slot(self.terminal, semaphore):
+                await asyncio.to_thread(self._kill_mt5_if_running)
+                await asyncio.sleep(1)
+                live = self._live(report_name, ea_name, symbol, timeframe)
+                terminal = asyncio.create_task(run_terminal(
+                    [str(self.terminal), f'/config:{ini_path}'],
+                    timeout=self.timeout,
+                    label=label,
+                    start_time=start_time,
+                    on_event=on_event,
+                ))
+                watcher = asyncio.create_task(self._watch_live(live))
+                try:
+                    await asyncio.wait({terminal, watcher}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    watcher.cancel()
+                aborted = not terminal.done()
+                if aborted:
+                    terminal.cancel()  # kills the terminal's process tree
+                    await asyncio.gather(terminal, return_exceptions=True)
+                    emit(on_event, "cancelled", label, start_time, detail="aborted from progress file")
+                exit_info = None if aborted else terminal.result()
+            if aborted or exit_info.timed_out:
+                live.finish("aborted" if aborted else "timeout")
+                result = OptimizationOutput(
+                    success=False,
+                    results=[],
+                    error="Optimization aborted" if aborted else "Optimization timed out",
+                    duration_seconds=time.time() - start_time,
+                    progress_path=live.progress_path,
+                )
+            else:
+                live.finish("done")
+                result = await asyncio.to_thread(self._collect, ea_name, run_dir, report_name, start_time)
+                result.progress_path = live.progress_path
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result = OptimizationOutput(
+                success=False,
+                results=[],
+                error=str(e),
+                duration_seconds=time.time() - start_time,
+            )
+
+        emit(on_event, "done" if result.success else "failed", label, start_time, detail=result.error)
+        return result
+
+    def _live(self, report_name: str, ea_name: str, symbol: str, timeframe: str) -> LiveOptimization:
+        return LiveOptimization(
+            MT5_DATA_PATH / "Tester",
+            progress_path_for(report_name),
+            agents_path=MT5_TESTER_AGENTS_PATH,
+            label=f"{ea_name} {symbol} {timeframe}",
+        )
 
+    async def _watch_live(self, live: LiveOptimization, interval: float = 0.5) -> None:
+        """Stream passes until an abort is requested (cancelled when the terminal exits)."""
+        while True:
+            await asyncio.to_thread(live.poll)
+            if live.abort_requested():
+                return
+            await asyncio.sleep(interval)
+
+    def _prepare(
+        self,
+        ea_name: str,
+        symbol: str,
+        timeframe: str,
+        from_date: str,
+        to_date: str,
+        forward_date: Optional[str],
+        fast_range: tuple,
+        slow_range: tuple,
+        run_dir: Optional[Path],
+    ) -> Tuple[Path, str, Path]:
+        """Write the optimization INI; returns (run_dir, report_name, ini_path)."""
         if run_dir is None:
             run_dir = MT5_DATA_PATH / "Tester" / "reports"
         run_dir.mkdir(parents=True, exist_ok=True)
@@ -111,81 +271,45 @@ class OptimizationRunner:
 
         # Generate optimization INI (with forward test if forward_date provided)
         create_optimization_ini(config, ini_path, fast_range, slow_range, forward_date=forward_date)
+        return run_dir, report_name, ini_path
 
-        try:
-            # Kill any running MT5
-            self._kill_mt5_if_running()
-            time.sleep(1)
-
-            # Run terminal with optimization config
-            cmd = [str(self.terminal), f'/config:{ini_path}']
-
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-
-            # Wait for completion
-            print(f"[DEBUG] Waiting for optimization with timeout={self.timeout}s ({self.timeout/60:.1f}min)")
-            try:
-                process.wait(timeout=self.timeout)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                return OptimizationOutput(
-                    success=False,
-                    results=[],
-                    error="Optimization timed out",
-                    duration_seconds=time.time() - start_time,
-                )
-
-            # Wait for files to be written
-            time.sleep(3)
+    def _collect(self, ea_name: str, run_dir: Path, report_name: str, start_time: float) -> OptimizationOutput:
+        """After the terminal exits: wait for the XML/HTML report and parse it."""
+        wait_for_report(
+            expected_report_paths(report_name, MT5_DATA_PATH, extensions=(".xml", ".htm")),
+            label=report_name,
+        )
 
-            # Find and parse optimization results from XML
-            results = self._parse_optimization_results(ea_name, run_dir, report_name)
+        # Find and parse optimization results from XML
+        results = self._parse_optimization_results(ea_name, run_dir, report_name)
 
-            # Also try HTML report if no XML results
-            if not results:
-                report_path = MT5_DATA_PATH / f"{report_name}.htm"
-                if report_path.exists():
-                    results = self._parse_optimization_report(report_path)
+        # Also try HTML report if no XML results
+        if not results:
+            report_path = MT5_DATA_PATH / f"{report_name}.htm"
+            if report_path.exists():
+                results = self._parse_optimization_report(report_path)
 
-            if results:
-                # Sort by profit factor descending
-                results.sort(key=lambda x: x.profit_factor, reverse=True)
-                best = results[0] if results else None
+        if results:
+            # Sort by profit factor descending
+            results.sort(key=lambda x: x.profit_factor, reverse=True)
+            best = results[0] if results else None
 
-                return OptimizationOutput(
-                    success=True,
-                    results=results,
-                    best_result=best,
-                    duration_seconds=time.time() - start_time,
-                )
-            else:
-                return OptimizationOutput(
-                    success=False,
-                    results=[],
-                    error="No optimization results found",
-                    duration_seconds=time.time() - start_time,
-                )
-
-        except Exception as e:
             return OptimizationOutput(
-                success=False,
-                results=[],
-                error=str(e),
+                success=True,
+                results=results,
+                best_result=best,
                 duration_seconds=time.time() - start_time,
             )
+        return OptimizationOutput(
+            success=False,
+            results=[],
+            error="No optimization results found",
+            duration_seconds=time.time() - start_time,
+        )
 
     def _kill_mt5_if_running(self):
-        """Kill any running MT5 terminal processes."""
-        for proc in psutil.process_iter(['name']):
-            try:
-                if proc.info['name'] and 'terminal64' in proc.info['name'].lower():
-                    proc.kill()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
+        """Kill running instances of this runner's terminal (other installs are left alone)."""
+        kill_terminal_instances(self.terminal)
 
     def _parse_optimization_results(self, ea_name: str, run_dir: Path, report_name: str) -> list:
         """Parse optimization results from XML file."""
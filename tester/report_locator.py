@@ -0,0 +1,129 @@
+"""
+MT5 Report Locator
+
+Finds the report a tester run produced without guessing.
+
+MT5 writes `Report=<name>` relative to the terminal's data folder and appends
+the extension itself (.htm for single backtests, .xml for optimizations), so the
+path is known before the terminal even starts. After the process exits the file
+may still be flushing, so we wait for its size to stop changing, polling with
+exponential backoff under a tight deadline instead of a fixed sleep.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+
+@dataclass
+class LocatedReport:
+    """Outcome of waiting for a report."""
+    path: Optional[Path]
+    latency_seconds: float
+    error: Optional[str] = None
+
+    @property
+    def found(self) -> bool:
+        return self.path is not None
+
+
+def read_ini_report(ini_path: Path) -> Optional[str]:
+    """Return the [Tester] Report= value from an INI file, if set."""
+    section = ""
+    try:
+        lines = Path(ini_path).read_text(encoding="utf-8", errors="ignore").splitlines()
+    except OSError:
+        return None
+    for raw in lines:
+        line = raw.strip()
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1].strip().lower()
+            continue
+        if section == "tester" and line.lower().startswith("report="):
+            return line.split("=", 1)[1].strip() or None
+    return None
+
+
+def expected_report_paths(
+    report_name: str,
+    data_path: Path,
+    *,
+    extensions: Sequence[str] = (".htm", ".html"),
+    extra_dirs: Sequence[Path] = (),
+) -> List[Path]:
+    """
+    Exact candidate paths for a report name, most likely first.
+
+    `report_name` may be relative (resolved against data_path, like MT5 does) or
+    absolute. `extra_dirs` are only consulted with the same exact file name.
+    """
+    name = Path(report_name)
+    base = name if name.is_absolute() else Path(data_path) / name
+    if name.suffix.lower() in {e.lower() for e in extensions}:
+        primary = [base]
+        file_names = [name.name]
+    else:
+        primary = [base.with_name(base.name + ext) for ext in extensions]
+        file_names = [name.name + ext for ext in extensions]
+
+    out: List[Path] = list(primary)
+    for d in extra_dirs:
+        for fn in file_names:
+            p = Path(d) / fn
+            if p not in out:
+                out.append(p)
+    return out
+
+
+def wait_for_report(
+    candidates: Sequence[Path],
+    *,
+    deadline_seconds: float = 10.0,
+    initial_delay: float = 0.02,
+    max_delay: float = 0.5,
+    stable_polls: int = 2,
+    label: str = "report",
+    verbose: bool = True,
+) -> LocatedReport:
+    """
+    Wait until one of the candidate files exists with a stable, non-zero size.
+
+    Polls every candidate each round; the delay between rounds doubles from
+    `initial_delay` up to `max_delay`. A file counts as complete once its size
+    is unchanged for `stable_polls` consecutive rounds.
+    """
+    start = time.time()
+    deadline = start + max(0.0, deadline_seconds)
+    delay = max(0.001, initial_delay)
+    last_size: dict = {}
+    stable: dict = {}
+
+    while True:
+        for p in candidates:
+            try:
+                size = p.stat().st_size
+            except OSError:
+                continue
+            if size > 0 and last_size.get(p) == size:
+                stable[p] = stable.get(p, 0) + 1
+                if stable[p] >= stable_polls:
+                    latency = time.time() - start
+                    if verbose:
+                        print(f"[report] {label}: {p.name} ready after {latency:.2f}s", file=sys.stderr)
+                    return LocatedReport(path=p, latency_seconds=latency)
+            else:
+                stable[p] = 0
+            last_size[p] = size
+
+        now = time.time()
+        if now >= deadline:
+            latency = now - start
+            if verbose:
+                print(f"[report] {label}: not found after {latency:.2f}s", file=sys.stderr)
+            return LocatedReport(path=None, latency_seconds=latency, error="Report file not generated")
+        time.sleep(min(delay, max(0.0, deadline - now)))
+        delay = min(delay * 2, max_delay)
@@ -0,0 +1,497 @@
+"""
+Backtest Result Cache
+
+Content-addressed store for single backtest reports, shared by every module
+that goes through BacktestRunner.run (workflow steps, multi-pair, timeframes,
+walk-forward, dashboard passes).
+
+The key is a SHA-256 over everything that determines the tester output:
+the compiled EA (.ex5 bytes), the terminal (build = terminal64.exe bytes,
+account server from <data>/config/common.ini, which fixes the broker's
+symbol specs and history), symbol, timeframe, dates, model, deposit,
+currency, leverage, execution latency and the canonicalized inputs. An
+unchanged rerun is served from disk without launching MT5; identical
+installs (e.g. the portable workers) share entries.
+
+Layout (config.BACKTEST_CACHE_DIR):
+  ab/abcdef.../report.htm      MT5 report (original file name kept in meta)
+  ab/abcdef.../*.png           chart images that came with it
+  ab/abcdef.../parsed.json     parsed sidecar: metrics + trades
+  ab/abcdef.../meta.json       key payload, sizes, created/last_used
+  stats.json                   cumulative hits/misses/stores/evictions
+
+Eviction is least-recently-used, bounded by entry count and total size. The
+footprint is tracked in memory (rescanned every RESCAN_SECONDS to pick up
+other processes' stores), so entries are only scanned when over budget.
+Lifetime counters are written to stats.json at most every
+STATS_FLUSH_SECONDS and at exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import configparser
+import hashlib
+import json
+import math
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import BACKTEST_CACHE_DIR
+
+CACHE_VERSION = 2  # v2: terminal identity in the key
+SIDECAR_SUFFIX = ".parsed.json"
+STATS_FLUSH_SECONDS = 5.0
+RESCAN_SECONDS = 300.0
+
+_ex5_hashes: Dict[Tuple[str, int, int], str] = {}
+_ex5_lock = threading.Lock()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for one cache instance (this process)."""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    skipped: int = 0  # lookups that could not be keyed (EA binary not found)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total * 100 if total else 0.0
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["hit_rate"] = round(self.hit_rate, 1)
+        return d
+
+
+def find_ex5(ea_name: str, data_path: Path) -> Optional[Path]:
+    """Locate the compiled EA under <data_path>/MQL5/Experts (direct path first, then recursive)."""
+    experts = Path(data_path) / "MQL5" / "Experts"
+    direct = experts / f"{ea_name.replace(chr(92), '/')}.ex5"
+    if direct.exists():
+        return direct
+    if not experts.exists():
+        return None
+    stem = Path(ea_name.replace("\\", "/")).name
+    return next(iter(sorted(experts.rglob(f"{stem}.ex5"))), None)
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, memoized on (path, size, mtime)."""
+    st = path.stat()
+    memo_key = (str(path), st.st_size, st.st_mtime_ns)
+    with _ex5_lock:
+        cached = _ex5_hashes.get(memo_key)
+    if cached:
+        return cached
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _ex5_lock:
+        _ex5_hashes[memo_key] = digest
+    return digest
+
+
+def account_server(data_path: Path) -> str:
+    """Trade server the terminal is logged in to ([Common] Server= in config/common.ini), or ""."""
+    ini = Path(data_path) / "config" / "common.ini"
+    try:
+        raw = ini.read_bytes()
+    except OSError:
+        return ""
+    # MT5 writes its INI files as UTF-16 (null bytes between chars).
+    text = raw.decode("utf-16", errors="ignore") if b"\x00" in raw[:64] else raw.decode("utf-8", errors="ignore")
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    try:
+        parser.read_string(text.lstrip("\ufeff"))
+    except configparser.Error:
+        return ""
+    return parser.get("Common", "Server", fallback="").strip()
+
+
+def terminal_identity(terminal: Path, data_path: Path) -> Dict[str, str]:
+    """Key fields naming the terminal build and broker server a backtest ran on."""
+    terminal = Path(terminal)
+    try:
+        build = file_sha256(terminal)
+    except OSError:
+        build = str(terminal)  # not readable here: fall back to the install path
+    return {"build": build, "server": account_server(data_path)}
+
+
+def canonical_value(value: Any) -> str:
+    """
+    Canonical text for an input value, so 14, 14.0 and "14" share a key
+    (they produce the same INI line for MT5). Booleans stay distinct.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        f = float(value)
+    else:
+        text = str(value).strip()
+        try:
+            f = float(text)
+        except ValueError:
+            return text
+    if math.isfinite(f) and f == int(f):
+        return str(int(f))
+    return repr(f)
+
+
+def canonical_inputs(inputs: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    return {str(k): canonical_value(v) for k, v in sorted((inputs or {}).items(), key=lambda kv: str(kv[0]))}
+
+
+def cache_key_payload(config: Any, ex5_sha256: str, terminal: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Key fields from a BacktestConfig (inputs as InputParam list) and terminal_identity()."""
+    inputs = {p.name: p.default for p in (config.inputs or [])}
+    return {
+        "v": CACHE_VERSION,
+        "ex5": ex5_sha256,
+        "terminal": dict(terminal or {}),
+        "symbol": str(config.symbol).upper(),
+        "period": str(config.period).upper(),
+        "from": str(config.from_date),
+        "to": str(config.to_date),
+        "model": int(config.model),
+        "deposit": canonical_value(config.deposit),
+        "currency": str(config.currency).upper(),
+        "leverage": canonical_value(config.leverage),
+        "latency": int(config.latency),
+        "inputs": canonical_inputs(inputs),
+    }
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class BacktestCache:
+    """On-disk LRU cache of backtest reports keyed by cache_key()."""
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        *,
+        max_entries: int = 2000,
+        max_size_mb: float = 2048.0,
+    ):
+        self.root = Path(root) if root else BACKTEST_CACHE_DIR
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, int] = {}  # lifetime counters not yet in stats.json
+        self._last_flush = time.monotonic()
+        self._footprint: Optional[Tuple[int, int]] = None  # (entries, bytes)
+        self._scanned_at = 0.0
+        atexit.register(self.flush_stats)
+
+    # ------------------------------------------------------------------ lookup
+
+    def entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, key: str, run_dir: Path) -> Optional[Path]:
+        """
+        Restore a cached report (with images and parsed sidecar) into run_dir.
+
+        Returns the restored report path, or None on a miss.
+        """
+        entry = self.entry_dir(key)
+        meta = self._read_meta(entry)
+        report = entry / "report.htm"
+        if not meta or not report.exists():
+            self._count("misses")
+            return None
+
+        run_dir.mkdir(parents=True, exist_ok=True)
+        report_name = meta.get("report_name") or "report.htm"
+        dest = run_dir / report_name
+        shutil.copy2(report, dest)
+        for img in entry.glob("*.png"):
+            shutil.copy2(img, run_dir / img.name)
+        sidecar = entry / "parsed.json"
+        if sidecar.exists():
+            shutil.copy2(sidecar, sidecar_path(dest))
+
+        meta["last_used"] = time.time()
+        meta["hits"] = int(meta.get("hits", 0)) + 1
+        self._write_json(entry / "meta.json", meta)
+        self._count("hits")
+        return dest
+
+    def skip(self) -> None:
+        """Record a lookup that could not be keyed."""
+        self._count("skipped")
+
+    # ------------------------------------------------------------------- store
+
+    def put(self, key: str, payload: Dict[str, Any], report_path: Path) -> bool:
+        """Store a finished report (plus images and a parsed sidecar) under key."""
+        entry = self.entry_dir(key)
+        if (entry / "meta.json").exists():
+            return True
+
+        tmp = self.root / f".tmp-{key[:12]}-{uuid.uuid4().hex[:8]}"
+        try:
+            tmp.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(report_path, tmp / "report.htm")
+            for img in report_path.parent.glob(f"{report_path.stem}*.png"):
+                shutil.copy2(img, tmp / img.name)
+
+            parsed = parse_sidecar(report_path)
+            if parsed is not None:
+                self._write_json(tmp / "parsed.json", parsed)
+                self._write_json(sidecar_path(report_path), parsed)
+
+            now = time.time()
+            size = sum(p.stat().st_size for p in tmp.iterdir() if p.is_file())
+            self._write_json(tmp / "meta.json", {
+                "key": key,
+                "payload": payload,
+                "report_name": report_path.name,
+                "size_bytes": size,
+                "created": now,
+                "last_used": now,
+                "hits": 0,
+            })
+
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                # Another worker stored the same key first.
+                shutil.rmtree(tmp, ignore_errors=True)
+                return entry.exists()
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return False
+
+        self._count("stores")
+        self._track_store(size)
+        return True
+
+    # ---------------------------------------------------------------- eviction
+
+    def entries(self) -> List[Tuple[Path, Dict[str, Any]]]:
+        out: List[Tuple[Path, Dict[str, Any]]] = []
+        if not self.root.exists():
+            return out
+        for shard in self.root.iterdir():
+            if not shard.is_dir() or shard.name.startswith("."):
+                continue
+            for entry in shard.iterdir():
+                meta = self._read_meta(entry)
+                if meta:
+                    out.append((entry, meta))
+        return out
+
+    def _track_store(self, size: int) -> None:
+        """Add a stored entry to the tracked footprint; evict only when over budget."""
+        over = False
+        with self._lock:
+            stale = self._footprint is None or time.monotonic() - self._scanned_at >= RESCAN_SECONDS
+            if not stale:
+                count, total = self._footprint
+                self._footprint = (count + 1, total + int(size))
+                over = self._footprint[0] > self.max_entries or self._footprint[1] > self.max_bytes
+        if stale or over:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until both limits hold. Returns entries removed."""
+        entries = self.entries()
+        total = sum(int(m.get("size_bytes", 0)) for _, m in entries)
+        with self._lock:
+            self._footprint = (len(entries), total)
+            self._scanned_at = time.monotonic()
+        if len(entries) <= self.max_entries and total <= self.max_bytes:
+            return 0
+
+        entries.sort(key=lambda em: float(em[1].get("last_used", 0)))
+        removed = 0
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            entry, meta = entries.pop(0)
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= int(meta.get("size_bytes", 0))
+            removed += 1
+        with self._lock:
+            self._footprint = (len(entries), total)
+        if removed:
+            self._count("evictions", removed)
+        return removed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+        with self._lock:
+            self._footprint = None
+            self._pending.clear()
+
+    # ------------------------------------------------------------------- stats
+
+    def summary(self) -> Dict[str, Any]:
+        """Session counters, cumulative counters, and current footprint."""
+        self.flush_stats()
+        entries = self.entries()
+        return {
+            "root": str(self.root),
+            "session": self.stats.to_dict(),
+            "lifetime": self._read_json(self.root / "stats.json") or {},
+            "entries": len(entries),
+            "size_mb": round(sum(int(m.get("size_bytes", 0)) for _, m in entries) / (1024 * 1024), 2),
+            "max_entries": self.max_entries,
+            "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+        }
+
+    def _count(self, field_name: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self.stats, field_name, getattr(self.stats, field_name) + n)
+            self._pending[field_name] = self._pending.get(field_name, 0) + n
+            due = time.monotonic() - self._last_flush >= STATS_FLUSH_SECONDS
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self) -> None:
+        """Add the pending counters to stats.json."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            if not pending:
+                return
+            path = self.root / "stats.json"
+            lifetime = self._read_json(path) or {}
+            for field_name, n in pending.items():
+                lifetime[field_name] = int(lifetime.get(field_name, 0)) + n
+            try:
+                self.root.mkdir(parents=True, exist_ok=True)
+                self._write_json(path, lifetime)
+            except OSError:
+                pass
+
+    # ---------------------------------------------------------------- helpers
+
+    def _read_meta(self, entry: Path) -> Optional[Dict[str, Any]]:
+        return self._read_json(entry / "meta.json")
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path: Path, data: Any) -> None:
+        tmp = path.with_name(path.name + f".{uuid.uuid4().hex[:6]}.tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+def sidecar_path(report_path: Path) -> Path:
+    return report_path.with_name(report_path.stem + SIDECAR_SUFFIX)
+
+
+def parse_sidecar(report_path: Path) -> Optional[Dict[str, Any]]:
+    """Parse a report once into {metrics, trades} for the sidecar."""
+    from parser.report import ReportParser
+    from parser.trade_extractor import extract_trades
+
+    try:
+        metrics = ReportParser().parse(report_path)
+        trades = extract_trades(str(report_path))
+    except Exception:
+        return None
+    return {
+        "metrics": metrics.to_dict() if metrics else None,
+        "trades": trades.to_dict(),
+    }
+
+
+def load_parsed(report_path: Path) -> Optional[Dict[str, Any]]:
+    """Read the parsed sidecar written next to a report, if any."""
+    return BacktestCache._read_json(sidecar_path(Path(report_path)))
+
+
+def cached_metrics(report_path: Path):
+    """BacktestMetrics from the sidecar, or None (callers fall back to ReportParser)."""
+    from parser.report import BacktestMetrics
+
+    parsed = load_parsed(report_path)
+    data = (parsed or {}).get("metrics")
+    if not data:
+        return None
+    fields = BacktestMetrics.__dataclass_fields__
+    return BacktestMetrics(**{k: v for k, v in data.items() if k in fields})
+
+
+def cached_trades(report_path: Path):
+    """TradeExtractionResult from the sidecar, or None (callers fall back to extract_trades)."""
+    from parser.trade_extractor import Trade, TradeExtractionResult
+
+    parsed = load_parsed(report_path)
+    data = (parsed or {}).get("trades")
+    if not data:
+        return None
+    trade_fields = Trade.__dataclass_fields__
+    return TradeExtractionResult(
+        success=bool(data.get("success")),
+        trades=[Trade(**{k: v for k, v in t.items() if k in trade_fields}) for t in data.get("trades", [])],
+        total_profit=float(data.get("total_profit", 0.0)),
+        total_commission=float(data.get("total_commission", 0.0)),
+        total_swap=float(data.get("total_swap", 0.0)),
+        initial_balance=float(data.get("initial_balance", 0.0)),
+        final_balance=float(data.get("final_balance", 0.0)),
+        total_net_profit=float(data.get("total_net_profit", 0.0)),
+        error=data.get("error"),
+    )
+
+
+_default_cache: Optional[BacktestCache] = None
+_default_lock = threading.Lock()
+
+
+def get_backtest_cache() -> Optional[BacktestCache]:
+    """Process-wide cache configured from settings.backtest_cache (None when disabled)."""
+    global _default_cache
+    from settings import get_settings
+
+    cfg = get_settings().backtest_cache
+    if not cfg.enabled:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = BacktestCache(max_entries=cfg.max_entries, max_size_mb=cfg.max_size_mb)
+        return _default_cache
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Inspect or manage the backtest result cache")
+    ap.add_argument("--clear", action="store_true", help="Delete all cached backtests")
+    ap.add_argument("--evict", action="store_true", help="Apply the size/entry limits now")
+    args = ap.parse_args()
+
+    cache = get_backtest_cache() or BacktestCache()
+    if args.clear:
+        cache.clear()
+    elif args.evict:
+        print(f"Evicted {cache.evict()} entries")
+    print(json.dumps(cache.summary(), indent=2))
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Stub MT5 terminal for exercising the tester plumbing without MetaTrader.
+
+Behaves like `terminal64.exe /config:<ini> [/portable]` as far as the runners
+care: reads the [Tester] section, "runs" for a while, writes an MT5-style HTML
+report (UTF-16) named after `Report=` into its data folder, and exits.
+
+Data folder:
+  - /portable              -> folder containing this executable (like MT5 portable mode)
+  - STUB_TERMINAL_DATA env -> that folder
+  - otherwise              -> current working directory
+
+Environment knobs:
+  STUB_TERMINAL_RUN_SECONDS  simulated backtest duration (default 0.2)
+  STUB_TERMINAL_REPORT       path of a canned report to copy instead of generating one
+  STUB_TERMINAL_TRADES       number of trades in generated reports (default 60)
+  STUB_TERMINAL_REPORT_DELAY seconds after the terminal exits before the report appears
+                             (written by a detached child, like a slow disk flush)
+  STUB_TERMINAL_WRITE_SECONDS spread the report write over this many seconds (growing file)
+  STUB_TERMINAL_PASS_SECONDS per-pass duration in optimization/batch mode (default 0.02)
+  STUB_TERMINAL_MAX_PASSES   cap on grid passes in optimization mode (default 500)
+  STUB_TERMINAL_COMMON       Common\Files folder for batch tables (default <data>/Common/Files)
+
+Optimization mode (Optimization=1/2 in [Tester]): every combination of the
+"||Y" input ranges is a pass. Each pass appends an "inputs:" line and a
+"pass N returned result R in T" line to <data>/Tester/logs/YYYYMMDD.log
+(UTF-16LE, like MT5), so live log ingestion can be exercised; the
+SpreadsheetML <Report>.xml is written at the end.
+
+Batch mode (tester/batch.py): an optimization INI over BatchPassIndex behaves
+like an EA built with SimpleEA_Batch.mqh: each index loads its row from
+BatchFile, the pass's trades go to pass_<index>.csv next to it, and a
+SpreadsheetML <Report>.xml lists one row per pass. A pass produces exactly the
+trades a single backtest with the same inputs would.
+
+Generated reports are deterministic per (symbol, period, dates, inputs), so
+identical configs produce identical results.
+
+Linux example (worker pool):
+  mkdir -p MT5_Workers/worker_1 && cp tester/stub_terminal.py MT5_Workers/worker_1/terminal64
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+def read_ini(ini_path: Path) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Return ([Tester] key/values, [TesterInputs] name -> default value)."""
+    tester: Dict[str, str] = {}
+    inputs: Dict[str, str] = {}
+    section = ""
+    for raw in ini_path.read_text(encoding="utf-8", errors="ignore").splitlines():
+        line = raw.strip()
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1].strip().lower()
+            continue
+        if "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        if section == "tester":
+            tester[key.strip()] = value.strip()
+        elif section == "testerinputs":
+            inputs[key.strip()] = value.split("||", 1)[0].strip()
+    return tester, inputs
+
+
+def _fmt(x: float) -> str:
+    return f"{x:.2f}"
+
+
+def _deals(tester: Dict[str, str], inputs: Dict[str, str], n_trades: int) -> Tuple[float, List[Tuple]]:
+    seed_src = "|".join(
+        [tester.get(k, "") for k in ("Symbol", "Period", "FromDate", "ToDate", "Model")]
+        + [f"{k}={v}" for k, v in sorted(inputs.items())]
+    )
+    rng = random.Random(int(hashlib.sha256(seed_src.encode("utf-8")).hexdigest()[:16], 16))
+    deposit = float(tester.get("Deposit") or 3000)
+    symbol = tester.get("Symbol") or "EURUSD"
+
+    start = datetime.strptime(tester.get("FromDate") or "2024.01.01", "%Y.%m.%d")
+    end = datetime.strptime(tester.get("ToDate") or "2024.12.01", "%Y.%m.%d")
+    span = max(1.0, (end - start).total_seconds())
+
+    edge = rng.uniform(-4.0, 8.0)
+    times = sorted(start + timedelta(seconds=rng.uniform(0, span)) for _ in range(n_trades * 2))
+
+    rows: List[Tuple] = [(start.strftime("%Y.%m.%d %H:%M:%S"), 1, "", "balance", "", "", "", "", 0.0, 0.0, deposit, deposit, "")]
+    balance = deposit
+    deal = 2
+    for i in range(n_trades):
+        t_in, t_out = times[2 * i], times[2 * i + 1]
+        side = "buy" if rng.random() < 0.5 else "sell"
+        exit_side = "sell" if side == "buy" else "buy"
+        price = round(1.1 + rng.uniform(-0.05, 0.05), 5)
+        profit = round(rng.gauss(edge, 40.0), 2)
+        commission = -0.7
+        rows.append((t_in.strftime("%Y.%m.%d %H:%M:%S"), deal, symbol, side, "in", "0.10", _fmt(price), deal, commission, 0.0, 0.0, balance + commission, ""))
+        balance += commission
+        deal += 1
+        balance += profit + commission
+        rows.append((t_out.strftime("%Y.%m.%d %H:%M:%S"), deal, symbol, exit_side, "out", "0.10", _fmt(price), deal, commission, 0.0, profit, balance, ""))
+        deal += 1
+    return deposit, rows
+
+
+def _stats(deposit: float, rows: List[Tuple]) -> Dict[str, float]:
+    nets: List[float] = []
+    prev = deposit
+    peak = deposit
+    max_dd = 0.0
+    max_dd_pct = 0.0
+    for r in rows[1:]:
+        bal = float(r[11])
+        if r[4] == "out":
+            nets.append(bal - prev)
+            prev = bal
+        peak = max(peak, bal)
+        if peak - bal > max_dd:
+            max_dd = peak - bal
+            max_dd_pct = max_dd / peak * 100 if peak > 0 else 0.0
+    gross_profit = sum(x for x in nets if x > 0)
+    gross_loss = sum(x for x in nets if x < 0)
+    net = gross_profit + gross_loss
+    pf = gross_profit / abs(gross_loss) if gross_loss else 0.0
+    wins = sum(1 for x in nets if x > 0)
+    return {
+        "net": net,
+        "gross_profit": gross_profit,
+        "gross_loss": gross_loss,
+        "pf": pf,
+        "max_dd": max_dd,
+        "max_dd_pct": max_dd_pct,
+        "trades": len(nets),
+        "wins": wins,
+        "expected_payoff": net / len(nets) if nets else 0.0,
+        "recovery": net / max_dd if max_dd else 0.0,
+    }
+
+
+def render_report(tester: Dict[str, str], inputs: Dict[str, str], n_trades: int) -> str:
+    deposit, rows = _deals(tester, inputs, n_trades)
+    closes = [r for r in rows if r[4] == "out"]
+    st = _stats(deposit, rows)
+    n, wins = int(st["trades"]), int(st["wins"])
+    max_dd, max_dd_pct = st["max_dd"], st["max_dd_pct"]
+
+    def kv(label: str, value: str) -> str:
+        return f'<tr><td nowrap>{label}:</td>\n<td nowrap><b>{value}</b></td></tr>\n'
+
+    summary = "".join([
+        kv("History Quality", "100%"),
+        kv("Bars", "6000"),
+        kv("Ticks", "240000"),
+        kv("Initial Deposit", _fmt(deposit)),
+        kv("Total Net Profit", _fmt(st["net"])),
+        kv("Gross Profit", _fmt(st["gross_profit"])),
+        kv("Gross Loss", _fmt(st["gross_loss"])),
+        kv("Profit Factor", _fmt(st["pf"])),
+        kv("Expected Payoff", _fmt(st["expected_payoff"])),
+        kv("Recovery Factor", _fmt(st["recovery"])),
+        kv("Sharpe Ratio", "0.00"),
+        kv("Balance Drawdown Maximal", f"{_fmt(max_dd)} ({max_dd_pct:.2f}%)"),
+        kv("Balance Drawdown Relative", f"{max_dd_pct:.2f}% ({_fmt(max_dd)})"),
+        kv("Total Trades", str(len(closes))),
+        kv("Profit Trades (% of total)", f"{wins} ({(wins / n * 100 if n else 0):.2f}%)"),
+        kv("Loss Trades (% of total)", f"{n - wins} ({((n - wins) / n * 100 if n else 0):.2f}%)"),
+    ])
+
+    deal_rows = "".join(
+        "<tr>" + "".join(f"<td>{c if not isinstance(c, float) else _fmt(c)}</td>" for c in r) + "</tr>\n"
+        for r in rows
+    )
+    return (
+        "<html><head><title>Strategy Tester Report</title></head><body>\n"
+        f"<table>\n{summary}</table>\n"
+        "<table>\n<tr><th>Time</th><th>Deal</th><th>Symbol</th><th>Type</th><th>Direction</th><th>Volume</th>"
+        "<th>Price</th><th>Order</th><th>Commission</th><th>Swap</th><th>Profit</th><th>Balance</th><th>Comment</th></tr>\n"
+        f"{deal_rows}</table>\n</body></html>\n"
+    )
+
+
+def read_input_ranges(ini_path: Path) -> Dict[str, Tuple[float, float, float, bool]]:
+    """[TesterInputs] name -> (min, step, max, optimize) for "v||min||step||max||Y" lines."""
+    ranges: Dict[str, Tuple[float, float, float, bool]] = {}
+    section = ""
+    for raw in ini_path.read_text(encoding="utf-8", errors="ignore").splitlines():
+        line = raw.strip()
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1].strip().lower()
+            continue
+        if section != "testerinputs" or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        parts = value.split("||")
+        if len(parts) == 5:
+            try:
+                ranges[key.strip()] = (float(parts[1]), float(parts[2]), float(parts[3]), parts[4].strip().upper() == "Y")
+            except ValueError:
+                continue
+    return ranges
+
+
+def _xml_cell(value) -> str:
+    kind = "Number" if isinstance(value, (int, float)) else "String"
+    return f'<Cell><Data ss:Type="{kind}">{value}</Data></Cell>'
+
+
+class _TesterLog:
+    """Appends MT5-style journal lines to <data>/Tester/logs/YYYYMMDD.log (UTF-16LE)."""
+
+    def __init__(self, data_dir: Path):
+        self.path = data_dir / "Tester" / "logs" / f"{datetime.now():%Y%m%d}.log"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            self.path.write_bytes(b"\xff\xfe")
+
+    def write(self, source: str, message: str) -> None:
+        now = datetime.now()
+        line = f"CS\t0\t{now:%H:%M:%S}.{now.microsecond // 1000:03d}\t{source}\t{message}\r\n"
+        with open(self.path, "ab") as f:
+            f.write(line.encode("utf-16-le"))
+
+    def log_pass(self, tester: Dict[str, str], pass_num: int, params: Dict[str, str], result: float, seconds: float) -> None:
+        where = f"{tester.get('Symbol', '')},{tester.get('Period', '')}"
+        self.write("Core 1", f"{where}: pass {pass_num} inputs: " + ", ".join(f"{k}={v}" for k, v in params.items()))
+        self.write("Core 1", f"pass {pass_num} returned result {result:.2f} in 0:00:{seconds:06.3f}")
+
+
+def _write_xml(dest: Path, xml_rows: List[str]) -> None:
+    dest.write_text(
+        '<?xml version="1.0"?>\n'
+        '<Workbook xmlns="urn:schemas-microsoft-com:office:spreadsheet" '
+        'xmlns:ss="urn:schemas-microsoft-com:office:spreadsheet">\n'
+        '<Worksheet ss:Name="Tester Optimizator Results"><Table>\n'
+        + "\n".join(xml_rows)
+        + "\n</Table></Worksheet></Workbook>\n",
+        encoding="utf-8",
+    )
+
+
+def _range_values(lo: float, step: float, hi: float) -> List[str]:
+    if step <= 0 or hi < lo:
+        return [_num(lo)]
+    n = int(round((hi - lo) / step)) + 1
+    return [_num(lo + i * step) for i in range(n)]
+
+
+def _num(x: float) -> str:
+    return str(int(x)) if float(x).is_integer() else f"{x:g}"
+
+
+_RESULT_HEADER = ["Pass", "Result", "Profit", "Expected Payoff", "Profit Factor", "Recovery Factor",
+                  "Sharpe Ratio", "Custom", "Equity DD %", "Trades"]
+
+
+def _result_values(pass_num: int, st: Dict[str, float]) -> list:
+    return [pass_num, round(st["net"], 2), round(st["net"], 2), round(st["expected_payoff"], 2), round(st["pf"], 2),
+            round(st["recovery"], 2), 0.0, 0.0, round(st["max_dd_pct"], 2), int(st["trades"])]
+
+
+def run_grid(
+    tester: Dict[str, str],
+    inputs: Dict[str, str],
+    ranges: Dict[str, Tuple[float, float, float, bool]],
+    dest: Path,
+    data_dir: Path,
+    n_trades: int,
+) -> None:
+    """Emulate a complete optimization over the "||Y" input ranges."""
+    optimized = {k: _range_values(lo, step, hi) for k, (lo, step, hi, on) in ranges.items() if on}
+    names = list(inputs)
+    max_passes = int(os.environ.get("STUB_TERMINAL_MAX_PASSES", "500"))
+    pass_seconds = float(os.environ.get("STUB_TERMINAL_PASS_SECONDS", "0.02"))
+    log = _TesterLog(data_dir)
+
+    xml_rows = ["<Row>" + "".join(_xml_cell(h) for h in _RESULT_HEADER + names) + "</Row>"]
+    combos: List[Dict[str, str]] = [dict(inputs)]
+    for name, values in optimized.items():
+        combos = [{**c, name: v} for c in combos for v in values]
+    for pass_num, params in enumerate(combos[:max_passes]):
+        deposit, rows = _deals(tester, params, n_trades)
+        st = _stats(deposit, rows)
+        time.sleep(pass_seconds)
+        log.log_pass(tester, pass_num, {k: params[k] for k in optimized}, st["net"], pass_seconds)
+        xml_rows.append("<Row>" + "".join(_xml_cell(v) for v in _result_values(pass_num, st) + [params.get(k, "") for k in names]) + "</Row>")
+    _write_xml(dest, xml_rows)
+
+
+def run_batch(
+    tester: Dict[str, str],
+    inputs: Dict[str, str],
+    ranges: Dict[str, Tuple[float, float, float, bool]],
+    dest: Path,
+    common_dir: Path,
+    n_trades: int,
+    data_dir: Path,
+) -> None:
+    """Emulate an EA using SimpleEA_Batch.mqh under a slow-complete optimization."""
+    lo, step, hi, _ = ranges["BatchPassIndex"]
+    table = common_dir / inputs.get("BatchFile", "").replace("\\", "/")
+    sets: Dict[int, Dict[str, str]] = {}
+    for line in table.read_text(encoding="ascii", errors="ignore").splitlines():
+        cells = line.strip().split(";")
+        if not cells or not cells[0].strip().isdigit():
+            continue
+        sets[int(cells[0])] = dict(c.split("=", 1) for c in cells[1:] if "=" in c)
+
+    fixed = {k: v for k, v in inputs.items() if k not in ("BatchPassIndex", "BatchFile")}
+    param_names = list(fixed) + ["BatchPassIndex"]
+    header = _RESULT_HEADER + param_names
+    log = _TesterLog(data_dir)
+    xml_rows = ["<Row>" + "".join(_xml_cell(h) for h in header) + "</Row>"]
+
+    pass_seconds = float(os.environ.get("STUB_TERMINAL_PASS_SECONDS", "0.02"))
+    idx = int(lo)
+    pass_num = 0
+    while idx <= int(hi):
+        params = dict(fixed)
+        params.update(sets.get(idx, {}))
+        deposit, rows = _deals(tester, params, n_trades)
+        st = _stats(deposit, rows)
+
+        # Trades export, as BatchExportTrades() writes it
+        lines = ["deal;time;symbol;direction;volume;entry_price;exit_price;commission;swap;profit;entry_time"]
+        for r_in, r_out in zip(rows[1::2], rows[2::2]):
+            lines.append(";".join([
+                str(r_out[1]), r_out[0], r_out[2], r_in[3], r_out[5], r_in[6], r_out[6],
+                _fmt(r_in[8] + r_out[8]), _fmt(r_out[9]), _fmt(r_out[10]), r_in[0],
+            ]))
+        (table.parent / f"pass_{idx}.csv").write_text("\r\n".join(lines) + "\r\n", encoding="ascii")
+
+        values = _result_values(pass_num, st) + [params.get(k, "") for k in fixed] + [idx]
+        xml_rows.append("<Row>" + "".join(_xml_cell(v) for v in values) + "</Row>")
+        time.sleep(pass_seconds)
+        log.log_pass(tester, pass_num, {"BatchPassIndex": str(idx)}, st["net"], pass_seconds)
+        idx += max(1, int(step))
+        pass_num += 1
+
+    _write_xml(dest, xml_rows)
+
+
+def main(argv: List[str]) -> int:
+    config = next((a.split(":", 1)[1] for a in argv if a.lower().startswith("/config:")), None)
+    if not config:
+        print("usage: stub_terminal /config:<ini> [/portable]", file=sys.stderr)
+        return 2
+
+    if any(a.lower() == "/portable" for a in argv):
+        data_dir = Path(sys.argv[0]).resolve().parent
+    else:
+        data_dir = Path(os.environ.get("STUB_TERMINAL_DATA") or Path.cwd())
+
+    tester, inputs = read_ini(Path(config))
+    time.sleep(float(os.environ.get("STUB_TERMINAL_RUN_SECONDS", "0.2")))
+
+    report = tester.get("Report")
+    if not report:
+        return 0
+    n_trades = int(os.environ.get("STUB_TERMINAL_TRADES", "60"))
+    ranges = read_input_ranges(Path(config))
+    if tester.get("Optimization", "0") != "0":
+        dest = data_dir / f"{report}.xml"
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if "BatchPassIndex" in ranges:
+            common_dir = Path(os.environ.get("STUB_TERMINAL_COMMON") or data_dir / "Common" / "Files")
+            run_batch(tester, inputs, ranges, dest, common_dir, n_trades, data_dir)
+        else:
+            run_grid(tester, inputs, ranges, dest, data_dir, n_trades)
+        return 0
+
+    dest = data_dir / f"{report}.htm"
+    dest.parent.mkdir(parents=True, exist_ok=True)
+
+    canned = os.environ.get("STUB_TERMINAL_REPORT")
+    if canned:
+        payload = Path(canned).read_bytes()
+    else:
+        payload = render_report(tester, inputs, n_trades).encode("utf-16")
+
+    delay = float(os.environ.get("STUB_TERMINAL_REPORT_DELAY", "0") or 0)
+    write_seconds = float(os.environ.get("STUB_TERMINAL_WRITE_SECONDS", "0") or 0)
+    if delay > 0:
+        # Exit now; a detached child writes the report later.
+        staged = dest.with_name(dest.name + ".stub")
+        staged.write_bytes(payload)
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--deferred-write", str(staged), str(dest), str(delay), str(write_seconds)],
+            start_new_session=True,
+        )
+        return 0
+
+    write_report(dest, payload, write_seconds)
+    return 0
+
+
+def write_report(dest: Path, payload: bytes, write_seconds: float = 0.0, chunks: int = 8) -> None:
+    """Write payload to dest, optionally in chunks spread over write_seconds."""
+    if write_seconds <= 0:
+        dest.write_bytes(payload)
+        return
+    step = max(1, -(-len(payload) // chunks))
+    with open(dest, "wb") as f:
+        for i in range(0, len(payload), step):
+            f.write(payload[i:i + step])
+            f.flush()
+            time.sleep(write_seconds / chunks)
+
+
+def deferred_write(argv: List[str]) -> int:
+    staged, dest, delay, write_seconds = Path(argv[0]), Path(argv[1]), float(argv[2]), float(argv[3])
+    time.sleep(delay)
+    payload = staged.read_bytes()
+    staged.unlink()
+    write_report(dest, payload, write_seconds)
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--deferred-write":
+        sys.exit(deferred_write(sys.argv[2:]))
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,167 @@
+"""
+Offline Trade Slicing
+
+Computes backtest metrics for any date window from the trade list of ONE
+full-period backtest, instead of launching MT5 once per window. Used by the
+offline walk-forward mode, where every IS/OOS fold becomes a pair of binary
+searches on the sorted trade times.
+
+Windows are half-open, [from_date 00:00, to_date 00:00), so adjacent windows
+(IS ending where OOS starts) never count a trade twice.
+
+A trade that opens before a window boundary and closes after it "straddles"
+the boundary. STRADDLE_POLICIES decides where it goes:
+- exit:  by close time, i.e. where its profit is realized (default)
+- entry: by open time, i.e. where the decision to trade was made
+- drop:  only trades fully inside the window count
+
+Each window is scored as a fresh account at the full run's initial deposit.
+This approximates separate MT5 runs: MT5 force-closes open positions at the
+end of a test, and indicator warm-up at the start of a window differs, so
+the numbers are close but not identical to per-window backtests.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from parser.report import BacktestMetrics, ReportParser
+from parser.trade_extractor import Trade, extract_trades
+
+STRADDLE_POLICIES = ("exit", "entry", "drop")
+
+
+def _bound(ymd: str) -> str:
+    """Window bound in MT5 deal-time format ("YYYY.MM.DD HH:MM:SS")."""
+    return f"{ymd} 00:00:00" if len(ymd) == 10 else ymd
+
+
+@dataclass
+class WindowMetrics:
+    """Metrics of one date window sliced from a full-period trade list."""
+    from_date: str
+    to_date: str
+    metrics: BacktestMetrics
+    total_commission: float = 0.0
+    total_swap: float = 0.0
+    straddling_trades: int = 0  # trades that cross a window boundary
+
+
+class TradeTimeline:
+    """
+    Trades of one backtest, sorted by close time for window queries.
+
+    Usage:
+        timeline = TradeTimeline(extraction.trades, initial_balance=10000)
+        w = timeline.window("2022.01.01", "2023.01.01", policy="exit")
+        print(w.metrics.profit_factor)
+    """
+
+    def __init__(self, trades: List[Trade], *, initial_balance: float, history_quality: float = 0.0):
+        self.trades: List[Trade] = sorted(trades, key=lambda t: t.time)
+        self.exit_times: List[str] = [t.time for t in self.trades]
+        # Trades without an entry time are treated as opened when they closed.
+        by_entry = sorted(range(len(self.trades)), key=lambda i: self.trades[i].entry_time or self.trades[i].time)
+        self._entry_order: List[int] = by_entry
+        self.entry_times: List[str] = [self.trades[i].entry_time or self.trades[i].time for i in by_entry]
+        self.initial_balance = float(initial_balance or 0.0)
+        self.history_quality = float(history_quality or 0.0)
+
+    def __len__(self) -> int:
+        return len(self.trades)
+
+    def _select(self, start: str, end: str, policy: str) -> Tuple[List[Trade], int]:
+        lo = bisect.bisect_left(self.exit_times, start)
+        hi = bisect.bisect_left(self.exit_times, end)
+        by_exit = self.trades[lo:hi]
+        straddling = sum(1 for t in by_exit if (t.entry_time or t.time) < start)
+
+        if policy == "exit":
+            return by_exit, straddling
+        if policy == "drop":
+            return [t for t in by_exit if (t.entry_time or t.time) >= start], straddling
+        if policy == "entry":
+            lo = bisect.bisect_left(self.entry_times, start)
+            hi = bisect.bisect_left(self.entry_times, end)
+            selected = sorted((self.trades[i] for i in self._entry_order[lo:hi]), key=lambda t: t.time)
+            return selected, sum(1 for t in selected if t.time >= end)
+        raise ValueError(f"Unknown straddle policy: {policy} (expected one of {', '.join(STRADDLE_POLICIES)})")
+
+    def window(self, from_date: str, to_date: str, *, policy: str = "exit") -> WindowMetrics:
+        """Metrics for trades in [from_date, to_date) under the given straddle policy."""
+        trades, straddling = self._select(_bound(from_date), _bound(to_date), policy)
+        return WindowMetrics(
+            from_date=from_date,
+            to_date=to_date,
+            metrics=trade_metrics(trades, self.initial_balance, history_quality=self.history_quality),
+            total_commission=sum(t.commission for t in trades),
+            total_swap=sum(t.swap for t in trades),
+            straddling_trades=straddling,
+        )
+
+
+def trade_metrics(trades: List[Trade], initial_balance: float, *, history_quality: float = 0.0) -> BacktestMetrics:
+    """
+    BacktestMetrics from a closed-trade list (in close-time order).
+
+    Drawdown is measured on the closed-trade balance curve (MT5 uses equity),
+    and the Sharpe ratio is mean/stdev of per-trade returns on balance.
+    """
+    deposit = float(initial_balance or 0.0)
+    m = BacktestMetrics(initial_deposit=deposit, history_quality=history_quality)
+    nets = [float(t.net_profit) for t in trades]
+    m.total_trades = len(nets)
+    m.final_balance = deposit
+    if not nets:
+        return m
+
+    m.gross_profit = sum(x for x in nets if x > 0)
+    m.gross_loss = sum(x for x in nets if x < 0)
+    m.total_net_profit = m.gross_profit + m.gross_loss
+    m.profit_factor = m.gross_profit / abs(m.gross_loss) if m.gross_loss else 0.0
+    m.winning_trades = sum(1 for x in nets if x > 0)
+    m.losing_trades = sum(1 for x in nets if x < 0)
+    m.win_rate = m.winning_trades / len(nets) * 100
+    m.expected_payoff = m.total_net_profit / len(nets)
+
+    balance = peak = deposit
+    returns: List[float] = []
+    for x in nets:
+        if balance > 0:
+            returns.append(x / balance)
+        balance += x
+        peak = max(peak, balance)
+        dd = peak - balance
+        if dd > m.max_drawdown:
+            m.max_drawdown = dd
+        if peak > 0:
+            m.max_drawdown_pct = max(m.max_drawdown_pct, dd / peak * 100)
+
+    m.final_balance = balance
+    m.roi_pct = m.total_net_profit / deposit * 100 if deposit else 0.0
+    m.recovery_factor = m.total_net_profit / m.max_drawdown if m.max_drawdown else 0.0
+    if len(returns) > 1:
+        mean = sum(returns) / len(returns)
+        std = math.sqrt(sum((r - mean) ** 2 for r in returns) / (len(returns) - 1))
+        m.sharpe_ratio = mean / std if std else 0.0
+    return m
+
+
+def timeline_from_report(report_path: Path, *, initial_balance: Optional[float] = None) -> Optional[TradeTimeline]:
+    """Build a TradeTimeline from an MT5 HTML report (None if no trades could be extracted)."""
+    extraction = extract_trades(str(report_path))
+    if not extraction.success:
+        return None
+    metrics = ReportParser().parse(Path(report_path))
+    deposit = initial_balance if initial_balance is not None else (
+        extraction.initial_balance or (metrics.initial_deposit if metrics else 0.0)
+    )
+    return TradeTimeline(
+        extraction.trades,
+        initial_balance=deposit,
+        history_quality=metrics.history_quality if metrics else 0.0,
+    )
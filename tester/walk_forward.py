@@ -6,6 +6,10 @@ parameter set (typically the best params from the main workflow).
 
 It is intended as an optional "confidence booster" after Step 11 to reduce the
 risk of trusting a single optimization split.
+
+With offline=True only ONE backtest runs (over the whole range) and every fold
+is sliced from its trade list (see tester/trade_slicer.py). Folds are then
+free, so fold/step sizes can be swept with sweep_offline_folds().
 """
 
 from __future__ import annotations
@@ -19,7 +23,10 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from parser.report import BacktestMetrics, ReportParser
 from parser.trade_extractor import extract_trades
-from tester.backtest import BacktestRunner
+from tester.backtest import BacktestResult
+from tester.checkpoint import CheckpointJournal
+from tester.trade_slicer import STRADDLE_POLICIES, TradeTimeline, timeline_from_report
+from tester.worker_pool import BacktestJob, WorkerPool
 
 
 def _parse_ymd(s: str) -> date:
@@ -38,6 +45,40 @@ def _add_months(d: date, months: int) -> date:
     return date(year, month, day)
 
 
+def fold_windows(
+    from_date: str,
+    to_date: str,
+    *,
+    min_is_months: int,
+    fold_months: int,
+    step_months: int,
+    max_folds: int,
+) -> List[Tuple[str, str, str, str]]:
+    """(is_from, is_to, oos_from, oos_to) per fold; IS is anchored at from_date."""
+    start = _parse_ymd(from_date)
+    end = _parse_ymd(to_date)
+    if end <= start:
+        return []
+
+    folds: List[Tuple[str, str, str, str]] = []
+    oos_start = _add_months(start, min_is_months)
+
+    while oos_start < end and len(folds) < max_folds:
+        is_start = start
+        is_end = oos_start
+        oos_end = _add_months(oos_start, fold_months)
+        if oos_end > end:
+            oos_end = end
+
+        if is_end <= is_start or oos_end <= oos_start:
+            break
+
+        folds.append((_fmt_ymd(is_start), _fmt_ymd(is_end), _fmt_ymd(oos_start), _fmt_ymd(oos_end)))
+        oos_start = _add_months(oos_start, step_months)
+
+    return folds
+
+
 @dataclass
 class PeriodResult:
     success: bool
@@ -49,6 +90,7 @@ class PeriodResult:
     total_swap: Optional[float] = None
     error: Optional[str] = None
     duration_seconds: float = 0.0
+    straddling_trades: Optional[int] = None  # offline mode only
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -81,6 +123,9 @@ class WalkForwardResult:
     include_is: bool
     folds: List[FoldResult]
     total_duration_seconds: float
+    mode: str = "mt5"  # mt5 (one backtest per window) or offline (sliced)
+    straddle_policy: Optional[str] = None
+    full_report_path: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -93,6 +138,9 @@ class WalkForwardResult:
             "step_months": self.step_months,
             "min_is_months": self.min_is_months,
             "include_is": self.include_is,
+            "mode": self.mode,
+            "straddle_policy": self.straddle_policy,
+            "full_report_path": self.full_report_path,
             "total_duration_seconds": self.total_duration_seconds,
             "folds": [f.to_dict() for f in self.folds],
         }
@@ -114,7 +162,14 @@ class WalkForwardTester:
         timeout_per_run: int = 900,
         run_dir: Optional[Path] = None,
         inputs: Optional[Dict[str, Any]] = None,
+        workers: Optional[int] = None,
+        pool: Optional[WorkerPool] = None,
+        offline: bool = False,
+        straddle_policy: str = "exit",
+        journal: Optional[CheckpointJournal] = None,
     ) -> None:
+        if straddle_policy not in STRADDLE_POLICIES:
+            raise ValueError(f"Unknown straddle policy: {straddle_policy} (expected one of {', '.join(STRADDLE_POLICIES)})")
         self.fold_months = int(fold_months)
         self.step_months = int(step_months)
         self.min_is_months = int(min_is_months)
@@ -123,38 +178,23 @@ class WalkForwardTester:
         self.timeout_per_run = int(timeout_per_run)
         self.run_dir = Path(run_dir) if run_dir else None
         self.inputs = inputs or {}
+        self.workers = workers
+        self.pool = pool
+        self.offline = bool(offline)
+        self.straddle_policy = straddle_policy
+        self.journal = journal
 
-        self._runner = BacktestRunner(timeout=self.timeout_per_run)
         self._parser = ReportParser()
 
-    def _run_period(
-        self,
-        *,
-        ea_name: str,
-        symbol: str,
-        timeframe: str,
-        from_date: str,
-        to_date: str,
-        run_dir: Path,
-    ) -> PeriodResult:
+    def _period_result(self, *, from_date: str, to_date: str, bt: BacktestResult) -> PeriodResult:
         start = time.time()
-        bt = self._runner.run(
-            ea_name=ea_name,
-            symbol=symbol,
-            timeframe=timeframe,
-            from_date=from_date,
-            to_date=to_date,
-            run_dir=run_dir,
-            inputs=self.inputs,
-        )
-
         if not bt.success or not bt.report_path:
             return PeriodResult(
                 success=False,
                 from_date=from_date,
                 to_date=to_date,
                 error=bt.error or "Backtest failed",
-                duration_seconds=time.time() - start,
+                duration_seconds=bt.duration_seconds,
             )
 
         metrics: Optional[BacktestMetrics] = self._parser.parse(bt.report_path)
@@ -169,32 +209,26 @@ class WalkForwardTester:
             total_commission=extraction.total_commission if extraction.success else None,
             total_swap=extraction.total_swap if extraction.success else None,
             error=None if metrics else "Failed to parse report",
-            duration_seconds=time.time() - start,
+            duration_seconds=bt.duration_seconds + (time.time() - start),
         )
 
     def _fold_windows(self, *, from_date: str, to_date: str) -> List[Tuple[str, str, str, str]]:
-        start = _parse_ymd(from_date)
-        end = _parse_ymd(to_date)
-        if end <= start:
-            return []
-
-        folds: List[Tuple[str, str, str, str]] = []
-        oos_start = _add_months(start, self.min_is_months)
-
-        while oos_start < end and len(folds) < self.max_folds:
-            is_start = start
-            is_end = oos_start
-            oos_end = _add_months(oos_start, self.fold_months)
-            if oos_end > end:
-                oos_end = end
-
-            if is_end <= is_start or oos_end <= oos_start:
-                break
-
-            folds.append((_fmt_ymd(is_start), _fmt_ymd(is_end), _fmt_ymd(oos_start), _fmt_ymd(oos_end)))
-            oos_start = _add_months(oos_start, self.step_months)
+        return fold_windows(
+            from_date,
+            to_date,
+            min_is_months=self.min_is_months,
+            fold_months=self.fold_months,
+            step_months=self.step_months,
+            max_folds=self.max_folds,
+        )
 
-        return folds
+    def _run_jobs(self, jobs: List[BacktestJob]) -> List[BacktestResult]:
+        pool = self.pool or WorkerPool.from_config(self.workers, timeout=self.timeout_per_run, journal=self.journal)
+        try:
+            return pool.map(jobs)
+        finally:
+            if self.pool is None:
+                pool.shutdown()
 
     def test(
         self,
@@ -205,6 +239,11 @@ class WalkForwardTester:
         from_date: str,
         to_date: str,
     ) -> WalkForwardResult:
+        if self.offline:
+            return self._test_offline(
+                ea_name=ea_name, symbol=symbol, timeframe=timeframe, from_date=from_date, to_date=to_date
+            )
+
         start_time = time.time()
         folds = self._fold_windows(from_date=from_date, to_date=to_date)
         out: List[FoldResult] = []
@@ -212,31 +251,111 @@ class WalkForwardTester:
         base = self.run_dir or Path.cwd()
         base.mkdir(parents=True, exist_ok=True)
 
+        # Every IS/OOS window is an independent backtest, so all of them are
+        # queued at once and spread across the worker pool.
+        jobs: List[BacktestJob] = []
         for idx, (is_from, is_to, oos_from, oos_to) in enumerate(folds, start=1):
             fold_dir = base / f"fold_{idx:02d}"
             fold_dir.mkdir(parents=True, exist_ok=True)
-
-            is_res: Optional[PeriodResult] = None
-            if self.include_is:
-                is_res = self._run_period(
-                    ea_name=ea_name,
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    from_date=is_from,
-                    to_date=is_to,
-                    run_dir=fold_dir / "IS",
+            windows = [("IS", is_from, is_to)] if self.include_is else []
+            windows.append(("OOS", oos_from, oos_to))
+            for side, w_from, w_to in windows:
+                jobs.append(
+                    BacktestJob(
+                        ea_name=ea_name,
+                        symbol=symbol,
+                        timeframe=timeframe,
+                        from_date=w_from,
+                        to_date=w_to,
+                        run_dir=fold_dir / side,
+                        inputs=self.inputs,
+                        tag=f"fold {idx} {side} {w_from}-{w_to}",
+                    )
                 )
 
-            oos_res = self._run_period(
-                ea_name=ea_name,
-                symbol=symbol,
-                timeframe=timeframe,
-                from_date=oos_from,
-                to_date=oos_to,
-                run_dir=fold_dir / "OOS",
+        bt_results = self._run_jobs(jobs)
+
+        periods: List[PeriodResult] = [
+            self._period_result(from_date=j.from_date, to_date=j.to_date, bt=bt)
+            for j, bt in zip(jobs, bt_results)
+        ]
+
+        per_fold = 2 if self.include_is else 1
+        for idx in range(1, len(folds) + 1):
+            chunk = periods[(idx - 1) * per_fold: idx * per_fold]
+            is_res: Optional[PeriodResult] = chunk[0] if self.include_is else None
+            out.append(FoldResult(fold_index=idx, is_result=is_res, oos_result=chunk[-1]))
+
+        return WalkForwardResult(
+            ea_name=ea_name,
+            symbol=symbol,
+            timeframe=timeframe,
+            from_date=from_date,
+            to_date=to_date,
+            fold_months=self.fold_months,
+            step_months=self.step_months,
+            min_is_months=self.min_is_months,
+            include_is=self.include_is,
+            folds=out,
+            total_duration_seconds=time.time() - start_time,
+        )
+
+    def _test_offline(
+        self,
+        *,
+        ea_name: str,
+        symbol: str,
+        timeframe: str,
+        from_date: str,
+        to_date: str,
+    ) -> WalkForwardResult:
+        start_time = time.time()
+        folds = self._fold_windows(from_date=from_date, to_date=to_date)
+
+        base = self.run_dir or Path.cwd()
+        base.mkdir(parents=True, exist_ok=True)
+
+        job = BacktestJob(
+            ea_name=ea_name,
+            symbol=symbol,
+            timeframe=timeframe,
+            from_date=from_date,
+            to_date=to_date,
+            run_dir=base / "full",
+            inputs=self.inputs,
+            tag=f"full {from_date}-{to_date}",
+        )
+        bt = self._run_jobs([job])[0]
+
+        timeline: Optional[TradeTimeline] = None
+        error = bt.error or "Backtest failed"
+        if bt.success and bt.report_path:
+            timeline = timeline_from_report(bt.report_path)
+            error = "Failed to extract trades from report"
+
+        def period(w_from: str, w_to: str) -> PeriodResult:
+            if timeline is None:
+                return PeriodResult(success=False, from_date=w_from, to_date=w_to, error=error)
+            w = timeline.window(w_from, w_to, policy=self.straddle_policy)
+            return PeriodResult(
+                success=True,
+                from_date=w_from,
+                to_date=w_to,
+                report_path=str(bt.report_path),
+                metrics=w.metrics.to_dict(),
+                total_commission=w.total_commission,
+                total_swap=w.total_swap,
+                straddling_trades=w.straddling_trades,
             )
 
-            out.append(FoldResult(fold_index=idx, is_result=is_res, oos_result=oos_res))
+        out = [
+            FoldResult(
+                fold_index=idx,
+                is_result=period(is_from, is_to) if self.include_is else None,
+                oos_result=period(oos_from, oos_to),
+            )
+            for idx, (is_from, is_to, oos_from, oos_to) in enumerate(folds, start=1)
+        ]
 
         return WalkForwardResult(
             ea_name=ea_name,
@@ -250,5 +369,52 @@ class WalkForwardTester:
             include_is=self.include_is,
             folds=out,
             total_duration_seconds=time.time() - start_time,
+            mode="offline",
+            straddle_policy=self.straddle_policy,
+            full_report_path=str(bt.report_path) if bt.report_path else None,
         )
 
+
+def sweep_offline_folds(
+    timeline: TradeTimeline,
+    *,
+    from_date: str,
+    to_date: str,
+    fold_months_options: List[int],
+    step_months_options: List[int],
+    min_is_months: int = 12,
+    max_folds: int = 12,
+    straddle_policy: str = "exit",
+    min_profit_factor: float = 1.5,
+) -> List[Dict[str, Any]]:
+    """
+    OOS summary for every (fold_months, step_months) combination.
+
+    Pure trade slicing, no MT5 runs: cheap enough to explore fold layouts
+    interactively once the full-period backtest exists.
+    """
+    rows: List[Dict[str, Any]] = []
+    for fold_months in fold_months_options:
+        for step_months in step_months_options:
+            windows = fold_windows(
+                from_date,
+                to_date,
+                min_is_months=min_is_months,
+                fold_months=fold_months,
+                step_months=step_months,
+                max_folds=max_folds,
+            )
+            oos = [timeline.window(f, t, policy=straddle_policy).metrics for _, _, f, t in windows]
+            pfs = [m.profit_factor for m in oos]
+            rois = [m.roi_pct for m in oos]
+            rows.append({
+                "fold_months": int(fold_months),
+                "step_months": int(step_months),
+                "folds": len(oos),
+                "oos_pf_mean": sum(pfs) / len(pfs) if pfs else None,
+                "oos_pf_worst": min(pfs) if pfs else None,
+                "oos_roi_mean": sum(rois) / len(rois) if rois else None,
+                "oos_pass_pct": (sum(1 for pf in pfs if pf >= min_profit_factor) / len(pfs) * 100) if pfs else None,
+                "oos_trades": sum(m.total_trades for m in oos),
+            })
+    return rows
@@ -0,0 +1,505 @@
+"""
+MT5 Worker Pool
+
+Runs backtests in parallel across N isolated MT5 installations.
+
+Each worker is a portable terminal install with its own data folder (history,
+Tester cache, reports) and a lock file, so two backtests never share a terminal
+and two processes (e.g. a dashboard and a walk-forward run) never grab the same
+worker at once. Jobs are dispatched to whichever worker is idle.
+
+Layout (see config.MT5_WORKERS_ROOT):
+  MT5_Workers/
+    worker_1/terminal64.exe   (+ its portable data: MQL5/, Tester/, ...)
+    worker_2/terminal64.exe
+    ...
+
+When no worker installs exist, the pool falls back to a single worker wrapping
+the default terminal (config.MT5_TERMINAL / MT5_DATA_PATH), i.e. the old
+sequential behavior.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+from config import MT5_DATA_PATH, MT5_TERMINAL, MT5_WORKERS_ROOT
+from tester.async_runner import EventCallback
+from tester.backtest import BacktestResult, BacktestRunner
+from tester.batch import BATCH_INCLUDE
+from tester.checkpoint import CheckpointJournal, job_fingerprint
+from tester.result_cache import file_sha256, find_ex5
+
+LOCK_FILE_NAME = ".simpleea_worker.lock"
+TERMINAL_EXE_NAMES = ("terminal64.exe", "terminal64", "terminal.exe")
+
+
+@dataclass
+class TerminalWorker:
+    """One isolated MT5 installation."""
+    worker_id: str
+    terminal_path: Path
+    data_path: Path
+    portable: bool = True
+
+    @property
+    def lock_path(self) -> Path:
+        return self.data_path / LOCK_FILE_NAME
+
+    def runner(self, timeout: int) -> BacktestRunner:
+        return BacktestRunner(
+            terminal_path=self.terminal_path,
+            timeout=timeout,
+            data_path=self.data_path,
+            portable=self.portable,
+        )
+
+
+@dataclass
+class BacktestJob:
+    """Arguments for one BacktestRunner.run call."""
+    ea_name: str
+    symbol: str
+    timeframe: str
+    from_date: str
+    to_date: str
+    run_dir: Path
+    inputs: Optional[Dict[str, Any]] = None
+    tag: Optional[str] = None  # caller-defined label (pair, timeframe, fold, pass...)
+
+    def run_kwargs(self) -> Dict[str, Any]:
+        return {
+            "ea_name": self.ea_name,
+            "symbol": self.symbol,
+            "timeframe": self.timeframe,
+            "from_date": self.from_date,
+            "to_date": self.to_date,
+            "run_dir": self.run_dir,
+            "inputs": self.inputs,
+        }
+
+
+class WorkerLockError(RuntimeError):
+    """Raised when a worker's lock file is held by another live process."""
+
+
+class WorkerLock:
+    """
+    Cross-process lock backed by a lock file containing the owner PID and its
+    create time.
+
+    The lock file is published complete with one atomic hard link, so nobody
+    sees a half-written owner. A lock whose owner is gone (or whose PID was
+    reused by another process) is stale and is taken over by atomically
+    renaming it away; a contender that renamed a lock someone else had just
+    taken over puts it back.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._held = False
+        self._token = ""
+
+    def acquire(self, timeout: float = 0.0, poll: float = 0.25) -> None:
+        deadline = time.time() + max(0.0, timeout)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            if self._create():
+                return
+            try:
+                seen = self.path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            except OSError:
+                seen = ""
+            if not _owner_alive(seen):
+                self._take_over(seen)
+                continue
+            if time.time() >= deadline:
+                raise WorkerLockError(f"Worker lock held by another process: {self.path}")
+            time.sleep(poll)
+
+    async def acquire_async(self, timeout: float = 0.0) -> None:
+        """acquire() in a thread; if the caller is cancelled meanwhile, a late acquire is released."""
+        fut = asyncio.ensure_future(asyncio.to_thread(self.acquire, timeout))
+        try:
+            await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            fut.add_done_callback(lambda f: f.cancelled() or f.exception() is not None or self.release())
+            raise
+
+    def _create(self) -> bool:
+        pid = os.getpid()
+        try:
+            created = psutil.Process(pid).create_time()
+        except psutil.Error:
+            created = 0.0
+        token = f"{pid} {created:.3f} {uuid.uuid4().hex}\n"
+        tmp = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_text(token, encoding="utf-8")
+        try:
+            os.link(tmp, self.path)
+        except FileExistsError:
+            return False
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._token = token
+        self._held = True
+        return True
+
+    def _take_over(self, seen: str) -> None:
+        grave = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex[:8]}.stale")
+        try:
+            os.rename(self.path, grave)
+        except FileNotFoundError:
+            return  # someone else removed it first
+        try:
+            if grave.read_text(encoding="utf-8") != seen:
+                # Not the stale lock we judged: another contender's fresh one.
+                try:
+                    os.link(grave, self.path)
+                except FileExistsError:
+                    pass
+        except OSError:
+            pass
+        finally:
+            grave.unlink(missing_ok=True)
+
+    def release(self) -> None:
+        if not self._held:
+            return
+        self._held = False
+        try:
+            if self.path.read_text(encoding="utf-8") == self._token:
+                self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "WorkerLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def _owner_alive(content: str) -> bool:
+    """Whether the "<pid> <create time> <token>" owner of a lock file still runs."""
+    parts = content.split()
+    try:
+        pid = int(parts[0])
+        created = float(parts[1]) if len(parts) > 1 else None
+    except (IndexError, ValueError):
+        return False
+    if pid <= 0:
+        return False
+    try:
+        proc = psutil.Process(pid)
+        return created is None or abs(proc.create_time() - created) < 1.0
+    except psutil.NoSuchProcess:
+        return False
+    except psutil.Error:
+        return True  # exists but not inspectable: assume it still owns the lock
+
+
+def discover_workers(root: Optional[Path] = None) -> List[TerminalWorker]:
+    """Find portable worker installs under root (worker_* folders with a terminal executable)."""
+    base = Path(root) if root else MT5_WORKERS_ROOT
+    if not base.exists():
+        return []
+
+    workers: List[TerminalWorker] = []
+    for d in sorted(base.iterdir()):
+        if not d.is_dir() or not d.name.lower().startswith("worker"):
+            continue
+        exe = next((d / n for n in TERMINAL_EXE_NAMES if (d / n).exists()), None)
+        if exe is None:
+            continue
+        workers.append(TerminalWorker(worker_id=d.name, terminal_path=exe, data_path=d, portable=True))
+    return workers
+
+
+class WorkerSyncError(RuntimeError):
+    """Raised when the compiled EA cannot be provided to a worker."""
+
+
+def sync_ea_to_worker(ea_name: str, worker: TerminalWorker, source_data_path: Optional[Path] = None) -> None:
+    """
+    Copy the compiled EA from the main terminal into a portable worker.
+
+    Workers have their own MQL5 folder, so an EA compiled in the main
+    terminal is invisible to them ("expert not found"). The .ex5 (and the
+    batch include, when the main terminal has it) is copied to the same
+    relative path under the worker whenever it is missing or its SHA-256
+    differs. Workers sharing the main data folder need nothing.
+    """
+    source = Path(source_data_path) if source_data_path else MT5_DATA_PATH
+    if not worker.portable or Path(worker.data_path).resolve() == source.resolve():
+        return
+    ex5 = find_ex5(ea_name, source)
+    if ex5 is None:
+        raise WorkerSyncError(f"Compiled EA not found: {ea_name}.ex5 under {source / 'MQL5' / 'Experts'}")
+
+    files = [ex5]
+    include = source / "MQL5" / "Include" / BATCH_INCLUDE
+    if include.exists():
+        files.append(include)
+    for src in files:
+        dest = worker.data_path / "MQL5" / src.relative_to(source / "MQL5")
+        try:
+            if dest.exists() and file_sha256(dest) == file_sha256(src):
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(dest.name + ".tmp")
+            shutil.copy2(src, tmp)
+            os.replace(tmp, dest)
+        except OSError as e:
+            raise WorkerSyncError(f"Could not copy {src.name} to worker {worker.worker_id}: {e}") from e
+
+
+def default_worker() -> TerminalWorker:
+    """The main (non-portable) installation from config.py."""
+    return TerminalWorker(worker_id="default", terminal_path=MT5_TERMINAL, data_path=MT5_DATA_PATH, portable=False)
+
+
+class WorkerPool:
+    """
+    Dispatches backtest jobs to idle MT5 workers.
+
+    Usage:
+        with WorkerPool.from_config(max_workers=4, timeout=600) as pool:
+            results = pool.map(jobs)
+    """
+
+    def __init__(
+        self,
+        workers: List[TerminalWorker],
+        *,
+        timeout: int = 300,
+        lock_timeout: float = 3600.0,
+        cooldown_seconds: float = 2.0,
+        journal: Optional[CheckpointJournal] = None,
+    ):
+        """
+        Args:
+            workers: Worker installations to use (at least one)
+            timeout: Per-backtest timeout in seconds
+            lock_timeout: Max seconds to wait for a worker locked by another process
+            cooldown_seconds: Pause after each run before the worker is reused (terminal shutdown)
+            journal: Checkpoint journal; jobs it already holds are not re-run
+        """
+        if not workers:
+            raise ValueError("WorkerPool needs at least one worker")
+        self.workers = list(workers)
+        self.timeout = int(timeout)
+        self.lock_timeout = float(lock_timeout)
+        self.cooldown_seconds = float(cooldown_seconds)
+        self.journal = journal
+
+        self._idle: "queue.Queue[TerminalWorker]" = queue.Queue()
+        for w in self.workers:
+            self._idle.put(w)
+        self._executor = ThreadPoolExecutor(max_workers=len(self.workers), thread_name_prefix="mt5-worker")
+        self._print_lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls,
+        max_workers: Optional[int] = None,
+        *,
+        timeout: int = 300,
+        root: Optional[Path] = None,
+        **kwargs: Any,
+    ) -> "WorkerPool":
+        """
+        Build a pool from worker installs under config.MT5_WORKERS_ROOT.
+
+        max_workers defaults to settings.workers.current_workers and is capped by
+        settings.workers.max_workers and by the number of installs found.
+        """
+        from settings import get_settings
+
+        ws = get_settings().workers
+        wanted = int(max_workers or ws.current_workers)
+        wanted = max(1, min(wanted, int(ws.max_workers)))
+
+        workers = discover_workers(root)[:wanted]
+        if not workers:
+            workers = [default_worker()]
+        return cls(workers, timeout=timeout, **kwargs)
+
+    @property
+    def size(self) -> int:
+        return len(self.workers)
+
+    def submit(self, job: BacktestJob) -> "Future[BacktestResult]":
+        """Queue a job; it runs on the next idle worker."""
+        return self._executor.submit(self._run_job, job)
+
+    def map(
+        self,
+        jobs: List[BacktestJob],
+        on_done: Optional[Callable[[BacktestJob, BacktestResult], None]] = None,
+    ) -> List[BacktestResult]:
+        """Run all jobs and return results in job order."""
+        futures = [self.submit(j) for j in jobs]
+        results: List[BacktestResult] = []
+        for job, fut in zip(jobs, futures):
+            res = fut.result()
+            if on_done:
+                on_done(job, res)
+            results.append(res)
+        return results
+
+    async def map_async(
+        self,
+        jobs: List[BacktestJob],
+        *,
+        on_event: Optional[EventCallback] = None,
+        on_done: Optional[Callable[[BacktestJob, BacktestResult], None]] = None,
+    ) -> List[BacktestResult]:
+        """
+        Run all jobs with BacktestRunner.run_async, one terminal per idle worker.
+
+        on_done runs in a thread as each job finishes, so parsing report N
+        overlaps backtest N+1. Results are returned in job order. Cancelling
+        the awaiting task kills every running terminal.
+        """
+        idle: "asyncio.Queue[TerminalWorker]" = asyncio.Queue()
+        for w in self.workers:
+            idle.put_nowait(w)
+
+        async def run_one(job: BacktestJob) -> BacktestResult:
+            fingerprint, res = await asyncio.to_thread(self._resume, job)
+            if res is not None:
+                if on_done:
+                    await asyncio.to_thread(on_done, job, res)
+                return res
+
+            worker = await idle.get()
+            try:
+                res = await self._run_on_worker_async(worker, job, on_event)
+            finally:
+                idle.put_nowait(worker)
+
+            self._checkpoint(job, fingerprint, res)
+            if on_done:
+                await asyncio.to_thread(on_done, job, res)
+            return res
+
+        return list(await asyncio.gather(*(run_one(j) for j in jobs)))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def _resume(self, job: BacktestJob) -> Tuple[Optional[str], Optional[BacktestResult]]:
+        """(fingerprint, result) - result is set when the journal already has this job."""
+        if self.journal is None:
+            return None, None
+        # Fingerprint the main terminal's .ex5: it is the copy sync_ea_to_worker pushes to
+        # the workers, and a worker still holds the previous build until the job runs.
+        fingerprint = job_fingerprint(job, MT5_DATA_PATH)
+        rec = self.journal.lookup(job.tag or job.symbol, fingerprint)
+        if rec is None:
+            return fingerprint, None
+        with self._print_lock:
+            print(f"[resume] {job.ea_name} {job.tag or job.symbol}: already done, reusing {Path(rec['report_path']).name}")
+        return fingerprint, BacktestResult(
+            success=True,
+            report_path=Path(rec["report_path"]),
+            duration_seconds=float(rec.get("duration_seconds") or 0.0),
+            resumed=True,
+        )
+
+    def _checkpoint(self, job: BacktestJob, fingerprint: Optional[str], res: Optional[BacktestResult]) -> None:
+        if self.journal is None or fingerprint is None or res is None:
+            return
+        if res.success and res.report_path:
+            self.journal.record(
+                job.tag or job.symbol,
+                fingerprint,
+                report_path=str(res.report_path),
+                duration_seconds=round(res.duration_seconds, 2),
+                cached=res.cached,
+            )
+
+    def _run_job(self, job: BacktestJob) -> BacktestResult:
+        fingerprint, resumed = self._resume(job)
+        if resumed is not None:
+            return resumed
+        res = self._run_on_worker(job)
+        self._checkpoint(job, fingerprint, res)
+        return res
+
+    async def _run_on_worker_async(
+        self, worker: TerminalWorker, job: BacktestJob, on_event: Optional[EventCallback]
+    ) -> BacktestResult:
+        """Async twin of _run_on_worker; failures come back as a result so on_done still sees them."""
+        lock = WorkerLock(worker.lock_path)
+        start = time.time()
+        try:
+            await lock.acquire_async(self.lock_timeout)
+        except WorkerLockError as e:
+            return BacktestResult(success=False, error=str(e), duration_seconds=time.time() - start)
+
+        label = job.tag or job.symbol
+        with self._print_lock:
+            print(f"[{worker.worker_id}] Backtesting {job.ea_name} {label}...")
+        try:
+            try:
+                await asyncio.to_thread(sync_ea_to_worker, job.ea_name, worker)
+            except WorkerSyncError as e:
+                return BacktestResult(success=False, error=str(e), duration_seconds=time.time() - start)
+            res = await worker.runner(self.timeout).run_async(**job.run_kwargs(), on_event=on_event)
+        finally:
+            lock.release()
+        if self.cooldown_seconds > 0 and not res.cached:
+            await asyncio.sleep(self.cooldown_seconds)
+        return res
+
+    def _run_on_worker(self, job: BacktestJob) -> BacktestResult:
+        worker = self._idle.get()
+        lock = WorkerLock(worker.lock_path)
+        start = time.time()
+        try:
+            try:
+                lock.acquire(timeout=self.lock_timeout)
+            except WorkerLockError as e:
+                return BacktestResult(success=False, error=str(e), duration_seconds=time.time() - start)
+
+            label = job.tag or job.symbol
+            with self._print_lock:
+                print(f"[{worker.worker_id}] Backtesting {job.ea_name} {label}...")
+            res: Optional[BacktestResult] = None
+            try:
+                try:
+                    sync_ea_to_worker(job.ea_name, worker)
+                except WorkerSyncError as e:
+                    return BacktestResult(success=False, error=str(e), duration_seconds=time.time() - start)
+                res = worker.runner(self.timeout).run(**job.run_kwargs())
+                return res
+            finally:
+                lock.release()
+                # Cache hits never started a terminal, so there is nothing to wind down.
+                if self.cooldown_seconds > 0 and not (res is not None and res.cached):
+                    time.sleep(self.cooldown_seconds)
+        finally:
+            self._idle.put(worker)
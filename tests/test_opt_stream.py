@@ -0,0 +1,137 @@
+"""AgentLogTail / LiveOptimization against UTF-16LE tester logs as MT5 writes them."""
+
+import json
+from pathlib import Path
+
+from tester.opt_stream import LiveOptimization
+from tester.opt_watcher import AgentLogTail
+
+BOM = "\ufeff".encode("utf-16-le")
+
+
+def utf16(text: str) -> bytes:
+    return text.replace("\n", "\r\n").encode("utf-16-le")
+
+
+def append(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def make_tester(tmp_path: Path) -> Path:
+    (tmp_path / "Tester" / "logs").mkdir(parents=True)
+    return tmp_path / "Tester"
+
+
+def test_reads_only_what_this_run_appends(tmp_path):
+    tester = make_tester(tmp_path)
+    log = tester / "logs" / "20260101.log"
+    append(log, BOM + utf16("old run: pass 1 returned result 5.0 in 0:00:01\n"))
+
+    tail = AgentLogTail(tester)
+    assert tail.poll().passes_done == 0
+
+    append(log, utf16("pass 7 returned result 12.5 in 0:00:02\n"))
+    progress = tail.poll()
+    assert progress.passes_done == 1
+    assert progress.last_line == "pass 7 returned result 12.5 in 0:00:02"
+
+
+def test_partial_line_waits_for_its_newline(tmp_path):
+    tester = make_tester(tmp_path)
+    log = tester / "logs" / "20260101.log"
+    tail = AgentLogTail(tester)
+    seen = []
+
+    line = utf16("pass 3 returned result 1.5 in 0:00:01\n")
+    append(log, BOM + line[:11])  # cut inside a UTF-16 code unit
+    assert tail.poll(on_line=lambda _log, text: seen.append(text)).passes_done == 0
+
+    append(log, line[11:-2])  # everything but the final "\n"
+    assert tail.poll(on_line=lambda _log, text: seen.append(text)).passes_done == 0
+
+    append(log, line[-2:])
+    assert tail.poll(on_line=lambda _log, text: seen.append(text)).passes_done == 1
+    assert seen == ["pass 3 returned result 1.5 in 0:00:01"]
+
+
+def test_newline_bytes_across_two_characters_are_not_a_line_end(tmp_path):
+    # U+0A41 U+0100 encode as 41 0a 00 01: the 0a 00 in the middle is not a "\n"
+    tester = make_tester(tmp_path)
+    log = tester / "logs" / "20260101.log"
+    tail = AgentLogTail(tester)
+
+    append(log, utf16("inputs: Name=\u0a41\u0100"))
+    assert tail.poll().last_line == ""
+
+    append(log, utf16("\npass 4 returned result 2.0 in 0:00:01\n"))
+    assert tail.poll().passes_done == 1
+
+
+def test_new_daily_log_is_read_from_the_start(tmp_path):
+    tester = make_tester(tmp_path)
+    append(tester / "logs" / "20260101.log", BOM + utf16("pass 1 returned result 1.0 in 0:00:01\n"))
+    tail = AgentLogTail(tester)
+
+    append(tester / "logs" / "20260102.log", BOM + utf16("pass 2 returned result 2.0 in 0:00:01\n"))
+    progress = tail.poll()
+    assert progress.passes_done == 1
+    assert progress.last_line == "pass 2 returned result 2.0 in 0:00:01"
+
+
+def test_truncated_log_is_reread_from_the_top(tmp_path):
+    tester = make_tester(tmp_path)
+    log = tester / "logs" / "20260101.log"
+    append(log, BOM + utf16("".join(f"old line {i}\n" for i in range(50))))
+    tail = AgentLogTail(tester)
+
+    log.write_bytes(BOM + utf16("pass 9 returned result 3.0 in 0:00:01\n"))
+    assert tail.poll().passes_done == 1
+
+    append(log, utf16("pass 10 returned result 4.0 in 0:00:01\n"))
+    assert tail.poll().passes_done == 2
+
+
+def test_agent_logs_and_genetic_pass_ids(tmp_path):
+    tester = make_tester(tmp_path)
+    agents = tmp_path / "Agents"
+    log = agents / "Agent-127.0.0.1-3000" / "logs" / "20260101.log"
+    append(log, BOM)
+    tail = AgentLogTail(tester, agents)
+
+    append(log, utf16(
+        "genetic pass (0, 42) returned result 9.0 in 0:00:01\n"
+        "genetic pass (1, 42) returned result 8.0 in 0:00:01\n"
+        "genetic pass (0, 42) returned result 9.0 in 0:00:01\n"
+    ))
+    assert tail.poll().passes_done == 2
+
+
+def test_live_optimization_publishes_passes_with_inputs(tmp_path):
+    tester = make_tester(tmp_path)
+    log = tester / "logs" / "20260101.log"
+    append(log, BOM)
+    progress_path = tmp_path / "live" / "EA_OPT.progress.json"
+    live = LiveOptimization(tester, progress_path, top_k=2)
+
+    append(log, utf16(
+        "inputs: Fast=5, Slow=20\n"
+        "pass 1 returned result 10.0 in 0:00:01\n"
+        "inputs: Fast=8, Slow=30\n"
+        "pass 2 returned result 25.0 in 0:00:01\n"
+    ))
+    line = utf16("pass 3 returned result 17.0 in 0:00:01\n")
+    append(log, line[:25])
+    assert live.poll(force_write=True) == 2
+
+    append(log, line[25:])
+    live.finish("done")
+
+    snap = json.loads(progress_path.read_text(encoding="utf-8"))
+    assert snap["status"] == "done"
+    assert snap["passes_done"] == 3
+    assert snap["best"]["pass_id"] == "2"
+    assert snap["best"]["params"] == {"Fast": "8", "Slow": "30"}
+    assert [r["pass_id"] for r in snap["top"]] == ["2", "3"]
+    assert [point[:2] for point in snap["convergence"]] == [[1, 10.0], [2, 25.0], [3, 25.0]]
@@ -0,0 +1,145 @@
+"""TerminalRegistry with fake data folders, process listing and PID lookups."""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from workflow.terminal_registry import TerminalRegistry
+
+
+class FakeProcesses:
+    """Stands in for the OS: a PID table, plus counters for both lookup paths."""
+
+    def __init__(self) -> None:
+        self.table: Dict[int, Path] = {}
+        self.scans = 0
+        self.lookups: List[int] = []
+
+    def list_processes(self) -> List[Tuple[int, Path]]:
+        self.scans += 1
+        return list(self.table.items())
+
+    def pid_exe(self, pid: int) -> Optional[Path]:
+        self.lookups.append(pid)
+        return self.table.get(pid)
+
+
+def make_terminal(base: Path, data_id: str, install: Path, log_mtime: float = 1_000_000.0) -> Path:
+    """A data folder whose origin.txt points at an install dir with terminal64.exe."""
+    install.mkdir(parents=True, exist_ok=True)
+    (install / "terminal64.exe").write_bytes(b"")
+    data_dir = base / data_id
+    (data_dir / "MQL5" / "Experts").mkdir(parents=True)
+    (data_dir / "origin.txt").write_text(str(install), encoding="utf-8")
+    touch_log(data_dir, log_mtime)
+    return data_dir
+
+
+def touch_log(data_dir: Path, mtime: float) -> None:
+    log = data_dir / "logs" / "20260101.log"
+    log.parent.mkdir(parents=True, exist_ok=True)
+    log.touch()
+    os.utime(log, (mtime, mtime))
+
+
+def make_registry(tmp_path: Path):
+    base = tmp_path / "Terminal"
+    a = make_terminal(base, "AAAA", tmp_path / "MT5 A")
+    b = make_terminal(base, "BBBB", tmp_path / "MT5 B")
+    procs = FakeProcesses()
+    registry = TerminalRegistry(
+        default_data_path=b,
+        bases=lambda: [base],
+        list_processes=procs.list_processes,
+        pid_exe=procs.pid_exe,
+    )
+    return registry, procs, a, b
+
+
+def by_id(terminals) -> Dict[str, dict]:
+    return {t["id"]: t for t in terminals}
+
+
+def test_first_refresh_scans_processes_and_orders_running_first(tmp_path):
+    registry, procs, _, _ = make_registry(tmp_path)
+    procs.table[101] = tmp_path / "MT5 A" / "terminal64.exe"
+
+    terminals = registry.list()
+    assert procs.scans == 1 and registry.full_scans == 1
+    assert [t["id"] for t in terminals] == ["AAAA", "BBBB"]  # running, then default
+    assert terminals[0]["is_running"] and terminals[0]["pids"] == [101]
+    assert not terminals[1]["is_running"] and terminals[1]["is_default"]
+    assert terminals[1]["terminal_exe"] == str(tmp_path / "MT5 B" / "terminal64.exe")
+
+
+def test_known_pids_are_rechecked_without_a_scan(tmp_path):
+    registry, procs, _, _ = make_registry(tmp_path)
+    procs.table[101] = tmp_path / "MT5 A" / "terminal64.exe"
+    registry.refresh()
+
+    terminals = by_id(registry.refresh())
+    assert procs.scans == 1
+    assert procs.lookups == [101]
+    assert terminals["AAAA"]["pids"] == [101]
+
+    del procs.table[101]  # terminal exited
+    terminals = by_id(registry.refresh())
+    assert procs.scans == 1
+    assert not terminals["AAAA"]["is_running"]
+
+
+def test_reused_pid_is_dropped(tmp_path):
+    registry, procs, _, _ = make_registry(tmp_path)
+    procs.table[101] = tmp_path / "MT5 A" / "terminal64.exe"
+    registry.refresh()
+
+    procs.table[101] = tmp_path / "elsewhere" / "notepad.exe"
+    terminals = by_id(registry.refresh())
+    assert procs.scans == 1
+    assert terminals["AAAA"]["pids"] == []
+
+
+def test_log_activity_of_an_idle_terminal_triggers_a_scan(tmp_path):
+    registry, procs, _, b = make_registry(tmp_path)
+    registry.refresh()
+    assert procs.scans == 1
+
+    procs.table[202] = tmp_path / "MT5 B" / "terminal64.exe"
+    registry.refresh()
+    assert procs.scans == 1  # no activity yet: a new process is not looked for
+
+    touch_log(b, 2_000_000.0)  # a starting terminal writes its journal
+    terminals = by_id(registry.refresh())
+    assert procs.scans == 2
+    assert terminals["BBBB"]["pids"] == [202]
+
+
+def test_log_activity_of_a_running_terminal_does_not_scan(tmp_path):
+    registry, procs, a, _ = make_registry(tmp_path)
+    procs.table[101] = tmp_path / "MT5 A" / "terminal64.exe"
+    registry.refresh()
+
+    touch_log(a, 2_000_000.0)
+    registry.refresh()
+    assert procs.scans == 1
+
+
+def test_forced_and_periodic_full_scans(tmp_path):
+    registry, procs, _, _ = make_registry(tmp_path)
+    registry.refresh()
+    registry.refresh(full_scan=True)
+    assert procs.scans == 2
+
+    registry.full_scan_interval = 0.0
+    registry.refresh()
+    assert procs.scans == 3
+
+
+def test_utf16_origin_and_removed_folders(tmp_path):
+    registry, procs, a, _ = make_registry(tmp_path)
+    (a / "origin.txt").write_bytes(str(tmp_path / "MT5 A").encode("utf-16"))
+    procs.table[101] = tmp_path / "MT5 A" / "terminal64.exe"
+    assert by_id(registry.refresh())["AAAA"]["pids"] == [101]
+
+    (a / "MQL5" / "Experts").rmdir()
+    assert list(by_id(registry.refresh())) == ["BBBB"]
@@ -17,9 +17,17 @@ let allStates = [];
 let allModules = [];
 let allTerminals = [];
 let allEas = [];
+let easTotal = 0;
+let easSearchTimer = null;
+
+const EA_PAGE_SIZE = 200;
 let selectedPath = null;
 let selectedState = null;
 let lastJobsById = {};
+let jobStream = null;
+let jobNodes = {};
+
+const JOB_LOG_MAX_CHARS = 20000;
 
 function $(sel) {
   return document.querySelector(sel);
@@ -139,16 +147,17 @@ function renderEaSelect() {
   if (!sel) return;
   sel.innerHTML = "";
 
-  const q = String($("#eaSearchInput").value || "").trim().toLowerCase();
-  const filtered = (allEas || []).filter((e) => {
-    if (!q) return true;
-    return String(e.name || "").toLowerCase().includes(q) || String(e.rel_path || "").toLowerCase().includes(q);
-  });
-
-  for (const e of filtered) {
-    const opt = el("option", { value: e.rel_path, text: `${e.name} — ${e.rel_path}` }, []);
+  // Already filtered + ranked by the server (/api/eas?q=...)
+  for (const e of allEas || []) {
+    const mark = e.status === "compiled" ? "" : ` (${e.status})`;
+    const opt = el("option", { value: e.rel_path, text: `${e.name} — ${e.rel_path}${mark}` }, []);
     sel.appendChild(opt);
   }
+
+  const count = $("#eaCount");
+  if (count) count.textContent = `${allEas.length} of ${easTotal} EAs`;
+  const more = $("#eaMoreBtn");
+  if (more) more.style.display = allEas.length < easTotal ? "" : "none";
 }
 
 async function refreshTerminals() {
@@ -165,10 +174,14 @@ async function refreshTerminals() {
   }
 }
 
-async function refreshEas(terminalId) {
+async function refreshEas(terminalId, append = false) {
   if (!terminalId) return;
-  const data = await fetchJson(`/api/eas?terminal_id=${encodeURIComponent(terminalId)}`);
-  allEas = data.eas || [];
+  const q = String(($("#eaSearchInput") || {}).value || "").trim();
+  const offset = append ? allEas.length : 0;
+  const params = new URLSearchParams({ terminal_id: terminalId, q, offset: String(offset), limit: String(EA_PAGE_SIZE) });
+  const data = await fetchJson(`/api/eas?${params}`);
+  allEas = append ? allEas.concat(data.eas || []) : data.eas || [];
+  easTotal = data.total || 0;
   renderEaSelect();
 }
 
@@ -374,7 +387,7 @@ function renderModulesTable() {
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({ module_id: m.id, state_path: selectedPath }),
               });
-              await refreshJobs();
+              await syncJobs();
             } catch (e) {
               alert(String(e.message || e));
             } finally {
@@ -397,41 +410,79 @@ function renderModulesTable() {
   mount.appendChild(table);
 }
 
+function jobCard(j) {
+  const title = el("div", { class: "job-title" });
+  const rc = el("span", { class: "muted" });
+  const cancel = el("button", {
+    class: "btn btn-secondary",
+    text: "Cancel",
+    onClick: async (ev) => {
+      ev.preventDefault();
+      cancel.disabled = true;
+      try {
+        await fetchJson("/api/jobs/cancel", {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ id: j.id }),
+        });
+        await syncJobs();
+      } catch (e) {
+        alert(String(e.message || e));
+        cancel.disabled = false;
+      }
+    },
+  });
+  const head = el("div", { class: "job-head" }, [title, el("div", {}, [rc, cancel])]);
+  const cmd = el("div", { class: "muted", text: (j.command || []).join(" ") });
+  const log = el("div", { class: "job-log", text: j.log_tail || "" });
+  const card = el("div", { class: "job" }, [head, cmd, log]);
+  jobNodes[j.id] = { card, title, rc, cancel, log };
+  updateJobCard(j);
+  return card;
+}
+
+function updateJobCard(j) {
+  const node = jobNodes[j.id];
+  if (!node) return;
+  const active = j.status === "queued" || j.status === "running";
+  node.title.textContent = `${j.module_id} • ${j.status}`;
+  node.rc.textContent = `rc=${j.returncode ?? "—"} • ${j.resource || "cpu"}${j.priority ? ` • prio ${j.priority}` : ""} `;
+  if (j.error) node.rc.title = j.error;
+  node.cancel.style.display = active ? "" : "none";
+}
+
 function renderJobsPanel(jobs) {
   const mount = $("#jobsPanel");
   mount.innerHTML = "";
+  jobNodes = {};
 
   if (!jobs.length) {
     mount.appendChild(el("div", { class: "muted", text: "No jobs yet." }));
     return;
   }
 
-  for (const j of jobs) {
-    const head = el("div", { class: "job-head" }, [
-      el("div", { class: "job-title", text: `${j.module_id} • ${j.status}` }),
-      el("div", { class: "muted", text: `rc=${j.returncode ?? "—"}` }),
-    ]);
-    const cmd = el("div", { class: "muted", text: (j.command || []).join(" ") });
-    const log = el("div", { class: "job-log", text: j.log_tail || "" });
-
-    mount.appendChild(el("div", { class: "job" }, [head, cmd, log]));
-  }
+  for (const j of jobs) mount.appendChild(jobCard(j));
 }
 
-async function refreshJobs() {
-  const data = await fetchJson("/api/jobs");
-  const jobs = data.jobs || [];
-  renderJobsPanel(jobs);
+function appendJobLog(id, text) {
+  const node = jobNodes[id];
+  if (!node || !text) return;
+  const log = node.log;
+  const atBottom = log.scrollTop + log.clientHeight >= log.scrollHeight - 4;
+  log.textContent = (log.textContent + text).slice(-JOB_LOG_MAX_CHARS);
+  if (atBottom) log.scrollTop = log.scrollHeight;
+}
 
-  const currentById = {};
+async function trackJobs(jobs) {
+  const currentById = Object.assign({}, lastJobsById);
   for (const j of jobs) currentById[j.id] = j;
 
   // If any running -> completed/failed, refresh selected state + states list.
   let shouldRefresh = false;
-  for (const [id, prev] of Object.entries(lastJobsById)) {
-    const cur = currentById[id];
-    if (!cur) continue;
-    if (String(prev.status) === "running" && String(cur.status) !== "running") {
+  for (const j of jobs) {
+    const prev = lastJobsById[j.id];
+    if (!prev) continue;
+    if (String(prev.status) === "running" && String(j.status) !== "running") {
       shouldRefresh = true;
       break;
     }
@@ -448,6 +499,46 @@ async function refreshJobs() {
   }
 }
 
+async function refreshJobs() {
+  const data = await fetchJson("/api/jobs");
+  const jobs = data.jobs || [];
+  renderJobsPanel(jobs);
+  await trackJobs(jobs);
+}
+
+// Jobs panel via server-sent events: one snapshot, then only status changes
+// and new log text. Returns false when the browser has no EventSource.
+function startJobStream() {
+  if (!window.EventSource) return false;
+  jobStream = new EventSource("/api/jobs/stream");
+  jobStream.addEventListener("snapshot", (ev) => {
+    const jobs = JSON.parse(ev.data).jobs || [];
+    renderJobsPanel(jobs);
+    trackJobs(jobs);
+  });
+  jobStream.addEventListener("job", (ev) => {
+    const j = JSON.parse(ev.data);
+    if (jobNodes[j.id]) {
+      updateJobCard(j);
+    } else {
+      const mount = $("#jobsPanel");
+      if (!Object.keys(jobNodes).length) mount.innerHTML = "";
+      mount.insertBefore(jobCard(j), mount.firstChild);
+    }
+    trackJobs([j]);
+  });
+  jobStream.addEventListener("log", (ev) => {
+    const d = JSON.parse(ev.data);
+    appendJobLog(d.id, d.text);
+  });
+  return true;
+}
+
+async function syncJobs() {
+  // The stream delivers new jobs by itself
+  if (!jobStream) await refreshJobs();
+}
+
 function attachEvents() {
   $("#searchInput").addEventListener("input", renderStatesList);
   $("#refreshBtn").addEventListener("click", async () => {
@@ -464,7 +555,15 @@ function attachEvents() {
 
   const eaSearch = $("#eaSearchInput");
   if (eaSearch) {
-    eaSearch.addEventListener("input", renderEaSelect);
+    eaSearch.addEventListener("input", () => {
+      clearTimeout(easSearchTimer);
+      easSearchTimer = setTimeout(() => refreshEas(termSel ? termSel.value : "").catch(() => {}), 200);
+    });
+  }
+
+  const eaMore = $("#eaMoreBtn");
+  if (eaMore) {
+    eaMore.addEventListener("click", () => refreshEas(termSel ? termSel.value : "", true).catch(() => {}));
   }
 
   const optCheck = $("#optCheck");
@@ -521,7 +620,7 @@ function attachEvents() {
             options: opts,
           }),
         });
-        await refreshJobs();
+        await syncJobs();
         await refreshStates();
       } catch (e) {
         alert(String(e.message || e));
@@ -538,10 +637,12 @@ async function boot() {
   await refreshTerminals();
   await refreshStates();
   await refreshModules();
-  await refreshJobs();
 
   setInterval(() => refreshStates().catch(() => {}), 15000);
-  setInterval(() => refreshJobs().catch(() => {}), 2000);
+  if (!startJobStream()) {
+    await refreshJobs();
+    setInterval(() => refreshJobs().catch(() => {}), 2000);
+  }
 }
 
 boot().catch((e) => {
@@ -0,0 +1,246 @@
+"""
+Incremental index of a terminal's MQL5/Experts tree for the web UI EA picker.
+
+Broker installs carry thousands of .mq5/.ex5 files in many subfolders, so
+walking the tree per request is slow. The index keeps one node per folder:
+
+  rel_dir -> {mtime_ns, subdirs, files: {file name -> [size, mtime_ns]}}
+
+refresh() stats every folder and only re-lists the ones whose mtime changed
+(a file added, removed or renamed in a folder bumps that folder's mtime).
+Folders modified within the last RACY_NS are re-listed again next time, so a
+change landing in the same mtime tick as the listing is not missed. An
+in-place edit or recompile of an existing file does not touch the folder
+mtime, so the known files of unchanged folders are re-stat'ed as well (one
+stat per .mq5/.ex5, no directory listing) and their size/mtime updated.
+
+The index is persisted (runs/cache/experts_index/<terminal_id>.json) and
+searched server-side: prefix matches rank first, then substring, then fuzzy
+(subsequence) matches; results are paginated.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+INDEX_VERSION = 1
+RACY_NS = 2_000_000_000  # folders changed this recently are not trusted yet
+
+SOURCE_EXT = ".mq5"
+COMPILED_EXT = ".ex5"
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def _fuzzy_gaps(query: str, text: str) -> Optional[int]:
+    """Characters skipped to match query as a subsequence of text (None if no match)."""
+    pos = -1
+    gaps = 0
+    for ch in query:
+        nxt = text.find(ch, pos + 1)
+        if nxt < 0:
+            return None
+        if pos >= 0:
+            gaps += nxt - pos - 1
+        pos = nxt
+    return gaps
+
+
+class ExpertsIndex:
+    """Persisted, folder-mtime-validated listing of the .mq5 files under one Experts folder."""
+
+    def __init__(self, experts_path: Path, cache_path: Optional[Path] = None, min_refresh_interval: float = 2.0):
+        self.experts_path = Path(experts_path)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.min_refresh_interval = float(min_refresh_interval)
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, Dict[str, Any]] = {}
+        self._entries: List[Dict[str, Any]] = []
+        self._keys: List[Tuple[str, str]] = []  # (name, rel_path) lowercased, parallel to _entries
+        self._last_refresh: Optional[float] = None
+        self._load()
+
+    def _load(self) -> None:
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("experts_path") != str(self.experts_path):
+            return
+        self._dirs = dict(data.get("dirs") or {})
+        self._rebuild()
+
+    def _save(self) -> None:
+        if not self.cache_path:
+            return
+        payload = {"version": INDEX_VERSION, "experts_path": str(self.experts_path), "dirs": self._dirs}
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_name(self.cache_path.name + f".{uuid.uuid4().hex[:6]}.tmp")
+            tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass  # the in-memory index still works
+
+    @staticmethod
+    def _list_dir(path: Path, mtime_ns: int) -> Dict[str, Any]:
+        subdirs: List[str] = []
+        files: Dict[str, List[int]] = {}
+        try:
+            with os.scandir(path) as it:
+                for de in it:
+                    try:
+                        if de.is_dir(follow_symlinks=False):
+                            subdirs.append(de.name)
+                            continue
+                        ext = os.path.splitext(de.name)[1].lower()
+                        if ext in (SOURCE_EXT, COMPILED_EXT) and de.is_file():
+                            st = de.stat()
+                            files[de.name] = [int(st.st_size), int(st.st_mtime_ns)]
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        if time.time_ns() - mtime_ns < RACY_NS:
+            mtime_ns = -1
+        return {"mtime_ns": mtime_ns, "subdirs": sorted(subdirs), "files": files}
+
+    @staticmethod
+    def _restat(path: Path, node: Dict[str, Any]) -> Optional[int]:
+        """Update size/mtime of a listed folder's files; returns how many changed (None: re-list the folder)."""
+        updated = 0
+        for name, stamp in node["files"].items():
+            try:
+                st = os.stat(path / name)
+            except OSError:
+                return None
+            current = [int(st.st_size), int(st.st_mtime_ns)]
+            if stamp != current:
+                node["files"][name] = current
+                updated += 1
+        return updated
+
+    def refresh(self, full: bool = False) -> int:
+        """Re-list changed folders and re-stat known files; returns folders (re)listed or dropped plus files updated."""
+        with self._lock:
+            new_dirs: Dict[str, Dict[str, Any]] = {}
+            listed = restated = 0
+            stack = [""]
+            while stack:
+                rel = stack.pop()
+                path = self.experts_path / rel if rel else self.experts_path
+                try:
+                    mtime_ns = path.stat().st_mtime_ns
+                except OSError:
+                    continue
+                node = self._dirs.get(rel)
+                updated = None
+                if not full and node and node["mtime_ns"] == mtime_ns:
+                    updated = self._restat(path, node)
+                if updated is None:
+                    node = self._list_dir(path, mtime_ns)
+                    listed += 1
+                else:
+                    restated += updated
+                new_dirs[rel] = node
+                stack.extend(_join(rel, d) for d in node["subdirs"])
+
+            changed = listed + restated + len(set(self._dirs) - set(new_dirs))
+            self._dirs = new_dirs
+            self._last_refresh = time.monotonic()
+            if changed:
+                self._rebuild()
+                self._save()
+            return changed
+
+    def _rebuild(self) -> None:
+        entries: List[Dict[str, Any]] = []
+        for rel_dir, node in self._dirs.items():
+            files = node["files"]
+            compiled = {os.path.splitext(n)[0].lower(): v for n, v in files.items() if n.lower().endswith(COMPILED_EXT)}
+            for fname, (size, mtime_ns) in files.items():
+                stem, ext = os.path.splitext(fname)
+                if ext.lower() != SOURCE_EXT:
+                    continue
+                ex5 = compiled.get(stem.lower())
+                if ex5 is None:
+                    status = "uncompiled"
+                elif ex5[1] < mtime_ns:
+                    status = "outdated"  # source newer than the .ex5
+                else:
+                    status = "compiled"
+                rel = _join(rel_dir, fname)
+                entries.append(
+                    {
+                        "name": stem,
+                        "rel_path": rel,
+                        "abs_path": str(self.experts_path / rel),
+                        "size_bytes": size,
+                        "mtime": mtime_ns / 1e9,
+                        "compiled": ex5 is not None,
+                        "status": status,
+                    }
+                )
+        entries.sort(key=lambda d: (d["name"].lower(), d["rel_path"]))
+        self._entries = entries
+        self._keys = [(e["name"].lower(), e["rel_path"].lower()) for e in entries]
+
+    def ensure_fresh(self) -> None:
+        """refresh() unless the last one ran less than min_refresh_interval ago."""
+        last = self._last_refresh
+        if last is None or time.monotonic() - last >= self.min_refresh_interval:
+            self.refresh()
+
+    def search(self, query: str = "", offset: int = 0, limit: int = 200, mode: str = "fuzzy") -> Dict[str, Any]:
+        """
+        One page of matching EAs.
+
+        mode="prefix" keeps only name/path prefix matches; "fuzzy" also keeps
+        substring and subsequence matches, ranked after the prefix matches.
+        """
+        self.ensure_fresh()
+        q = (query or "").strip().lower().replace("\\", "/")
+        with self._lock:
+            entries, keys = self._entries, self._keys
+        if not q:
+            hits = entries
+        else:
+            ranked: List[Tuple[int, int, int]] = []
+            for i, (name, rel) in enumerate(keys):
+                if name.startswith(q):
+                    ranked.append((0, 0, i))
+                elif rel.startswith(q):
+                    ranked.append((1, 0, i))
+                elif mode == "prefix":
+                    continue
+                elif q in name:
+                    ranked.append((2, name.index(q), i))
+                elif q in rel:
+                    ranked.append((3, rel.index(q), i))
+                else:
+                    gaps = _fuzzy_gaps(q, rel)
+                    if gaps is not None:
+                        ranked.append((4, gaps, i))
+            ranked.sort()
+            hits = [entries[i] for _, _, i in ranked]
+
+        offset = max(0, int(offset))
+        limit = max(1, int(limit))
+        return {
+            "query": query or "",
+            "mode": mode,
+            "total": len(hits),
+            "offset": offset,
+            "limit": limit,
+            "eas": hits[offset : offset + limit],
+        }
@@ -0,0 +1,374 @@
+"""
+Persistent Job Queue for the Web UI
+
+Jobs started from the web UI (workflows, post-step modules) used to be
+spawned immediately and only tracked in memory. The queue adds:
+
+- resource classes: "mt5:<terminal>" jobs run one at a time per terminal
+  (two backtests on one terminal collide); "cpu" jobs share cpu_slots slots
+- priorities: queued jobs start highest priority first, FIFO within a
+  priority; a job waiting for a busy terminal does not hold back others
+- persistence: every state change is appended (fsync'ed) to a JSONL store,
+  later lines win and the file is compacted on load; queued jobs survive a
+  restart and start again once the server is back
+- orphan recovery: a job that was running when the server stopped is
+  re-attached if its PID is still alive with the same create time (it keeps
+  its resource slot until it exits); otherwise it is marked "unknown". The
+  exit code of a re-attached process cannot be read, so it also ends as
+  "unknown".
+
+- cancellation kills the whole process tree (the job script and the
+  terminal64.exe / tester agents it started) from a helper thread; the job
+  stays "running" and keeps its slot until every process of the tree exited.
+
+Status flow: queued -> running -> completed | failed | cancelled | unknown
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import psutil
+
+from tester.async_runner import kill_process_tree
+
+STORE_VERSION = 1
+CPU = "cpu"
+FINAL_STATUSES = ("completed", "failed", "cancelled", "unknown")
+
+
+def mt5_resource(terminal_key: str) -> str:
+    """Resource class of jobs that drive the given MT5 terminal."""
+    return f"mt5:{terminal_key}"
+
+
+@dataclass
+class Job:
+    id: str
+    module_id: str
+    state_path: str
+    command: List[str]
+    log_path: str
+    log_rel: Optional[str] = None
+    resource: str = CPU
+    priority: int = 0
+    queued_at: float = 0.0
+    started_at: Optional[float] = None
+    ended_at: Optional[float] = None
+    returncode: Optional[int] = None
+    status: str = "queued"  # queued|running|completed|failed|cancelled|unknown
+    pid: Optional[int] = None
+    pid_created: Optional[float] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+
+def tail_with_offset(path: Path, max_bytes: int = 8000) -> Tuple[str, int]:
+    """Last max_bytes of a file and the byte offset right after what was read."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            start = max(0, size - max_bytes)
+            f.seek(start, os.SEEK_SET)
+            data = f.read(size - start)
+        return data.decode("utf-8", errors="replace"), start + len(data)
+    except Exception:
+        return "", 0
+
+
+class JobQueue:
+    """Scheduler + JSONL-backed history of subprocess jobs."""
+
+    def __init__(
+        self,
+        store_path: Path,
+        cwd: Path,
+        cpu_slots: Optional[int] = None,
+        history_limit: int = 200,
+    ):
+        """
+        Args:
+            store_path: JSONL store (created on first job)
+            cwd: Working directory of the job processes
+            cpu_slots: Concurrent "cpu" jobs (default: core count)
+            history_limit: Finished jobs kept when the store is compacted
+        """
+        self.store_path = Path(store_path)
+        self.cwd = Path(cwd)
+        self.cpu_slots = max(1, int(cpu_slots or os.cpu_count() or 1))
+        self.history_limit = int(history_limit)
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._load()
+
+    def _load(self) -> None:
+        if not self.store_path.exists():
+            return
+        jobs: Dict[str, Job] = {}
+        for line in self.store_path.read_text(encoding="utf-8", errors="replace").splitlines():
+            try:
+                rec = json.loads(line)
+                if rec.get("v") != STORE_VERSION:
+                    continue
+                job = Job.from_dict(rec["job"])
+            except (ValueError, KeyError, TypeError):
+                continue  # torn write from a crash
+            jobs[job.id] = job  # later lines win
+
+        finished = sorted((j for j in jobs.values() if j.status in FINAL_STATUSES), key=lambda j: j.queued_at)
+        for j in finished[: max(0, len(finished) - self.history_limit)]:
+            del jobs[j.id]
+
+        for job in jobs.values():
+            entry: Dict[str, Any] = {"job": job}
+            if job.status == "running":
+                self._reattach(job, entry)
+            self._entries[job.id] = entry
+
+        self._compact()  # one line per kept job, including re-attach results
+
+    def _reattach(self, job: Job, entry: Dict[str, Any]) -> None:
+        """Adopt a job process that outlived the previous server (or mark it unknown)."""
+        proc = None
+        if job.pid:
+            try:
+                p = psutil.Process(int(job.pid))
+                if job.pid_created is None or abs(p.create_time() - float(job.pid_created)) < 1.0:
+                    proc = p
+            except (psutil.Error, OSError):
+                proc = None
+        if proc is not None and proc.is_running():
+            entry["adopted"] = proc
+            return
+        job.status = "unknown"
+        job.ended_at = time.time()
+        job.error = "Server restarted; the job process was gone"
+
+    def _compact(self) -> None:
+        tmp = self.store_path.with_name(self.store_path.name + ".tmp")
+        lines = [self._line(e["job"]) for e in sorted(self._entries.values(), key=lambda e: e["job"].queued_at)]
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text("".join(lines), encoding="utf-8")
+        os.replace(tmp, self.store_path)
+
+    @staticmethod
+    def _line(job: Job) -> str:
+        return json.dumps({"v": STORE_VERSION, "job": asdict(job)}, default=str) + "\n"
+
+    def _persist(self, job: Job) -> None:
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.store_path, "a", encoding="utf-8") as f:
+            f.write(self._line(job))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def capacity(self, resource: str) -> int:
+        return 1 if resource.startswith("mt5:") else self.cpu_slots
+
+    def submit(self, job: Job) -> Job:
+        """Queue a job (starts right away when its resource has a free slot)."""
+        with self._lock:
+            job.status = "queued"
+            job.queued_at = job.queued_at or time.time()
+            self._entries[job.id] = {"job": job}
+            self._persist(job)
+            self._tick()
+        self._wake.set()
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Drop a queued job or kill a running one (with its child processes)."""
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if not entry:
+                return None
+            job: Job = entry["job"]
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.ended_at = time.time()
+                self._persist(job)
+            elif job.status == "running" and not entry.get("killing"):
+                entry["cancel"] = True
+                entry["killing"] = True
+                threading.Thread(
+                    target=self._kill_tree, args=(entry, job.pid), name=f"job-kill-{job.id}", daemon=True
+                ).start()
+            return job
+
+    def _kill_tree(self, entry: Dict[str, Any], pid: Optional[int]) -> None:
+        """Kill a job's process tree; the job is reaped once none of it is alive."""
+        tree: List[psutil.Process] = []
+        try:
+            if pid:
+                root = psutil.Process(int(pid))
+                tree = [root] + root.children(recursive=True)
+            with self._lock:
+                entry["tree"] = tree
+            if pid:
+                kill_process_tree(int(pid))
+        except (psutil.Error, OSError):
+            pass
+        finally:
+            with self._lock:
+                entry.pop("killing", None)
+            self._wake.set()
+
+    @staticmethod
+    def _tree_alive(entry: Dict[str, Any]) -> bool:
+        """Whether a cancelled job still has live processes (terminal, agents)."""
+        if entry.get("killing"):
+            return True
+        for p in entry.get("tree", ()):
+            try:
+                if p.is_running() and p.status() != psutil.STATUS_ZOMBIE:
+                    return True
+            except (psutil.Error, OSError):
+                continue
+        return False
+
+    def _start(self, entry: Dict[str, Any]) -> None:
+        job: Job = entry["job"]
+        log_path = Path(job.log_path)
+        try:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            log_f = open(log_path, "w", encoding="utf-8", errors="replace")
+            proc = subprocess.Popen(
+                job.command,
+                cwd=str(self.cwd),
+                stdout=log_f,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+        except Exception as e:
+            job.status = "failed"
+            job.ended_at = time.time()
+            job.error = str(e)
+            self._persist(job)
+            return
+        entry.update({"proc": proc, "log_f": log_f})
+        job.status = "running"
+        job.started_at = time.time()
+        job.pid = proc.pid
+        try:
+            job.pid_created = psutil.Process(proc.pid).create_time()
+        except (psutil.Error, OSError):
+            job.pid_created = None
+        self._persist(job)
+
+    def _finish(self, entry: Dict[str, Any], returncode: Optional[int]) -> None:
+        job: Job = entry["job"]
+        job.returncode = returncode
+        job.ended_at = time.time()
+        if entry.pop("cancel", False):
+            job.status = "cancelled"
+        elif returncode is None:
+            job.status = "unknown"
+            job.error = job.error or "Re-attached after a server restart; exit code unavailable"
+        else:
+            job.status = "completed" if returncode == 0 else "failed"
+        log_f = entry.pop("log_f", None)
+        if log_f is not None:
+            try:
+                log_f.close()
+            except Exception:
+                pass
+        entry.pop("proc", None)
+        entry.pop("adopted", None)
+        entry.pop("tree", None)
+        # The log is final now: remember its tail + size so it is never re-read
+        entry["log_tail"], entry["log_size"] = tail_with_offset(Path(job.log_path))
+        self._persist(job)
+
+    def _tick(self) -> None:
+        """Reap finished processes, then start queued jobs that fit (caller holds the lock)."""
+        busy: Dict[str, int] = {}
+        queued: List[Dict[str, Any]] = []
+        for entry in self._entries.values():
+            job: Job = entry["job"]
+            if job.status == "running":
+                if entry.get("cancel") and self._tree_alive(entry):
+                    pass  # keep the slot until the terminal and agents are gone too
+                elif "proc" in entry:
+                    rc = entry["proc"].poll()
+                    if rc is not None:
+                        self._finish(entry, int(rc))
+                        continue
+                elif "adopted" in entry:
+                    try:
+                        alive = entry["adopted"].is_running() and entry["adopted"].status() != psutil.STATUS_ZOMBIE
+                    except (psutil.Error, OSError):
+                        alive = False
+                    if not alive:
+                        self._finish(entry, None)
+                        continue
+                busy[job.resource] = busy.get(job.resource, 0) + 1
+            elif job.status == "queued":
+                queued.append(entry)
+
+        queued.sort(key=lambda e: (-int(e["job"].priority), e["job"].queued_at))
+        for entry in queued:
+            res = entry["job"].resource
+            if busy.get(res, 0) < self.capacity(res):
+                self._start(entry)
+                busy[res] = busy.get(res, 0) + 1
+
+    def poll(self, limit: Optional[int] = None) -> List[Job]:
+        """Jobs newest first (after reaping/dispatching)."""
+        with self._lock:
+            self._tick()
+            jobs = [e["job"] for e in self._entries.values()]
+        jobs.sort(key=lambda j: j.queued_at, reverse=True)
+        return jobs[:limit] if limit else jobs
+
+    def log_info(self, job_id: str) -> Tuple[Optional[Path], Optional[int], Optional[str]]:
+        """(log path, final size, final tail) of a job; size/tail are None until it finished."""
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if not entry:
+                return None, None, None
+            job: Job = entry["job"]
+            log_path = Path(job.log_path)
+            if job.status in FINAL_STATUSES and "log_size" not in entry:
+                # History from a previous server run: read the tail once
+                entry["log_tail"], entry["log_size"] = tail_with_offset(log_path)
+            if job.status == "queued":
+                return None, None, None
+            return log_path, entry.get("log_size"), entry.get("log_tail")
+
+    def start(self, interval: float = 0.5) -> None:
+        """Dispatch queued jobs from a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def _run() -> None:
+            while not self._stop.is_set():
+                try:
+                    with self._lock:
+                        self._tick()
+                except Exception:
+                    pass
+                self._wake.wait(interval)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=_run, name="job-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
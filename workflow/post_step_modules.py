@@ -57,9 +57,9 @@ POST_STEP_MODULES: List[PostStepModule] = [
     PostStepModule(
         id="param_sensitivity",
         title="Parameter Sensitivity Sweep",
-        description="Local perturbation sweep around best params to detect knife-edge settings.",
-        implemented=False,
-        command_template='(planned) python scripts/run_param_sensitivity.py --state "{state}" --open',
+        description="Neighborhood plateau scoring over the optimization passes to detect knife-edge settings (offline, no new backtests).",
+        implemented=True,
+        command_template='python scripts/run_param_sensitivity.py --state "{state}" --open',
         state_key="param_sensitivity",
     ),
     PostStepModule(
@@ -0,0 +1,161 @@
+"""
+Resident summary index of workflow state files (runs/workflow_*.json).
+
+The web UI lists runs every few seconds. Loading and summarizing every state
+file per request gets slow once there are hundreds of runs (some states carry
+large step outputs), so the summaries are kept in memory:
+
+- refresh() stats the state files and only re-reads the ones whose
+  (mtime, size) changed; deleted files drop out
+- a background watcher calls refresh() every few seconds
+- the index is persisted (runs/cache/state_index.json) so a restarted server
+  starts warm and only re-reads what changed while it was down
+
+list() answers from the pre-sorted in-memory list (newest first).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+INDEX_VERSION = 1
+
+# state file path -> summary dict (expected to report its own read errors)
+Summarizer = Callable[[Path], Dict[str, Any]]
+
+
+class StateIndex:
+    """(mtime, size)-validated summaries of runs/workflow_*.json."""
+
+    def __init__(
+        self,
+        runs_dir: Path,
+        summarize: Summarizer,
+        cache_path: Optional[Path] = None,
+        pattern: str = "workflow_",
+        summary_version: int = 1,
+    ):
+        self.runs_dir = Path(runs_dir)
+        self.summarize = summarize
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.pattern = pattern
+        self.summary_version = int(summary_version)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._sorted: List[Dict[str, Any]] = []
+        self._refreshed = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._load()
+
+    def _load(self) -> None:
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("summary_version") != self.summary_version:
+            return
+        self._entries = dict(data.get("entries") or {})
+        self._resort()
+
+    def _save(self) -> None:
+        if not self.cache_path:
+            return
+        with self._lock:
+            payload = {"version": INDEX_VERSION, "summary_version": self.summary_version, "entries": dict(self._entries)}
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_name(self.cache_path.name + f".{uuid.uuid4().hex[:6]}.tmp")
+            tmp.write_text(json.dumps(payload), encoding="utf-8")
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass  # the in-memory index still works; next change retries
+
+    def _resort(self) -> None:
+        order = sorted(self._entries.values(), key=lambda e: e["mtime_ns"], reverse=True)
+        self._sorted = [e["summary"] for e in order]
+
+    def _read(self, path: Path) -> Dict[str, Any]:
+        try:
+            return self.summarize(path)
+        except Exception as e:
+            return {"path": str(path), "filename": path.name, "error": str(e)}
+
+    def refresh(self) -> int:
+        """Re-read changed state files; returns how many entries changed."""
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> int:
+        seen: Dict[str, os.stat_result] = {}
+        try:
+            with os.scandir(self.runs_dir) as it:
+                for de in it:
+                    if de.name.startswith(self.pattern) and de.name.endswith(".json") and de.is_file():
+                        seen[de.name] = de.stat()
+        except OSError:
+            seen = {}
+
+        with self._lock:
+            current = dict(self._entries)
+        changed: Dict[str, Optional[Dict[str, Any]]] = {}
+        for name, st in seen.items():
+            e = current.get(name)
+            if e and e["mtime_ns"] == st.st_mtime_ns and e["size"] == st.st_size:
+                continue
+            changed[name] = {
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "summary": self._read(self.runs_dir / name),
+            }
+        for name in current:
+            if name not in seen:
+                changed[name] = None
+
+        with self._lock:
+            for name, e in changed.items():
+                if e is None:
+                    self._entries.pop(name, None)
+                else:
+                    self._entries[name] = e
+            if changed or not self._refreshed:
+                self._resort()
+            self._refreshed = True
+        if changed:
+            self._save()
+        return len(changed)
+
+    def list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Summaries newest first (refreshes synchronously once if the watcher has not run yet)."""
+        if not self._refreshed:
+            self.refresh()
+        with self._lock:
+            return self._sorted[: max(0, int(limit))]
+
+    def start(self, interval: float = 2.0) -> None:
+        """Keep the index warm from a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def _watch() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.refresh()
+                except Exception:
+                    pass
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=_watch, name="state-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,307 @@
+"""
+Cached MT5 terminal discovery for the web UI.
+
+Finding terminals means listing the MetaQuotes/Terminal data folders under
+%APPDATA% / %LOCALAPPDATA%, reading each origin.txt, checking log mtimes and
+matching running terminal64.exe processes to install dirs. Doing all of that
+(including a walk over every OS process) per /api/terminals request is slow,
+so the registry does it in the background and requests read the cached list:
+
+- a data folder is re-read only when its origin.txt / MQL5/Experts stamp changes
+- running terminals are tracked by PID: known PIDs are re-checked one by one;
+  the full process scan only runs on the first refresh, when a terminal that
+  is not known to be running shows new log activity (a starting terminal
+  writes its journal right away), or every full_scan_interval seconds as a
+  safety net
+- the OS-specific parts (data folder bases, process listing, PID -> exe) are
+  injectable, so the registry works on Linux with fake folders and processes
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import psutil
+
+TERMINAL_EXE_NAMES = ("terminal64.exe", "terminal.exe")
+SKIP_DIRS = {"common", "community", "help"}
+
+# (pid, exe path) of every process that looks like an MT5 terminal
+ProcessLister = Callable[[], Iterable[Tuple[int, Path]]]
+# exe path of a live PID (None if the process is gone)
+PidExe = Callable[[int], Optional[Path]]
+
+
+def default_bases() -> List[Path]:
+    """Terminal data folder roots that exist on this machine."""
+    bases: List[Path] = []
+    for var in ("APPDATA", "LOCALAPPDATA"):
+        root = os.environ.get(var)
+        if root:
+            bases.append(Path(root) / "MetaQuotes" / "Terminal")
+    return [b for b in bases if b.exists()]
+
+
+def read_origin_path(data_dir: Path) -> Optional[Path]:
+    """Install dir recorded in <data_dir>/origin.txt (None if missing/empty)."""
+    origin = data_dir / "origin.txt"
+    if not origin.exists():
+        return None
+    try:
+        b = origin.read_bytes()
+        # Some terminals write origin.txt as UTF-16 (null bytes between chars).
+        if b"\x00" in b[:64]:
+            raw = b.decode("utf-16", errors="ignore").strip()
+        else:
+            raw = b.decode("utf-8", errors="ignore").strip()
+    except Exception:
+        return None
+    if not raw:
+        return None
+    return Path(raw)
+
+
+def latest_mtime_under(path: Path, suffix: str = ".log") -> Optional[float]:
+    """Newest mtime of the <suffix> files directly under path."""
+    latest: Optional[float] = None
+    try:
+        with os.scandir(path) as it:
+            for de in it:
+                if not de.name.endswith(suffix):
+                    continue
+                try:
+                    mt = de.stat().st_mtime
+                except OSError:
+                    continue
+                if latest is None or mt > latest:
+                    latest = mt
+    except OSError:
+        return None
+    return latest
+
+
+def list_terminal_processes() -> Iterator[Tuple[int, Path]]:
+    """Full process scan (psutil) for terminal64.exe / terminal.exe."""
+    for proc in psutil.process_iter(["pid", "name", "exe"]):
+        try:
+            name = (proc.info.get("name") or "").lower()
+            exe = proc.info.get("exe")
+            if not exe:
+                continue
+            exe_path = Path(exe)
+            if "terminal64" not in name and exe_path.name.lower() not in TERMINAL_EXE_NAMES:
+                continue
+            if not exe_path.exists():
+                continue
+            yield int(proc.info["pid"]), exe_path
+        except Exception:
+            continue
+
+
+def process_exe(pid: int) -> Optional[Path]:
+    """Exe of one PID (targeted check, no process scan)."""
+    try:
+        exe = psutil.Process(pid).exe()
+    except (psutil.Error, OSError):
+        return None
+    return Path(exe) if exe else None
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class TerminalRegistry:
+    """Background-refreshed list of MT5 terminal data folders and running terminals."""
+
+    def __init__(
+        self,
+        default_data_path: Optional[Path] = None,
+        bases: Callable[[], List[Path]] = default_bases,
+        list_processes: ProcessLister = list_terminal_processes,
+        pid_exe: PidExe = process_exe,
+        full_scan_interval: float = 60.0,
+    ):
+        self.default_data_path = Path(default_data_path).resolve() if default_data_path else None
+        self.bases = bases
+        self.list_processes = list_processes
+        self.pid_exe = pid_exe
+        self.full_scan_interval = float(full_scan_interval)
+        self.full_scans = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._folders: Dict[str, Dict[str, Any]] = {}  # data dir -> {"stamp", "info"}
+        self._log_mtimes: Dict[str, Optional[float]] = {}
+        self._pids: Dict[int, Path] = {}  # terminal PID -> install dir
+        self._last_full_scan: Optional[float] = None
+        self._terminals: List[Dict[str, Any]] = []
+        self._refreshed = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _folder_info(self, data_dir: Path) -> Optional[Dict[str, Any]]:
+        """Static part of a terminal entry, re-read only when its stamp changes."""
+        experts = data_dir / "MQL5" / "Experts"
+        stamp = [_stat_key(data_dir / "origin.txt"), experts.is_dir()]
+        key = str(data_dir)
+        cached = self._folders.get(key)
+        if cached and cached["stamp"] == stamp:
+            return cached["info"]
+
+        info: Optional[Dict[str, Any]] = None
+        if experts.is_dir():
+            origin = read_origin_path(data_dir)
+            terminal_exe = None
+            if origin:
+                cand = origin / "terminal64.exe"
+                if cand.exists():
+                    terminal_exe = str(cand)
+                else:
+                    cand2 = origin / "terminal.exe"
+                    terminal_exe = str(cand2) if cand2.exists() else str(cand)
+            info = {
+                "id": data_dir.name,
+                "data_path": str(data_dir),
+                "experts_path": str(experts),
+                "origin_path": str(origin) if origin else None,
+                "install_dir": origin.resolve() if origin else None,
+                "terminal_exe": terminal_exe,
+                "is_default": self.default_data_path is not None and data_dir.resolve() == self.default_data_path,
+            }
+        self._folders[key] = {"stamp": stamp, "info": info}
+        return info
+
+    def _scan_folders(self) -> List[Dict[str, Any]]:
+        found: List[Dict[str, Any]] = []
+        seen_ids: set[str] = set()
+        seen_dirs: set[str] = set()
+        for base in self.bases():
+            try:
+                data_dirs = list(base.iterdir())
+            except OSError:
+                continue
+            for data_dir in data_dirs:
+                if data_dir.name.lower() in SKIP_DIRS or data_dir.name in seen_ids or not data_dir.is_dir():
+                    continue
+                seen_ids.add(data_dir.name)
+                seen_dirs.add(str(data_dir))
+                info = self._folder_info(data_dir)
+                if info:
+                    found.append(info)
+        for key in set(self._folders) - seen_dirs:
+            del self._folders[key]
+        return found
+
+    def _update_pids(self, need_full_scan: bool) -> None:
+        now = time.monotonic()
+        if (
+            need_full_scan
+            or self._last_full_scan is None
+            or now - self._last_full_scan >= self.full_scan_interval
+        ):
+            pids: Dict[int, Path] = {}
+            for pid, exe in self.list_processes():
+                try:
+                    pids[int(pid)] = Path(exe).parent.resolve()
+                except OSError:
+                    continue
+            self._pids = pids
+            self._last_full_scan = now
+            self.full_scans += 1
+            return
+        for pid, install_dir in list(self._pids.items()):
+            exe = self.pid_exe(pid)
+            # Gone, or the PID was reused by another program
+            if exe is None or exe.parent.resolve() != install_dir:
+                del self._pids[pid]
+
+    def refresh(self, full_scan: bool = False) -> List[Dict[str, Any]]:
+        """Re-discover terminals; returns the new list."""
+        with self._refresh_lock:
+            folders = self._scan_folders()
+            running_installs = set(self._pids.values())
+
+            log_mtimes: Dict[str, Optional[float]] = {}
+            new_activity = False
+            for info in folders:
+                data_dir = Path(info["data_path"])
+                latest = latest_mtime_under(data_dir / "logs")
+                if latest is None:
+                    latest = latest_mtime_under(data_dir / "Tester" / "logs")
+                log_mtimes[info["data_path"]] = latest
+                if (
+                    self._refreshed
+                    and latest != self._log_mtimes.get(info["data_path"])
+                    and info["install_dir"] is not None
+                    and info["install_dir"] not in running_installs
+                ):
+                    new_activity = True
+            self._log_mtimes = log_mtimes
+            self._update_pids(full_scan or new_activity)
+
+            by_install: Dict[Path, List[int]] = {}
+            for pid, install_dir in sorted(self._pids.items()):
+                by_install.setdefault(install_dir, []).append(pid)
+
+            out: List[Dict[str, Any]] = []
+            for info in folders:
+                pids = by_install.get(info["install_dir"], []) if info["install_dir"] else []
+                entry = {k: v for k, v in info.items() if k != "install_dir"}
+                entry.update(
+                    {
+                        "is_running": bool(pids),
+                        "pids": pids,
+                        "latest_log_mtime": log_mtimes.get(info["data_path"]),
+                    }
+                )
+                out.append(entry)
+            out.sort(key=lambda d: (not bool(d.get("is_running")), not bool(d.get("is_default")), str(d.get("id"))))
+
+            with self._lock:
+                self._terminals = out
+                self._refreshed = True
+            return out
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Cached terminals (running first, then the configured default)."""
+        if not self._refreshed:
+            self.refresh()
+        with self._lock:
+            return list(self._terminals)
+
+    def get(self, terminal_id: str) -> Optional[Dict[str, Any]]:
+        tid = (terminal_id or "").strip()
+        if not tid:
+            return None
+        for t in self.list():
+            if t.get("id") == tid:
+                return t
+        return None
+
+    def start(self, interval: float = 5.0) -> None:
+        """Keep the registry warm from a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def _watch() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.refresh()
+                except Exception:
+                    pass
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=_watch, name="terminal-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()